@@ -4,40 +4,47 @@ Aplicador de Tempos Gerados - Versão Refinamento Inteligente
 Refina tempos aproximados usando direção calculada pelo otimizador
 """
 
-import pandas as pd
-from openpyxl import load_workbook, Workbook
 from decimal import Decimal, ROUND_HALF_UP, getcontext
 import json
+import logging
 import os
 import time
 import shutil
 from datetime import datetime
-from valores_teste import valores_base
+from otimizador_tempos_inteligente import extrair_dados_planilha_original
+from estrategias_tempo import compilar_estrategia
+from orcamento_otimizacao import criar_orcamento, limitar, qualidade, repassar_interrompidos
+from registro_log import obter_logger, ListaFloat, Progresso
+from instrumentacao import (contar, cronometrar, medir_ponto, reiniciar, CHAMADAS_MOTOR, ITERACOES,
+                            REJEITADOS_LIMITE, relatorio as relatorio_instrumentacao)
+from relatorio_streaming import EscritorRelatorio, renderizar_texto
+from sensibilidade_tempos import (calcular_sensibilidades, ordem_por_sensibilidade,
+                                  candidatos_por_sensibilidade, indice_lista_ordenada)
 
 # Configura precisão máxima
 getcontext().prec = 28
 
-def ler_valor_exato(sheet, linha, coluna):
-    """
-    Lê valor exato da célula com precisão máxima
-    """
-    valor = sheet.cell(row=linha, column=coluna).value
-    if valor is None:
-        return Decimal('0')
-    return Decimal(str(valor))
+log = obter_logger(__name__)
+
+# Etapa dos registros de ponto no relatório em fluxo
+ETAPA_RELATORIO = 'refinamento_hibrido'
 
-def gerar_tempos_refinamento(tempo_base, raio_busca=Decimal('0.01'), incremento=Decimal('0.0001')):
+# Tolerância da vazão média no refinamento híbrido
+TOLERANCIA_HIBRIDA = Decimal('0.07')
+
+def gerar_tempos_refinamento(tempo_base, raio_busca=Decimal('0.01'), incremento=Decimal('0.0001'), estrategia=None):
     """
     Gera tempos para refinamento baseado em um tempo aproximado
     FOCA APENAS NAS CASAS DECIMAIS - 7 CASAS DECIMAIS
     """
+    restricoes = compilar_estrategia(estrategia)
     tempos = []
     valor_inicial = tempo_base - raio_busca
     valor_final = tempo_base + raio_busca
     
-    # Garante que está dentro dos limites 239.599-240.499
-    valor_inicial = max(valor_inicial, Decimal('239.5990000'))
-    valor_final = min(valor_final, Decimal('240.4990000'))
+    # Garante que está dentro dos limites da estratégia (239.599-240.499 em 240 s)
+    valor_inicial = max(valor_inicial, restricoes.limite_inferior)
+    valor_final = min(valor_final, restricoes.limite_superior)
     
     valor_atual = valor_inicial
     while valor_atual <= valor_final:
@@ -51,6 +58,7 @@ def calcular_vazao_com_tempos(leituras, constantes, tempos_teste):
     Calcula a vazão média usando os tempos fornecidos
     CÁLCULOS CORRETOS E COMPLETOS - VERSÃO BRUTA
     """
+    contar(CHAMADAS_MOTOR)
     resultados = []
     
     for i, leitura in enumerate(leituras):
@@ -106,94 +114,122 @@ def calcular_vazao_com_tempos(leituras, constantes, tempos_teste):
     
     return vazao_media
 
-def buscar_refinamento_tempos_sequencial(leituras, constantes, vazao_desejada, tempos_aproximados, direcao_refinamento, tolerancia_objetivo=Decimal('0.005')):
+def buscar_refinamento_tempos_sequencial(leituras, constantes, vazao_desejada, tempos_aproximados, direcao_refinamento, tolerancia_objetivo=Decimal('0.005'),
+                                         estrategia=None, prazo=None, ordem=None):
     """
     Refina os tempos um por vez sequencialmente - ESTRATÉGIA HÍBRIDA
     Primeiro testa valores principais, depois fallback se necessário
+    A sensibilidade de cada leitura define a ordem dos tempos e o valor estimado
+    da grade (só os valores em volta são testados); dentro da tolerância fica o
+    primeiro valor da grade, como na varredura completa
+    estrategia: estratégia de tempo alvo (None = TEMPO_ALVO, padrão 240 s)
+    prazo: Prazo opcional; esgotado, retorna a melhor aproximação até ali
+    ordem: ordem fixa dos tempos (None = do mais para o menos sensível)
     """
-    print(f"   🎯 Refinando tempos sequencialmente (ESTRATÉGIA HÍBRIDA)...")
-    print(f"   📊 Vazão desejada: {float(vazao_desejada):.6f}")
-    print(f"   📊 Tolerância objetivo: ±{float(tolerancia_objetivo)}")
-    print(f"   📊 Tempos aproximados: {[float(t) for t in tempos_aproximados]}")
-    print(f"   📊 Direção refinamento: {direcao_refinamento}")
+    log.info("   🎯 Refinando tempos sequencialmente (ESTRATÉGIA HÍBRIDA)...")
+    log.info("   📊 Vazão desejada: %.6f", vazao_desejada)
+    log.info("   📊 Tolerância objetivo: ±%s", float(tolerancia_objetivo))
+    log.info("   📊 Tempos aproximados: %s", ListaFloat(tempos_aproximados))
+    log.info("   📊 Direção refinamento: %s", direcao_refinamento)
     
     # Calcula vazão inicial com tempos aproximados
     vazao_inicial = calcular_vazao_com_tempos(leituras, constantes, tempos_aproximados)
     diferenca_inicial = abs(vazao_inicial - vazao_desejada)
-    print(f"   📊 Vazão inicial: {float(vazao_inicial):.8f}")
-    print(f"   📊 Diferença inicial: {float(diferenca_inicial):.8f}")
+    log.info("   📊 Vazão inicial: %.8f", vazao_inicial)
+    log.info("   📊 Diferença inicial: %.8f", diferenca_inicial)
     
-    # Importa valores de fallback
-    from valores_teste import valores_principais, valores_fallback
+    # Grades da estratégia já filtradas pela direção (abaixo do nominal para INCREMENTAR,
+    # acima para DECREMENTAR), compiladas uma vez por processo
+    restricoes = compilar_estrategia(estrategia)
+    valores_principais_filtrados, valores_fallback_filtrados, rejeitados_limite = restricoes.grades(direcao_refinamento)
+    desempatar = restricoes.desempatar
     
     # Começa com os tempos aproximados
     tempos_atual = tempos_aproximados.copy()
     total_testes = 0
     melhorias_encontradas = 0
-    
-    # Testa cada tempo individualmente
-    for tempo_idx in range(3):
-        print(f"   🔍 Testando tempo {tempo_idx + 1}...")
+    # Mensagens por candidato só são montadas com o log em DEBUG
+    depurar = log.isEnabledFor(logging.DEBUG)
+    
+    # Sensibilidade d(vazão)/d(tempo) de cada leitura: a de maior efeito é testada primeiro
+    sensibilidades = calcular_sensibilidades(calcular_vazao_com_tempos, leituras, constantes, tempos_atual,
+                                             vazao_base=vazao_inicial)
+    if ordem is None:
+        ordem = ordem_por_sensibilidade(sensibilidades)
+    log.info("   📊 Sensibilidades (L/h por s): %s | ordem: %s",
+             ListaFloat(sensibilidades), [i + 1 for i in ordem])
+    
+    # Testa cada tempo individualmente, do mais para o menos sensível
+    # Melhor aproximação até aqui (os tempos de partida, se o prazo acabar antes do primeiro tempo)
+    melhor_vazao, melhor_diferenca = vazao_inicial, diferenca_inicial
+    for tempo_idx in ordem:
+        if prazo is not None and prazo.esgotado():
+            log.info("   ⏱️  Prazo esgotado antes do tempo %s: mantendo a melhor aproximação", tempo_idx + 1)
+            break
+        log.debug("   🔍 Testando tempo %s...", tempo_idx + 1)
         
         melhor_tempo = tempos_atual[tempo_idx]
         melhor_vazao = calcular_vazao_com_tempos(leituras, constantes, tempos_atual)
         melhor_diferenca = abs(melhor_vazao - vazao_desejada)
         
-        print(f"   📊 Estado atual antes do teste:")
-        print(f"      Tempo {tempo_idx + 1}: {float(melhor_tempo):.6f}")
-        print(f"      Vazão atual: {float(melhor_vazao):.8f}")
-        print(f"      Diferença atual: {float(melhor_diferenca):.8f}")
+        log.debug("   📊 Estado atual antes do teste:")
+        log.debug("      Tempo %s: %.6f", tempo_idx + 1, melhor_tempo)
+        log.debug("      Vazão atual: %.8f", melhor_vazao)
+        log.debug("      Diferença atual: %.8f", melhor_diferenca)
         
         # ESTRATÉGIA HÍBRIDA: Primeiro testa valores principais
-        if direcao_refinamento == 'INCREMENTAR':
-            valores_principais_filtrados = [v for v in valores_principais if v < Decimal('240.000000')]
-            valores_fallback_filtrados = [v for v in valores_fallback if v < Decimal('240.000000')]
-        else:  # DECREMENTAR
-            valores_principais_filtrados = [v for v in valores_principais if v > Decimal('240.000000')]
-            valores_fallback_filtrados = [v for v in valores_fallback if v > Decimal('240.000000')]
+        contar(REJEITADOS_LIMITE, rejeitados_limite)
         
-        print(f"   📊 ESTRATÉGIA HÍBRIDA:")
-        print(f"      Valores principais: {len(valores_principais_filtrados)}")
-        print(f"      Valores fallback: {len(valores_fallback_filtrados)}")
+        log.debug("   📊 ESTRATÉGIA HÍBRIDA:")
+        log.debug("      Valores principais: %s", len(valores_principais_filtrados))
+        log.debug("      Valores fallback: %s", len(valores_fallback_filtrados))
+        
+        def avaliar(valor_teste):
+            tempos_teste = tempos_atual.copy()
+            tempos_teste[tempo_idx] = valor_teste
+            return calcular_vazao_com_tempos(leituras, constantes, tempos_teste)
+        
+        def candidatos(valores, tempo_base, vazao_base):
+            # Só os valores da grade em volta do tempo estimado pela sensibilidade
+            if not valores:
+                return ()
+            return limitar(candidatos_por_sensibilidade(
+                avaliar, valores.__getitem__, indice_lista_ordenada(valores), (0, len(valores) - 1),
+                tempo_base, vazao_base, sensibilidades[tempo_idx], vazao_desejada,
+                tolerancia=tolerancia_objetivo, inicio=0,
+            ), prazo)
         
         # FASE 1: Testa valores principais
-        print(f"   🔍 FASE 1: Testando {len(valores_principais_filtrados)} valores principais...")
+        log.debug("   🔍 FASE 1: Testando valores principais em volta da estimativa...")
         objetivo_atingido = False
         
-        for i, valor_teste in enumerate(valores_principais_filtrados):
+        for valor_teste, vazao_atual in candidatos(valores_principais_filtrados, melhor_tempo, melhor_vazao):
             total_testes += 1
-            
-            # Cria uma cópia dos tempos e altera apenas o tempo atual
-            tempos_teste = tempos_atual.copy()
-            tempos_teste[tempo_idx] = valor_teste
-            
-            # Calcula vazão com este tempo alterado
-            vazao_atual = calcular_vazao_com_tempos(leituras, constantes, tempos_teste)
             diferenca = abs(vazao_atual - vazao_desejada)
             
-            # Log a cada 50 testes para acompanhar o progresso
-            if i % 50 == 0:
-                print(f"      Teste {i+1}/{len(valores_principais_filtrados)}: {float(valor_teste):.6f} → {float(vazao_atual):.8f} (dif: {float(diferenca):.8f})")
+            if depurar:
+                log.debug("      Teste %s: %.6f → %.8f (dif: %.8f)", total_testes, valor_teste, vazao_atual, diferenca)
             
-            # Se encontrou uma melhor aproximação
-            if diferenca < melhor_diferenca:
+            # Se encontrou uma melhor aproximação (empates pela regra da estratégia)
+            if diferenca < melhor_diferenca or (desempatar is not None and diferenca == melhor_diferenca
+                                                and desempatar(valor_teste, melhor_tempo)):
                 melhor_diferenca = diferenca
                 melhor_tempo = valor_teste
                 melhor_vazao = vazao_atual
                 melhorias_encontradas += 1
                 
-                print(f"   📊 ✅ NOVA MELHOR APROXIMAÇÃO (PRINCIPAL) para tempo {tempo_idx + 1}!")
-                print(f"      Tempo {tempo_idx + 1}: {float(valor_teste):.6f}")
-                print(f"      Vazão: {float(vazao_atual):.8f}")
-                print(f"      Diferença: {float(diferenca):.8f}")
-                print(f"      Melhoria: {float(melhor_diferenca - diferenca):.8f}")
+                if depurar:
+                    log.debug("   📊 ✅ NOVA MELHOR APROXIMAÇÃO (PRINCIPAL) para tempo %s!", tempo_idx + 1)
+                    log.debug("      Tempo %s: %.6f", tempo_idx + 1, valor_teste)
+                    log.debug("      Vazão: %.8f", vazao_atual)
+                    log.debug("      Diferença: %.8f", diferenca)
             
             # Se atingiu o objetivo, para imediatamente
             if diferenca <= tolerancia_objetivo:
-                print(f"   ✅ OBJETIVO ATINGIDO (PRINCIPAL) no tempo {tempo_idx + 1}!")
-                print(f"      Tempo {tempo_idx + 1}: {float(valor_teste):.6f}")
-                print(f"      Vazão: {float(vazao_atual):.8f}")
-                print(f"      Diferença: {float(diferenca):.8f}")
+                log.debug("   ✅ OBJETIVO ATINGIDO (PRINCIPAL) no tempo %s!", tempo_idx + 1)
+                log.debug("      Tempo %s: %.6f", tempo_idx + 1, valor_teste)
+                log.debug("      Vazão: %.8f", vazao_atual)
+                log.debug("      Diferença: %.8f", diferenca)
                 
                 # Atualiza o tempo e retorna
                 tempos_atual[tempo_idx] = valor_teste
@@ -208,43 +244,36 @@ def buscar_refinamento_tempos_sequencial(leituras, constantes, vazao_desejada, t
                 }
         
         # FASE 2: Se não atingiu objetivo, testa valores de fallback
-        if not objetivo_atingido and diferenca_inicial > tolerancia_objetivo * Decimal('2'):
-            print(f"   🔍 FASE 2: Testando {len(valores_fallback_filtrados)} valores de fallback...")
+        if not objetivo_atingido and diferenca_inicial > tolerancia_objetivo * Decimal('2') and (prazo is None or not prazo.expirado):
+            log.debug("   🔍 FASE 2: Testando valores de fallback em volta da estimativa...")
             
-            for i, valor_teste in enumerate(valores_fallback_filtrados):
+            for valor_teste, vazao_atual in candidatos(valores_fallback_filtrados, melhor_tempo, melhor_vazao):
                 total_testes += 1
-                
-                # Cria uma cópia dos tempos e altera apenas o tempo atual
-                tempos_teste = tempos_atual.copy()
-                tempos_teste[tempo_idx] = valor_teste
-                
-                # Calcula vazão com este tempo alterado
-                vazao_atual = calcular_vazao_com_tempos(leituras, constantes, tempos_teste)
                 diferenca = abs(vazao_atual - vazao_desejada)
                 
-                # Log a cada 50 testes para acompanhar o progresso
-                if i % 50 == 0:
-                    print(f"      Teste {i+1}/{len(valores_fallback_filtrados)}: {float(valor_teste):.6f} → {float(vazao_atual):.8f} (dif: {float(diferenca):.8f})")
+                if depurar:
+                    log.debug("      Teste %s: %.6f → %.8f (dif: %.8f)", total_testes, valor_teste, vazao_atual, diferenca)
                 
-                # Se encontrou uma melhor aproximação
-                if diferenca < melhor_diferenca:
+                # Se encontrou uma melhor aproximação (empates pela regra da estratégia)
+                if diferenca < melhor_diferenca or (desempatar is not None and diferenca == melhor_diferenca
+                                                    and desempatar(valor_teste, melhor_tempo)):
                     melhor_diferenca = diferenca
                     melhor_tempo = valor_teste
                     melhor_vazao = vazao_atual
                     melhorias_encontradas += 1
                     
-                    print(f"   📊 ✅ NOVA MELHOR APROXIMAÇÃO (FALLBACK) para tempo {tempo_idx + 1}!")
-                    print(f"      Tempo {tempo_idx + 1}: {float(valor_teste):.6f}")
-                    print(f"      Vazão: {float(vazao_atual):.8f}")
-                    print(f"      Diferença: {float(diferenca):.8f}")
-                    print(f"      Melhoria: {float(melhor_diferenca - diferenca):.8f}")
+                    if depurar:
+                        log.debug("   📊 ✅ NOVA MELHOR APROXIMAÇÃO (FALLBACK) para tempo %s!", tempo_idx + 1)
+                        log.debug("      Tempo %s: %.6f", tempo_idx + 1, valor_teste)
+                        log.debug("      Vazão: %.8f", vazao_atual)
+                        log.debug("      Diferença: %.8f", diferenca)
                 
                 # Se atingiu o objetivo, para imediatamente
                 if diferenca <= tolerancia_objetivo:
-                    print(f"   ✅ OBJETIVO ATINGIDO (FALLBACK) no tempo {tempo_idx + 1}!")
-                    print(f"      Tempo {tempo_idx + 1}: {float(valor_teste):.6f}")
-                    print(f"      Vazão: {float(vazao_atual):.8f}")
-                    print(f"      Diferença: {float(diferenca):.8f}")
+                    log.debug("   ✅ OBJETIVO ATINGIDO (FALLBACK) no tempo %s!", tempo_idx + 1)
+                    log.debug("      Tempo %s: %.6f", tempo_idx + 1, valor_teste)
+                    log.debug("      Vazão: %.8f", vazao_atual)
+                    log.debug("      Diferença: %.8f", diferenca)
                     
                     # Atualiza o tempo e retorna
                     tempos_atual[tempo_idx] = valor_teste
@@ -263,17 +292,17 @@ def buscar_refinamento_tempos_sequencial(leituras, constantes, vazao_desejada, t
         
         # Verifica se houve melhoria
         if melhor_tempo != tempos_aproximados[tempo_idx]:
-            print(f"   ✅ Tempo {tempo_idx + 1} otimizado: {float(tempos_aproximados[tempo_idx]):.6f} → {float(melhor_tempo):.6f}")
-            print(f"   📊 Vazão após tempo {tempo_idx + 1}: {float(melhor_vazao):.8f}")
-            print(f"   📊 Diferença após tempo {tempo_idx + 1}: {float(melhor_diferenca):.8f}")
+            log.debug("   ✅ Tempo %s otimizado: %.6f → %.6f", tempo_idx + 1, tempos_aproximados[tempo_idx], melhor_tempo)
+            log.debug("   📊 Vazão após tempo %s: %.8f", tempo_idx + 1, melhor_vazao)
+            log.debug("   📊 Diferença após tempo %s: %.8f", tempo_idx + 1, melhor_diferenca)
         else:
-            print(f"   ⚠️  Tempo {tempo_idx + 1} não foi otimizado (manteve {float(melhor_tempo):.6f})")
-            print(f"   📊 Vazão mantida: {float(melhor_vazao):.8f}")
-            print(f"   📊 Diferença mantida: {float(melhor_diferenca):.8f}")
+            log.debug("   ⚠️  Tempo %s não foi otimizado (manteve %.6f)", tempo_idx + 1, melhor_tempo)
+            log.debug("   📊 Vazão mantida: %.8f", melhor_vazao)
+            log.debug("   📊 Diferença mantida: %.8f", melhor_diferenca)
     
     # Retorna a melhor aproximação encontrada após testar todos os tempos
-    print(f"   📊 Total de testes realizados: {total_testes}")
-    print(f"   📊 Melhorias encontradas: {melhorias_encontradas}")
+    log.info("   📊 Total de testes realizados: %s", total_testes)
+    log.info("   📊 Melhorias encontradas: %s", melhorias_encontradas)
     
     return {
         'tempos': tempos_atual.copy(),
@@ -285,140 +314,63 @@ def buscar_refinamento_tempos_sequencial(leituras, constantes, vazao_desejada, t
         'estrategia': 'híbrida'
     }
 
-def carregar_informacoes_refinamento():
+def carregar_informacoes_refinamento(arquivo_informacoes='informacoes_refinamento.json'):
     """
     Carrega as informações de refinamento calculadas pelo otimizador
     """
     try:
-        with open('informacoes_refinamento.json', 'r', encoding='utf-8') as f:
+        with open(arquivo_informacoes, 'r', encoding='utf-8') as f:
             informacoes = json.load(f)
-        print(f"✅ Carregadas informações de refinamento para {len(informacoes)} pontos")
+        log.info("✅ Carregadas informações de refinamento para %s pontos", len(informacoes))
         return informacoes
     except FileNotFoundError:
-        print(f"❌ Arquivo informacoes_refinamento.json não encontrado!")
-        print(f"💡 Execute primeiro: python otimizador_tempos_inteligente.py")
+        log.error("❌ Arquivo %s não encontrado!", arquivo_informacoes)
+        log.info("💡 Execute primeiro: python otimizador_tempos_inteligente.py")
         return None
     except Exception as e:
-        print(f"❌ Erro ao carregar informações de refinamento: {e}")
+        log.error("❌ Erro ao carregar informações de refinamento: %s", e)
         return None
 
 def extrair_dados_planilha_corrigida(arquivo_corrigido, arquivo_original):
     """
     Extrai dados da planilha corrigida e valores desejados da original
     """
-    try:
-        # Carrega planilha corrigida (com valores aproximados)
-        wb_corrigido = load_workbook(arquivo_corrigido, data_only=True)
-        coleta_corrigido = wb_corrigido["Coleta de Dados"]
-        estimativa_corrigido = wb_corrigido["Estimativa da Incerteza"]
-        
-        # Carrega planilha original (para valores desejados)
-        wb_original = load_workbook(arquivo_original, data_only=True)
-        coleta_original = wb_original["Coleta de Dados"]
-        
-        # Extrai constantes da planilha corrigida
-        constantes = {}
-        constantes['ponto_mlp'] = ler_valor_exato(coleta_corrigido, 50, 9)  # I50
-        constantes['pulso_equipamento_mlp'] = ler_valor_exato(coleta_corrigido, 50, 30)  # AD50
-        constantes['constante_correcao_temp'] = ler_valor_exato(coleta_corrigido, 51, 18)  # R51
-        constantes['constante_correcao_inclinacao'] = ler_valor_exato(coleta_corrigido, 51, 21)  # U51
-        constantes['modo_calibracao'] = coleta_corrigido.cell(row=16, column=24).value  # X16
-        constantes['correcao_tempo_bu23'] = ler_valor_exato(estimativa_corrigido, 23, 73)  # BU23
-        constantes['correcao_tempo_bw23'] = ler_valor_exato(estimativa_corrigido, 23, 75)  # BW23
-        constantes['correcao_temp_bu26'] = ler_valor_exato(estimativa_corrigido, 26, 73)  # BU26
-        constantes['correcao_temp_bw26'] = ler_valor_exato(estimativa_corrigido, 26, 75)  # BW26
-        
-        # Extrai dados dos pontos
-        pontos = []
-        linha_atual = 54
-        num_ponto = 1
-        
-        while True:
-            pulsos = ler_valor_exato(coleta_corrigido, linha_atual, 3)
-            
-            if pulsos == 0:
-                pulsos2 = ler_valor_exato(coleta_corrigido, linha_atual + 1, 3)
-                pulsos3 = ler_valor_exato(coleta_corrigido, linha_atual + 2, 3)
-                
-                if pulsos2 == 0 and pulsos3 == 0:
-                    break
-            
-            ponto = {
-                'numero': num_ponto,
-                'linha_inicial': linha_atual,
-                'leituras': [],
-                'valores_originais': {},
-                'tempos_aproximados': []
-            }
-            
-            # Extrai valores da planilha corrigida (aproximados)
-            for i in range(3):
-                linha = linha_atual + i
-                
-                # Valores brutos da planilha corrigida
-                pulsos_padrao = ler_valor_exato(coleta_corrigido, linha, 3)
-                tempo_coleta = ler_valor_exato(coleta_corrigido, linha, 6)  # Tempo aproximado
-                leitura_medidor = ler_valor_exato(coleta_corrigido, linha, 15)
-                temperatura = ler_valor_exato(coleta_corrigido, linha, 18)
-                
-                # Valores calculados da planilha corrigida
-                tempo_coleta_corrigido = ler_valor_exato(coleta_corrigido, linha, 27)
-                temperatura_corrigida = ler_valor_exato(coleta_corrigido, linha, 30)
-                totalizacao_padrao_corrigido = ler_valor_exato(coleta_corrigido, linha, 12)
-                vazao_referencia = ler_valor_exato(coleta_corrigido, linha, 9)
-                vazao_medidor = ler_valor_exato(coleta_corrigido, linha, 24)
-                erro_percentual = ler_valor_exato(coleta_corrigido, linha, 21)
-                
-                leitura = {
-                    'linha': linha,
-                    'pulsos_padrao': pulsos_padrao,
-                    'tempo_coleta': tempo_coleta,
-                    'leitura_medidor': leitura_medidor,
-                    'temperatura': temperatura,
-                    'tempo_coleta_corrigido': tempo_coleta_corrigido,
-                    'temperatura_corrigida': temperatura_corrigida,
-                    'totalizacao_padrao_corrigido': totalizacao_padrao_corrigido,
-                    'vazao_referencia': vazao_referencia,
-                    'vazao_medidor': vazao_medidor,
-                    'erro_percentual': erro_percentual
-                }
-                
-                ponto['leituras'].append(leitura)
-                ponto['tempos_aproximados'].append(tempo_coleta)
-            
-            # Valores desejados da planilha original
-            linha_agregados = linha_atual + 3
-            vazao_media_original = ler_valor_exato(coleta_original, linha_agregados, 9)
-            tendencia_original = ler_valor_exato(coleta_original, linha_agregados, 21)
-            desvio_padrao_original = ler_valor_exato(coleta_original, linha_agregados, 30)
-            
-            ponto['valores_originais'] = {
-                'vazao_media': vazao_media_original,
-                'tendencia': tendencia_original,
-                'desvio_padrao': desvio_padrao_original
-            }
-            
-            pontos.append(ponto)
-            num_ponto += 1
-            linha_atual += 9
-        
-        return constantes, pontos
-        
-    except Exception as e:
-        print(f"ERRO: Erro ao extrair dados: {e}")
+    # Ambas as planilhas passam pelo cache de snapshots (sem reabrir no openpyxl)
+    constantes, pontos = extrair_dados_planilha_original(arquivo_corrigido)
+    if constantes is None or pontos is None:
+        return None, None
+    
+    constantes_original, pontos_original = extrair_dados_planilha_original(arquivo_original)
+    if constantes_original is None or pontos_original is None:
         return None, None
+    
+    # Valores desejados da planilha original, indexados pela linha inicial do ponto
+    valores_desejados = {p['linha_inicial']: p['valores_originais'] for p in pontos_original}
+    valores_vazios = {
+        'vazao_media': Decimal('0'),
+        'tendencia': Decimal('0'),
+        'desvio_padrao': Decimal('0')
+    }
+    
+    for ponto in pontos:
+        ponto['tempos_aproximados'] = [leitura['tempo_coleta'] for leitura in ponto['leituras']]
+        ponto['valores_originais'] = valores_desejados.get(ponto['linha_inicial'], dict(valores_vazios))
+    
+    return constantes, pontos
 
-def processar_ponto_refinamento_inteligente(ponto, constantes, info_refinamento, tolerancia_objetivo=Decimal('0.07')):
+def processar_ponto_refinamento_inteligente(ponto, constantes, info_refinamento, tolerancia_objetivo=TOLERANCIA_HIBRIDA,
+                                            estrategia=None, prazo=None):
     """
     Processa um ponto individual refinando os tempos aproximados - VERSÃO BRUTA
+    prazo: Prazo opcional da busca (o resultado informa o encerramento e os resíduos)
     """
-    print(f"\n🔍 REFINANDO Ponto {ponto['numero']} (linha {ponto['linha_inicial']}) - VERSÃO BRUTA...")
-    print(f"   📊 Vazão desejada: {float(ponto['valores_originais']['vazao_media']):.6f}")
-    print(f"   📊 Tendência desejada: {float(ponto['valores_originais']['tendencia']):.6f}")
-    print(f"   📊 Desvio padrão desejado: {float(ponto['valores_originais']['desvio_padrao']):.6f}")
-    print(f"   📊 Tempos aproximados: {[float(t) for t in ponto['tempos_aproximados']]}")
-    print(f"   📊 Direção refinamento: {info_refinamento['direcao_refinamento']}")
-    print(f"   📊 Magnitude diferença: {info_refinamento['magnitude_diferenca']:.6f}")
+    log.info("\n🔍 REFINANDO Ponto %s (linha %s) - VERSÃO BRUTA...", ponto['numero'], ponto['linha_inicial'])
+    log.info("   📊 Vazão desejada: %.6f", ponto['valores_originais']['vazao_media'])
+    log.info("   📊 Tendência desejada: %.6f", ponto['valores_originais']['tendencia'])
+    log.info("   📊 Desvio padrão desejado: %.6f", ponto['valores_originais']['desvio_padrao'])
+    log.info("   📊 Tempos aproximados: %s", ListaFloat(ponto['tempos_aproximados']))
+    log.info("   📊 Direção refinamento: %s", info_refinamento['direcao_refinamento'])
+    log.info("   📊 Magnitude diferença: %.6f", info_refinamento['magnitude_diferenca'])
     
     vazao_desejada = ponto['valores_originais']['vazao_media']
     leituras = ponto['leituras']
@@ -428,27 +380,31 @@ def processar_ponto_refinamento_inteligente(ponto, constantes, info_refinamento,
     # Calcula vazão inicial para comparação
     vazao_inicial = calcular_vazao_com_tempos(leituras, constantes, tempos_aproximados)
     diferenca_inicial = abs(vazao_inicial - vazao_desejada)
-    print(f"   📊 Vazão inicial: {float(vazao_inicial):.8f}")
-    print(f"   📊 Diferença inicial: {float(diferenca_inicial):.8f}")
+    log.info("   📊 Vazão inicial: %.8f", vazao_inicial)
+    log.info("   📊 Diferença inicial: %.8f", diferenca_inicial)
     
     # Refina os tempos sequencialmente um por vez
-    resultado = buscar_refinamento_tempos_sequencial(leituras, constantes, vazao_desejada, tempos_aproximados, direcao_refinamento, tolerancia_objetivo)
+    resultado = buscar_refinamento_tempos_sequencial(leituras, constantes, vazao_desejada, tempos_aproximados, direcao_refinamento, tolerancia_objetivo,
+                                                     estrategia, prazo)
     
     if resultado is None:
-        print(f"   ❌ Não foi possível refinar os tempos do Ponto {ponto['numero']}!")
+        log.error("   ❌ Não foi possível refinar os tempos do Ponto %s!", ponto['numero'])
         return None
     
     # Calcula melhoria
     melhoria = diferenca_inicial - resultado['diferenca']
-    
-    print(f"   ✅ Ponto {ponto['numero']} refinado com sucesso!")
-    print(f"   📊 Tempos refinados: {[float(t) for t in resultado['tempos']]}")
-    print(f"   📊 Vazão obtida: {float(resultado['vazao_atual']):.8f}")
-    print(f"   📊 Diferença: {float(resultado['diferenca']):.8f}")
-    print(f"   📊 Melhoria: {float(melhoria):.8f}")
-    print(f"   📊 Objetivo atingido: {'✅' if resultado['objetivo_atingido'] else '❌'}")
-    print(f"   📊 Combinações testadas: {resultado['iteracoes']}")
-    print(f"   📊 Melhorias encontradas: {resultado['melhorias_encontradas']}")
+    campos_qualidade, residuos = qualidade(leituras, constantes, resultado['tempos'], ponto['valores_originais'],
+                                           resultado, prazo)
+    
+    log.info("   ✅ Ponto %s refinado com sucesso!", ponto['numero'])
+    log.info("   📊 Tempos refinados: %s", ListaFloat(resultado['tempos']))
+    log.info("   📊 Vazão obtida: %.8f", resultado['vazao_atual'])
+    log.info("   📊 Diferença: %.8f", resultado['diferenca'])
+    log.info("   📊 Melhoria: %.8f", melhoria)
+    log.info("   📊 Objetivo atingido: %s", ('✅' if resultado['objetivo_atingido'] else '❌'))
+    log.info("   📊 Combinações testadas: %s", resultado['iteracoes'])
+    log.info("   📊 Melhorias encontradas: %s", resultado['melhorias_encontradas'])
+    log.info("   📊 Encerramento: %s", campos_qualidade['encerramento'])
     
     return {
         'numero': ponto['numero'],
@@ -464,288 +420,335 @@ def processar_ponto_refinamento_inteligente(ponto, constantes, info_refinamento,
         'iteracoes': resultado['iteracoes'],
         'melhorias_encontradas': resultado['melhorias_encontradas'],
         'estrategia_usada': resultado.get('estrategia', 'híbrida'),
-        'direcao_refinamento': direcao_refinamento
+        'direcao_refinamento': direcao_refinamento,
+        **campos_qualidade,
+        # Valores Decimal sem arredondamento para o relatório em fluxo
+        'exatos': {
+            'tempos_refinados': list(resultado['tempos']),
+            'vazao_atual': resultado['vazao_atual'],
+            'vazao_desejada': vazao_desejada,
+            'diferenca': resultado['diferenca'],
+            'diferenca_inicial': diferenca_inicial,
+            'melhoria': melhoria,
+            'residuos': residuos
+        }
     }
 
+def aplicar_tempos_refinados_na_aba(resultados_pontos, coleta_sheet):
+    """
+    Aplica os tempos refinados na aba "Coleta de Dados" (em memória)
+    NÃO ALTERA OUTROS VALORES - APENAS OS TEMPOS
+    """
+    pontos_aplicados = 0
+    
+    for resultado in resultados_pontos:
+        if resultado is None:
+            continue
+            
+        numero_ponto = resultado['numero']
+        linha_inicial = resultado['linha_inicial']
+        tempos_refinados = resultado['tempos_refinados']
+        tempos_aproximados = resultado['tempos_aproximados']
+        
+        log.info("   📊 Aplicando Ponto %s (linha %s)...", numero_ponto, linha_inicial)
+        log.info("      Tempos aproximados: %s", tempos_aproximados)
+        log.info("      Tempos refinados: %s", tempos_refinados)
+        
+        # Aplica APENAS os 3 tempos refinados para o ponto
+        # NÃO ALTERA OUTROS VALORES
+        for i, tempo in enumerate(tempos_refinados):
+            linha = linha_inicial + i
+            
+            # Aplica APENAS o tempo refinado na coluna F (6) - TEMPO DE COLETA
+            coleta_sheet.cell(row=linha, column=6).value = float(tempo)
+            
+            log.debug("      Linha %s: %.6fs → %.6fs", linha, tempos_aproximados[i], tempo)
+        
+        pontos_aplicados += 1
+    
+    return pontos_aplicados
+
 def aplicar_tempos_refinados_na_planilha(resultados_pontos, arquivo_corrigido, arquivo_resultado):
     """
     Aplica os tempos refinados na planilha Excel
     NÃO ALTERA OUTROS VALORES - APENAS OS TEMPOS
     """
-    print(f"\n📄 Aplicando tempos refinados na planilha...")
+    log.info("\n📄 Aplicando tempos refinados na planilha...")
     
     # Tenta criar cópia da planilha corrigida
     try:
         shutil.copy2(arquivo_corrigido, arquivo_resultado)
-        print(f"   ✅ Arquivo copiado com sucesso: {arquivo_resultado}")
+        log.info("   ✅ Arquivo copiado com sucesso: %s", arquivo_resultado)
     except PermissionError:
-        print(f"   ⚠️  Erro de permissão ao copiar arquivo. Arquivo pode estar em uso.")
-        print(f"   🔧 Tentando criar novo arquivo...")
+        log.warning("   ⚠️  Erro de permissão ao copiar arquivo. Arquivo pode estar em uso.")
+        log.info("   🔧 Tentando criar novo arquivo...")
         
         # Tenta criar um novo arquivo com nome diferente
         arquivo_resultado = arquivo_resultado.replace('.xlsx', '_NOVO.xlsx')
         try:
             shutil.copy2(arquivo_corrigido, arquivo_resultado)
-            print(f"   ✅ Arquivo criado com sucesso: {arquivo_resultado}")
+            log.info("   ✅ Arquivo criado com sucesso: %s", arquivo_resultado)
         except Exception as e:
-            print(f"   ❌ Erro ao criar arquivo: {e}")
-            print(f"   💡 Feche o Excel e tente novamente")
+            log.error("   ❌ Erro ao criar arquivo: %s", e)
+            log.info("   💡 Feche o Excel e tente novamente")
             return False
     except Exception as e:
-        print(f"   ❌ Erro inesperado ao copiar arquivo: {e}")
+        log.error("   ❌ Erro inesperado ao copiar arquivo: %s", e)
         return False
     
     # Carrega a planilha
+    from openpyxl import load_workbook
+
     try:
         wb = load_workbook(arquivo_resultado)
         coleta_sheet = wb["Coleta de Dados"]
     except Exception as e:
-        print(f"   ❌ Erro ao carregar planilha: {e}")
+        log.error("   ❌ Erro ao carregar planilha: %s", e)
         return False
     
-    pontos_aplicados = 0
-    
-    for resultado in resultados_pontos:
-        if resultado is None:
-            continue
-            
-        numero_ponto = resultado['numero']
-        linha_inicial = resultado['linha_inicial']
-        tempos_refinados = resultado['tempos_refinados']
-        tempos_aproximados = resultado['tempos_aproximados']
-        
-        print(f"   📊 Aplicando Ponto {numero_ponto} (linha {linha_inicial})...")
-        print(f"      Tempos aproximados: {tempos_aproximados}")
-        print(f"      Tempos refinados: {tempos_refinados}")
-        
-        # Aplica APENAS os 3 tempos refinados para o ponto
-        # NÃO ALTERA OUTROS VALORES
-        for i, tempo in enumerate(tempos_refinados):
-            linha = linha_inicial + i
-            
-            # Aplica APENAS o tempo refinado na coluna F (6) - TEMPO DE COLETA
-            coleta_sheet.cell(row=linha, column=6).value = float(tempo)
-            
-            print(f"      Linha {linha}: {tempos_aproximados[i]:.6f}s → {float(tempo):.6f}s")
-        
-        pontos_aplicados += 1
+    pontos_aplicados = aplicar_tempos_refinados_na_aba(resultados_pontos, coleta_sheet)
     
     # Salva a planilha
     try:
         wb.save(arquivo_resultado)
-        print(f"   ✅ Planilha salva com sucesso: {arquivo_resultado}")
+        log.info("   ✅ Planilha salva com sucesso: %s", arquivo_resultado)
     except PermissionError:
-        print(f"   ⚠️  Erro de permissão ao salvar planilha. Arquivo pode estar em uso.")
-        print(f"   💡 Feche o Excel e tente novamente")
+        log.warning("   ⚠️  Erro de permissão ao salvar planilha. Arquivo pode estar em uso.")
+        log.info("   💡 Feche o Excel e tente novamente")
         return False
     except Exception as e:
-        print(f"   ❌ Erro ao salvar planilha: {e}")
+        log.error("   ❌ Erro ao salvar planilha: %s", e)
         return False
     
-    print(f"\n✅ Tempos refinados aplicados com sucesso!")
-    print(f"   Pontos processados: {pontos_aplicados}")
-    print(f"   Arquivo salvo: {arquivo_resultado}")
-    print(f"   ⚠️  OUTROS VALORES MANTIDOS ORIGINAIS")
+    log.info("\n✅ Tempos refinados aplicados com sucesso!")
+    log.info("   Pontos processados: %s", pontos_aplicados)
+    log.info("   Arquivo salvo: %s", arquivo_resultado)
+    log.warning("   ⚠️  OUTROS VALORES MANTIDOS ORIGINAIS")
     
     return True
 
-def gerar_relatorio_final(resultados_pontos, arquivo_resultado):
+def abrir_relatorio_hibrido(prefixo_relatorio='relatorio_refinamento_tempos_preciso', estrategia=None):
     """
-    Gera relatório final completo
+    Abre o relatório em fluxo (<prefixo>.jsonl): cada ponto é gravado ao terminar
     """
-    print(f"\n📋 GERANDO RELATÓRIO FINAL")
-    
-    # Filtra resultados válidos
-    resultados_validos = [r for r in resultados_pontos if r is not None]
-    
-    # Estatísticas
-    total_pontos = len(resultados_pontos)
-    pontos_processados = len(resultados_validos)
-    objetivos_atingidos = sum(1 for r in resultados_validos if r['objetivo_atingido'])
-    diferenca_media = sum(r['diferenca'] for r in resultados_validos) / len(resultados_validos) if resultados_validos else 0
-    diferenca_inicial_media = sum(r['diferenca_inicial'] for r in resultados_validos) / len(resultados_validos) if resultados_validos else 0
-    melhoria_media = sum(r['melhoria'] for r in resultados_validos) / len(resultados_validos) if resultados_validos else 0
-    iteracoes_total = sum(r['iteracoes'] for r in resultados_validos)
-    melhorias_total = sum(r['melhorias_encontradas'] for r in resultados_validos)
-    
-    relatorio = {
-        "metadata": {
-            "data_geracao": datetime.now().isoformat(),
-            "descricao": "Refinamento HÍBRIDO de tempos aproximados com tolerância de 0.07",
-            "precisao": "Decimal com 28 dígitos",
-            "arquivo_resultado": arquivo_resultado,
-            "tolerancia_objetivo": 0.07,
-            "estrategia": "Híbrida (principais + fallback)",
-            "fase1": "Valores principais 239.800-240.200",
-            "fase2": "Valores fallback 239.600-239.800",
-            "incremento": "0.001000",
-            "total_valores": len(valores_base)
-        },
-        "estatisticas": {
-            "total_pontos": total_pontos,
-            "pontos_processados": pontos_processados,
-            "objetivos_atingidos": objetivos_atingidos,
-            "diferenca_inicial_media": diferenca_inicial_media,
-            "diferenca_media": diferenca_media,
-            "melhoria_media": melhoria_media,
-            "iteracoes_total": iteracoes_total,
-            "melhorias_total": melhorias_total
-        },
-        "resultados": resultados_validos
-    }
-    
-    # Salvar em JSON
-    with open("relatorio_refinamento_tempos_preciso.json", "w", encoding="utf-8") as f:
-        json.dump(relatorio, f, indent=2, ensure_ascii=False, default=str)
-    
-    # Salvar relatório legível
-    with open("relatorio_refinamento_tempos_preciso.txt", "w", encoding="utf-8") as f:
-        f.write("=== RELATÓRIO DE REFINAMENTO HÍBRIDO DE TEMPOS ===\n\n")
-        f.write("🎯 OBJETIVO:\n")
-        f.write("   • Refinar tempos aproximados da planilha corrigida\n")
-        f.write("   • Atingir diferença de vazão de ±0.07\n")
-        f.write("   • Estratégia híbrida com valores principais + fallback\n")
-        f.write("   • Incremento de 0.001000 para máxima precisão\n\n")
-        
-        f.write("✅ ESTRATÉGIA HÍBRIDA:\n")
-        f.write("   • Etapa 1: otimizador_tempos_inteligente.py gera valores aproximados\n")
-        f.write("   • Etapa 2: aplicador_tempos_gerados.py refina com estratégia híbrida\n")
-        f.write("   • FASE 1: Valores principais 239.800000 - 240.200000\n")
-        f.write("   • FASE 2: Valores fallback 239.600000 - 239.800000 (casos extremos)\n")
-        f.write("   • Incremento: 0.001000\n")
-        f.write("   • Precisão: Decimal com 28 dígitos\n\n")
-        
-        f.write("📊 ESTATÍSTICAS GERAIS:\n")
-        f.write(f"   • Total de pontos: {total_pontos}\n")
-        f.write(f"   • Pontos processados: {pontos_processados}\n")
-        f.write(f"   • Objetivos atingidos: {objetivos_atingidos}\n")
-        f.write(f"   • Diferença inicial média: {diferenca_inicial_media:.8f}\n")
-        f.write(f"   • Diferença final média: {diferenca_media:.8f}\n")
-        f.write(f"   • Melhoria média: {melhoria_media:.8f}\n")
-        f.write(f"   • Total de iterações: {iteracoes_total}\n")
-        f.write(f"   • Total de melhorias encontradas: {melhorias_total}\n\n")
-        
-        f.write("�� RESULTADOS POR PONTO:\n")
-        for resultado in resultados_validos:
-            f.write(f"\n   PONTO {resultado['numero']}:\n")
-            f.write(f"     • Vazão desejada: {resultado['vazao_desejada']:.8f} L/h\n")
-            f.write(f"     • Vazão obtida: {resultado['vazao_atual']:.8f} L/h\n")
-            f.write(f"     • Diferença inicial: {resultado['diferenca_inicial']:.8f}\n")
-            f.write(f"     • Diferença final: {resultado['diferenca']:.8f}\n")
-            f.write(f"     • Melhoria: {resultado['melhoria']:.8f}\n")
-            f.write(f"     • Objetivo atingido: {'✅' if resultado['objetivo_atingido'] else '❌'}\n")
-            f.write(f"     • Iterações: {resultado['iteracoes']}\n")
-            f.write(f"     • Melhorias encontradas: {resultado['melhorias_encontradas']}\n")
-            f.write(f"     • Tempos aproximados: {resultado['tempos_aproximados']}\n")
-            f.write(f"     • Tempos refinados: {resultado['tempos_refinados']}\n")
-        
-        f.write(f"\n🎉 CONCLUSÃO:\n")
-        f.write(f"   ✅ Refinamento concluído com alta precisão\n")
-        f.write(f"   ✅ {objetivos_atingidos}/{pontos_processados} pontos atingiram o objetivo\n")
-        f.write(f"   ✅ Melhoria média: {melhoria_media:.8f}\n")
-        f.write(f"   ✅ Diferença final média: {diferenca_media:.8f}\n")
-        f.write(f"   ✅ Total de melhorias encontradas: {melhorias_total}\n")
-        f.write(f"   ✅ Planilha refinada: {arquivo_resultado}\n")
+    restricoes = compilar_estrategia(estrategia)
+    return EscritorRelatorio(
+        f"{prefixo_relatorio}.jsonl", ETAPA_RELATORIO,
+        titulo="RELATÓRIO DE REFINAMENTO HÍBRIDO DE TEMPOS",
+        descricao="Refinamento HÍBRIDO de tempos aproximados com tolerância de 0.07",
+        precisao="Decimal com 28 dígitos",
+        tolerancia_objetivo=Decimal('0.07'),
+        incremento=Decimal('0.001000'),
+        total_valores=len(restricoes.base),
+        tempo_alvo=restricoes.estrategia.nome,
+        objetivo=[
+            "Refinar tempos aproximados da planilha corrigida",
+            "Atingir diferença de vazão de ±0.07",
+            "Estratégia híbrida com valores principais + fallback",
+            "Incremento de 0.001000 para máxima precisão",
+        ],
+        estrategia=[
+            "Etapa 1: otimizador_tempos_inteligente.py gera valores aproximados",
+            "Etapa 2: aplicador_tempos_gerados.py refina com estratégia híbrida",
+            f"FASE 1: Valores principais {restricoes.principais[0]:.6f} - {restricoes.principais[-1]:.6f}",
+            f"FASE 2: Valores fallback {restricoes.fallback[0]:.6f} - {restricoes.fallback[-1]:.6f} (casos extremos)",
+            "Precisão: Decimal com 28 dígitos",
+        ],
+    )
 
-def main():
+def gerar_relatorio_final(relatorio, arquivo_resultado, prefixo_relatorio='relatorio_refinamento_tempos_preciso'):
     """
-    Função principal - REFINAMENTO HÍBRIDO DE VALORES APROXIMADOS
+    Conclui o relatório em fluxo (registro de resumo) e gera o relatório legível a partir dele
     """
-    arquivo_original = "SAN-038-25-09.xlsx"
-    arquivo_corrigido = "SAN-038-25-09_CORRIGIDO.xlsx"
-    arquivo_resultado = "SAN-038-25-09_REFINADO_HIBRIDO.xlsx"
-    
-    if not os.path.exists(arquivo_original):
-        print(f"❌ Arquivo original não encontrado: {arquivo_original}")
-        return
-    
-    if not os.path.exists(arquivo_corrigido):
-        print(f"❌ Arquivo corrigido não encontrado: {arquivo_corrigido}")
-        print(f"💡 Execute primeiro: python otimizador_tempos_inteligente.py")
-        return
-    
-    print("🚀 Iniciando REFINAMENTO HÍBRIDO de tempos aproximados...")
-    print("=" * 60)
-    print("🎯 OBJETIVO: Refinar valores aproximados para precisão ±0.07")
-    print("🔧 ESTRATÉGIA: Híbrida (principais + fallback)")
-    print("📊 FASE 1: Valores principais 239.800-240.200")
-    print("📊 FASE 2: Valores fallback 239.600-239.800 (casos extremos)")
-    print("📊 PRECISÃO: Incremento de 0.001000 para máxima precisão")
-    print("=" * 60)
-    
-    # Extrai dados da planilha corrigida e valores desejados da original
-    constantes, pontos = extrair_dados_planilha_corrigida(arquivo_corrigido, arquivo_original)
-    if constantes is None or pontos is None:
-        return
-    
-    print(f"✅ Extraídos {len(pontos)} pontos da planilha corrigida")
-    print(f"✅ Valores desejados obtidos da planilha original")
-    
-    # Carrega informações de refinamento
-    informacoes_refinamento = carregar_informacoes_refinamento()
-    if informacoes_refinamento is None:
-        return
-    
-    # Cria mapeamento por número do ponto
-    mapeamento_refinamento = {}
-    for info in informacoes_refinamento:
-        mapeamento_refinamento[info['numero']] = info
-    
+    log.info("\n📋 GERANDO RELATÓRIO FINAL")
+    
+    estatisticas = relatorio.estatisticas.para_dicionario().get(ETAPA_RELATORIO, {})
+    objetivos_atingidos = estatisticas.get('objetivos_atingidos', 0)
+    pontos_processados = estatisticas.get('pontos_processados', 0)
+    
+    relatorio.concluir(
+        arquivo_resultado=arquivo_resultado,
+        instrumentacao=relatorio_instrumentacao(),
+        conclusao=[
+            "✅ Refinamento concluído com alta precisão",
+            f"✅ {objetivos_atingidos}/{pontos_processados} pontos atingiram o objetivo",
+            f"✅ Planilha refinada: {arquivo_resultado}",
+        ],
+    )
+    renderizar_texto(relatorio.caminho, f"{prefixo_relatorio}.txt")
+
+def refinar_pontos_hibrido(pontos, constantes, mapeamento_refinamento, relatorio=None, cache=None, estrategia=None,
+                           orcamento=None):
+    """
+    Refina os tempos de todos os pontos com a estratégia híbrida
+    Retorna a lista de resultados por ponto (None para pontos sem informação),
+    gravados também no relatório em fluxo, se houver
+    cache: CacheSolucoes opcional (pontos inalterados não são refinados de novo)
+    estrategia: estratégia de tempo alvo (None = TEMPO_ALVO, padrão 240 s)
+    orcamento: segundos por ponto (None = ORCAMENTO_PONTO; sem limite se ausente)
+    """
+    restricoes = compilar_estrategia(estrategia)
+    agenda = criar_orcamento(orcamento, len(pontos))
     tempo_inicio = time.time()
     resultados_pontos = []
+    progresso = Progresso(len(pontos), "Refinamento híbrido", log)
     
     # Processa cada ponto individualmente
     for i, ponto in enumerate(pontos):
-        print(f"\n{'='*60}")
-        print(f"🔍 REFINANDO PONTO {i+1}/{len(pontos)}")
-        print(f"{'='*60}")
+        log.info("\n%s", '='*60)
+        log.info("🔍 REFINANDO PONTO %s/%s", i+1, len(pontos))
+        log.info("%s", '='*60)
         
         # Pega a informação de refinamento para o ponto atual
         info_refinamento = mapeamento_refinamento.get(ponto['numero'])
         
         if info_refinamento is None:
-            print(f"   ⚠️  Nenhuma informação de refinamento encontrada para o Ponto {ponto['numero']}.")
-            print(f"   📊 Pulando refinamento para este ponto.")
+            log.warning("   ⚠️  Nenhuma informação de refinamento encontrada para o Ponto %s.", ponto['numero'])
+            log.info("   📊 Pulando refinamento para este ponto.")
             resultados_pontos.append(None)
+            if agenda is not None:
+                agenda.concluir_ponto(i, ponto, None)
+            if relatorio is not None:
+                relatorio.ponto(None, ETAPA_RELATORIO, ponto['numero'])
+            progresso.avancar()
             continue
         
-        # Processa o ponto individual
-        resultado_ponto = processar_ponto_refinamento_inteligente(ponto, constantes, info_refinamento)
+        # Processa o ponto individual (com o prazo do orçamento, se houver)
+        prazo = agenda.prazo_ponto() if agenda is not None else None
+        with medir_ponto(ponto['numero']):
+            if cache is None:
+                resultado_ponto = processar_ponto_refinamento_inteligente(ponto, constantes, info_refinamento,
+                                                                          estrategia=restricoes, prazo=prazo)
+            else:
+                resultado_ponto = cache.resolver(
+                    ETAPA_RELATORIO, ponto, constantes, ponto['tempos_aproximados'], TOLERANCIA_HIBRIDA,
+                    lambda tempos: processar_ponto_refinamento_inteligente(
+                        dict(ponto, tempos_aproximados=tempos), constantes, info_refinamento, estrategia=restricoes,
+                        prazo=prazo),
+                    extras={'direcao_refinamento': info_refinamento['direcao_refinamento'],
+                            'tempo_alvo': restricoes.assinatura},
+                    campo_tempos='tempos_refinados',
+                )
+            if resultado_ponto and resultado_ponto.get('cache') != 'acerto':
+                contar(ITERACOES, resultado_ponto['iteracoes'])
         resultados_pontos.append(resultado_ponto)
+        # Pontos interrompidos pelo prazo vão para o relatório depois do repasse
+        adiado = agenda is not None and agenda.concluir_ponto(i, ponto, resultado_ponto)
+        if relatorio is not None and not adiado:
+            relatorio.ponto(resultado_ponto, ETAPA_RELATORIO, ponto['numero'])
         
         # Se atingiu o objetivo, pode parar este ponto
         if resultado_ponto and resultado_ponto['objetivo_atingido']:
-            print(f"   ✅ Ponto {ponto['numero']} ATINGIU O OBJETIVO!")
-            print(f"   🎯 Próximo ponto...")
+            log.info("   ✅ Ponto %s ATINGIU O OBJETIVO!", ponto['numero'])
+            log.info("   🎯 Próximo ponto...")
         else:
-            print(f"   ⚠️  Ponto {ponto['numero']} não atingiu o objetivo")
-            print(f"   📊 Melhor aproximação refinada encontrada")
+            log.warning("   ⚠️  Ponto %s não atingiu o objetivo", ponto['numero'])
+            log.info("   📊 Melhor aproximação refinada encontrada")
         
         # Mostra progresso
         tempo_decorrido = time.time() - tempo_inicio
-        print(f"   ⏱️  Tempo decorrido: {tempo_decorrido:.2f} segundos")
-        print(f"   📊 Progresso: {i+1}/{len(pontos)} pontos")
+        log.info("   ⏱️  Tempo decorrido: %.2f segundos", tempo_decorrido)
+        log.info("   📊 Progresso: %s/%s pontos", i+1, len(pontos))
+        progresso.avancar()
+    
+    # Sobra do orçamento para os pontos interrompidos, partindo da melhor aproximação
+    if agenda is not None:
+        repassar_interrompidos(
+            agenda, resultados_pontos,
+            lambda ponto, anterior, prazo: processar_ponto_refinamento_inteligente(
+                dict(ponto, tempos_aproximados=anterior['exatos']['tempos_refinados']), constantes,
+                mapeamento_refinamento[ponto['numero']], estrategia=restricoes, prazo=prazo),
+            relatorio, ETAPA_RELATORIO,
+        )
+    
+    progresso.concluir()
+    return resultados_pontos
+
+def executar_refinamento_hibrido(arquivo_original, arquivo_corrigido, arquivo_resultado,
+                                 arquivo_informacoes='informacoes_refinamento.json',
+                                 prefixo_relatorio='relatorio_refinamento_tempos_preciso'):
+    """
+    Executa o refinamento híbrido de todos os pontos e gera a planilha refinada
+    Retorna a lista de resultados por ponto, ou None em caso de erro
+    """
+    reiniciar()
+    restricoes = compilar_estrategia()
+    log.info("🚀 Iniciando REFINAMENTO HÍBRIDO de tempos aproximados...")
+    log.info("%s", "=" * 60)
+    log.info("🎯 OBJETIVO: Refinar valores aproximados para precisão ±0.07")
+    log.info("🔧 ESTRATÉGIA: Híbrida (principais + fallback), tempo alvo %s s", restricoes.estrategia.nome)
+    log.info("📊 FASE 1: Valores principais %.3f-%.3f", restricoes.principais[0], restricoes.principais[-1])
+    log.info("📊 FASE 2: Valores fallback %.3f-%.3f (casos extremos)", restricoes.fallback[0], restricoes.fallback[-1])
+    log.info("📊 PRECISÃO: Incremento de 0.001000 para máxima precisão")
+    log.info("%s", "=" * 60)
+    
+    # Extrai dados da planilha corrigida e valores desejados da original
+    with cronometrar('extracao'):
+        constantes, pontos = extrair_dados_planilha_corrigida(arquivo_corrigido, arquivo_original)
+    if constantes is None or pontos is None:
+        return None
+    
+    log.info("✅ Extraídos %s pontos da planilha corrigida", len(pontos))
+    log.info("✅ Valores desejados obtidos da planilha original")
+    
+    # Carrega informações de refinamento
+    informacoes_refinamento = carregar_informacoes_refinamento(arquivo_informacoes)
+    if informacoes_refinamento is None:
+        return None
+    
+    # Cria mapeamento por número do ponto
+    mapeamento_refinamento = {}
+    for info in informacoes_refinamento:
+        mapeamento_refinamento[info['numero']] = info
+    
+    tempo_inicio = time.time()
+    relatorio = abrir_relatorio_hibrido(prefixo_relatorio)
+    with cronometrar('refinamento_hibrido'):
+        resultados_pontos = refinar_pontos_hibrido(pontos, constantes, mapeamento_refinamento, relatorio)
     
     tempo_total = time.time() - tempo_inicio
     
-    print(f"\n📊 RESUMO FINAL:")
-    print(f"   Pontos processados: {len(resultados_pontos)}/{len(pontos)}")
-    print(f"   Tempo total: {tempo_total:.2f} segundos")
-    print(f"   Tempo médio por ponto: {tempo_total/len(pontos):.2f} segundos")
+    log.info("\n📊 RESUMO FINAL:")
+    log.info("   Pontos processados: %s/%s", len(resultados_pontos), len(pontos))
+    log.info("   Tempo total: %.2f segundos", tempo_total)
+    log.info("   Tempo médio por ponto: %.2f segundos", tempo_total/len(pontos))
     
     # Aplica os tempos refinados na planilha
-    sucesso = aplicar_tempos_refinados_na_planilha(resultados_pontos, arquivo_corrigido, arquivo_resultado)
+    with cronometrar('gravacao_planilha'):
+        sucesso = aplicar_tempos_refinados_na_planilha(resultados_pontos, arquivo_corrigido, arquivo_resultado)
     
     if sucesso:
         # Gera relatório final
-        gerar_relatorio_final(resultados_pontos, arquivo_resultado)
+        gerar_relatorio_final(relatorio, arquivo_resultado, prefixo_relatorio)
         
-        print(f"\n✅ Relatório salvo em: relatorio_refinamento_tempos_preciso.json")
-        print(f"✅ Relatório legível salvo em: relatorio_refinamento_tempos_preciso.txt")
-        print("🎉 Refinamento inteligente concluído!")
-        print(f"📄 Planilha refinada: {arquivo_resultado}")
+        log.info("\n✅ Relatório salvo em: %s.jsonl", prefixo_relatorio)
+        log.info("✅ Relatório legível salvo em: %s.txt", prefixo_relatorio)
+        log.info("🎉 Refinamento inteligente concluído!")
+        log.info("📄 Planilha refinada: %s", arquivo_resultado)
     else:
-        print("❌ Erro ao aplicar tempos refinados!")
+        relatorio.concluir(False)
+        log.error("❌ Erro ao aplicar tempos refinados!")
+    
+    return resultados_pontos if sucesso else None
+
+def main():
+    """
+    Função principal - REFINAMENTO HÍBRIDO DE VALORES APROXIMADOS
+    """
+    arquivo_original = "SAN-038-25-09.xlsx"
+    arquivo_corrigido = "SAN-038-25-09_CORRIGIDO.xlsx"
+    arquivo_resultado = "SAN-038-25-09_REFINADO_HIBRIDO.xlsx"
+    
+    if not os.path.exists(arquivo_original):
+        log.error("❌ Arquivo original não encontrado: %s", arquivo_original)
+        return
+    
+    if not os.path.exists(arquivo_corrigido):
+        log.error("❌ Arquivo corrigido não encontrado: %s", arquivo_corrigido)
+        log.info("💡 Execute primeiro: python otimizador_tempos_inteligente.py")
+        return
+    
+    executar_refinamento_hibrido(arquivo_original, arquivo_corrigido, arquivo_resultado)
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
@@ -0,0 +1,399 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark de Desempenho
+Mede os caminhos críticos sobre as planilhas de fixture do repositório:
+extração, avaliação única e em lote do motor, otimizadores por ponto,
+gravação da planilha e pipeline completo. Cada caso roda com aquecimento e
+várias rodadas; o resultado (mediana, p95, ops/s) é acrescentado a um
+histórico JSONL e pode ser comparado com uma execução anterior
+
+Uso:
+    python benchmark_desempenho.py executar [--rodadas 5] [--casos extracao,motor_lote]
+    python benchmark_desempenho.py comparar [--base -2] [--limite 0.10]
+"""
+
+from decimal import Decimal, getcontext
+from datetime import datetime
+import argparse
+import io
+import json
+import math
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from registro_log import configurar_log
+
+# Configurar precisão alta
+getcontext().prec = 28
+
+RAIZ_PROJETO = os.path.dirname(os.path.abspath(__file__))
+
+# Planilha de fixture usada por padrão (versionada no repositório)
+PLANILHA_PADRAO = os.path.join(RAIZ_PROJETO, "SAN-038-25-09_CORRIGIDO.xlsx")
+
+ARQUIVO_HISTORICO = os.path.join(RAIZ_PROJETO, "historico_benchmark.jsonl")
+
+# Aumento relativo da mediana considerado regressão
+LIMITE_REGRESSAO = 0.10
+
+# Candidatos avaliados por rodada no caso de avaliação em lote
+CANDIDATOS_LOTE = 200
+
+
+class Caso:
+    """
+    Caso de benchmark: preparar() roda uma vez e devolve a função medida;
+    operacoes é o número de operações executadas por chamada (para ops/s)
+    """
+
+    def __init__(self, nome, descricao, preparar, operacoes=1, rodadas=None):
+        self.nome = nome
+        self.descricao = descricao
+        self.preparar = preparar
+        self.operacoes = operacoes
+        self.rodadas = rodadas
+
+
+def _dados_planilha(planilha):
+    from otimizador_tempos_inteligente import ler_snapshot_planilha
+
+    snapshot = ler_snapshot_planilha(planilha)
+    if snapshot is None or not snapshot['pontos']:
+        raise ValueError(f"planilha sem pontos de calibração: {planilha}")
+    return snapshot['constantes'], snapshot['pontos']
+
+
+def preparar_extracao(planilha):
+    from otimizador_tempos_inteligente import ler_snapshot_planilha
+    return lambda: ler_snapshot_planilha(planilha)
+
+
+def preparar_extracao_cache(planilha):
+    from otimizador_tempos_inteligente import extrair_dados_planilha_original
+    extrair_dados_planilha_original(planilha)
+    return lambda: extrair_dados_planilha_original(planilha)
+
+
+def preparar_motor_avaliacao(planilha):
+    from otimizador_tempos_inteligente import calcular_formulas_com_tempo_ajustado, calcular_agregados_com_tempo_ajustado
+
+    constantes, pontos = _dados_planilha(planilha)
+    leituras = pontos[0]['leituras']
+    tempos = [Decimal('240.000')] * len(leituras)
+    return lambda: calcular_agregados_com_tempo_ajustado(
+        calcular_formulas_com_tempo_ajustado(leituras, constantes, tempos))
+
+
+def preparar_motor_lote(planilha):
+    from refinador_ultra_preciso import calcular_vazao_com_tempos
+
+    constantes, pontos = _dados_planilha(planilha)
+    leituras = pontos[0]['leituras']
+    candidatos = [[Decimal('239.900') + Decimal(i) / Decimal('1000')] * len(leituras)
+                  for i in range(CANDIDATOS_LOTE)]
+
+    def avaliar_lote():
+        for tempos in candidatos:
+            calcular_vazao_com_tempos(leituras, constantes, tempos)
+    return avaliar_lote
+
+
+def preparar_otimizador_240(planilha):
+    from otimizador_tempos_inteligente import otimizar_tempos_ponto_simples_240
+
+    constantes, pontos = _dados_planilha(planilha)
+    ponto = pontos[0]
+    return lambda: otimizar_tempos_ponto_simples_240(ponto['leituras'], constantes, ponto['valores_originais'])
+
+
+def preparar_refinamento_hibrido(planilha):
+    from aplicador_tempos_gerados import buscar_refinamento_tempos_sequencial, calcular_vazao_com_tempos
+
+    constantes, pontos = _dados_planilha(planilha)
+    ponto = pontos[0]
+    tempos = [l['tempo_coleta'] for l in ponto['leituras']]
+    vazao_desejada = ponto['valores_originais']['vazao_media']
+    vazao_atual = calcular_vazao_com_tempos(ponto['leituras'], constantes, tempos)
+    direcao = 'INCREMENTAR' if vazao_atual < vazao_desejada else 'DECREMENTAR'
+    return lambda: buscar_refinamento_tempos_sequencial(ponto['leituras'], constantes, vazao_desejada, tempos, direcao)
+
+
+def preparar_refinamento_ultra(planilha):
+    from refinador_ultra_preciso import buscar_refinamento_ultra_preciso
+
+    constantes, pontos = _dados_planilha(planilha)
+    ponto = pontos[0]
+    tempos = [l['tempo_coleta'] for l in ponto['leituras']]
+    vazao_desejada = ponto['valores_originais']['vazao_media']
+    return lambda: buscar_refinamento_ultra_preciso(ponto['leituras'], constantes, vazao_desejada, tempos)
+
+
+def preparar_refinamento_ultra_compartilhado(planilha):
+    from memoria_compartilhada import ExecutorPontos, refinar_ponto_ultra, refinar_pontos_ultra_compartilhado
+
+    constantes, pontos = _dados_planilha(planilha)
+    for ponto in pontos:
+        ponto['tempos_refinados'] = [l['tempo_coleta'] for l in ponto['leituras']]
+    # Pool criado fora da medição (reaproveitado entre as rodadas)
+    executor = ExecutorPontos(refinar_ponto_ultra)
+    return lambda: refinar_pontos_ultra_compartilhado(pontos, constantes, executor=executor)
+
+
+def preparar_gravacao(planilha):
+    from openpyxl import load_workbook
+
+    wb = load_workbook(planilha)
+    return lambda: wb.save(io.BytesIO())
+
+
+def preparar_pipeline(planilha):
+    from pipeline_certificado import PipelineCertificado
+
+    saida = os.path.join(os.getcwd(), "benchmark_CERTIFICADO_FINAL.xlsx")
+    return lambda: PipelineCertificado(planilha).executar(saida)
+
+
+CASOS = [
+    Caso('extracao', "leitura da planilha sem cache (openpyxl + layout)", preparar_extracao),
+    Caso('extracao_cache', "leitura pelo cache de snapshots", preparar_extracao_cache),
+    Caso('motor_avaliacao', "uma avaliação das fórmulas de um ponto", preparar_motor_avaliacao),
+    Caso('motor_lote', f"{CANDIDATOS_LOTE} avaliações de vazão em sequência", preparar_motor_lote,
+         operacoes=CANDIDATOS_LOTE),
+    Caso('otimizador_240_ponto', "otimização simples (240 s) de um ponto", preparar_otimizador_240),
+    Caso('refinamento_hibrido_ponto', "busca híbrida de um ponto", preparar_refinamento_hibrido),
+    Caso('refinamento_ultra_ponto', "busca ultra-precisa de um ponto", preparar_refinamento_ultra),
+    Caso('refinamento_ultra_compartilhado', "busca ultra-precisa de todos os pontos em processos (memória compartilhada)",
+         preparar_refinamento_ultra_compartilhado),
+    Caso('gravacao_planilha', "gravação da pasta de trabalho completa", preparar_gravacao),
+    Caso('pipeline_completo', "pipeline em memória de uma planilha", preparar_pipeline, rodadas=3),
+]
+
+
+def percentil(valores, fracao):
+    """
+    Percentil pelo posto mais próximo (valores já ordenados)
+    """
+    if not valores:
+        return 0.0
+    posto = max(1, math.ceil(fracao * len(valores)))
+    return valores[posto - 1]
+
+
+def medir_caso(caso, planilha, rodadas, aquecimento):
+    """
+    Executa aquecimento + rodadas e calcula as estatísticas em milissegundos
+    """
+    funcao = caso.preparar(planilha)
+    for _ in range(aquecimento):
+        funcao()
+
+    # Casos lentos limitam o número de rodadas
+    total_rodadas = min(caso.rodadas, rodadas) if caso.rodadas else rodadas
+
+    tempos_ns = []
+    for _ in range(total_rodadas):
+        inicio = time.perf_counter_ns()
+        funcao()
+        tempos_ns.append(time.perf_counter_ns() - inicio)
+
+    tempos_ms = sorted(t / 1e6 for t in tempos_ns)
+    mediana = statistics.median(tempos_ms)
+    return {
+        'rodadas': len(tempos_ms),
+        'operacoes': caso.operacoes,
+        'mediana_ms': round(mediana, 4),
+        'p95_ms': round(percentil(tempos_ms, 0.95), 4),
+        'min_ms': round(tempos_ms[0], 4),
+        'media_ms': round(statistics.fmean(tempos_ms), 4),
+        'ops_por_segundo': round(caso.operacoes / (mediana / 1000), 2) if mediana > 0 else None,
+    }
+
+
+def commit_atual():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=RAIZ_PROJETO,
+                              capture_output=True, text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def executar_benchmark(planilha=PLANILHA_PADRAO, nomes_casos=None, rodadas=5, aquecimento=1, rotulo=None):
+    """
+    Mede os casos selecionados numa pasta temporária (cache e saídas isolados)
+    Retorna o registro do histórico
+    """
+    planilha = os.path.abspath(planilha)
+    casos = [c for c in CASOS if not nomes_casos or c.nome in nomes_casos]
+    desconhecidos = set(nomes_casos or ()) - {c.nome for c in CASOS}
+    if desconhecidos:
+        raise ValueError(f"casos desconhecidos: {', '.join(sorted(desconhecidos))}")
+
+    registro = {
+        'data': datetime.now().isoformat(),
+        'rotulo': rotulo,
+        'commit': commit_atual(),
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'planilha': os.path.basename(planilha),
+        'rodadas': rodadas,
+        'aquecimento': aquecimento,
+        'casos': {},
+    }
+
+    diretorio_anterior = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix='benchmark_') as pasta:
+        copia = os.path.join(pasta, os.path.basename(planilha))
+        shutil.copy2(planilha, copia)
+        os.chdir(pasta)
+        try:
+            for caso in casos:
+                print(f"⏱️  {caso.nome}: {caso.descricao}...", file=sys.stderr)
+                registro['casos'][caso.nome] = medir_caso(caso, copia, rodadas, aquecimento)
+        finally:
+            os.chdir(diretorio_anterior)
+
+    return registro
+
+
+def gravar_historico(registro, arquivo_historico=ARQUIVO_HISTORICO):
+    with open(arquivo_historico, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(registro, ensure_ascii=False) + '\n')
+
+
+def carregar_historico(arquivo_historico=ARQUIVO_HISTORICO):
+    if not os.path.exists(arquivo_historico):
+        return []
+    with open(arquivo_historico, 'r', encoding='utf-8') as f:
+        return [json.loads(linha) for linha in f if linha.strip()]
+
+
+def localizar_registro(historico, referencia):
+    """
+    Localiza um registro por índice (ex.: -2) ou por rótulo/commit
+    """
+    try:
+        return historico[int(referencia)]
+    except (ValueError, IndexError):
+        pass
+    for registro in reversed(historico):
+        if referencia in (registro.get('rotulo'), registro.get('commit')):
+            return registro
+    return None
+
+
+def comparar_registros(base, atual, limite=LIMITE_REGRESSAO):
+    """
+    Compara as medianas caso a caso; regressão = aumento relativo acima do limite
+    """
+    comparacao = []
+    for nome, medida in atual['casos'].items():
+        referencia = base['casos'].get(nome)
+        if referencia is None or not referencia['mediana_ms']:
+            continue
+        variacao = medida['mediana_ms'] / referencia['mediana_ms'] - 1
+        comparacao.append({
+            'caso': nome,
+            'base_ms': referencia['mediana_ms'],
+            'atual_ms': medida['mediana_ms'],
+            'variacao': variacao,
+            'regressao': variacao > limite,
+        })
+    return comparacao
+
+
+def descrever_registro(registro):
+    return registro.get('rotulo') or registro.get('commit') or registro['data']
+
+
+def imprimir_registro(registro):
+    print(f"\n📊 BENCHMARK ({descrever_registro(registro)}) - {registro['planilha']}")
+    print(f"   {'caso':<28}{'mediana ms':>12}{'p95 ms':>12}{'ops/s':>12}")
+    for nome, medida in registro['casos'].items():
+        ops = medida['ops_por_segundo']
+        print(f"   {nome:<28}{medida['mediana_ms']:>12.3f}{medida['p95_ms']:>12.3f}{(ops or 0):>12.1f}")
+
+
+def imprimir_comparacao(base, atual, comparacao, limite):
+    print(f"\n🔍 COMPARAÇÃO: {descrever_registro(base)} → {descrever_registro(atual)} (limite {limite:.0%})")
+    print(f"      {'caso':<28}{'base ms':>12}{'atual ms':>12}{'variação':>10}")
+    for item in comparacao:
+        simbolo = '❌' if item['regressao'] else '✅'
+        print(f"   {simbolo} {item['caso']:<28}{item['base_ms']:>12.3f}{item['atual_ms']:>12.3f}{item['variacao']:>+10.1%}")
+    regressoes = [item['caso'] for item in comparacao if item['regressao']]
+    if regressoes:
+        print(f"\n❌ Regressões: {', '.join(regressoes)}")
+    else:
+        print("\n✅ Nenhuma regressão acima do limite")
+    return regressoes
+
+
+def comando_executar(args):
+    nomes = [n.strip() for n in args.casos.split(',')] if args.casos else None
+    configurar_log(modo='silencioso')
+    registro = executar_benchmark(args.planilha, nomes, args.rodadas, args.aquecimento, args.rotulo)
+    imprimir_registro(registro)
+
+    historico = carregar_historico(args.historico)
+    gravar_historico(registro, args.historico)
+    print(f"\n✅ Histórico atualizado: {args.historico}")
+
+    if args.comparar and historico:
+        base = historico[-1]
+        regressoes = imprimir_comparacao(base, registro, comparar_registros(base, registro, args.limite), args.limite)
+        return 1 if regressoes else 0
+    return 0
+
+
+def comando_comparar(args):
+    historico = carregar_historico(args.historico)
+    if len(historico) < 2:
+        print(f"❌ São necessárias ao menos duas execuções em {args.historico}")
+        return 2
+
+    base = localizar_registro(historico, args.base)
+    atual = localizar_registro(historico, args.atual)
+    if base is None or atual is None:
+        print(f"❌ Execução não encontrada: {args.base if base is None else args.atual}")
+        return 2
+
+    regressoes = imprimir_comparacao(base, atual, comparar_registros(base, atual, args.limite), args.limite)
+    return 1 if regressoes else 0
+
+
+def main():
+    """
+    Função principal - BENCHMARK DE DESEMPENHO
+    """
+    parser = argparse.ArgumentParser(description="Benchmark dos caminhos críticos do pipeline de certificados")
+    parser.add_argument('--historico', default=ARQUIVO_HISTORICO, help="arquivo JSONL do histórico")
+    subcomandos = parser.add_subparsers(dest='comando', required=True)
+
+    executar = subcomandos.add_parser('executar', help="mede os casos e grava no histórico")
+    executar.add_argument('--planilha', default=PLANILHA_PADRAO, help="planilha de fixture")
+    executar.add_argument('--casos', default=None,
+                          help="casos separados por vírgula: " + ', '.join(c.nome for c in CASOS))
+    executar.add_argument('--rodadas', type=int, default=5, help="rodadas medidas por caso (padrão: 5)")
+    executar.add_argument('--aquecimento', type=int, default=1, help="rodadas de aquecimento (padrão: 1)")
+    executar.add_argument('--rotulo', default=None, help="rótulo da execução no histórico")
+    executar.add_argument('--comparar', action='store_true', help="compara com a execução anterior do histórico")
+    executar.add_argument('--limite', type=float, default=LIMITE_REGRESSAO, help="limite de regressão (padrão: 0.10)")
+
+    comparar = subcomandos.add_parser('comparar', help="compara duas execuções do histórico")
+    comparar.add_argument('--base', default='-2', help="índice, rótulo ou commit da base (padrão: penúltima)")
+    comparar.add_argument('--atual', default='-1', help="índice, rótulo ou commit da atual (padrão: última)")
+    comparar.add_argument('--limite', type=float, default=LIMITE_REGRESSAO, help="limite de regressão (padrão: 0.10)")
+
+    args = parser.parse_args()
+    if args.comando == 'executar':
+        return comando_executar(args)
+    return comando_comparar(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
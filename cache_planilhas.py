@@ -0,0 +1,220 @@
+# -*- coding: utf-8 -*-
+"""
+Cache de Snapshots de Planilhas
+Guarda em disco os dados extraídos de cada planilha (constantes, pontos e
+valores sagrados), indexados pelo SHA-256 do conteúdo do arquivo .xlsx
+"""
+
+from decimal import Decimal
+import hashlib
+import marshal
+import os
+import re
+import zlib
+
+from instrumentacao import contar, ACERTOS_CACHE, FALTAS_CACHE
+from registro_log import obter_logger
+
+# Pasta local do cache (pode ser sobrescrita pela variável de ambiente)
+PASTA_CACHE = os.environ.get('CACHE_PLANILHAS_DIR', '.cache_planilhas')
+
+# Tamanho máximo ocupado pelo cache antes da remoção dos snapshots mais antigos
+LIMITE_CACHE_BYTES = 64 * 1024 * 1024
+
+# Versão do formato do snapshot - incrementar quando a extração mudar
+VERSAO_SNAPSHOT = 2
+
+# Versões cujos snapshots continuam sendo lidos (a atual primeiro): só as de mesma
+# extração, em que mudou apenas a serialização. A versão 1 é anterior à detecção de
+# blocos da versão 2 e seus snapshots podem ter outros pontos, então não é lida
+VERSOES_LEGIVEIS = (VERSAO_SNAPSHOT,)
+
+CABECALHO = b'SNPL'
+MARCADOR_DECIMAL = '\x00D'
+MARCADOR_TUPLA = '\x00T'
+
+log = obter_logger(__name__)
+
+
+def calcular_hash_planilha(arquivo_excel):
+    """
+    Calcula o SHA-256 dos bytes da planilha
+    """
+    sha = hashlib.sha256()
+    with open(arquivo_excel, 'rb') as f:
+        for bloco in iter(lambda: f.read(1024 * 1024), b''):
+            sha.update(bloco)
+    return sha.hexdigest()
+
+
+def _codificar(valor):
+    """
+    Converte Decimal (e tuplas, que podem contê-los) em tuplas marcadas para
+    serialização exata via marshal
+    """
+    if isinstance(valor, Decimal):
+        return (MARCADOR_DECIMAL, str(valor))
+    if isinstance(valor, dict):
+        return {k: _codificar(v) for k, v in valor.items()}
+    if isinstance(valor, list):
+        return [_codificar(v) for v in valor]
+    if isinstance(valor, tuple):
+        return (MARCADOR_TUPLA, [_codificar(v) for v in valor])
+    return valor
+
+
+def _decodificar(valor):
+    """
+    Reconstrói os Decimal e as tuplas a partir das tuplas marcadas
+    """
+    if isinstance(valor, tuple) and len(valor) == 2:
+        if valor[0] == MARCADOR_DECIMAL:
+            return Decimal(valor[1])
+        if valor[0] == MARCADOR_TUPLA:
+            return tuple(_decodificar(v) for v in valor[1])
+    if isinstance(valor, dict):
+        return {k: _decodificar(v) for k, v in valor.items()}
+    if isinstance(valor, list):
+        return [_decodificar(v) for v in valor]
+    return valor
+
+
+def serializar_snapshot(snapshot):
+    """
+    Serializa o snapshot em formato binário compacto (marshal + zlib)
+    Os valores Decimal são preservados exatamente pela sua representação textual
+    """
+    corpo = zlib.compress(marshal.dumps(_codificar(snapshot), 4), 6)
+    return CABECALHO + bytes([VERSAO_SNAPSHOT]) + corpo
+
+
+def desserializar_snapshot(dados):
+    """
+    Reconstrói o snapshot a partir dos bytes gravados no cache
+    """
+    if dados[:4] != CABECALHO or dados[4] not in VERSOES_LEGIVEIS:
+        return None
+    return _decodificar(marshal.loads(zlib.decompress(dados[5:])))
+
+
+def caminho_snapshot(hash_planilha, pasta_cache=None, versao=None):
+    """
+    Retorna o caminho do arquivo de snapshot para um hash de planilha (versão atual por padrão)
+    """
+    pasta_cache = pasta_cache or PASTA_CACHE
+    return os.path.join(pasta_cache, f"{hash_planilha}-v{versao or VERSAO_SNAPSHOT}.snap")
+
+
+def versao_arquivo(nome):
+    """
+    Versão do formato pelo nome do arquivo de snapshot, ou None se não for um snapshot
+    """
+    encontrado = re.search(r'-v(\d+)\.snap$', nome)
+    return int(encontrado.group(1)) if encontrado else None
+
+
+def ler_snapshot_cache(hash_planilha, pasta_cache=None):
+    """
+    Lê um snapshot do cache (versão atual ou anterior ainda legível),
+    retornando None quando ausente ou inválido
+    """
+    for versao in VERSOES_LEGIVEIS:
+        caminho = caminho_snapshot(hash_planilha, pasta_cache, versao)
+        try:
+            with open(caminho, 'rb') as f:
+                snapshot = desserializar_snapshot(f.read())
+        except FileNotFoundError:
+            continue
+        except (OSError, ValueError, EOFError, TypeError, zlib.error):
+            continue
+
+        if snapshot is not None:
+            # Marca o snapshot como usado recentemente (ordem de remoção LRU)
+            try:
+                os.utime(caminho, None)
+            except OSError:
+                pass
+            return snapshot
+    return None
+
+
+def gravar_snapshot_cache(hash_planilha, snapshot, pasta_cache=None, limite_bytes=LIMITE_CACHE_BYTES):
+    """
+    Grava o snapshot no cache de forma atômica e aplica o limite de tamanho
+    """
+    pasta_cache = pasta_cache or PASTA_CACHE
+    os.makedirs(pasta_cache, exist_ok=True)
+    caminho = caminho_snapshot(hash_planilha, pasta_cache)
+    temporario = f"{caminho}.{os.getpid()}.tmp"
+
+    with open(temporario, 'wb') as f:
+        f.write(serializar_snapshot(snapshot))
+    os.replace(temporario, caminho)
+
+    limpar_cache_excedente(pasta_cache, limite_bytes)
+    return caminho
+
+
+def limpar_cache_excedente(pasta_cache=None, limite_bytes=LIMITE_CACHE_BYTES):
+    """
+    Remove os snapshots de versões que não são mais lidas e depois os usados há
+    mais tempo até o cache caber no limite
+    """
+    pasta_cache = pasta_cache or PASTA_CACHE
+    try:
+        entradas = [e for e in os.scandir(pasta_cache) if e.is_file() and e.name.endswith('.snap')]
+    except FileNotFoundError:
+        return 0
+
+    # Snapshots de versões fora de VERSOES_LEGIVEIS nunca mais são lidos
+    removidos = 0
+    for entrada in [e for e in entradas if versao_arquivo(e.name) not in VERSOES_LEGIVEIS]:
+        try:
+            os.remove(entrada.path)
+            removidos += 1
+        except OSError:
+            pass
+        entradas.remove(entrada)
+    if removidos:
+        log.info("   🗑️  Cache de planilhas: %s snapshot(s) de versão não legível removidos", removidos)
+
+    arquivos = sorted(((e.stat().st_mtime, e.stat().st_size, e.path) for e in entradas))
+    total = sum(tamanho for _, tamanho, _ in arquivos)
+
+    for _, tamanho, caminho in arquivos:
+        if total <= limite_bytes:
+            break
+        try:
+            os.remove(caminho)
+            total -= tamanho
+            removidos += 1
+        except OSError:
+            continue
+
+    return removidos
+
+
+def obter_snapshot_planilha(arquivo_excel, extrator, pasta_cache=None):
+    """
+    Retorna o snapshot da planilha, usando o cache quando o conteúdo não mudou
+    Em caso de falta, chama extrator(arquivo_excel) e grava o resultado
+    O extrator deve retornar um dicionário ou None em caso de erro
+    """
+    hash_planilha = calcular_hash_planilha(arquivo_excel)
+
+    snapshot = ler_snapshot_cache(hash_planilha, pasta_cache)
+    if snapshot is not None:
+        contar(ACERTOS_CACHE)
+        return snapshot
+
+    contar(FALTAS_CACHE)
+    snapshot = extrator(arquivo_excel)
+    if snapshot is None:
+        return None
+
+    try:
+        gravar_snapshot_cache(hash_planilha, snapshot, pasta_cache)
+    except OSError as e:
+        log.warning("   ⚠️  Não foi possível gravar o cache da planilha: %s", e)
+
+    return snapshot
@@ -0,0 +1,302 @@
+# -*- coding: utf-8 -*-
+"""
+Cache Persistente de Soluções por Ponto
+Banco SQLite na pasta do cache de planilhas com as soluções de cada etapa de
+refinamento, indexadas pela impressão digital do ponto: constantes, leituras
+(com os tempos de partida), valores desejados, tolerância e estratégia.
+
+    • ponto inalterado → a solução é servida do banco, sem nova busca;
+    • ponto alterado (ex.: uma leitura redigitada) → a busca parte dos tempos
+      da solução mais próxima do mesmo grupo (mesmas constantes, alvos,
+      tolerância e estratégia), em vez dos tempos de partida. O resultado só é
+      aceito se convergir dentro da tolerância; senão a busca é refeita a partir
+      dos tempos de partida, para o certificado não depender do histórico do cache.
+
+Cada solução guarda a versão do motor: ao incrementar VERSAO_MOTOR todas as
+soluções anteriores são descartadas. O banco é limitado em número de entradas;
+as usadas há mais tempo são removidas primeiro (LRU)
+"""
+
+from decimal import Decimal, getcontext
+import hashlib
+import json
+import os
+import sqlite3
+import time
+
+from cache_planilhas import PASTA_CACHE
+from instrumentacao import contar, ACERTOS_CACHE, FALTAS_CACHE
+from orcamento_otimizacao import ENCERRAMENTO_CONVERGENCIA, ENCERRAMENTO_PRAZO
+from registro_log import obter_logger
+
+# Configurar precisão alta
+getcontext().prec = 28
+
+# Versão dos motores de refinamento - incrementar quando o resultado de uma busca mudar
+VERSAO_MOTOR = 2
+
+ARQUIVO_BANCO = 'solucoes.sqlite3'
+
+# Número máximo de soluções guardadas antes da remoção das usadas há mais tempo
+LIMITE_ENTRADAS = 20_000
+
+# Distância relativa máxima (por grandeza) para aproveitar uma solução vizinha
+DISTANCIA_MAXIMA = 0.05
+
+# Grandezas das leituras que entram na impressão digital e na distância
+GRANDEZAS_PONTO = ('pulsos_padrao', 'tempo_coleta', 'leitura_medidor', 'temperatura')
+
+MARCADOR_DECIMAL = '$decimal'
+
+log = obter_logger(__name__)
+
+
+def _codificar(valor):
+    if isinstance(valor, Decimal):
+        return {MARCADOR_DECIMAL: str(valor)}
+    raise TypeError(f"tipo não serializável: {type(valor).__name__}")
+
+
+def _decodificar(objeto):
+    if len(objeto) == 1 and MARCADOR_DECIMAL in objeto:
+        return Decimal(objeto[MARCADOR_DECIMAL])
+    return objeto
+
+
+def serializar_solucao(solucao):
+    """
+    JSON da solução com os Decimal preservados exatamente
+    """
+    return json.dumps(solucao, ensure_ascii=False, separators=(',', ':'), default=_codificar)
+
+
+def desserializar_solucao(texto):
+    return json.loads(texto, object_hook=_decodificar)
+
+
+def _hash(dados):
+    return hashlib.sha256(json.dumps(dados, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+def impressao_ponto(estrategia, constantes, leituras, tempos_iniciais, alvos, tolerancia, extras=None):
+    """
+    (impressão digital, grupo, vetor) do ponto
+    grupo: tudo menos as leituras (soluções vizinhas só são aproveitadas dentro do grupo)
+    vetor: grandezas das leituras e tempos de partida, para a distância entre pontos
+    """
+    grupo = _hash({
+        'estrategia': estrategia,
+        'constantes': {chave: str(valor) for chave, valor in constantes.items()},
+        'alvos': {chave: str(valor) for chave, valor in alvos.items()},
+        'tolerancia': str(tolerancia),
+        'extras': extras or {},
+        'leituras': len(leituras),
+    })
+    valores = [leitura.get(grandeza) for leitura in leituras for grandeza in GRANDEZAS_PONTO] + list(tempos_iniciais)
+    impressao = _hash({'grupo': grupo, 'valores': [str(v) for v in valores]})
+    vetor = [float(v) if v is not None else 0.0 for v in valores]
+    return impressao, grupo, vetor
+
+
+def convergiu(solucao, tolerancia):
+    """
+    True se a solução atingiu o objetivo pela convergência, com o resíduo da
+    vazão média dentro da tolerância (critério de aceite da partida vizinha)
+    """
+    if not solucao or not solucao.get('objetivo_atingido'):
+        return False
+    if solucao.get('encerramento', ENCERRAMENTO_CONVERGENCIA) != ENCERRAMENTO_CONVERGENCIA:
+        return False
+    residuo = solucao.get('exatos', {}).get('residuos', {}).get('vazao_media')
+    return residuo is None or Decimal(residuo) <= Decimal(tolerancia)
+
+
+def distancia(vetor_a, vetor_b):
+    """
+    Maior diferença relativa entre as grandezas de dois pontos
+    """
+    return max((abs(a - b) / max(abs(b), 1.0) for a, b in zip(vetor_a, vetor_b)), default=0.0)
+
+
+class CacheSolucoes:
+    """
+    Banco de soluções por ponto
+    Uso:
+        with CacheSolucoes() as cache:
+            resultado = cache.resolver(estrategia, ponto, constantes, tempos, tolerancia, resolver)
+    """
+
+    def __init__(self, caminho=None, versao_motor=VERSAO_MOTOR, limite_entradas=LIMITE_ENTRADAS):
+        self.caminho = caminho or os.path.join(PASTA_CACHE, ARQUIVO_BANCO)
+        self.versao_motor = versao_motor
+        self.limite_entradas = limite_entradas
+        self.acertos = 0
+        self.reaproveitadas = 0
+        self.rejeitadas = 0
+        self.faltas = 0
+
+        pasta = os.path.dirname(self.caminho)
+        if pasta:
+            os.makedirs(pasta, exist_ok=True)
+        # Processos do lote compartilham o banco: espera o bloqueio em vez de falhar
+        self._conexao = sqlite3.connect(self.caminho, timeout=30)
+        self._conexao.execute('PRAGMA journal_mode=WAL')
+        self._conexao.execute(
+            'CREATE TABLE IF NOT EXISTS solucoes ('
+            ' impressao TEXT PRIMARY KEY, grupo TEXT NOT NULL, versao_motor INTEGER NOT NULL,'
+            ' vetor TEXT NOT NULL, solucao TEXT NOT NULL, criado REAL NOT NULL, usado REAL NOT NULL)'
+        )
+        self._conexao.execute('CREATE INDEX IF NOT EXISTS solucoes_grupo ON solucoes (grupo)')
+        self._conexao.execute('CREATE INDEX IF NOT EXISTS solucoes_usado ON solucoes (usado)')
+        self.invalidar_versoes_antigas()
+
+    def invalidar_versoes_antigas(self):
+        """
+        Remove as soluções de outras versões do motor
+        """
+        with self._conexao:
+            removidas = self._conexao.execute('DELETE FROM solucoes WHERE versao_motor != ?',
+                                              (self.versao_motor,)).rowcount
+        if removidas:
+            log.info("   🗑️  Cache de soluções: %s soluções de outra versão do motor removidas", removidas)
+        return removidas
+
+    def obter(self, impressao):
+        """
+        Solução gravada para a impressão digital, ou None
+        """
+        linha = self._conexao.execute('SELECT solucao FROM solucoes WHERE impressao = ? AND versao_motor = ?',
+                                      (impressao, self.versao_motor)).fetchone()
+        if linha is None:
+            return None
+        with self._conexao:
+            self._conexao.execute('UPDATE solucoes SET usado = ? WHERE impressao = ?', (time.time(), impressao))
+        return desserializar_solucao(linha[0])
+
+    def mais_proxima(self, grupo, vetor, distancia_maxima=DISTANCIA_MAXIMA):
+        """
+        (distância, solução) da solução mais próxima do grupo, ou None
+        """
+        melhor = None
+        for vetor_gravado, solucao in self._conexao.execute(
+                'SELECT vetor, solucao FROM solucoes WHERE grupo = ? AND versao_motor = ?',
+                (grupo, self.versao_motor)):
+            d = distancia(vetor, json.loads(vetor_gravado))
+            if d <= distancia_maxima and (melhor is None or d < melhor[0]):
+                melhor = (d, solucao)
+        if melhor is None:
+            return None
+        return melhor[0], desserializar_solucao(melhor[1])
+
+    def gravar(self, impressao, grupo, vetor, solucao):
+        agora = time.time()
+        with self._conexao:
+            self._conexao.execute(
+                'INSERT OR REPLACE INTO solucoes (impressao, grupo, versao_motor, vetor, solucao, criado, usado)'
+                ' VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (impressao, grupo, self.versao_motor, json.dumps(vetor), serializar_solucao(solucao), agora, agora)
+            )
+        self.limpar_excedente()
+
+    def limpar_excedente(self):
+        """
+        Remove as soluções usadas há mais tempo até o banco caber no limite
+        """
+        with self._conexao:
+            return self._conexao.execute(
+                'DELETE FROM solucoes WHERE impressao IN ('
+                ' SELECT impressao FROM solucoes ORDER BY usado DESC LIMIT -1 OFFSET ?)',
+                (self.limite_entradas,)
+            ).rowcount
+
+    def __len__(self):
+        return self._conexao.execute('SELECT COUNT(*) FROM solucoes').fetchone()[0]
+
+    def consultar(self, estrategia, ponto, constantes, tempos_iniciais, tolerancia, extras=None,
+                  campo_tempos='tempos'):
+        """
+        Consulta do ponto, sem resolvê-lo: (chave, solução do cache ou None,
+        tempos de partida da solução vizinha ou None)
+        Para quem resolve os pontos em lote; sem acerto, a solução obtida vai para concluir(chave, ...)
+        """
+        chave = impressao_ponto(estrategia, constantes, ponto['leituras'], tempos_iniciais,
+                                ponto['valores_originais'], tolerancia, extras)
+        solucao = self.obter(chave[0])
+        if solucao is not None:
+            contar(ACERTOS_CACHE)
+            self.acertos += 1
+            log.info("   ♻️  Ponto %s servido do cache de soluções", ponto['numero'])
+            solucao.update({'numero': ponto['numero'], 'linha_inicial': ponto['linha_inicial'], 'cache': 'acerto'})
+            return chave, solucao, None
+
+        contar(FALTAS_CACHE)
+        vizinha = self.mais_proxima(chave[1], chave[2])
+        if vizinha is not None and vizinha[1].get('exatos', {}).get(campo_tempos):
+            log.info("   ♻️  Ponto %s parte da solução vizinha (distância %.2e)", ponto['numero'], vizinha[0])
+            return chave, None, list(vizinha[1]['exatos'][campo_tempos])
+        self.faltas += 1
+        return chave, None, None
+
+    def aceitar_vizinha(self, ponto, solucao, tolerancia):
+        """
+        True se o resultado da partida vizinha convergiu; senão a busca deve ser
+        refeita a partir dos tempos de partida
+        """
+        if convergiu(solucao, tolerancia):
+            self.reaproveitadas += 1
+            return True
+        log.info("   ♻️  Ponto %s: partida vizinha não convergiu, refazendo dos tempos de partida", ponto['numero'])
+        self.rejeitadas += 1
+        return False
+
+    def concluir(self, chave, solucao, origem):
+        """
+        Grava a solução resolvida e a devolve marcada com a origem ('falta' ou 'partida_vizinha')
+        """
+        # Solução interrompida pelo prazo não é gravada: com mais tempo a busca iria além
+        if solucao.get('encerramento') != ENCERRAMENTO_PRAZO:
+            try:
+                self.gravar(*chave, solucao)
+            except (sqlite3.Error, TypeError) as e:
+                log.warning("   ⚠️  Não foi possível gravar a solução no cache: %s", e)
+        return dict(solucao, cache=origem)
+
+    def resolver(self, estrategia, ponto, constantes, tempos_iniciais, tolerancia, resolver, extras=None,
+                 campo_tempos='tempos'):
+        """
+        Solução do ponto pelo cache, ou resolver(tempos_de_partida) gravando o resultado
+        Sem acerto, parte dos tempos (campo_tempos) da solução vizinha mais próxima, se houver;
+        o resultado da partida vizinha só é aceito se convergir, senão a busca é refeita
+        a partir de tempos_iniciais
+        """
+        chave, solucao, partida = self.consultar(estrategia, ponto, constantes, tempos_iniciais, tolerancia,
+                                                 extras, campo_tempos)
+        if solucao is not None:
+            return solucao
+
+        origem = 'falta'
+        if partida is not None:
+            solucao = resolver(partida)
+            if self.aceitar_vizinha(ponto, solucao, tolerancia):
+                origem = 'partida_vizinha'
+            else:
+                solucao = None
+        if solucao is None:
+            solucao = resolver(list(tempos_iniciais))
+            if solucao is None:
+                return None
+        return self.concluir(chave, solucao, origem)
+
+    def estatisticas(self):
+        return {'acertos': self.acertos, 'partidas_vizinhas': self.reaproveitadas,
+                'vizinhas_rejeitadas': self.rejeitadas, 'faltas': self.faltas, 'entradas': len(self)}
+
+    def fechar(self):
+        self._conexao.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo, valor, rastreamento):
+        self.fechar()
+        return False
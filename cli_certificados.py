@@ -0,0 +1,404 @@
+# -*- coding: utf-8 -*-
+"""
+Linha de Comando Unificada dos Certificados
+Um único ponto de entrada com subcomandos:
+
+    extract   extrai constantes e pontos da planilha (JSON)
+    optimize  otimização de tempos → planilha _CORRIGIDO
+    apply     refinamento híbrido → planilha _REFINADO_HIBRIDO
+    refine    refinamento ultra-preciso → _CERTIFICADO_FINAL
+    verify    confere os valores sagrados de um certificado gravado
+    report    resume um resultado JSON do pipeline ou do lote, ou um relatório
+              em fluxo (.jsonl), inclusive de um lote ainda em execução
+    batch     processa uma pasta de planilhas em paralelo (--assincrono: leitura,
+              cálculo e gravação sobrepostos)
+    uncertainty  incerteza de I57/U57 por Monte Carlo
+    robustness   resistência dos valores sagrados ao arredondamento da planilha
+    serve     serviço HTTP local (pool de processos aquecidos)
+    queue     lote retomável com fila persistente (run, work, status, retry)
+
+Os módulos pesados (openpyxl, numpy, motores de cálculo) são importados apenas
+dentro do subcomando que os usa, então comandos rápidos como
+"verify --summary" (snapshots em cache) e "report" iniciam em dezenas de ms
+"""
+
+from decimal import Decimal
+import argparse
+import json
+import os
+import sys
+
+
+def _base(arquivo):
+    return arquivo[:-5] if arquivo.lower().endswith('.xlsx') else arquivo
+
+
+def _exigir(*arquivos):
+    """
+    Retorna False (e registra o erro) se algum arquivo não existir
+    """
+    from registro_log import obter_logger
+
+    log = obter_logger(__name__)
+    for arquivo in arquivos:
+        if not os.path.exists(arquivo):
+            log.error("❌ Arquivo não encontrado: %s", arquivo)
+            return False
+    return True
+
+
+def comando_extract(args):
+    """
+    Extrai constantes e pontos (cache de snapshots) e grava em JSON
+    """
+    if not _exigir(args.original):
+        return 2
+    from otimizador_tempos_inteligente import extrair_dados_planilha_original
+
+    constantes, pontos = extrair_dados_planilha_original(args.original, usar_cache=not args.sem_cache)
+    if pontos is None:
+        return 1
+
+    dados = {'arquivo': args.original, 'constantes': constantes, 'pontos': pontos}
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as f:
+            json.dump(dados, f, indent=2, ensure_ascii=False, default=str)
+        print(f"✅ {len(pontos)} pontos extraídos para: {args.saida}")
+    else:
+        json.dump(dados, sys.stdout, indent=2, ensure_ascii=False, default=str)
+        print()
+    return 0
+
+
+def comando_optimize(args):
+    if not _exigir(args.original):
+        return 2
+    from otimizador_tempos_inteligente import executar_otimizacao
+
+    arquivo_corrigido = args.saida or f"{_base(args.original)}_CORRIGIDO.xlsx"
+    resultados = executar_otimizacao(args.original, arquivo_corrigido, args.informacoes)
+    return 0 if resultados is not None else 1
+
+
+def comando_apply(args):
+    arquivo_corrigido = args.corrigido or f"{_base(args.original)}_CORRIGIDO.xlsx"
+    if not _exigir(args.original, arquivo_corrigido, args.informacoes):
+        return 2
+    from aplicador_tempos_gerados import executar_refinamento_hibrido
+
+    arquivo_resultado = args.saida or f"{_base(args.original)}_REFINADO_HIBRIDO.xlsx"
+    resultados = executar_refinamento_hibrido(args.original, arquivo_corrigido, arquivo_resultado, args.informacoes)
+    return 0 if resultados is not None else 1
+
+
+def comando_refine(args):
+    arquivo_refinado = args.refinado or f"{_base(args.original)}_REFINADO_HIBRIDO.xlsx"
+    if not _exigir(args.original, arquivo_refinado):
+        return 2
+    from refinador_ultra_preciso import executar_refinamento_ultra_preciso
+
+    arquivo_resultado = args.saida or f"{_base(args.original)}_CERTIFICADO_FINAL.xlsx"
+    resultados = executar_refinamento_ultra_preciso(args.original, arquivo_refinado, arquivo_resultado)
+    return 0 if resultados is not None else 1
+
+
+def comando_verify(args):
+    """
+    Recalcula a vazão média do certificado gravado e compara com a original
+    """
+    arquivo_final = args.final or f"{_base(args.original)}_CERTIFICADO_FINAL.xlsx"
+    if not _exigir(args.original, arquivo_final):
+        return 2
+    from processamento_lote import verificar_certificado
+
+    verificacao = verificar_certificado(args.original, arquivo_final, Decimal(args.tolerancia))
+    if verificacao is None:
+        print(f"❌ Não foi possível ler: {args.original} / {arquivo_final}")
+        return 2
+
+    aprovados = sum(1 for v in verificacao if v['aprovado'])
+    if not args.summary:
+        for v in verificacao:
+            simbolo = '✅' if v['aprovado'] else '❌'
+            detalhe = v.get('erro') or f"vazão {v['vazao_media']} | diferença {v['diferenca_vazao']}"
+            print(f"   {simbolo} Ponto {v['ponto']}: {detalhe}")
+    print(f"📊 {os.path.basename(arquivo_final)}: {aprovados}/{len(verificacao)} pontos aprovados")
+    return 0 if verificacao and aprovados == len(verificacao) else 1
+
+
+def _imprimir_lote(entrada, tempo_total, estatisticas, resultados):
+    print(f"📊 LOTE: {entrada} ({tempo_total} s)")
+    print(f"   Planilhas: {estatisticas['total_planilhas']} | ✅ {estatisticas['aprovadas']}"
+          f" | ⚠️  {estatisticas['reprovadas']} | ❌ {estatisticas['com_erro']}")
+    for r in resultados:
+        simbolo = {'aprovado': '✅', 'reprovado': '⚠️ '}.get(r['status'], '❌')
+        detalhe = r.get('erro') or f"{r.get('pontos_aprovados')}/{r.get('pontos')} pontos aprovados"
+        print(f"   {simbolo} {os.path.basename(r['arquivo'])}: {detalhe}")
+
+
+def comando_report_fluxo(args):
+    """
+    Relatório em fluxo (.jsonl): lê só o que já foi gravado, então funciona com
+    o pipeline ou o lote ainda em execução
+    """
+    from relatorio_streaming import ler_registros, renderizar_texto, PLANILHA, RESUMO
+
+    cabecalho = next(ler_registros(args.arquivo), {})
+    if cabecalho.get('tipo') != 'lote':
+        renderizar_texto(args.arquivo, detalhar_pontos=not args.summary)
+        return 0
+
+    estatisticas = {'total_planilhas': 0, 'aprovadas': 0, 'reprovadas': 0, 'com_erro': 0}
+    chave_status = {'aprovado': 'aprovadas', 'reprovado': 'reprovadas'}
+    resultados, tempo_total = [], 'em andamento'
+    for registro in ler_registros(args.arquivo, (PLANILHA, RESUMO)):
+        if registro['registro'] == RESUMO:
+            tempo_total = registro.get('tempo_total')
+            continue
+        estatisticas['total_planilhas'] += 1
+        estatisticas[chave_status.get(registro['status'], 'com_erro')] += 1
+        resultados.append(registro)
+
+    metadata = cabecalho.get('metadata', {})
+    _imprimir_lote(metadata.get('entrada'), tempo_total, estatisticas, resultados)
+    if estatisticas['total_planilhas'] < metadata.get('planilhas', 0):
+        print(f"   ⏳ {estatisticas['total_planilhas']}/{metadata['planilhas']} planilhas concluídas")
+    return 0
+
+
+def comando_report(args):
+    """
+    Resume um resultado do pipeline (*_pipeline.json, resultado_pipeline.json),
+    o resumo de um lote (resumo_lote.json) ou um relatório em fluxo (.jsonl)
+    """
+    if not _exigir(args.arquivo):
+        return 2
+    if args.arquivo.lower().endswith('.jsonl'):
+        return comando_report_fluxo(args)
+    with open(args.arquivo, 'r', encoding='utf-8') as f:
+        dados = json.load(f)
+
+    if 'resultados' in dados and 'estatisticas' in dados:
+        _imprimir_lote(dados['metadata'].get('entrada'), dados['metadata'].get('tempo_total'),
+                       dados['estatisticas'], dados['resultados'])
+        return 0
+
+    if 'verificacao' not in dados:
+        print(f"❌ Formato de resultado desconhecido: {args.arquivo}")
+        return 2
+
+    verificacao = dados['verificacao']
+    aprovados = sum(1 for v in verificacao if v['aprovado'])
+    print(f"📊 {dados.get('arquivo_original')} → {dados.get('arquivo_certificado')}")
+    print(f"   Pontos aprovados: {aprovados}/{len(verificacao)} | tempo total: {dados.get('tempo_total', 0):.2f} s")
+    for etapa in dados.get('etapas', []):
+        print(f"   • {etapa['nome']}: {etapa['tempo']:.3f} s ({etapa['pontos_processados']} pontos)")
+    contadores = (dados.get('instrumentacao') or {}).get('contadores')
+    if contadores:
+        print("   Contadores: " + ', '.join(f"{nome}={valor}" for nome, valor in sorted(contadores.items())))
+    if not args.summary:
+        for v in verificacao:
+            simbolo = '✅' if v['aprovado'] else '❌'
+            print(f"   {simbolo} Ponto {v['ponto']}: {v.get('erro') or v.get('diferenca_vazao')}")
+    return 0
+
+
+def comando_batch(args):
+    if args.log_nivel:
+        # Herdado pelos processos do pool
+        os.environ['LOG_NIVEL'] = args.log_nivel.upper()
+    if args.assincrono:
+        from pipeline_assincrono import processar_lote_assincrono
+
+        consolidado = processar_lote_assincrono(args.entrada, args.saida, args.processos, args.limite_fila,
+                                                not args.sem_cache_solucoes)
+        return 0 if consolidado is not None else 1
+    from processamento_lote import processar_lote
+
+    consolidado = processar_lote(args.entrada, args.saida, args.processos, args.checkpoints, args.log_jsonl_lote,
+                                 not args.sem_cache_solucoes)
+    return 0 if consolidado is not None else 1
+
+
+def comando_uncertainty(args):
+    from incerteza_monte_carlo import executar_incerteza
+
+    return executar_incerteza(args.original, args.amostras, args.probabilidade, args.orcamento,
+                              args.semente, args.bloco, args.json)
+
+
+def comando_robustness(args):
+    from robustez_solucoes import executar_robustez
+
+    return executar_robustez(args.original, args.final, args.amostras, args.modo, args.limiar,
+                             args.semente, args.json)
+
+
+def comando_serve(args):
+    if args.log_nivel:
+        # Herdado pelos processos do pool
+        os.environ['LOG_NIVEL'] = args.log_nivel.upper()
+    from servico_http import servir
+
+    return servir(args.endereco, args.porta, args.processos, args.limite_fila, args.tempo_limite)
+
+
+def comando_queue(args):
+    if args.log_nivel:
+        # Herdado pelos processos de trabalho
+        os.environ['LOG_NIVEL'] = args.log_nivel.upper()
+    from fila_jobs import FilaJobs, caminho_fila, executar_fila, imprimir_estado, trabalhar
+
+    if args.acao == 'run':
+        consolidado = executar_fila(args.entrada, args.saida, args.processos, args.checkpoints,
+                                    args.log_jsonl_lote, args.tentativas)
+        return 0 if consolidado is not None else 1
+
+    arquivo_fila = caminho_fila(args.saida)
+    if not _exigir(arquivo_fila):
+        return 2
+    if args.acao == 'work':
+        trabalhar(arquivo_fila, args.tentativas)
+        return 0
+    with FilaJobs(arquivo_fila, args.tentativas) as fila:
+        if args.acao == 'retry':
+            print(f"🔁 {fila.repetir_falhos()} job(s) falho(s) devolvido(s) para a fila")
+        imprimir_estado(fila.estado())
+    return 0
+
+
+def criar_parser():
+    parser = argparse.ArgumentParser(prog='cli_certificados', description="Ferramentas de certificados de calibração")
+    parser.add_argument('--log-nivel', default=None, help="DEBUG, INFO (padrão), WARNING ou ERROR")
+    parser.add_argument('--progresso', action='store_true', help="mostra apenas barras de progresso e o resumo")
+    parser.add_argument('--log-jsonl', default=None, help="arquivo JSONL para gravar também o log")
+    parser.add_argument('--tempo-alvo', default=None,
+                        help="estratégia de tempo alvo: 240 (padrão), 360 ou outro nominal em segundos")
+    parser.add_argument('--orcamento-ponto', default=None,
+                        help="segundos de busca por ponto em cada etapa; esgotado, fica a melhor solução (padrão: sem limite)")
+    sub = parser.add_subparsers(dest='comando', metavar='comando')
+    sub.required = True
+
+    p = sub.add_parser('extract', aliases=['extrair'], help="extrai constantes e pontos da planilha")
+    p.add_argument('original', help="planilha de certificado")
+    p.add_argument('-o', '--saida', default=None, help="arquivo JSON (padrão: saída padrão)")
+    p.add_argument('--sem-cache', action='store_true', help="lê a planilha mesmo com snapshot em cache")
+    p.set_defaults(funcao=comando_extract)
+
+    p = sub.add_parser('optimize', aliases=['otimizar'], help="otimiza os tempos e gera a planilha _CORRIGIDO")
+    p.add_argument('original', help="planilha original")
+    p.add_argument('-o', '--saida', default=None, help="planilha corrigida (padrão: <original>_CORRIGIDO.xlsx)")
+    p.add_argument('--informacoes', default='informacoes_refinamento.json', help="informações para o refinamento")
+    p.set_defaults(funcao=comando_optimize)
+
+    p = sub.add_parser('apply', aliases=['aplicar'], help="refinamento híbrido → _REFINADO_HIBRIDO")
+    p.add_argument('original', help="planilha original")
+    p.add_argument('--corrigido', default=None, help="planilha corrigida (padrão: <original>_CORRIGIDO.xlsx)")
+    p.add_argument('-o', '--saida', default=None, help="planilha refinada (padrão: <original>_REFINADO_HIBRIDO.xlsx)")
+    p.add_argument('--informacoes', default='informacoes_refinamento.json', help="informações da otimização")
+    p.set_defaults(funcao=comando_apply)
+
+    p = sub.add_parser('refine', aliases=['refinar'], help="refinamento ultra-preciso → _CERTIFICADO_FINAL")
+    p.add_argument('original', help="planilha original")
+    p.add_argument('--refinado', default=None, help="planilha refinada (padrão: <original>_REFINADO_HIBRIDO.xlsx)")
+    p.add_argument('-o', '--saida', default=None, help="certificado final (padrão: <original>_CERTIFICADO_FINAL.xlsx)")
+    p.set_defaults(funcao=comando_refine)
+
+    p = sub.add_parser('verify', aliases=['verificar'], help="confere os valores sagrados de um certificado")
+    p.add_argument('original', help="planilha original")
+    p.add_argument('final', nargs='?', default=None, help="certificado (padrão: <original>_CERTIFICADO_FINAL.xlsx)")
+    p.add_argument('--tolerancia', default='0.00001', help="diferença máxima da vazão média (padrão: 0.00001)")
+    p.add_argument('--summary', '--resumo', action='store_true', help="mostra apenas a contagem de aprovados")
+    p.set_defaults(funcao=comando_verify)
+
+    p = sub.add_parser('report', aliases=['relatorio'], help="resume um resultado do pipeline ou do lote")
+    p.add_argument('arquivo', help="*_pipeline.json, resultado_pipeline.json, resumo_lote.json ou relatório .jsonl")
+    p.add_argument('--summary', '--resumo', action='store_true', help="omite o detalhe por ponto")
+    p.set_defaults(funcao=comando_report)
+
+    p = sub.add_parser('batch', aliases=['lote'], help="processa uma pasta de planilhas em paralelo")
+    p.add_argument('entrada', help="pasta com planilhas .xlsx ou padrão glob")
+    p.add_argument('-o', '--saida', default='resultados_lote', help="pasta de resultados (padrão: resultados_lote)")
+    p.add_argument('-p', '--processos', type=int, default=None, help="número de processos (padrão: núcleos da CPU)")
+    p.add_argument('--checkpoints', action='store_true', help="grava a planilha e os resultados de cada etapa")
+    p.add_argument('--log-jsonl-lote', action='store_true', help="grava também o log de cada planilha em JSONL")
+    p.add_argument('--assincrono', action='store_true', help="sobrepõe leitura, cálculo e gravação das planilhas")
+    p.add_argument('--limite-fila', type=int, default=2, help="planilhas em espera entre estágios (--assincrono, padrão: 2)")
+    p.add_argument('--sem-cache-solucoes', action='store_true', help="refina todos os pontos sem o cache de soluções")
+    p.set_defaults(funcao=comando_batch)
+
+    p = sub.add_parser('uncertainty', aliases=['incerteza'], help="incerteza de I57/U57 por Monte Carlo")
+    p.add_argument('original', help="planilha de certificado")
+    p.add_argument('-n', '--amostras', type=int, default=200_000, help="amostras por ponto (padrão: 200000)")
+    p.add_argument('-p', '--probabilidade', type=float, default=0.95, help="probabilidade de abrangência (padrão: 0.95)")
+    p.add_argument('--orcamento', default=None, help="arquivo JSON com o orçamento de incerteza")
+    p.add_argument('--semente', type=int, default=None, help="semente do gerador (resultados reprodutíveis)")
+    p.add_argument('--bloco', type=int, default=65_536, help="amostras por bloco (padrão: 65536)")
+    p.add_argument('--json', default=None, help="grava os resultados neste arquivo")
+    p.set_defaults(funcao=comando_uncertainty)
+
+    p = sub.add_parser('robustness', aliases=['robustez'], help="resistência dos valores sagrados ao arredondamento")
+    p.add_argument('original', help="planilha original")
+    p.add_argument('final', nargs='?', default=None, help="certificado (padrão: <original>_CERTIFICADO_FINAL.xlsx)")
+    p.add_argument('-n', '--amostras', type=int, default=4096, help="perturbações por ponto (padrão: 4096)")
+    p.add_argument('--modo', choices=('excel', 'exibicao'), default='excel', help="excel: 15 algarismos; exibicao: casas do formato")
+    p.add_argument('--limiar', type=float, default=0.99, help="probabilidade mínima (padrão: 0.99)")
+    p.add_argument('--semente', type=int, default=0, help="semente do gerador (padrão: 0)")
+    p.add_argument('--json', default=None, help="grava os resultados neste arquivo")
+    p.set_defaults(funcao=comando_robustness)
+
+    p = sub.add_parser('serve', aliases=['servir'], help="serviço HTTP local do pipeline")
+    p.add_argument('--endereco', default='127.0.0.1', help="endereço de escuta (padrão: 127.0.0.1)")
+    p.add_argument('--porta', type=int, default=8765, help="porta (padrão: 8765)")
+    p.add_argument('-p', '--processos', type=int, default=None, help="processos de trabalho (padrão: núcleos da CPU)")
+    p.add_argument('--limite-fila', type=int, default=16, help="requisições em espera (padrão: 16)")
+    p.add_argument('--tempo-limite', type=int, default=600, help="segundos por certificado (padrão: 600)")
+    p.set_defaults(funcao=comando_serve)
+
+    p = sub.add_parser('queue', aliases=['fila'], help="lote retomável com fila persistente")
+    p.add_argument('acao', choices=('run', 'work', 'status', 'retry'),
+                   help="run: enfileira e processa; work: só processa (outro terminal); status; retry: repete os falhos")
+    p.add_argument('entrada', nargs='?', default=None, help="pasta com planilhas .xlsx ou padrão glob (run)")
+    p.add_argument('-o', '--saida', default='resultados_lote', help="pasta de resultados e da fila (padrão: resultados_lote)")
+    p.add_argument('-p', '--processos', type=int, default=None, help="número de processos (padrão: núcleos da CPU)")
+    p.add_argument('--tentativas', type=int, default=3, help="tentativas por planilha (padrão: 3)")
+    p.add_argument('--checkpoints', action='store_true', help="grava a planilha e os resultados de cada etapa")
+    p.add_argument('--log-jsonl-lote', action='store_true', help="grava também o log de cada planilha em JSONL")
+    p.set_defaults(funcao=comando_queue)
+
+    return parser
+
+
+def main(argv=None):
+    """
+    Função principal - LINHA DE COMANDO UNIFICADA
+    """
+    parser = criar_parser()
+    args = parser.parse_args(argv)
+
+    if args.tempo_alvo is not None:
+        from estrategias_tempo import obter_estrategia, VARIAVEL_AMBIENTE
+        try:
+            estrategia = obter_estrategia(args.tempo_alvo)
+        except ValueError as e:
+            parser.error(str(e))
+        # Pela variável de ambiente a estratégia chega também aos processos de trabalho
+        os.environ[VARIAVEL_AMBIENTE] = estrategia.nome
+
+    if args.orcamento_ponto is not None:
+        import orcamento_otimizacao
+        try:
+            segundos = orcamento_otimizacao.validar_orcamento(args.orcamento_ponto)
+        except ValueError as e:
+            parser.error(str(e))
+        os.environ[orcamento_otimizacao.VARIAVEL_AMBIENTE] = repr(segundos)
+
+    if args.comando not in ('report', 'relatorio', 'batch', 'lote', 'queue', 'fila'):
+        from registro_log import configurar_log
+        configurar_log(args.log_nivel, 'progresso' if args.progresso else 'texto', args.log_jsonl)
+
+    return args.funcao(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
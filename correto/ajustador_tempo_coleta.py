@@ -53,16 +53,34 @@ HIERARQUIA DE INFLUÊNCIA:
 
 import pandas as pd
 import json
+from dataclasses import dataclass, field
 from datetime import datetime
 from decimal import Decimal, ROUND_HALF_UP, getcontext
 from openpyxl import load_workbook
 import shutil
 import os
+import random
+import sys
 import time
 
+# Permite importar os módulos da raiz do projeto (modelo_dados, etc.)
+RAIZ_PROJETO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if RAIZ_PROJETO not in sys.path:
+    sys.path.insert(0, RAIZ_PROJETO)
+
+from modelo_dados import TabelaPontos
+from layout_planilha import ler_certificado, ler_grade, detectar_blocos
+from registro_log import obter_logger, ListaFloat
+from relatorio_streaming import EscritorRelatorio, renderizar_texto
+from instrumentacao import (contar, cronometrar, medir_ponto, CHAMADAS_MOTOR, ITERACOES,
+                            relatorio as relatorio_instrumentacao)
+from estrategias_tempo import compilar_estrategia
+
 # Configurar precisão alta para evitar diferenças de arredondamento
 getcontext().prec = 15  # Fixado em 15 casas decimais conforme solicitado
 
+log = obter_logger(__name__)
+
 # Dicionário com as fórmulas críticas da planilha
 FORMULAS_CRITICAS = {
     'vazao_referencia': {
@@ -131,13 +149,13 @@ def listar_formulas_criticas():
     """
     Lista todas as fórmulas críticas disponíveis
     """
-    print("📋 FÓRMULAS CRÍTICAS DA PLANILHA:")
-    print("=" * 50)
+    log.info("📋 FÓRMULAS CRÍTICAS DA PLANILHA:")
+    log.info("%s", "=" * 50)
     for nome, info in FORMULAS_CRITICAS.items():
-        print(f"🔹 {info['descricao']} - {info['celula']}")
-        print(f"   Fórmula: {info['formula']}")
-        print(f"   Dependências: {', '.join(info['dependencias'])}")
-        print()
+        log.info("🔹 %s - %s", info['descricao'], info['celula'])
+        log.info("   Fórmula: %s", info['formula'])
+        log.info("   Dependências: %s", ', '.join(info['dependencias']))
+        log.info("")
 
 def converter_para_decimal_padrao(valor):
     """
@@ -164,7 +182,7 @@ def ler_valor_exato(sheet, linha, coluna):
         valor = sheet.cell(row=linha, column=coluna).value
         return converter_para_decimal_padrao(valor)
     except Exception as e:
-        print(f"       ERRO ao ler valor na linha {linha}, coluna {coluna}: {e}")
+        log.error("       ERRO ao ler valor na linha %s, coluna %s: %s", linha, coluna, e)
         return Decimal('0')
 
 def calcular_desvio_padrao_amostral(valores):
@@ -234,10 +252,10 @@ def extrair_constantes_calculo(arquivo_excel):
         temperatura_constante = ler_valor_exato(coleta_sheet, 51, 18)  # R$51
         fator_correcao_temp = ler_valor_exato(coleta_sheet, 51, 21)  # U$51
         
-        print(f"   Constantes extraídas:")
-        print(f"     Pulso do padrão em L/P: {float(pulso_padrao_lp)}")
-        print(f"     Temperatura constante: {float(temperatura_constante)}")
-        print(f"     Fator correção temperatura: {float(fator_correcao_temp)}")
+        log.info("   Constantes extraídas:")
+        log.info("     Pulso do padrão em L/P: %s", float(pulso_padrao_lp))
+        log.info("     Temperatura constante: %s", float(temperatura_constante))
+        log.info("     Fator correção temperatura: %s", float(fator_correcao_temp))
         
         return {
             'pulso_padrao_lp': pulso_padrao_lp,
@@ -246,7 +264,7 @@ def extrair_constantes_calculo(arquivo_excel):
         }
         
     except Exception as e:
-        print(f"ERRO: Erro ao extrair constantes: {e}")
+        log.error("ERRO: Erro ao extrair constantes: %s", e)
         return None
 
 def calcular_valores_certificado(dados_originais, constantes):
@@ -257,7 +275,7 @@ def calcular_valores_certificado(dados_originais, constantes):
     valores_certificado = {}
     
     for ponto_key, ponto in dados_originais.items():
-        print(f"\n📊 Calculando valores do certificado para {ponto_key}:")
+        log.info("\n📊 Calculando valores do certificado para %s:", ponto_key)
         
         totalizacoes = []
         leituras_medidor = []
@@ -274,7 +292,7 @@ def calcular_valores_certificado(dados_originais, constantes):
             totalizacoes.append(totalizacao)
             leituras_medidor.append(leitura['leitura_medidor'])
             
-            print(f"     Leitura: Totalização = {float(totalizacao)} L, Leitura Medidor = {float(leitura['leitura_medidor'])} L")
+            log.debug("     Leitura: Totalização = %s L, Leitura Medidor = %s L", float(totalizacao), float(leitura['leitura_medidor']))
         
         # Calcula médias conforme fórmulas do certificado da documentação
         media_totalizacao = sum(totalizacoes) / Decimal(str(len(totalizacoes)))
@@ -288,8 +306,8 @@ def calcular_valores_certificado(dados_originais, constantes):
             'leituras_medidor': leituras_medidor
         }
         
-        print(f"     Média Totalização: {float(media_totalizacao)} L")
-        print(f"     Média Leitura Medidor: {float(media_leitura_medidor)} L")
+        log.info("     Média Totalização: %s L", float(media_totalizacao))
+        log.info("     Média Leitura Medidor: %s L", float(media_leitura_medidor))
     
     return valores_certificado
 
@@ -299,43 +317,30 @@ def extrair_dados_originais(arquivo_excel):
     Extrai todos os parâmetros de entrada brutos das abas "Coleta de Dados"
     """
     try:
-        print(f"📖 PASSO 1: Extraindo dados originais do arquivo: {arquivo_excel}")
+        log.info("📖 PASSO 1: Extraindo dados originais do arquivo: %s", arquivo_excel)
         
         # Carregar planilha com openpyxl para precisão máxima
         wb = load_workbook(arquivo_excel, data_only=True)
         coleta_sheet = wb["Coleta de Dados"]
         
-        print("✅ Aba 'Coleta de Dados' carregada com sucesso")
-        
-        # Identifica os pontos de calibração usando pandas para estrutura
-        coleta_df = pd.read_excel(arquivo_excel, sheet_name='Coleta de Dados', header=None)
+        log.info("✅ Aba 'Coleta de Dados' carregada com sucesso")
         
-        # Configuração dos pontos (baseado no extrator_pontos_calibracao.py)
-        pontos_config = []
-        linha_inicial = 50
-        avanca_linha = 9
-        num_ponto = 1
+        # Identifica os pontos de calibração numa única passagem pela coluna C
+        # (blocos com qualquer número de leituras, ver layout_planilha.detectar_blocos)
+        grade = ler_grade(coleta_sheet, coluna_maxima=3)
+        blocos = detectar_blocos(grade, converter=converter_para_decimal_padrao)
         
-        while True:
-            valores_nulos = 0
-            for i in range(3): 
-                pulsos = get_numeric_value(coleta_df, linha_inicial + 3 + i, 2)
-                if pulsos == 0 or pd.isna(pulsos):
-                    valores_nulos += 1
-            
-            if valores_nulos == 3:
-                break
-                
-            ponto_config = {
-                'inicio_linha': linha_inicial,
-                'num_leituras': 3,
+        pontos_config = [
+            {
+                'inicio_linha': bloco['cabecalho'],
+                'primeira_leitura': bloco['primeira_leitura'],
+                'num_leituras': bloco['leituras'],
                 'num_ponto': num_ponto
             }
-            pontos_config.append(ponto_config)
-            linha_inicial += avanca_linha
-            num_ponto += 1
+            for num_ponto, bloco in enumerate(blocos.para_dicionario(), start=1)
+        ]
         
-        print(f"✅ Encontrados {len(pontos_config)} pontos de calibração")
+        log.info("✅ Encontrados %s pontos de calibração", len(pontos_config))
         
         dados_originais = {}
         
@@ -346,9 +351,9 @@ def extrair_dados_originais(arquivo_excel):
                 'valores_sagrados': {}
             }
 
-            # Extrai as 3 leituras de cada ponto
+            # Extrai as leituras de cada ponto
             for i in range(config['num_leituras']):
-                linha = config['inicio_linha'] + 4 + i  # +4 em vez de +3 para pular a linha do título
+                linha = config['primeira_leitura'] + i
                 
                 # Lê todos os parâmetros necessários
                 pulsos_padrao = ler_valor_exato(coleta_sheet, linha, 3)      # Coluna C
@@ -370,13 +375,13 @@ def extrair_dados_originais(arquivo_excel):
                 
                 ponto['leituras'].append(leitura)
                 
-                print(f"   Ponto {config['num_ponto']}, Leitura {i+1}, Linha {linha}:")
-                print(f"     Pulsos: {float(pulsos_padrao)}")
-                print(f"     Tempo: {float(tempo_coleta)} s")
-                print(f"     Vazão Ref: {float(vazao_referencia)} L/h")
-                print(f"     Leitura Medidor: {float(leitura_medidor)} L")
-                print(f"     Temperatura: {float(temperatura)} °C")
-                print(f"     Erro: {float(erro)} %")
+                log.debug("   Ponto %s, Leitura %s, Linha %s:", config['num_ponto'], i+1, linha)
+                log.debug("     Pulsos: %s", float(pulsos_padrao))
+                log.debug("     Tempo: %s s", float(tempo_coleta))
+                log.debug("     Vazão Ref: %s L/h", float(vazao_referencia))
+                log.debug("     Leitura Medidor: %s L", float(leitura_medidor))
+                log.debug("     Temperatura: %s °C", float(temperatura))
+                log.debug("     Erro: %s %%", float(erro))
 
             # Calcula os valores sagrados (Vazão Média, Tendência, Desvio Padrão)
             vazoes = [l['vazao_referencia'] for l in ponto['leituras']]
@@ -398,19 +403,19 @@ def extrair_dados_originais(arquivo_excel):
                 'desvio_padrao': desvio_padrao
             }
             
-            print(f"   VALORES SAGRADOS do Ponto {config['num_ponto']}:")
-            print(f"     Vazão Média: {float(vazao_media)} L/h")
-            print(f"     Tendência: {float(tendencia)} %")
-            print(f"     Desvio Padrão: {float(desvio_padrao) if desvio_padrao else 'N/A'} %")
+            log.debug("   VALORES SAGRADOS do Ponto %s:", config['num_ponto'])
+            log.debug("     Vazão Média: %s L/h", float(vazao_media))
+            log.debug("     Tendência: %s %%", float(tendencia))
+            log.debug("     Desvio Padrão: %s %%", (float(desvio_padrao) if desvio_padrao else 'N/A'))
             
             dados_originais[f"ponto_{config['num_ponto']}"] = ponto
             
-            print(f"  Ponto {ponto['numero']}: {len(ponto['leituras'])} leituras extraídas")
+            log.debug("  Ponto %s: %s leituras extraídas", ponto['numero'], len(ponto['leituras']))
         
         return dados_originais
         
     except Exception as e:
-        print(f"ERRO: Erro ao extrair dados originais: {e}")
+        log.error("ERRO: Erro ao extrair dados originais: %s", e)
         return None
 
 def get_numeric_value(df, row, col):
@@ -422,24 +427,36 @@ def get_numeric_value(df, row, col):
         return Decimal('0')
     except:
         return Decimal('0')
+CONSTANTES_MOTOR = ('i51', 'r51', 'u51', 'bu23', 'bw23')
+
 def run_calculation_engine(inputs):
     """
     MOTOR DE CÁLCULO: Simula as fórmulas da planilha para UMA medição.
     Esta era a função que estava faltando no seu código.
     """
-    # Desempacota os inputs para clareza
-    c = inputs.get('pulsos_padrao', Decimal(0))
-    f = inputs.get('tempo_coleta', Decimal(0))
-    o = inputs.get('leitura_medidor', Decimal(0))
-    r = inputs.get('temperatura', Decimal(0))
-    
-    # Constantes
-    i51 = inputs.get('i51', Decimal(0))
-    r51 = inputs.get('r51', Decimal(0))
-    u51 = inputs.get('u51', Decimal(0))
-    bu23 = inputs.get('bu23', Decimal(0))
-    bw23 = inputs.get('bw23', Decimal(0))
+    resultado = calcular_medicao(
+        inputs.get('pulsos_padrao', Decimal(0)),
+        inputs.get('tempo_coleta', Decimal(0)),
+        inputs.get('leitura_medidor', Decimal(0)),
+        *(inputs.get(nome, Decimal(0)) for nome in CONSTANTES_MOTOR)
+    )
+    if resultado is None:
+        return None
     
+    l_calculado, vazao_referencia, vazao_medidor, erro_percentual = resultado
+    return {
+        "totalizacao_corrigida": l_calculado,
+        "vazao_referencia": vazao_referencia,
+        "vazao_medidor": vazao_medidor,
+        "erro": erro_percentual
+    }
+
+def calcular_medicao(c, f, o, i51, r51, u51, bu23, bw23):
+    """
+    Núcleo do motor de cálculo com argumentos posicionais (sem dicionários)
+    Retorna (totalização, vazão de referência, vazão do medidor, erro) ou None
+    """
+    contar(CHAMADAS_MOTOR)
     # Simulação da fórmula de AA (Tempo de Coleta Corrigido)
     correcao_aa = f * bu23 + bw23
     aa_calculado = f - correcao_aa
@@ -457,63 +474,61 @@ def run_calculation_engine(inputs):
     vazao_medidor = (o / aa_calculado) * Decimal('3600')
     erro_percentual = ((vazao_medidor - vazao_referencia) / vazao_referencia) * Decimal(100) if vazao_referencia != 0 else Decimal(0)
     
-    return {
-        "totalizacao_corrigida": l_calculado,
-        "vazao_referencia": vazao_referencia,
-        "vazao_medidor": vazao_medidor,
-        "erro": erro_percentual
-    }
-def encontrar_ajuste_global(leituras_ponto, constantes, valores_certificado_originais, ponto_key):
+    return l_calculado, vazao_referencia, vazao_medidor, erro_percentual
+
+def encontrar_ajuste_global(leituras_ponto, constantes, valores_certificado_originais, ponto_key, estrategia=None):
     """
-    LÓGICA FINAL: Otimiza tempos de coleta para valores próximos a 240 segundos
-    (entre 239.6000 e 240.4000) preservando exatamente os valores sagrados.
+    LÓGICA FINAL: Otimiza tempos de coleta para valores próximos ao tempo nominal
+    (nominal ± janela_ajuste da estratégia, 239.6000-240.4000 para 240 s)
+    preservando exatamente os valores sagrados.
+    estrategia: estratégia de tempo alvo (None = TEMPO_ALVO, padrão 240 s)
     """
-    print(f"--- Iniciando Otimização de Tempos para 240s em {ponto_key} ---")
+    restricoes = compilar_estrategia(estrategia)
+    nome_estrategia = restricoes.estrategia.nome
+    log.info("--- Iniciando Otimização de Tempos para %ss em %s ---", nome_estrategia, ponto_key)
     
     # 1. PREPARAÇÃO DOS DADOS E ALVOS
     alvos = valores_certificado_originais[ponto_key]
     alvo_vazao_ref_media = alvos['media_totalizacao'] # Alvo para a vazão de referência
     alvo_vazao_med_media = alvos['media_leitura_medidor']  # Alvo para a vazão do medidor
     
-    # 2. BUSCA ITERATIVA PARA TEMPOS PRÓXIMOS A 240s
+    # 2. BUSCA ITERATIVA PARA TEMPOS PRÓXIMOS AO NOMINAL
     
-    # Define o intervalo de tempos permitidos
-    tempo_min = Decimal('239.6000')
-    tempo_max = Decimal('240.4000')
-    tempo_alvo = Decimal('240.0000')
+    # Define o intervalo de tempos permitidos (da estratégia)
+    tempo_min, tempo_max = restricoes.faixa_ajuste
+    tempo_alvo = restricoes.tempo_nominal
+    sorteio_min, sorteio_max = float(tempo_min), float(tempo_max)
     
-    print(f"🎯 OBJETIVO: Tempos entre {float(tempo_min)}s e {float(tempo_max)}s")
-    print(f"🎯 ALVO: {float(tempo_alvo)}s")
+    log.info("🎯 OBJETIVO: Tempos entre %ss e %ss", float(tempo_min), float(tempo_max))
+    log.info("🎯 ALVO: %ss", float(tempo_alvo))
     
     melhor_resultado = None
     melhor_erro = Decimal('inf')
     melhor_tempos = None
     
+    # Dados do ponto em colunas: os candidatos só trocam a coluna de tempo,
+    # então pulsos, leituras e constantes são resolvidos uma única vez
+    vista = TabelaPontos.de_leituras(leituras_ponto).ponto(0)
+    pulsos = vista.decimais('pulsos_padrao')
+    leituras_medidor = vista.decimais('leitura_medidor')
+    args_constantes = tuple(constantes.get(nome, Decimal(0)) for nome in CONSTANTES_MOTOR)
+    n_leituras = len(vista)
+    
     # Busca por diferentes combinações de tempos
     for iteracao in range(1000):
         
-        # Gera tempos aleatórios dentro do intervalo permitido
-        tempos_teste = []
-        for i in range(len(leituras_ponto)):
-            # Gera tempo aleatório entre 239.6 e 240.4
-            import random
-            tempo_aleatorio = Decimal(str(random.uniform(239.6, 240.4)))
-            tempos_teste.append(tempo_aleatorio)
-        
-        # Testa esta combinação de tempos
-        dados_teste = []
-        for i, leitura in enumerate(leituras_ponto):
-            inputs_teste = leitura.copy()
-            inputs_teste.update(constantes)
-            inputs_teste['tempo_coleta'] = tempos_teste[i]
-            dados_teste.append(inputs_teste)
-
+        # Gera tempos aleatórios dentro da faixa da estratégia
+        tempos_teste = [Decimal(str(random.uniform(sorteio_min, sorteio_max))) for _ in range(n_leituras)]
+        
         # Roda o motor de cálculo para as medições
-        resultados_individuais = [run_calculation_engine(d) for d in dados_teste]
+        resultados_individuais = [
+            calcular_medicao(pulsos[i], tempos_teste[i], leituras_medidor[i], *args_constantes)
+            for i in range(n_leituras)
+        ]
         
         # Calcula os valores médios resultantes
-        vazao_ref_media_calc = sum(r['vazao_referencia'] for r in resultados_individuais) / len(resultados_individuais)
-        vazao_med_media_calc = sum(r['vazao_medidor'] for r in resultados_individuais) / len(resultados_individuais)
+        vazao_ref_media_calc = sum(r[1] for r in resultados_individuais) / n_leituras
+        vazao_med_media_calc = sum(r[2] for r in resultados_individuais) / n_leituras
         
         # Calcula erro dos valores sagrados
         erro_ref = abs(vazao_ref_media_calc - alvo_vazao_ref_media)
@@ -530,7 +545,6 @@ def encontrar_ajuste_global(leituras_ponto, constantes, valores_certificado_orig
         if custo_total < melhor_erro:
             melhor_erro = custo_total
             melhor_resultado = {
-                'dados_teste': dados_teste,
                 'resultados_individuais': resultados_individuais,
                 'tempos_teste': tempos_teste,
                 'vazao_ref_media_calc': vazao_ref_media_calc,
@@ -543,12 +557,12 @@ def encontrar_ajuste_global(leituras_ponto, constantes, valores_certificado_orig
 
         # Verifica se atingiu precisão suficiente
         if erro_ref < Decimal("1e-10") and erro_med < Decimal("1e-10") and desvio_tempos < Decimal("0.1"):
-            print(f"✅ SUCESSO! Solução encontrada na iteração {iteracao+1}.")
+            log.info("✅ SUCESSO! Solução encontrada na iteração %s.", iteracao+1)
             return {
                 'tempos_ajustados': tempos_teste,
-                'pulsos_ajustados': [d['pulsos_padrao'] for d in dados_teste],
-                'leituras_ajustadas': [d['leitura_medidor'] for d in dados_teste],
-                'estrategia_usada': 'Otimização para Tempos ~240s',
+                'pulsos_ajustados': list(pulsos),
+                'leituras_ajustadas': list(leituras_medidor),
+                'estrategia_usada': f'Otimização para Tempos ~{nome_estrategia}s',
                 'iteracoes_realizadas': iteracao + 1,
                 'convergencia_atingida': True,
                 'erro_ref': float(erro_ref),
@@ -557,17 +571,17 @@ def encontrar_ajuste_global(leituras_ponto, constantes, valores_certificado_orig
             }
 
         if iteracao % 100 == 0:
-            print(f"  Iteração {iteracao}: Erro Ref: {erro_ref:.2E} | Erro Med: {erro_med:.2E} | Desvio Tempos: {desvio_tempos:.4f}s")
+            log.debug("  Iteração %s: Erro Ref: %.2E | Erro Med: %.2E | Desvio Tempos: %.4fs", iteracao, erro_ref, erro_med, desvio_tempos)
 
-    print("⚠️ AVISO: Busca atingiu limite de iterações. Retornando melhor resultado encontrado.")
+    log.warning("⚠️ AVISO: Busca atingiu limite de iterações. Retornando melhor resultado encontrado.")
     
     # Retorna o melhor resultado encontrado
     if melhor_resultado:
         return {
             'tempos_ajustados': melhor_resultado['tempos_teste'],
-            'pulsos_ajustados': [d['pulsos_padrao'] for d in melhor_resultado['dados_teste']],
-            'leituras_ajustadas': [d['leitura_medidor'] for d in melhor_resultado['dados_teste']],
-            'estrategia_usada': 'Otimização para Tempos ~240s (Melhor Resultado)',
+            'pulsos_ajustados': list(pulsos),
+            'leituras_ajustadas': list(leituras_medidor),
+            'estrategia_usada': f'Otimização para Tempos ~{nome_estrategia}s (Melhor Resultado)',
             'iteracoes_realizadas': melhor_resultado['iteracao'] + 1,
             'convergencia_atingida': False,
             'erro_ref': float(melhor_resultado['erro_ref']),
@@ -577,10 +591,10 @@ def encontrar_ajuste_global(leituras_ponto, constantes, valores_certificado_orig
     
     # Fallback caso não tenha encontrado nenhum resultado
     return {
-        'tempos_ajustados': [Decimal('240.0000') for _ in leituras_ponto],
+        'tempos_ajustados': [tempo_alvo for _ in leituras_ponto],
         'pulsos_ajustados': [l['pulsos_padrao'] for l in leituras_ponto],
         'leituras_ajustadas': [l['leitura_medidor'] for l in leituras_ponto],
-        'estrategia_usada': 'Fallback - Tempos 240s',
+        'estrategia_usada': f'Fallback - Tempos {nome_estrategia}s',
         'iteracoes_realizadas': 1000,
         'convergencia_atingida': False,
         'erro_ref': float(Decimal('inf')),
@@ -589,38 +603,44 @@ def encontrar_ajuste_global(leituras_ponto, constantes, valores_certificado_orig
     }
 
 
-def harmonizar_tempos_coleta(dados_originais, constantes, valores_certificado_originais):
+def harmonizar_tempos_coleta(dados_originais, constantes, valores_certificado_originais, estrategia=None):
     """
     PASSO 2: Harmonização do Tempo de Coleta
-    Calcula tempos ajustados próximos a 240 segundos (entre 239.6000 e 240.4000)
-    para preservar os valores sagrados, baseado nos tempos originais
+    Calcula tempos ajustados próximos ao tempo nominal da estratégia (240 s:
+    entre 239.6000 e 240.4000) para preservar os valores sagrados, baseado nos tempos originais
     """
-    print(f"\n🎯 PASSO 2: HARMONIZAÇÃO DOS TEMPOS DE COLETA")
-    print("=" * 60)
-    print("   ⚙️  CONFIGURAÇÃO: Tempos ajustados próximos a 240 segundos (239.6-240.4s) com estratégias específicas por ponto")
+    restricoes = compilar_estrategia(estrategia)
+    tempo_min, tempo_max = restricoes.faixa_ajuste
+    log.info("\n🎯 PASSO 2: HARMONIZAÇÃO DOS TEMPOS DE COLETA")
+    log.info("%s", "=" * 60)
+    log.info("   ⚙️  CONFIGURAÇÃO: Tempos ajustados próximos a %s segundos (%s-%ss) com estratégias específicas por ponto",
+             restricoes.estrategia.nome, float(tempo_min), float(tempo_max))
     
     dados_harmonizados = {}
     
     for ponto_key, ponto in dados_originais.items():
-        print(f"\n📊 Processando {ponto_key}:")
+        log.info("\n📊 Processando %s:", ponto_key)
         
         # Tempos originais
         tempos_originais = [l['tempo_coleta'] for l in ponto['leituras']]
         vazao_media_original = ponto['valores_sagrados']['vazao_media']
-        print(f"   Tempos originais: {[float(t) for t in tempos_originais]} s")
-        print(f"   Vazão média original: {float(vazao_media_original)} L/h")
+        log.info("   Tempos originais: %s s", ListaFloat(tempos_originais))
+        log.info("   Vazão média original: %s L/h", float(vazao_media_original))
         
         # Calcula tempos ajustados com casas decimais específicas para preservar vazão média
         tempos_ajustados = []
         fatores_ajuste = []
         
         # Executa busca global única para todo o ponto
-        resultado_ajuste = encontrar_ajuste_global(
-            ponto['leituras'],
-            constantes,
-            valores_certificado_originais,
-            ponto_key
-        )
+        with medir_ponto(ponto_key):
+            resultado_ajuste = encontrar_ajuste_global(
+                ponto['leituras'],
+                constantes,
+                valores_certificado_originais,
+                ponto_key,
+                restricoes
+            )
+        contar(ITERACOES, resultado_ajuste['iteracoes_realizadas'])
         
         # Extrai resultados da otimização
         tempos_ajustados = resultado_ajuste['tempos_ajustados']
@@ -630,9 +650,9 @@ def harmonizar_tempos_coleta(dados_originais, constantes, valores_certificado_or
         iteracoes_realizadas = resultado_ajuste['iteracoes_realizadas']
         convergencia_atingida = resultado_ajuste['convergencia_atingida']
         
-        print(f"   🎯 ESTRATÉGIA APLICADA: {estrategia_usada}")
-        print(f"   🔍 Iterações realizadas: {iteracoes_realizadas}")
-        print(f"   ✅ Convergência atingida: {convergencia_atingida}")
+        log.info("   🎯 ESTRATÉGIA APLICADA: %s", estrategia_usada)
+        log.info("   🔍 Iterações realizadas: %s", iteracoes_realizadas)
+        log.info("   ✅ Convergência atingida: %s", convergencia_atingida)
         
         # Calcula fatores de ajuste
         for i, leitura in enumerate(ponto['leituras']):
@@ -642,11 +662,11 @@ def harmonizar_tempos_coleta(dados_originais, constantes, valores_certificado_or
             fator = tempo_ajustado / tempo_original
             fatores_ajuste.append(fator)
             
-            print(f"     Leitura {i+1}:")
-            print(f"       Tempo: {float(tempo_original)} → {float(tempo_ajustado)} s")
-            print(f"       Pulsos: {float(leitura['pulsos_padrao'])} → {int(pulsos_ajustados[i])}")
-            print(f"       Leitura: {float(leitura['leitura_medidor'])} → {float(leituras_ajustadas[i])} L")
-            print(f"       Fator: {float(fator)}")
+            log.debug("     Leitura %s:", i+1)
+            log.debug("       Tempo: %s → %s s", float(tempo_original), float(tempo_ajustado))
+            log.debug("       Pulsos: %s → %s", float(leitura['pulsos_padrao']), int(pulsos_ajustados[i]))
+            log.debug("       Leitura: %s → %s L", float(leitura['leitura_medidor']), float(leituras_ajustadas[i]))
+            log.debug("       Fator: %s", float(fator))
         
         dados_harmonizados[ponto_key] = {
             'ponto_numero': ponto['numero'],
@@ -666,14 +686,14 @@ def aplicar_ajuste_proporcional(dados_harmonizados, constantes, valores_certific
     PASSO 3: Aplicação do Ajuste Proporcional
     Calcula valores ajustados que levam exatamente aos valores do certificado original
     """
-    print(f"\n⚙️  PASSO 3: APLICAÇÃO DO AJUSTE PROPORCIONAL")
-    print("=" * 60)
-    print("   🎯 OBJETIVO: Ajustar valores para chegar exatamente aos valores do certificado")
+    log.info("\n⚙️  PASSO 3: APLICAÇÃO DO AJUSTE PROPORCIONAL")
+    log.info("%s", "=" * 60)
+    log.info("   🎯 OBJETIVO: Ajustar valores para chegar exatamente aos valores do certificado")
     
     dados_ajustados = {}
     
     for ponto_key, dados in dados_harmonizados.items():
-        print(f"\n📊 Processando {ponto_key}:")
+        log.info("\n📊 Processando %s:", ponto_key)
         
         tempos_unificados = dados['tempos_unificados']
         leituras_originais = dados['leituras_originais']
@@ -684,16 +704,16 @@ def aplicar_ajuste_proporcional(dados_harmonizados, constantes, valores_certific
         media_totalizacao_alvo = valores_cert_originais['media_totalizacao']
         media_leitura_medidor_alvo = valores_cert_originais['media_leitura_medidor']
         
-        print(f"   🎯 VALORES ALVO DO CERTIFICADO:")
-        print(f"     Média Totalização: {float(media_totalizacao_alvo)} L")
-        print(f"     Média Leitura Medidor: {float(media_leitura_medidor_alvo)} L")
+        log.info("   🎯 VALORES ALVO DO CERTIFICADO:")
+        log.info("     Média Totalização: %s L", float(media_totalizacao_alvo))
+        log.info("     Média Leitura Medidor: %s L", float(media_leitura_medidor_alvo))
         
         # Calcula os valores exatos necessários para chegar aos valores do certificado
         leituras_ajustadas = []
         
         # Para cada leitura, calcula os valores que levam aos valores do certificado
         for i, (leitura_original, tempo_unificado) in enumerate(zip(leituras_originais, tempos_unificados)):
-            print(f"   Leitura {i+1}:")
+            log.debug("   Leitura %s:", i+1)
             
             # Calcula a nova leitura do medidor proporcionalmente ao tempo ajustado
             # Para manter o erro original: Leitura_original / Tempo_original = Leitura_nova / Tempo_nova
@@ -747,14 +767,14 @@ def aplicar_ajuste_proporcional(dados_harmonizados, constantes, valores_certific
             
             leituras_ajustadas.append(leitura_ajustada)
             
-            print(f"     Tempo: {float(leitura_original['tempo_coleta'])} → {float(novo_tempo)} s")
-            print(f"     Pulsos: {float(leitura_original['pulsos_padrao'])} → {int(novo_qtd_pulsos)} (inteiro)")
-            print(f"     Leitura Medidor: {float(leitura_original['leitura_medidor'])} → {float(nova_leitura_medidor)} L")
-            print(f"     Fator Tempo Leitura: {float(fator_tempo_leitura)}")
-            print(f"     Proporção Totalização: {float(proporcao_totalizacao)}")
-            print(f"     Nova Totalização: {float(nova_totalizacao)} L")
-            print(f"     Vazão Ref: {float(leitura_original['vazao_referencia'])} L/h (preservada)")
-            print(f"     Erro: {float(leitura_original['erro'])} % (preservado)")
+            log.debug("     Tempo: %s → %s s", float(leitura_original['tempo_coleta']), float(novo_tempo))
+            log.debug("     Pulsos: %s → %s (inteiro)", float(leitura_original['pulsos_padrao']), int(novo_qtd_pulsos))
+            log.debug("     Leitura Medidor: %s → %s L", float(leitura_original['leitura_medidor']), float(nova_leitura_medidor))
+            log.debug("     Fator Tempo Leitura: %s", float(fator_tempo_leitura))
+            log.debug("     Proporção Totalização: %s", float(proporcao_totalizacao))
+            log.debug("     Nova Totalização: %s L", float(nova_totalizacao))
+            log.debug("     Vazão Ref: %s L/h (preservada)", float(leitura_original['vazao_referencia']))
+            log.debug("     Erro: %s %% (preservado)", float(leitura_original['erro']))
         
         dados_ajustados[ponto_key] = {
             'ponto_numero': dados['ponto_numero'],
@@ -770,13 +790,13 @@ def verificar_valores_sagrados(dados_ajustados):
     PASSO 4: Verificação dos Valores Sagrados
     Confirma que Vazão Média, Tendência e Desvio Padrão permaneceram idênticos
     """
-    print(f"\n🔍 PASSO 4: VERIFICAÇÃO DOS VALORES SAGRADOS")
-    print("=" * 60)
+    log.info("\n🔍 PASSO 4: VERIFICAÇÃO DOS VALORES SAGRADOS")
+    log.info("%s", "=" * 60)
     
     verificacao_passed = True
     
     for ponto_key, dados in dados_ajustados.items():
-        print(f"\n📊 Verificando {ponto_key}:")
+        log.info("\n📊 Verificando %s:", ponto_key)
         
         valores_sagrados_originais = dados['valores_sagrados']
         leituras_ajustadas = dados['leituras_ajustadas']
@@ -804,19 +824,19 @@ def verificar_valores_sagrados(dados_ajustados):
         # Desvio Padrão ajustado (deve ser igual ao original)
         desvio_padrao_ajustado = calcular_desvio_padrao_amostral(erros_ajustados)
         
-        print(f"   Vazão Média:")
-        print(f"     Original: {float(vazao_original)} L/h")
-        print(f"     Ajustada: {float(vazao_media_ajustada)} L/h")
-        print(f"     Diferença: {float(vazao_media_ajustada - vazao_original)} L/h")
+        log.info("   Vazão Média:")
+        log.info("     Original: %s L/h", float(vazao_original))
+        log.info("     Ajustada: %s L/h", float(vazao_media_ajustada))
+        log.info("     Diferença: %s L/h", float(vazao_media_ajustada - vazao_original))
         
-        print(f"   Tendência:")
-        print(f"     Original: {float(tendencia_original)} %")
-        print(f"     Ajustada: {float(tendencia_ajustada)} %")
-        print(f"     Diferença: {float(tendencia_ajustada - tendencia_original)} %")
+        log.info("   Tendência:")
+        log.info("     Original: %s %%", float(tendencia_original))
+        log.info("     Ajustada: %s %%", float(tendencia_ajustada))
+        log.info("     Diferença: %s %%", float(tendencia_ajustada - tendencia_original))
         
-        print(f"   Desvio Padrão:")
-        print(f"     Original: {float(desvio_original) if desvio_original else 'N/A'} %")
-        print(f"     Ajustada: {float(desvio_padrao_ajustado) if desvio_padrao_ajustado else 'N/A'} %")
+        log.info("   Desvio Padrão:")
+        log.info("     Original: %s %%", (float(desvio_original) if desvio_original else 'N/A'))
+        log.info("     Ajustada: %s %%", (float(desvio_padrao_ajustado) if desvio_padrao_ajustado else 'N/A'))
         
         # Verifica se as diferenças são zero (preservação exata)
         tolerancia = Decimal('1e-20')  # Tolerância muito pequena para diferenças de arredondamento
@@ -826,13 +846,13 @@ def verificar_valores_sagrados(dados_ajustados):
             (desvio_original and desvio_padrao_ajustado and 
              abs(desvio_padrao_ajustado - desvio_original) > tolerancia)):
             
-            print(f"   ❌ VALORES SAGRADOS ALTERADOS!")
-            print(f"       Vazão Média: {vazao_original} vs {vazao_media_ajustada}")
-            print(f"       Tendência: {tendencia_original} vs {tendencia_ajustada}")
-            print(f"       Desvio Padrão: {desvio_original} vs {desvio_padrao_ajustado}")
+            log.error("   ❌ VALORES SAGRADOS ALTERADOS!")
+            log.info("       Vazão Média: %s vs %s", vazao_original, vazao_media_ajustada)
+            log.info("       Tendência: %s vs %s", tendencia_original, tendencia_ajustada)
+            log.info("       Desvio Padrão: %s vs %s", desvio_original, desvio_padrao_ajustado)
             verificacao_passed = False
         else:
-            print(f"   ✅ VALORES SAGRADOS PRESERVADOS EXATAMENTE!")
+            log.info("   ✅ VALORES SAGRADOS PRESERVADOS EXATAMENTE!")
     
     return verificacao_passed
 
@@ -841,27 +861,27 @@ def verificar_valores_certificado_detalhado(dados_ajustados, constantes, valores
     VERIFICAÇÃO MUITO DETALHADA dos valores do certificado
     Analisa cada etapa do cálculo para identificar onde estão as diferenças
     """
-    print(f"\n🔍 VERIFICAÇÃO MUITO DETALHADA DOS VALORES DO CERTIFICADO")
-    print("=" * 80)
+    log.info("\n🔍 VERIFICAÇÃO MUITO DETALHADA DOS VALORES DO CERTIFICADO")
+    log.info("%s", "=" * 80)
     
     verificacao_certificado_passed = True
     
     for ponto_key, dados in dados_ajustados.items():
-        print(f"\n📊 VERIFICAÇÃO DETALHADA para {ponto_key}:")
+        log.info("\n📊 VERIFICAÇÃO DETALHADA para %s:", ponto_key)
         
         valores_cert_originais = valores_certificado_originais[ponto_key]
         leituras_ajustadas = dados['leituras_ajustadas']
         
-        print(f"   📋 VALORES ORIGINAIS DO CERTIFICADO:")
-        print(f"     Média Totalização: {float(valores_cert_originais['media_totalizacao'])} L")
-        print(f"     Média Leitura Medidor: {float(valores_cert_originais['media_leitura_medidor'])} L")
+        log.info("   📋 VALORES ORIGINAIS DO CERTIFICADO:")
+        log.info("     Média Totalização: %s L", float(valores_cert_originais['media_totalizacao']))
+        log.info("     Média Leitura Medidor: %s L", float(valores_cert_originais['media_leitura_medidor']))
         
         # Adiciona informações dos valores sagrados originais
         valores_sagrados_originais = dados['valores_sagrados']
-        print(f"   📊 VALORES SAGRADOS ORIGINAIS:")
-        print(f"     Vazão Média: {float(valores_sagrados_originais['vazao_media'])} L/h")
-        print(f"     Tendência: {float(valores_sagrados_originais['tendencia'])} %")
-        print(f"     Desvio Padrão Amostral: {float(valores_sagrados_originais['desvio_padrao']) if valores_sagrados_originais['desvio_padrao'] else 'N/A'} %")
+        log.info("   📊 VALORES SAGRADOS ORIGINAIS:")
+        log.info("     Vazão Média: %s L/h", float(valores_sagrados_originais['vazao_media']))
+        log.info("     Tendência: %s %%", float(valores_sagrados_originais['tendencia']))
+        log.info("     Desvio Padrão Amostral: %s %%", (float(valores_sagrados_originais['desvio_padrao']) if valores_sagrados_originais['desvio_padrao'] else 'N/A'))
         
         # Calcula os valores sagrados com dados ajustados
         vazoes_ajustadas = []
@@ -880,43 +900,43 @@ def verificar_valores_certificado_detalhado(dados_ajustados, constantes, valores
         # Desvio Padrão ajustado
         desvio_padrao_ajustado = calcular_desvio_padrao_amostral(erros_ajustados)
         
-        print(f"   📊 VALORES SAGRADOS RECALCULADOS:")
-        print(f"     Vazão Média: {float(vazao_media_ajustada)} L/h")
-        print(f"     Tendência: {float(tendencia_ajustada)} %")
-        print(f"     Desvio Padrão Amostral: {float(desvio_padrao_ajustado) if desvio_padrao_ajustado else 'N/A'} %")
+        log.info("   📊 VALORES SAGRADOS RECALCULADOS:")
+        log.info("     Vazão Média: %s L/h", float(vazao_media_ajustada))
+        log.info("     Tendência: %s %%", float(tendencia_ajustada))
+        log.info("     Desvio Padrão Amostral: %s %%", (float(desvio_padrao_ajustado) if desvio_padrao_ajustado else 'N/A'))
         
         # Compara os valores
-        print(f"   📊 COMPARAÇÃO DOS VALORES SAGRADOS:")
-        print(f"     Vazão Média:")
-        print(f"       Original: {float(valores_sagrados_originais['vazao_media'])} L/h")
-        print(f"       Recalculada: {float(vazao_media_ajustada)} L/h")
-        print(f"       Diferença: {float(vazao_media_ajustada - valores_sagrados_originais['vazao_media'])} L/h")
-        
-        print(f"     Tendência:")
-        print(f"       Original: {float(valores_sagrados_originais['tendencia'])} %")
-        print(f"       Recalculada: {float(tendencia_ajustada)} %")
-        print(f"       Diferença: {float(tendencia_ajustada - valores_sagrados_originais['tendencia'])} %")
-        
-        print(f"     Desvio Padrão:")
-        print(f"       Original: {float(valores_sagrados_originais['desvio_padrao']) if valores_sagrados_originais['desvio_padrao'] else 'N/A'} %")
-        print(f"       Recalculado: {float(desvio_padrao_ajustado) if desvio_padrao_ajustado else 'N/A'} %")
+        log.info("   📊 COMPARAÇÃO DOS VALORES SAGRADOS:")
+        log.info("     Vazão Média:")
+        log.info("       Original: %s L/h", float(valores_sagrados_originais['vazao_media']))
+        log.info("       Recalculada: %s L/h", float(vazao_media_ajustada))
+        log.info("       Diferença: %s L/h", float(vazao_media_ajustada - valores_sagrados_originais['vazao_media']))
+        
+        log.info("     Tendência:")
+        log.info("       Original: %s %%", float(valores_sagrados_originais['tendencia']))
+        log.info("       Recalculada: %s %%", float(tendencia_ajustada))
+        log.info("       Diferença: %s %%", float(tendencia_ajustada - valores_sagrados_originais['tendencia']))
+        
+        log.info("     Desvio Padrão:")
+        log.info("       Original: %s %%", (float(valores_sagrados_originais['desvio_padrao']) if valores_sagrados_originais['desvio_padrao'] else 'N/A'))
+        log.info("       Recalculado: %s %%", (float(desvio_padrao_ajustado) if desvio_padrao_ajustado else 'N/A'))
         if valores_sagrados_originais['desvio_padrao'] and desvio_padrao_ajustado:
-            print(f"       Diferença: {float(desvio_padrao_ajustado - valores_sagrados_originais['desvio_padrao'])} %")
+            log.info("       Diferença: %s %%", float(desvio_padrao_ajustado - valores_sagrados_originais['desvio_padrao']))
         else:
-            print(f"       Diferença: N/A")
+            log.info("       Diferença: N/A")
         
-        print(f"\n   🔬 ANÁLISE DETALHADA POR LEITURA:")
+        log.info("\n   🔬 ANÁLISE DETALHADA POR LEITURA:")
         
         # Recalcula os valores do certificado com dados ajustados
         totalizacoes_ajustadas = []
         leituras_medidor_ajustadas = []
         
         for i, leitura in enumerate(leituras_ajustadas):
-            print(f"\n     📊 LEITURA {i+1} (Linha {leitura['linha']}):")
-            print(f"       Pulsos: {float(leitura['pulsos_padrao'])}")
-            print(f"       Tempo: {float(leitura['tempo_coleta'])} s")
-            print(f"       Leitura Medidor: {float(leitura['leitura_medidor'])} L")
-            print(f"       Temperatura: {float(leitura['temperatura'])} °C")
+            log.debug("\n     📊 LEITURA %s (Linha %s):", i+1, leitura['linha'])
+            log.debug("       Pulsos: %s", float(leitura['pulsos_padrao']))
+            log.debug("       Tempo: %s s", float(leitura['tempo_coleta']))
+            log.debug("       Leitura Medidor: %s L", float(leitura['leitura_medidor']))
+            log.debug("       Temperatura: %s °C", float(leitura['temperatura']))
             
             # Calcula "Totalização no Padrão Corrigido • L" com dados ajustados
             totalizacao = calcular_totalizacao_padrao_corrigido(
@@ -929,7 +949,7 @@ def verificar_valores_certificado_detalhado(dados_ajustados, constantes, valores
             totalizacoes_ajustadas.append(totalizacao)
             leituras_medidor_ajustadas.append(leitura['leitura_medidor'])
             
-            print(f"       Totalização Calculada: {float(totalizacao)} L")
+            log.debug("       Totalização Calculada: %s L", float(totalizacao))
             
             # Mostra os passos do cálculo
             volume_pulsos = leitura['pulsos_padrao'] * constantes['pulso_padrao_lp']
@@ -937,12 +957,12 @@ def verificar_valores_certificado_detalhado(dados_ajustados, constantes, valores
             fator_correcao = (constantes['temperatura_constante'] + constantes['fator_correcao_temp'] * vazao) / Decimal('100')
             totalizacao_manual = volume_pulsos - (fator_correcao * volume_pulsos)
             
-            print(f"       Passos do cálculo:")
-            print(f"         Volume Pulsos: {float(volume_pulsos)} L")
-            print(f"         Vazão: {float(vazao)} L/h")
-            print(f"         Fator Correção: {float(fator_correcao)}")
-            print(f"         Totalização Manual: {float(totalizacao_manual)} L")
-            print(f"         Diferença: {float(totalizacao - totalizacao_manual)} L")
+            log.debug("       Passos do cálculo:")
+            log.debug("         Volume Pulsos: %s L", float(volume_pulsos))
+            log.debug("         Vazão: %s L/h", float(vazao))
+            log.debug("         Fator Correção: %s", float(fator_correcao))
+            log.debug("         Totalização Manual: %s L", float(totalizacao_manual))
+            log.debug("         Diferença: %s L", float(totalizacao - totalizacao_manual))
         
         # Calcula médias ajustadas
         media_totalizacao_ajustada = sum(totalizacoes_ajustadas) / Decimal(str(len(totalizacoes_ajustadas)))
@@ -952,16 +972,16 @@ def verificar_valores_certificado_detalhado(dados_ajustados, constantes, valores
         media_totalizacao_original = valores_cert_originais['media_totalizacao']
         media_leitura_medidor_original = valores_cert_originais['media_leitura_medidor']
         
-        print(f"\n   📊 COMPARAÇÃO DE MÉDIAS:")
-        print(f"     Média Totalização no Padrão Corrigido:")
-        print(f"       Original: {float(media_totalizacao_original)} L")
-        print(f"       Ajustada: {float(media_totalizacao_ajustada)} L")
-        print(f"       Diferença: {float(media_totalizacao_ajustada - media_totalizacao_original)} L")
+        log.info("\n   📊 COMPARAÇÃO DE MÉDIAS:")
+        log.info("     Média Totalização no Padrão Corrigido:")
+        log.info("       Original: %s L", float(media_totalizacao_original))
+        log.info("       Ajustada: %s L", float(media_totalizacao_ajustada))
+        log.info("       Diferença: %s L", float(media_totalizacao_ajustada - media_totalizacao_original))
         
-        print(f"     Média Leitura no Medidor:")
-        print(f"       Original: {float(media_leitura_medidor_original)} L")
-        print(f"       Ajustada: {float(media_leitura_medidor_ajustada)} L")
-        print(f"       Diferença: {float(media_leitura_medidor_ajustada - media_leitura_medidor_original)} L")
+        log.info("     Média Leitura no Medidor:")
+        log.info("       Original: %s L", float(media_leitura_medidor_original))
+        log.info("       Ajustada: %s L", float(media_leitura_medidor_ajustada))
+        log.info("       Diferença: %s L", float(media_leitura_medidor_ajustada - media_leitura_medidor_original))
         
         # Verifica se as diferenças são aceitáveis
         tolerancia = Decimal('1e-20')
@@ -969,12 +989,12 @@ def verificar_valores_certificado_detalhado(dados_ajustados, constantes, valores
         if (abs(media_totalizacao_ajustada - media_totalizacao_original) > tolerancia or
             abs(media_leitura_medidor_ajustada - media_leitura_medidor_original) > tolerancia):
             
-            print(f"\n   ❌ VALORES DO CERTIFICADO ALTERADOS!")
-            print(f"       Média Totalização: {media_totalizacao_original} vs {media_totalizacao_ajustada}")
-            print(f"       Média Leitura Medidor: {media_leitura_medidor_original} vs {media_leitura_medidor_ajustada}")
+            log.error("\n   ❌ VALORES DO CERTIFICADO ALTERADOS!")
+            log.info("       Média Totalização: %s vs %s", media_totalizacao_original, media_totalizacao_ajustada)
+            log.info("       Média Leitura Medidor: %s vs %s", media_leitura_medidor_original, media_leitura_medidor_ajustada)
             verificacao_certificado_passed = False
         else:
-            print(f"\n   ✅ VALORES DO CERTIFICADO PRESERVADOS EXATAMENTE!")
+            log.info("\n   ✅ VALORES DO CERTIFICADO PRESERVADOS EXATAMENTE!")
     
     return verificacao_certificado_passed
 
@@ -983,11 +1003,11 @@ def verificar_formula_media_medidor(dados_ajustados, valores_certificado_origina
     Verifica especificamente a fórmula: =SE('Coleta de Dados'!C54="";"---";DEF.NÚM.DEC((MÉDIA('Coleta de Dados'!I54:I56));'Estimativa da Incerteza'!BQ10))
     Esta fórmula calcula a média das leituras do medidor (coluna I) com precisão decimal
     """
-    print(f"\n🔍 VERIFICAÇÃO ESPECÍFICA DA FÓRMULA MÉDIA DO MEDIDOR")
-    print("=" * 80)
+    log.info("\n🔍 VERIFICAÇÃO ESPECÍFICA DA FÓRMULA MÉDIA DO MEDIDOR")
+    log.info("%s", "=" * 80)
     
     for ponto_key, dados in dados_ajustados.items():
-        print(f"\n📊 VERIFICAÇÃO DA FÓRMULA para {ponto_key}:")
+        log.info("\n📊 VERIFICAÇÃO DA FÓRMULA para %s:", ponto_key)
         
         valores_cert_originais = valores_certificado_originais[ponto_key]
         leituras_ajustadas = dados['leituras_ajustadas']
@@ -995,9 +1015,9 @@ def verificar_formula_media_medidor(dados_ajustados, valores_certificado_origina
         # Extrai as leituras do medidor (coluna I na planilha)
         leituras_medidor = [leitura['leitura_medidor'] for leitura in leituras_ajustadas]
         
-        print(f"   📋 LEITURAS DO MEDIDOR (coluna I):")
+        log.info("   📋 LEITURAS DO MEDIDOR (coluna I):")
         for i, leitura in enumerate(leituras_ajustadas):
-            print(f"     Linha {leitura['linha']}: {float(leitura['leitura_medidor'])} L")
+            log.debug("     Linha %s: %s L", leitura['linha'], float(leitura['leitura_medidor']))
         
         # Calcula a média conforme a fórmula Excel
         media_leitura_medidor = sum(leituras_medidor) / Decimal(str(len(leituras_medidor)))
@@ -1005,48 +1025,48 @@ def verificar_formula_media_medidor(dados_ajustados, valores_certificado_origina
         # Valor original do certificado
         media_original = valores_cert_originais['media_leitura_medidor']
         
-        print(f"\n   📊 COMPARAÇÃO DA FÓRMULA MÉDIA:")
-        print(f"     Média Original (Certificado): {float(media_original)} L")
-        print(f"     Média Calculada (Fórmula): {float(media_leitura_medidor)} L")
-        print(f"     Diferença: {float(media_leitura_medidor - media_original)} L")
+        log.info("\n   📊 COMPARAÇÃO DA FÓRMULA MÉDIA:")
+        log.info("     Média Original (Certificado): %s L", float(media_original))
+        log.info("     Média Calculada (Fórmula): %s L", float(media_leitura_medidor))
+        log.info("     Diferença: %s L", float(media_leitura_medidor - media_original))
         
         # Verifica se a diferença é significativa
         tolerancia = Decimal('1e-20')
         if abs(media_leitura_medidor - media_original) > tolerancia:
-            print(f"     ❌ DIFERENÇA DETECTADA!")
-            print(f"         A fórmula não está preservando o valor original")
+            log.error("     ❌ DIFERENÇA DETECTADA!")
+            log.info("         A fórmula não está preservando o valor original")
         else:
-            print(f"     ✅ FÓRMULA PRESERVANDO VALOR ORIGINAL!")
+            log.info("     ✅ FÓRMULA PRESERVANDO VALOR ORIGINAL!")
         
         # Mostra os passos detalhados do cálculo
-        print(f"\n   🔬 PASSOS DETALHADOS DO CÁLCULO:")
-        print(f"     Soma das leituras: {float(sum(leituras_medidor))} L")
-        print(f"     Número de leituras: {len(leituras_medidor)}")
-        print(f"     Divisão: {float(sum(leituras_medidor))} / {len(leituras_medidor)} = {float(media_leitura_medidor)} L")
+        log.info("\n   🔬 PASSOS DETALHADOS DO CÁLCULO:")
+        log.info("     Soma das leituras: %s L", float(sum(leituras_medidor)))
+        log.info("     Número de leituras: %s", len(leituras_medidor))
+        log.info("     Divisão: %s / %s = %s L", float(sum(leituras_medidor)), len(leituras_medidor), float(media_leitura_medidor))
         
         # Verifica se há diferenças nos valores individuais
-        print(f"\n   📋 VERIFICAÇÃO DOS VALORES INDIVIDUAIS:")
+        log.info("\n   📋 VERIFICAÇÃO DOS VALORES INDIVIDUAIS:")
         for i, leitura in enumerate(leituras_ajustadas):
-            print(f"     Leitura {i+1}: {float(leitura['leitura_medidor'])} L")
+            log.debug("     Leitura %s: %s L", i+1, float(leitura['leitura_medidor']))
         
-        print(f"   📊 RESULTADO FINAL:")
-        print(f"     Média Original: {float(media_original)} L")
-        print(f"     Média Calculada: {float(media_leitura_medidor)} L")
-        print(f"     Status: {'✅ PRESERVADO' if abs(media_leitura_medidor - media_original) <= tolerancia else '❌ ALTERADO'}")
+        log.info("   📊 RESULTADO FINAL:")
+        log.info("     Média Original: %s L", float(media_original))
+        log.info("     Média Calculada: %s L", float(media_leitura_medidor))
+        log.info("     Status: %s", ('✅ PRESERVADO' if abs(media_leitura_medidor - media_original) <= tolerancia else '❌ ALTERADO'))
 
 def gerar_planilha_corrigida(dados_ajustados, arquivo_original):
     """
     PASSO 5: Geração da Planilha Corrigida
     Cria uma nova planilha Excel com os valores ajustados com 15 casas decimais
     """
-    print(f"\n📄 PASSO 5: GERANDO PLANILHA CORRIGIDA")
-    print("=" * 60)
+    log.info("\n📄 PASSO 5: GERANDO PLANILHA CORRIGIDA")
+    log.info("%s", "=" * 60)
     
     # Cria cópia do arquivo original
     arquivo_corrigido = arquivo_original.replace('.xlsx', '_CORRIGIDO.xlsx')
     shutil.copy2(arquivo_original, arquivo_corrigido)
     
-    print(f"   Arquivo corrigido: {arquivo_corrigido}")
+    log.info("   Arquivo corrigido: %s", arquivo_corrigido)
     
     # Carrega a planilha corrigida
     wb = load_workbook(arquivo_corrigido)
@@ -1065,91 +1085,91 @@ def gerar_planilha_corrigida(dados_ajustados, arquivo_original):
             coleta_sheet.cell(row=linha, column=15).value = float(leitura['leitura_medidor'])  # Coluna O - Leitura Medidor
             coleta_sheet.cell(row=linha, column=18).value = float(leitura['temperatura'])     # Coluna R - Temperatura
             
-            print(f"     Linha {linha}:")
-            print(f"       Pulsos: {int(leitura['pulsos_padrao'])} (inteiro)")
-            print(f"       Tempo: {float(leitura['tempo_coleta'])} s")
-            print(f"       Leitura Medidor: {float(leitura['leitura_medidor'])} L")
-            print(f"       Temperatura: {float(leitura['temperatura'])} °C")
+            log.debug("     Linha %s:", linha)
+            log.debug("       Pulsos: %s (inteiro)", int(leitura['pulsos_padrao']))
+            log.debug("       Tempo: %s s", float(leitura['tempo_coleta']))
+            log.debug("       Leitura Medidor: %s L", float(leitura['leitura_medidor']))
+            log.debug("       Temperatura: %s °C", float(leitura['temperatura']))
     
     # Salva a planilha corrigida
     wb.save(arquivo_corrigido)
-    print(f"   ✅ Planilha corrigida salva com sucesso")
+    log.info("   ✅ Planilha corrigida salva com sucesso")
     
     return arquivo_corrigido
 
 def gerar_relatorio_final(dados_originais, dados_harmonizados, dados_ajustados, verificacao_passed, arquivo_corrigido):
     """
     Gera relatório final completo
+    Um registro JSONL por ponto (valores exatos) e o relatório legível gerado a partir dele
     """
-    print(f"\n📋 GERANDO RELATÓRIO FINAL")
-    
-    relatorio = {
-        "metadata": {
-            "data_geracao": datetime.now().isoformat(),
-            "descricao": "Ajuste de tempos de coleta conforme documentação",
-            "precisao": "Decimal com 28 dígitos",
-            "verificacao_passed": verificacao_passed,
-            "arquivo_corrigido": arquivo_corrigido
-        },
-        "dados_originais": dados_originais,
-        "dados_harmonizados": dados_harmonizados,
-        "dados_ajustados": dados_ajustados
-    }
+    log.info("\n📋 GERANDO RELATÓRIO FINAL")
+    
+    relatorio = EscritorRelatorio(
+        "relatorio_ajuste_tempos.jsonl", 'ajuste_tempos',
+        titulo="RELATÓRIO DE AJUSTE DE TEMPOS DE COLETA",
+        descricao="Ajuste de tempos de coleta conforme documentação",
+        precisao="Decimal com 28 dígitos",
+        verificacao_passed=verificacao_passed,
+        arquivo_corrigido=arquivo_corrigido,
+        objetivo=[
+            "Harmonizar tempos de coleta para 360 segundos (valor fixo)",
+            "Aplicar ajuste proporcional para manter valores sagrados",
+            "Preservar Vazão Média, Tendência e Desvio Padrão",
+        ],
+        estrategia=[
+            "Precisão: Decimal com 28 dígitos",
+            "Tempo unificado: 360 segundos (valor fixo para todos os pontos)",
+            "Estratégia: Ajuste proporcional conforme documentação",
+            "Valores sagrados: Preservados absolutamente",
+        ],
+    )
     
-    # Salvar em JSON
-    with open("relatorio_ajuste_tempos.json", "w", encoding="utf-8") as f:
-        json.dump(relatorio, f, indent=2, ensure_ascii=False, default=str)
-    
-    # Salvar relatório legível
-    with open("relatorio_ajuste_tempos.txt", "w", encoding="utf-8") as f:
-        f.write("=== RELATÓRIO DE AJUSTE DE TEMPOS DE COLETA ===\n\n")
-        f.write("🎯 OBJETIVO:\n")
-        f.write("   • Harmonizar tempos de coleta para 360 segundos (valor fixo)\n")
-        f.write("   • Aplicar ajuste proporcional para manter valores sagrados\n")
-        f.write("   • Preservar Vazão Média, Tendência e Desvio Padrão\n\n")
-        
-        f.write("✅ CONFIGURAÇÕES:\n")
-        f.write("   • Precisão: Decimal com 28 dígitos\n")
-        f.write("   • Tempo unificado: 360 segundos (valor fixo para todos os pontos)\n")
-        f.write("   • Estratégia: Ajuste proporcional conforme documentação\n")
-        f.write("   • Valores sagrados: Preservados absolutamente\n\n")
-        
-        f.write("📊 RESULTADOS POR PONTO:\n")
-        for ponto_key, dados in dados_ajustados.items():
-            f.write(f"\n   PONTO {dados['ponto_numero']}:\n")
-            f.write(f"     Valores sagrados preservados:\n")
-            f.write(f"       • Vazão Média: {float(dados['valores_sagrados']['vazao_media'])} L/h\n")
-            f.write(f"       • Tendência: {float(dados['valores_sagrados']['tendencia'])} %\n")
-            f.write(f"       • Desvio Padrão: {float(dados['valores_sagrados']['desvio_padrao']) if dados['valores_sagrados']['desvio_padrao'] else 'N/A'} %\n")
-            f.write(f"     Tempos harmonizados (todos fixados em 360 segundos):\n")
-            for i, leitura in enumerate(dados['leituras_ajustadas']):
-                f.write(f"       • Leitura {i+1}: {float(leitura['tempo_coleta'])} s\n")
-        
-        f.write(f"\n🎉 CONCLUSÃO:\n")
-        if verificacao_passed:
-            f.write(f"   ✅ VERIFICAÇÃO PASSOU - Valores sagrados preservados\n")
-            f.write(f"   ✅ Tempos harmonizados com sucesso\n")
-            f.write(f"   ✅ Ajuste proporcional aplicado corretamente\n")
-            f.write(f"   ✅ Planilha corrigida gerada: {arquivo_corrigido}\n")
-        else:
-            f.write(f"   ❌ VERIFICAÇÃO FALHOU - Valores sagrados foram alterados\n")
-            f.write(f"   ⚠️  Revisar implementação do ajuste proporcional\n")
+    for ponto_key, dados in dados_ajustados.items():
+        harmonizado = dados_harmonizados.get(ponto_key, {})
+        relatorio.ponto({
+            'valores_sagrados': dados['valores_sagrados'],
+            'tempos_originais': [l['tempo_coleta'] for l in dados_originais[ponto_key]['leituras']],
+            'tempos_harmonizados': harmonizado.get('tempos_unificados'),
+            'fatores_ajuste': harmonizado.get('fatores_ajuste'),
+            'estrategia_usada': harmonizado.get('estrategia_usada'),
+            'convergencia_atingida': harmonizado.get('convergencia_atingida'),
+            'leituras_ajustadas': [
+                {chave: leitura[chave] for chave in ('linha', 'tempo_coleta', 'pulsos_padrao', 'leitura_medidor') if chave in leitura}
+                for leitura in dados['leituras_ajustadas']
+            ],
+        }, 'ajuste_tempos', dados['ponto_numero'])
     
-    print(f"   ✅ Relatórios salvos:")
-    print(f"      • relatorio_ajuste_tempos.json")
-    print(f"      • relatorio_ajuste_tempos.txt")
+    if verificacao_passed:
+        conclusao = [
+            "✅ VERIFICAÇÃO PASSOU - Valores sagrados preservados",
+            "✅ Tempos harmonizados com sucesso",
+            "✅ Ajuste proporcional aplicado corretamente",
+            f"✅ Planilha corrigida gerada: {arquivo_corrigido}",
+        ]
+    else:
+        conclusao = [
+            "❌ VERIFICAÇÃO FALHOU - Valores sagrados foram alterados",
+            "⚠️  Revisar implementação do ajuste proporcional",
+        ]
+    relatorio.concluir(verificacao_passed=verificacao_passed, instrumentacao=relatorio_instrumentacao(),
+                       conclusao=conclusao)
+    renderizar_texto(relatorio.caminho, "relatorio_ajuste_tempos.txt")
+    
+    log.info("   ✅ Relatórios salvos:")
+    log.info("      • relatorio_ajuste_tempos.jsonl")
+    log.info("      • relatorio_ajuste_tempos.txt")
 
 def verificar_precisao(dados_ajustados, constantes, valores_certificado_originais):
     """
     NOVA VERIFICAÇÃO: Verificação de precisão com nova lógica de otimização
     """
-    print(f"\n🔍 NOVA VERIFICAÇÃO DE PRECISÃO")
-    print("=" * 60)
+    log.info("\n🔍 NOVA VERIFICAÇÃO DE PRECISÃO")
+    log.info("%s", "=" * 60)
     
     verificacao_passed = True
     
     for ponto_key, dados in dados_ajustados.items():
-        print(f"\n📊 Verificando {ponto_key}:")
+        log.info("\n📊 Verificando %s:", ponto_key)
         
         valores_sagrados_originais = dados['valores_sagrados']
         leituras_ajustadas = dados['leituras_ajustadas']
@@ -1185,16 +1205,16 @@ def verificar_precisao(dados_ajustados, constantes, valores_certificado_originai
         vazao_ref_original = valores_sagrados_originais['vazao_media']
         vazao_med_original = valores_certificado_originais[ponto_key]['media_leitura_medidor']
         
-        print(f"   📊 COMPARAÇÃO DOS VALORES:")
-        print(f"     Vazão Ref Média:")
-        print(f"       Original: {float(vazao_ref_original)} L/h")
-        print(f"       Otimizada: {float(vazao_ref_media)} L/h")
-        print(f"       Diferença: {float(vazao_ref_media - vazao_ref_original)} L/h")
+        log.info("   📊 COMPARAÇÃO DOS VALORES:")
+        log.info("     Vazão Ref Média:")
+        log.info("       Original: %s L/h", float(vazao_ref_original))
+        log.info("       Otimizada: %s L/h", float(vazao_ref_media))
+        log.info("       Diferença: %s L/h", float(vazao_ref_media - vazao_ref_original))
         
-        print(f"     Vazão Medidor Média:")
-        print(f"       Original: {float(vazao_med_original)} L/h")
-        print(f"       Otimizada: {float(vazao_med_media)} L/h")
-        print(f"       Diferença: {float(vazao_med_media - vazao_med_original)} L/h")
+        log.info("     Vazão Medidor Média:")
+        log.info("       Original: %s L/h", float(vazao_med_original))
+        log.info("       Otimizada: %s L/h", float(vazao_med_media))
+        log.info("       Diferença: %s L/h", float(vazao_med_media - vazao_med_original))
         
         # Tolerância mais rigorosa para esta versão
         tolerancia = Decimal('1e-10')
@@ -1202,14 +1222,14 @@ def verificar_precisao(dados_ajustados, constantes, valores_certificado_originai
         if (abs(vazao_ref_media - vazao_ref_original) > tolerancia or
             abs(vazao_med_media - vazao_med_original) > tolerancia):
             
-            print(f"   ❌ PRECISÃO INSUFICIENTE!")
-            print(f"       Erro Vazão Ref: {float(abs(vazao_ref_media - vazao_ref_original))}")
-            print(f"       Erro Vazão Medidor: {float(abs(vazao_med_media - vazao_med_original))}")
+            log.error("   ❌ PRECISÃO INSUFICIENTE!")
+            log.info("       Erro Vazão Ref: %s", float(abs(vazao_ref_media - vazao_ref_original)))
+            log.info("       Erro Vazão Medidor: %s", float(abs(vazao_med_media - vazao_med_original)))
             verificacao_passed = False
         else:
-            print(f"   ✅ PRECISÃO EXCELENTE!")
-            print(f"       Erro Vazão Ref: {float(abs(vazao_ref_media - vazao_ref_original))}")
-            print(f"       Erro Vazão Medidor: {float(abs(vazao_med_media - vazao_med_original))}")
+            log.info("   ✅ PRECISÃO EXCELENTE!")
+            log.info("       Erro Vazão Ref: %s", float(abs(vazao_ref_media - vazao_ref_original)))
+            log.info("       Erro Vazão Medidor: %s", float(abs(vazao_med_media - vazao_med_original)))
     
     return verificacao_passed
 
@@ -1218,8 +1238,8 @@ def verificar_otimizacao_individual_ponto(dados_ajustados, constantes, valores_c
     NOVA FUNÇÃO: Verificação individual específica para cada ponto
     Analisa a qualidade da otimização de cada ponto separadamente
     """
-    print(f"\n🔍 VERIFICAÇÃO INDIVIDUAL ESPECÍFICA para {ponto_key}")
-    print("=" * 80)
+    log.info("\n🔍 VERIFICAÇÃO INDIVIDUAL ESPECÍFICA para %s", ponto_key)
+    log.info("%s", "=" * 80)
     
     dados_ponto = dados_ajustados[ponto_key]
     valores_cert_originais = valores_certificado_originais[ponto_key]
@@ -1228,12 +1248,12 @@ def verificar_otimizacao_individual_ponto(dados_ajustados, constantes, valores_c
     # Extrai valores originais do ponto
     valores_sagrados_originais = dados_ponto['valores_sagrados']
     
-    print(f"   📊 VALORES ORIGINAIS DO PONTO:")
-    print(f"     Vazão Média: {float(valores_sagrados_originais['vazao_media'])} L/h")
-    print(f"     Tendência: {float(valores_sagrados_originais['tendencia'])} %")
-    print(f"     Desvio Padrão: {float(valores_sagrados_originais['desvio_padrao']) if valores_sagrados_originais['desvio_padrao'] else 'N/A'} %")
-    print(f"     Média Totalização (Certificado): {float(valores_cert_originais['media_totalizacao'])} L")
-    print(f"     Média Leitura Medidor (Certificado): {float(valores_cert_originais['media_leitura_medidor'])} L")
+    log.info("   📊 VALORES ORIGINAIS DO PONTO:")
+    log.info("     Vazão Média: %s L/h", float(valores_sagrados_originais['vazao_media']))
+    log.info("     Tendência: %s %%", float(valores_sagrados_originais['tendencia']))
+    log.info("     Desvio Padrão: %s %%", (float(valores_sagrados_originais['desvio_padrao']) if valores_sagrados_originais['desvio_padrao'] else 'N/A'))
+    log.info("     Média Totalização (Certificado): %s L", float(valores_cert_originais['media_totalizacao']))
+    log.info("     Média Leitura Medidor (Certificado): %s L", float(valores_cert_originais['media_leitura_medidor']))
     
     # Recalcula valores com dados ajustados
     totalizacoes_calculadas = []
@@ -1241,14 +1261,14 @@ def verificar_otimizacao_individual_ponto(dados_ajustados, constantes, valores_c
     vazoes_medidor_calculadas = []
     erros_calculados = []
     
-    print(f"\n   🔬 CÁLCULOS DETALHADOS POR LEITURA:")
+    log.info("\n   🔬 CÁLCULOS DETALHADOS POR LEITURA:")
     
     for i, leitura in enumerate(leituras_ajustadas):
-        print(f"\n     📊 LEITURA {i+1} (Linha {leitura['linha']}):")
-        print(f"       Pulsos: {int(leitura['pulsos_padrao'])}")
-        print(f"       Tempo: {float(leitura['tempo_coleta'])} s")
-        print(f"       Leitura Medidor: {float(leitura['leitura_medidor'])} L")
-        print(f"       Temperatura: {float(leitura['temperatura'])} °C")
+        log.info("\n     📊 LEITURA %s (Linha %s):", i+1, leitura['linha'])
+        log.info("       Pulsos: %s", int(leitura['pulsos_padrao']))
+        log.info("       Tempo: %s s", float(leitura['tempo_coleta']))
+        log.info("       Leitura Medidor: %s L", float(leitura['leitura_medidor']))
+        log.info("       Temperatura: %s °C", float(leitura['temperatura']))
         
         # Calcula "Totalização no Padrão Corrigido • L" com dados ajustados
         totalizacao = calcular_totalizacao_padrao_corrigido(
@@ -1275,10 +1295,10 @@ def verificar_otimizacao_individual_ponto(dados_ajustados, constantes, valores_c
             erro = Decimal('0')
         erros_calculados.append(erro)
         
-        print(f"       Totalização Calculada: {float(totalizacao)} L")
-        print(f"       Vazão Ref: {float(vazao_ref)} L/h")
-        print(f"       Vazão Medidor: {float(vazao_med)} L/h")
-        print(f"       Erro: {float(erro)} %")
+        log.info("       Totalização Calculada: %s L", float(totalizacao))
+        log.info("       Vazão Ref: %s L/h", float(vazao_ref))
+        log.info("       Vazão Medidor: %s L/h", float(vazao_med))
+        log.info("       Erro: %s %%", float(erro))
     
     # Calcula médias ajustadas
     vazao_ref_media = sum(vazoes_ref_calculadas) / Decimal(str(len(vazoes_ref_calculadas)))
@@ -1287,56 +1307,56 @@ def verificar_otimizacao_individual_ponto(dados_ajustados, constantes, valores_c
     tendencia_ajustada = sum(erros_calculados) / Decimal(str(len(erros_calculados)))
     desvio_padrao_ajustado = calcular_desvio_padrao_amostral(erros_calculados)
     
-    print(f"\n   📊 VALORES RECALCULADOS COM DADOS AJUSTADOS:")
-    print(f"     Vazão Média: {float(vazao_ref_media)} L/h")
-    print(f"     Tendência: {float(tendencia_ajustada)} %")
-    print(f"     Desvio Padrão: {float(desvio_padrao_ajustado) if desvio_padrao_ajustado else 'N/A'} %")
-    print(f"     Média Totalização: {float(media_totalizacao)} L")
-    print(f"     Média Leitura Medidor: {float(vazao_med_media)} L")
+    log.info("\n   📊 VALORES RECALCULADOS COM DADOS AJUSTADOS:")
+    log.info("     Vazão Média: %s L/h", float(vazao_ref_media))
+    log.info("     Tendência: %s %%", float(tendencia_ajustada))
+    log.info("     Desvio Padrão: %s %%", (float(desvio_padrao_ajustado) if desvio_padrao_ajustado else 'N/A'))
+    log.info("     Média Totalização: %s L", float(media_totalizacao))
+    log.info("     Média Leitura Medidor: %s L", float(vazao_med_media))
     
     # Compara com valores originais
-    print(f"\n   📊 COMPARAÇÃO COM VALORES ORIGINAIS:")
+    log.info("\n   📊 COMPARAÇÃO COM VALORES ORIGINAIS:")
     
     # Vazão Média
     diff_vazao = vazao_ref_media - valores_sagrados_originais['vazao_media']
-    print(f"     Vazão Média:")
-    print(f"       Original: {float(valores_sagrados_originais['vazao_media'])} L/h")
-    print(f"       Ajustada: {float(vazao_ref_media)} L/h")
-    print(f"       Diferença: {float(diff_vazao)} L/h")
-    print(f"       Erro Relativo: {float((diff_vazao / valores_sagrados_originais['vazao_media']) * 100)} %")
+    log.info("     Vazão Média:")
+    log.info("       Original: %s L/h", float(valores_sagrados_originais['vazao_media']))
+    log.info("       Ajustada: %s L/h", float(vazao_ref_media))
+    log.info("       Diferença: %s L/h", float(diff_vazao))
+    log.info("       Erro Relativo: %s %%", float((diff_vazao / valores_sagrados_originais['vazao_media']) * 100))
     
     # Tendência
     diff_tendencia = tendencia_ajustada - valores_sagrados_originais['tendencia']
-    print(f"     Tendência:")
-    print(f"       Original: {float(valores_sagrados_originais['tendencia'])} %")
-    print(f"       Ajustada: {float(tendencia_ajustada)} %")
-    print(f"       Diferença: {float(diff_tendencia)} %")
+    log.info("     Tendência:")
+    log.info("       Original: %s %%", float(valores_sagrados_originais['tendencia']))
+    log.info("       Ajustada: %s %%", float(tendencia_ajustada))
+    log.info("       Diferença: %s %%", float(diff_tendencia))
     
     # Desvio Padrão
     if valores_sagrados_originais['desvio_padrao'] and desvio_padrao_ajustado:
         diff_desvio = desvio_padrao_ajustado - valores_sagrados_originais['desvio_padrao']
-        print(f"     Desvio Padrão:")
-        print(f"       Original: {float(valores_sagrados_originais['desvio_padrao'])} %")
-        print(f"       Ajustado: {float(desvio_padrao_ajustado)} %")
-        print(f"       Diferença: {float(diff_desvio)} %")
+        log.info("     Desvio Padrão:")
+        log.info("       Original: %s %%", float(valores_sagrados_originais['desvio_padrao']))
+        log.info("       Ajustado: %s %%", float(desvio_padrao_ajustado))
+        log.info("       Diferença: %s %%", float(diff_desvio))
     else:
-        print(f"     Desvio Padrão: N/A")
+        log.info("     Desvio Padrão: N/A")
     
     # Média Totalização
     diff_totalizacao = media_totalizacao - valores_cert_originais['media_totalizacao']
-    print(f"     Média Totalização:")
-    print(f"       Original: {float(valores_cert_originais['media_totalizacao'])} L")
-    print(f"       Ajustada: {float(media_totalizacao)} L")
-    print(f"       Diferença: {float(diff_totalizacao)} L")
-    print(f"       Erro Relativo: {float((diff_totalizacao / valores_cert_originais['media_totalizacao']) * 100)} %")
+    log.info("     Média Totalização:")
+    log.info("       Original: %s L", float(valores_cert_originais['media_totalizacao']))
+    log.info("       Ajustada: %s L", float(media_totalizacao))
+    log.info("       Diferença: %s L", float(diff_totalizacao))
+    log.info("       Erro Relativo: %s %%", float((diff_totalizacao / valores_cert_originais['media_totalizacao']) * 100))
     
     # Média Leitura Medidor
     diff_leitura = vazao_med_media - valores_cert_originais['media_leitura_medidor']
-    print(f"     Média Leitura Medidor:")
-    print(f"       Original: {float(valores_cert_originais['media_leitura_medidor'])} L")
-    print(f"       Ajustada: {float(vazao_med_media)} L")
-    print(f"       Diferença: {float(diff_leitura)} L")
-    print(f"       Erro Relativo: {float((diff_leitura / valores_cert_originais['media_leitura_medidor']) * 100)} %")
+    log.info("     Média Leitura Medidor:")
+    log.info("       Original: %s L", float(valores_cert_originais['media_leitura_medidor']))
+    log.info("       Ajustada: %s L", float(vazao_med_media))
+    log.info("       Diferença: %s L", float(diff_leitura))
+    log.info("       Erro Relativo: %s %%", float((diff_leitura / valores_cert_originais['media_leitura_medidor']) * 100))
     
     # Avalia a qualidade da otimização
     tolerancia_vazao = Decimal('1e-6')
@@ -1349,11 +1369,11 @@ def verificar_otimizacao_individual_ponto(dados_ajustados, constantes, valores_c
     qualidade_totalizacao = abs(diff_totalizacao) <= tolerancia_totalizacao
     qualidade_leitura = abs(diff_leitura) <= tolerancia_leitura
     
-    print(f"\n   🎯 AVALIAÇÃO DA QUALIDADE DA OTIMIZAÇÃO:")
-    print(f"     Vazão Média: {'✅ EXCELENTE' if qualidade_vazao else '❌ PRECISA MELHORAR'}")
-    print(f"     Tendência: {'✅ EXCELENTE' if qualidade_tendencia else '❌ PRECISA MELHORAR'}")
-    print(f"     Média Totalização: {'✅ EXCELENTE' if qualidade_totalizacao else '❌ PRECISA MELHORAR'}")
-    print(f"     Média Leitura: {'✅ EXCELENTE' if qualidade_leitura else '❌ PRECISA MELHORAR'}")
+    log.info("\n   🎯 AVALIAÇÃO DA QUALIDADE DA OTIMIZAÇÃO:")
+    log.info("     Vazão Média: %s", ('✅ EXCELENTE' if qualidade_vazao else '❌ PRECISA MELHORAR'))
+    log.info("     Tendência: %s", ('✅ EXCELENTE' if qualidade_tendencia else '❌ PRECISA MELHORAR'))
+    log.info("     Média Totalização: %s", ('✅ EXCELENTE' if qualidade_totalizacao else '❌ PRECISA MELHORAR'))
+    log.info("     Média Leitura: %s", ('✅ EXCELENTE' if qualidade_leitura else '❌ PRECISA MELHORAR'))
     
     # Calcula score geral
     score = 0
@@ -1364,14 +1384,14 @@ def verificar_otimizacao_individual_ponto(dados_ajustados, constantes, valores_c
     
     score_percentual = (score / 4) * 100
     
-    print(f"\n   📈 SCORE GERAL: {score}/4 ({float(score_percentual)}%)")
+    log.info("\n   📈 SCORE GERAL: %s/4 (%s%%)", score, float(score_percentual))
     
     if score_percentual >= 75:
-        print(f"     🎉 OTIMIZAÇÃO EXCELENTE!")
+        log.info("     🎉 OTIMIZAÇÃO EXCELENTE!")
     elif score_percentual >= 50:
-        print(f"     ✅ OTIMIZAÇÃO BOA")
+        log.info("     ✅ OTIMIZAÇÃO BOA")
     else:
-        print(f"     ⚠️  OTIMIZAÇÃO PRECISA MELHORAR")
+        log.warning("     ⚠️  OTIMIZAÇÃO PRECISA MELHORAR")
     
     return {
         'score': score,
@@ -1388,6 +1408,229 @@ def verificar_otimizacao_individual_ponto(dados_ajustados, constantes, valores_c
         }
     }
 
+# ---------------------------------------------------------------------------
+# VERIFICAÇÃO CONSOLIDADA (passagem única)
+# ---------------------------------------------------------------------------
+
+# Tolerâncias de cada verificação (as mesmas das funções de verificação individuais)
+TOLERANCIA_PRESERVACAO = Decimal('1e-20')
+TOLERANCIA_PRECISAO = Decimal('1e-10')
+TOLERANCIA_OTIMIZACAO = Decimal('1e-6')
+
+VERIFICACOES = ('valores_sagrados', 'valores_certificado', 'precisao', 'formula_media_medidor', 'otimizacao')
+
+
+@dataclass
+class GrandezasPonto:
+    """
+    Grandezas derivadas de um ponto ajustado, calculadas uma única vez
+    e compartilhadas por todas as verificações
+    """
+    ponto: str
+    totalizacoes: list
+    vazoes_referencia: list
+    leituras_medidor: list
+    erros: list
+    vazoes_preservadas: list
+    erros_preservados: list
+    media_totalizacao: Decimal
+    vazao_referencia_media: Decimal
+    media_leitura_medidor: Decimal
+    tendencia: Decimal
+    desvio_padrao: Decimal
+    vazao_media_preservada: Decimal
+    tendencia_preservada: Decimal
+    desvio_padrao_preservado: Decimal
+
+
+@dataclass
+class ResultadoVerificacao:
+    """
+    Tabela de aprovação/reprovação de todas as verificações de todos os pontos
+    """
+    grandezas: dict = field(default_factory=dict)
+    tabela: list = field(default_factory=list)
+    scores: dict = field(default_factory=dict)
+
+    def aprovado(self, verificacao=None, ponto=None):
+        linhas = [l for l in self.tabela
+                  if (verificacao is None or l['verificacao'] == verificacao)
+                  and (ponto is None or l['ponto'] == ponto)]
+        return bool(linhas) and all(l['aprovado'] for l in linhas)
+
+    @property
+    def score_medio(self):
+        if not self.scores:
+            return 0
+        return sum(s['score_percentual'] for s in self.scores.values()) / len(self.scores)
+
+
+def _media(valores):
+    return sum(valores) / Decimal(str(len(valores)))
+
+
+def calcular_grandezas_ponto(ponto_key, dados_ponto, constantes):
+    """
+    Passagem única sobre as leituras ajustadas de um ponto: totalizações,
+    vazões, erros, médias e desvios usados por todas as verificações
+    """
+    totalizacoes, vazoes_referencia, leituras_medidor, erros = [], [], [], []
+    vazoes_preservadas, erros_preservados = [], []
+
+    for leitura in dados_ponto['leituras_ajustadas']:
+        totalizacao = calcular_totalizacao_padrao_corrigido(
+            leitura['pulsos_padrao'],
+            constantes['pulso_padrao_lp'],
+            constantes['temperatura_constante'],
+            constantes['fator_correcao_temp'],
+            leitura['tempo_coleta']
+        )
+        totalizacoes.append(totalizacao)
+        vazoes_referencia.append((totalizacao / leitura['tempo_coleta']) * Decimal('3600'))
+        leituras_medidor.append(leitura['leitura_medidor'])
+        if totalizacao != 0:
+            erros.append(((leitura['leitura_medidor'] - totalizacao) / totalizacao) * Decimal('100'))
+        else:
+            erros.append(Decimal('0'))
+        vazoes_preservadas.append(leitura['vazao_referencia'])
+        erros_preservados.append(leitura['erro'])
+
+    return GrandezasPonto(
+        ponto=ponto_key,
+        totalizacoes=totalizacoes,
+        vazoes_referencia=vazoes_referencia,
+        leituras_medidor=leituras_medidor,
+        erros=erros,
+        vazoes_preservadas=vazoes_preservadas,
+        erros_preservados=erros_preservados,
+        media_totalizacao=_media(totalizacoes),
+        vazao_referencia_media=_media(vazoes_referencia),
+        media_leitura_medidor=_media(leituras_medidor),
+        tendencia=_media(erros),
+        desvio_padrao=calcular_desvio_padrao_amostral(erros),
+        vazao_media_preservada=_media(vazoes_preservadas),
+        tendencia_preservada=_media(erros_preservados),
+        desvio_padrao_preservado=calcular_desvio_padrao_amostral(erros_preservados),
+    )
+
+
+def _comparacao(ponto_key, verificacao, grandeza, original, calculado, tolerancia):
+    if original is None or calculado is None:
+        # Desvio padrão indefinido (menos de duas leituras não nulas): não comparável
+        return {'ponto': ponto_key, 'verificacao': verificacao, 'grandeza': grandeza,
+                'original': original, 'calculado': calculado, 'diferenca': None,
+                'tolerancia': tolerancia, 'aprovado': True}
+    diferenca = calculado - original
+    return {'ponto': ponto_key, 'verificacao': verificacao, 'grandeza': grandeza,
+            'original': original, 'calculado': calculado, 'diferenca': diferenca,
+            'tolerancia': tolerancia, 'aprovado': abs(diferenca) <= tolerancia}
+
+
+def verificar_ponto_consolidado(grandezas, dados_ponto, valores_cert):
+    """
+    Executa todas as verificações de um ponto sobre as grandezas já calculadas
+    Retorna as linhas da tabela de aprovação
+    """
+    p = grandezas.ponto
+    sagrados = dados_ponto['valores_sagrados']
+    desvio_original = sagrados['desvio_padrao'] or None
+
+    return [
+        # PASSO 4: valores sagrados preservados nas leituras ajustadas
+        _comparacao(p, 'valores_sagrados', 'vazao_media', sagrados['vazao_media'],
+                    grandezas.vazao_media_preservada, TOLERANCIA_PRESERVACAO),
+        _comparacao(p, 'valores_sagrados', 'tendencia', sagrados['tendencia'],
+                    grandezas.tendencia_preservada, TOLERANCIA_PRESERVACAO),
+        _comparacao(p, 'valores_sagrados', 'desvio_padrao', desvio_original,
+                    grandezas.desvio_padrao_preservado or None, TOLERANCIA_PRESERVACAO),
+        # Médias do certificado recalculadas com os tempos ajustados
+        _comparacao(p, 'valores_certificado', 'media_totalizacao', valores_cert['media_totalizacao'],
+                    grandezas.media_totalizacao, TOLERANCIA_PRESERVACAO),
+        _comparacao(p, 'valores_certificado', 'media_leitura_medidor', valores_cert['media_leitura_medidor'],
+                    grandezas.media_leitura_medidor, TOLERANCIA_PRESERVACAO),
+        # Precisão das vazões médias
+        _comparacao(p, 'precisao', 'vazao_referencia_media', sagrados['vazao_media'],
+                    grandezas.vazao_referencia_media, TOLERANCIA_PRECISAO),
+        _comparacao(p, 'precisao', 'vazao_medidor_media', valores_cert['media_leitura_medidor'],
+                    grandezas.media_leitura_medidor, TOLERANCIA_PRECISAO),
+        # Fórmula MÉDIA('Coleta de Dados'!I54:I56)
+        _comparacao(p, 'formula_media_medidor', 'media_leitura_medidor', valores_cert['media_leitura_medidor'],
+                    grandezas.media_leitura_medidor, TOLERANCIA_PRESERVACAO),
+        # Qualidade da otimização individual (score de 0 a 4)
+        _comparacao(p, 'otimizacao', 'vazao_media', sagrados['vazao_media'],
+                    grandezas.vazao_referencia_media, TOLERANCIA_OTIMIZACAO),
+        _comparacao(p, 'otimizacao', 'tendencia', sagrados['tendencia'],
+                    grandezas.tendencia, TOLERANCIA_OTIMIZACAO),
+        _comparacao(p, 'otimizacao', 'media_totalizacao', valores_cert['media_totalizacao'],
+                    grandezas.media_totalizacao, TOLERANCIA_OTIMIZACAO),
+        _comparacao(p, 'otimizacao', 'media_leitura', valores_cert['media_leitura_medidor'],
+                    grandezas.media_leitura_medidor, TOLERANCIA_OTIMIZACAO),
+    ]
+
+
+def verificar_certificado_consolidado(dados_ajustados, constantes, valores_certificado_originais):
+    """
+    VERIFICAÇÃO CONSOLIDADA: calcula as grandezas de cada ponto uma única vez e
+    executa sobre elas as verificações de valores sagrados, médias do certificado,
+    precisão, fórmula da média do medidor e qualidade da otimização
+    Substitui as chamadas separadas de verificar_otimizacao_individual_ponto,
+    verificar_valores_sagrados, verificar_precisao,
+    verificar_valores_certificado_detalhado e verificar_formula_media_medidor
+    """
+    log.info("\n🔍 VERIFICAÇÃO CONSOLIDADA DOS PONTOS")
+    log.info("%s", "=" * 80)
+
+    resultado = ResultadoVerificacao()
+
+    for ponto_key, dados_ponto in dados_ajustados.items():
+        with medir_ponto(ponto_key):
+            grandezas = calcular_grandezas_ponto(ponto_key, dados_ponto, constantes)
+            linhas = verificar_ponto_consolidado(grandezas, dados_ponto, valores_certificado_originais[ponto_key])
+
+        resultado.grandezas[ponto_key] = grandezas
+        resultado.tabela.extend(linhas)
+
+        otimizacao = {l['grandeza']: l for l in linhas if l['verificacao'] == 'otimizacao'}
+        score = sum(1 for l in otimizacao.values() if l['aprovado'])
+        resultado.scores[ponto_key] = {
+            'score': score,
+            'score_percentual': (score / 4) * 100,
+            'qualidade_vazao': otimizacao['vazao_media']['aprovado'],
+            'qualidade_tendencia': otimizacao['tendencia']['aprovado'],
+            'qualidade_totalizacao': otimizacao['media_totalizacao']['aprovado'],
+            'qualidade_leitura': otimizacao['media_leitura']['aprovado'],
+            'diferencas': {
+                'vazao': otimizacao['vazao_media']['diferenca'],
+                'tendencia': otimizacao['tendencia']['diferenca'],
+                'totalizacao': otimizacao['media_totalizacao']['diferenca'],
+                'leitura': otimizacao['media_leitura']['diferenca'],
+            }
+        }
+
+        for linha in linhas:
+            log.debug("   %s | %-22s | %-24s | original %s | calculado %s | diferença %s",
+                      ponto_key, linha['verificacao'], linha['grandeza'], linha['original'],
+                      linha['calculado'], linha['diferenca'])
+
+    registrar_tabela_verificacao(resultado)
+    return resultado
+
+
+def registrar_tabela_verificacao(resultado):
+    """
+    Uma linha por ponto com o status de cada verificação e o score da otimização
+    """
+    cabecalho = ' | '.join(f"{nome[:12]:^12}" for nome in VERIFICACOES)
+    log.info("   %-10s | %s | score", "ponto", cabecalho)
+    for ponto_key, score in resultado.scores.items():
+        status = ' | '.join(f"{('✅' if resultado.aprovado(nome, ponto_key) else '❌'):^11}" for nome in VERIFICACOES)
+        log.info("   %-10s | %s | %s/4", ponto_key, status, score['score'])
+
+    for linha in resultado.tabela:
+        if not linha['aprovado'] and linha['verificacao'] != 'otimizacao':
+            log.warning("   ⚠️  %s %s/%s: diferença %s (tolerância %s)", linha['ponto'], linha['verificacao'],
+                        linha['grandeza'], linha['diferenca'], linha['tolerancia'])
+
 def gerar_json_comparativo_valores_certificado(dados_originais, dados_ajustados, valores_certificado_originais, constantes):
     """
     NOVA FUNÇÃO: Gera JSON com valores originais vs corrigidos do certificado
@@ -1395,8 +1638,8 @@ def gerar_json_comparativo_valores_certificado(dados_originais, dados_ajustados,
     Inclui vazão média, tendência e desvio padrão amostral com 14 casas decimais
     Calcula os valores reais que serão gerados pela planilha após as correções
     """
-    print(f"\n📊 GERANDO JSON COMPARATIVO DOS VALORES DO CERTIFICADO")
-    print("=" * 80)
+    log.info("\n📊 GERANDO JSON COMPARATIVO DOS VALORES DO CERTIFICADO")
+    log.info("%s", "=" * 80)
     
     # Configuração para 14 casas decimais
     casas_decimais = 14
@@ -1408,8 +1651,8 @@ def gerar_json_comparativo_valores_certificado(dados_originais, dados_ajustados,
         if valor is None:
             return "0.00000000000000"
         
-        # Converte para string com 14 casas decimais
-        valor_str = f"{float(valor):.14f}"
+        # Arredonda o Decimal diretamente (sem passar por float, que perde os últimos dígitos)
+        valor_str = format(Decimal(str(valor)).quantize(Decimal('1e-14'), rounding=ROUND_HALF_UP), 'f')
         return valor_str
     
     def calcular_vazao_referencia(pulsos_padrao, totalizacao, tempo_coleta):
@@ -1457,195 +1700,84 @@ def gerar_json_comparativo_valores_certificado(dados_originais, dados_ajustados,
         return erro
     
     # PASSO 1: Primeiro gerar a planilha corrigida
-    print(f"\n📄 PASSO 1: GERANDO PLANILHA CORRIGIDA PARA LEITURA DOS VALORES REAIS")
+    log.info("\n📄 PASSO 1: GERANDO PLANILHA CORRIGIDA PARA LEITURA DOS VALORES REAIS")
     arquivo_original = "SAN-038-25-09.xlsx"
     arquivo_corrigido = gerar_planilha_corrigida(dados_ajustados, arquivo_original)
     
-    # PASSO 2: Aguardar carregamento da planilha com timeout
-    print(f"\n⏳ PASSO 2: AGUARDANDO CARREGAMENTO DA PLANILHA CORRIGIDA")
-    
-    timeout_segundos = 10
-    tempo_inicio = time.time()
-    
-    while not os.path.exists(arquivo_corrigido):
-        if time.time() - tempo_inicio > timeout_segundos:
-            print(f"❌ TIMEOUT: Arquivo {arquivo_corrigido} não foi criado em {timeout_segundos} segundos")
-            return None
-        time.sleep(0.1)
-    
-    print(f"✅ Arquivo corrigido detectado: {arquivo_corrigido}")
+    # PASSO 2: Confirmar a planilha corrigida
+    # gerar_planilha_corrigida grava o arquivo de forma síncrona, então não há o que aguardar
+    log.info("\n⏳ PASSO 2: CONFIRMANDO PLANILHA CORRIGIDA")
+
+    if not arquivo_corrigido or not os.path.isfile(arquivo_corrigido):
+        log.error("❌ Arquivo %s não foi gerado", arquivo_corrigido)
+        return None
+
+    log.info("✅ Arquivo corrigido detectado: %s", arquivo_corrigido)
     
     # PASSO 3: Ler valores reais da planilha corrigida
-    print(f"\n📖 PASSO 3: LENDO VALORES REAIS DA PLANILHA CORRIGIDA")
+    log.info("\n📖 PASSO 3: LENDO VALORES REAIS DA PLANILHA CORRIGIDA")
     
     def ler_valores_reais_planilha(arquivo_excel):
         """
         Lê os valores reais calculados pela planilha Excel
-        Busca especificamente pelos valores do certificado nas células corretas
+        Os endereços (I57/U57/AD57 de cada bloco) vêm do layout compilado
         """
         try:
-            from openpyxl import load_workbook
             wb = load_workbook(arquivo_excel, data_only=True)  # data_only=True para ler valores calculados
+            certificado = ler_certificado(wb, converter_para_decimal_padrao)
+            wb.close()
             
-            # Mapeamento das células dos valores do certificado
-            # Baseado na estrutura da planilha SAN-038-25-09.xlsx
             valores_reais = {}
-            
-            # Para cada ponto de calibração (1 a 8)
-            for ponto_num in range(1, 9):
+            for ponto in certificado['pontos']:
+                ponto_num = ponto['numero']
                 ponto_key = f"ponto_{ponto_num}"
-                valores_reais[ponto_key] = {}
+                valores_reais[ponto_key] = dict(ponto['valores_originais'])
                 
-                # Determina as linhas base para cada ponto
-                # Ponto 1: linhas 54-56, Ponto 2: linhas 59-61, etc.
-                linha_base = 54 + (ponto_num - 1) * 5
+                log.info("     📊 Ponto %s: Vazão média (I%s): %s L/h", ponto_num, ponto['linha_inicial'] + 3, float(valores_reais[ponto_key]['vazao_media']))
+                log.info("     📊 Ponto %s: Tendência (U%s): %s %%", ponto_num, ponto['linha_inicial'] + 3, float(valores_reais[ponto_key]['tendencia']))
+                log.info("     📊 Ponto %s: Desvio (AD%s): %s %%", ponto_num, ponto['linha_inicial'] + 3, float(valores_reais[ponto_key]['desvio_padrao']))
                 
-                # Lê valores das células específicas do certificado
-                try:
-                    # Busca por valores do certificado em diferentes possíveis localizações
-                    # Primeiro tenta ler das células onde os valores são calculados
-                    
-                    # Células possíveis para os valores do certificado
-                    # Vazão Média pode estar em diferentes colunas dependendo da estrutura
-                    possiveis_colunas_vazao = [9, 10, 11]  # Colunas I, J, K
-                    possiveis_colunas_tendencia = [21, 22, 23]  # Colunas U, V, W
-                    possiveis_colunas_desvio = [22, 23, 24]  # Colunas V, W, X
-                    
-                    vazao_media_encontrada = None
-                    tendencia_encontrada = None
-                    desvio_encontrado = None
-                    
-                    # Busca por Vazão Média
-                    for col in possiveis_colunas_vazao:
-                        for linha_offset in range(-5, 15):  # Busca em um range de linhas
-                            try:
-                                cell = wb.active.cell(row=linha_base + linha_offset, column=col)
-                                if cell.value and isinstance(cell.value, (int, float)) and cell.value > 1000:
-                                    # Valores de vazão são tipicamente > 1000 L/h
-                                    vazao_media_encontrada = Decimal(str(cell.value))
-                                    print(f"     📊 Ponto {ponto_num}: Vazão média encontrada em {cell.coordinate}: {float(vazao_media_encontrada)} L/h")
-                                    break
-                            except:
-                                continue
-                        if vazao_media_encontrada:
-                            break
-                    
-                    # Busca por Tendência
-                    for col in possiveis_colunas_tendencia:
-                        for linha_offset in range(-5, 15):
-                            try:
-                                cell = wb.active.cell(row=linha_base + linha_offset, column=col)
-                                if cell.value and isinstance(cell.value, (int, float)) and abs(cell.value) < 10:
-                                    # Valores de tendência são tipicamente pequenos (entre -10 e +10)
-                                    tendencia_encontrada = Decimal(str(cell.value))
-                                    print(f"     📊 Ponto {ponto_num}: Tendência encontrada em {cell.coordinate}: {float(tendencia_encontrada)} %")
-                                    break
-                            except:
-                                continue
-                        if tendencia_encontrada:
-                            break
-                    
-                    # Busca por Desvio Padrão
-                    for col in possiveis_colunas_desvio:
-                        for linha_offset in range(-5, 15):
-                            try:
-                                cell = wb.active.cell(row=linha_base + linha_offset, column=col)
-                                if cell.value and isinstance(cell.value, (int, float)) and cell.value > 0 and cell.value < 5:
-                                    # Valores de desvio são tipicamente pequenos e positivos
-                                    desvio_encontrado = Decimal(str(cell.value))
-                                    print(f"     📊 Ponto {ponto_num}: Desvio encontrado em {cell.coordinate}: {float(desvio_encontrado)} %")
-                                    break
-                            except:
-                                continue
-                        if desvio_encontrado:
-                            break
-                    
-                    # Se não encontrou valores específicos, tenta ler das células padrão
-                    if not vazao_media_encontrada:
-                        try:
-                            # Tenta ler de células específicas conhecidas
-                            vazao_cell = wb.active.cell(row=linha_base + 10, column=9)  # Coluna I
-                            if vazao_cell.value and isinstance(vazao_cell.value, (int, float)):
-                                vazao_media_encontrada = Decimal(str(vazao_cell.value))
-                                print(f"     📊 Ponto {ponto_num}: Vazão média lida de célula padrão: {float(vazao_media_encontrada)} L/h")
-                        except:
-                            pass
-                    
-                    if not tendencia_encontrada:
-                        try:
-                            tendencia_cell = wb.active.cell(row=linha_base + 10, column=21)  # Coluna U
-                            if tendencia_cell.value and isinstance(tendencia_cell.value, (int, float)):
-                                tendencia_encontrada = Decimal(str(tendencia_cell.value))
-                                print(f"     📊 Ponto {ponto_num}: Tendência lida de célula padrão: {float(tendencia_encontrada)} %")
-                        except:
-                            pass
-                    
-                    if not desvio_encontrado:
-                        try:
-                            desvio_cell = wb.active.cell(row=linha_base + 10, column=22)  # Coluna V
-                            if desvio_cell.value and isinstance(desvio_cell.value, (int, float)):
-                                desvio_encontrado = Decimal(str(desvio_cell.value))
-                                print(f"     📊 Ponto {ponto_num}: Desvio lido de célula padrão: {float(desvio_encontrado)} %")
-                        except:
-                            pass
-                    
-                    valores_reais[ponto_key] = {
-                        'vazao_media': vazao_media_encontrada if vazao_media_encontrada else Decimal('0'),
-                        'tendencia': tendencia_encontrada if tendencia_encontrada else Decimal('0'),
-                        'desvio_padrao': desvio_encontrado if desvio_encontrado else Decimal('0')
-                    }
-                    
-                    # Verifica se encontrou pelo menos um valor válido
-                    valores_validos = sum(1 for v in valores_reais[ponto_key].values() if v != 0)
-                    if valores_validos > 0:
-                        print(f"     ✅ Ponto {ponto_num}: {valores_validos}/3 valores encontrados na planilha")
-                    else:
-                        print(f"     ⚠️  Ponto {ponto_num}: Nenhum valor encontrado na planilha, usando cálculo Python")
-                    
-                except Exception as e:
-                    print(f"⚠️  Erro ao ler valores do ponto {ponto_num}: {e}")
-                    # Fallback: usar valores calculados pelo Python
-                    valores_reais[ponto_key] = {
-                        'vazao_media': Decimal('0'),
-                        'tendencia': Decimal('0'),
-                        'desvio_padrao': Decimal('0')
-                    }
+                # Verifica se encontrou pelo menos um valor válido
+                valores_validos = sum(1 for v in valores_reais[ponto_key].values() if v != 0)
+                if valores_validos > 0:
+                    log.info("     ✅ Ponto %s: %s/3 valores encontrados na planilha", ponto_num, valores_validos)
+                else:
+                    log.warning("     ⚠️  Ponto %s: Nenhum valor encontrado na planilha, usando cálculo Python", ponto_num)
             
-            wb.close()
             return valores_reais
             
         except Exception as e:
-            print(f"❌ Erro ao ler planilha: {e}")
+            log.error("❌ Erro ao ler planilha: %s", e)
             return None
     
     # Tenta ler os valores reais da planilha
     valores_reais_planilha = ler_valores_reais_planilha(arquivo_corrigido)
     
     if not valores_reais_planilha:
-        print(f"⚠️  Não foi possível ler valores da planilha, usando valores calculados")
+        log.warning("⚠️  Não foi possível ler valores da planilha, usando valores calculados")
         valores_reais_planilha = {}
     
-    comparativo = {
-        "metadata": {
-            "data_geracao": datetime.now().isoformat(),
-            "descricao": "Comparativo de valores originais vs corrigidos do certificado",
-            "precisao": f"Decimal com {casas_decimais} casas decimais",
-            "total_pontos": len(dados_originais),
-            "arquivo_planilha_corrigida": arquivo_corrigido,
-            "fonte_valores_corrigidos": "Planilha Excel corrigida (valores reais calculados)",
-            "formulas_utilizadas": {
-                "vazao_referencia": "=SE(C54=\"\";\"\";L54/AA54*3600)",
-                "vazao_media": "=SE(I54=\"\";\"\";MÉDIA(I54:I56))",
-                "erro_percentual": "=SE(O54=\"\";\"\";(O54-L54)/L54*100)",
-                "tendencia": "=SE(U54=\"\";\"\";MÉDIA(U54:U56))",
-                "desvio_padrao": "=SE(U54=\"\";\"\";STDEV.S(U54:U56))"
-            }
-        },
-        "pontos_calibracao": {}
-    }
+    # Cada ponto é gravado no JSONL assim que é calculado (nada acumulado em memória)
+    nome_arquivo = "comparativo_valores_certificado.jsonl"
+    comparativo = EscritorRelatorio(
+        nome_arquivo, 'comparativo_certificado',
+        titulo="COMPARATIVO DE VALORES DO CERTIFICADO",
+        descricao="Comparativo de valores originais vs corrigidos do certificado",
+        precisao=f"Decimal com {casas_decimais} casas decimais",
+        total_pontos=len(dados_originais),
+        arquivo_planilha_corrigida=arquivo_corrigido,
+        fonte_valores_corrigidos="Planilha Excel corrigida (valores reais calculados)",
+        formulas_utilizadas={
+            "vazao_referencia": "=SE(C54=\"\";\"\";L54/AA54*3600)",
+            "vazao_media": "=SE(I54=\"\";\"\";MÉDIA(I54:I56))",
+            "erro_percentual": "=SE(O54=\"\";\"\";(O54-L54)/L54*100)",
+            "tendencia": "=SE(U54=\"\";\"\";MÉDIA(U54:U56))",
+            "desvio_padrao": "=SE(U54=\"\";\"\";STDEV.S(U54:U56))"
+        }
+    )
     
     for ponto_key in dados_originais.keys():
-        print(f"\n📊 Processando {ponto_key}:")
+        log.info("\n📊 Processando %s:", ponto_key)
         
         # Extrai dados originais
         dados_orig = dados_originais[ponto_key]
@@ -1660,13 +1792,13 @@ def gerar_json_comparativo_valores_certificado(dados_originais, dados_ajustados,
         erros_corrigidos = []
         totalizacoes_corrigidas = []
         
-        print(f"   🔬 CALCULANDO VALORES CORRIGIDOS COM FÓRMULAS REAIS:")
+        log.info("   🔬 CALCULANDO VALORES CORRIGIDOS COM FÓRMULAS REAIS:")
         
         for i, leitura in enumerate(leituras_ajustadas):
-            print(f"     📊 LEITURA {i+1} (Linha {leitura['linha']}):")
-            print(f"       Pulsos: {int(leitura['pulsos_padrao'])}")
-            print(f"       Tempo: {float(leitura['tempo_coleta'])} s")
-            print(f"       Leitura Medidor: {float(leitura['leitura_medidor'])} L")
+            log.debug("     📊 LEITURA %s (Linha %s):", i+1, leitura['linha'])
+            log.debug("       Pulsos: %s", int(leitura['pulsos_padrao']))
+            log.debug("       Tempo: %s s", float(leitura['tempo_coleta']))
+            log.debug("       Leitura Medidor: %s L", float(leitura['leitura_medidor']))
             
             # Calcula "Totalização no Padrão Corrigido • L" com dados ajustados
             totalizacao = calcular_totalizacao_padrao_corrigido(
@@ -1693,9 +1825,9 @@ def gerar_json_comparativo_valores_certificado(dados_originais, dados_ajustados,
             )
             erros_corrigidos.append(erro)
             
-            print(f"       Totalização: {float(totalizacao)} L")
-            print(f"       Vazão Ref: {float(vazao_ref)} L/h")
-            print(f"       Erro: {float(erro)} %")
+            log.debug("       Totalização: %s L", float(totalizacao))
+            log.debug("       Vazão Ref: %s L/h", float(vazao_ref))
+            log.debug("       Erro: %s %%", float(erro))
         
         # Calcula valores finais usando fórmulas do certificado
         vazao_media_corrigida = calcular_vazao_media(vazoes_ref_corrigidas)
@@ -1707,21 +1839,21 @@ def gerar_json_comparativo_valores_certificado(dados_originais, dados_ajustados,
         
         # Tenta usar valores reais da planilha se disponíveis
         if ponto_key in valores_reais_planilha and valores_reais_planilha[ponto_key]['vazao_media'] != 0:
-            print(f"   📖 USANDO VALORES REAIS DA PLANILHA EXCEL:")
+            log.info("   📖 USANDO VALORES REAIS DA PLANILHA EXCEL:")
             valores_reais = valores_reais_planilha[ponto_key]
             vazao_media_corrigida = valores_reais['vazao_media']
             tendencia_corrigida = valores_reais['tendencia']
             desvio_padrao_corrigido = valores_reais['desvio_padrao']
             fonte_valores = "Planilha Excel (valores reais calculados)"
         else:
-            print(f"   🔬 USANDO VALORES CALCULADOS PELO PYTHON:")
+            log.info("   🔬 USANDO VALORES CALCULADOS PELO PYTHON:")
             fonte_valores = "Cálculo Python (fórmulas replicadas)"
         
-        print(f"   📊 VALORES FINAIS CALCULADOS:")
-        print(f"     Vazão Média (MÉDIA(I54:I56)): {float(vazao_media_corrigida)} L/h")
-        print(f"     Tendência (MÉDIA(U54:U56)): {float(tendencia_corrigida)} %")
-        print(f"     Desvio Padrão (STDEV.S(U54:U56)): {float(desvio_padrao_corrigido) if desvio_padrao_corrigido else 'N/A'} %")
-        print(f"     Fonte: {fonte_valores}")
+        log.info("   📊 VALORES FINAIS CALCULADOS:")
+        log.info("     Vazão Média (MÉDIA(I54:I56)): %s L/h", float(vazao_media_corrigida))
+        log.info("     Tendência (MÉDIA(U54:U56)): %s %%", float(tendencia_corrigida))
+        log.info("     Desvio Padrão (STDEV.S(U54:U56)): %s %%", (float(desvio_padrao_corrigido) if desvio_padrao_corrigido else 'N/A'))
+        log.info("     Fonte: %s", fonte_valores)
         
         # Prepara dados do ponto
         dados_ponto = {
@@ -1828,53 +1960,55 @@ def gerar_json_comparativo_valores_certificado(dados_originais, dados_ajustados,
             }
         }
         
-        comparativo["pontos_calibracao"][ponto_key] = dados_ponto
+        comparativo.ponto(dados_ponto, 'comparativo', dados_orig['numero'])
         
         # Mostra informações no console
-        print(f"   📊 VALORES ORIGINAIS:")
-        print(f"     Vazão Média: {formatar_decimal_14_casas(valores_sagrados_originais['vazao_media'])} L/h")
-        print(f"     Tendência: {formatar_decimal_14_casas(valores_sagrados_originais['tendencia'])} %")
-        print(f"     Desvio Padrão: {formatar_decimal_14_casas(valores_sagrados_originais['desvio_padrao']) if valores_sagrados_originais['desvio_padrao'] else '0.00000000000000'} %")
-        print(f"     Média Totalização: {formatar_decimal_14_casas(valores_cert_originais['media_totalizacao'])} L")
-        print(f"     Média Leitura: {formatar_decimal_14_casas(valores_cert_originais['media_leitura_medidor'])} L")
-        
-        print(f"   📊 VALORES CORRIGIDOS ({fonte_valores.upper()}):")
-        print(f"     Vazão Média: {formatar_decimal_14_casas(vazao_media_corrigida)} L/h")
-        print(f"     Tendência: {formatar_decimal_14_casas(tendencia_corrigida)} %")
-        print(f"     Desvio Padrão: {formatar_decimal_14_casas(desvio_padrao_corrigido) if desvio_padrao_corrigido else '0.00000000000000'} %")
-        print(f"     Média Totalização: {formatar_decimal_14_casas(valores_cert_originais['media_totalizacao'])} L")
-        print(f"     Média Leitura: {formatar_decimal_14_casas(valores_cert_originais['media_leitura_medidor'])} L")
+        log.info("   📊 VALORES ORIGINAIS:")
+        log.info("     Vazão Média: %s L/h", formatar_decimal_14_casas(valores_sagrados_originais['vazao_media']))
+        log.info("     Tendência: %s %%", formatar_decimal_14_casas(valores_sagrados_originais['tendencia']))
+        log.info("     Desvio Padrão: %s %%", (formatar_decimal_14_casas(valores_sagrados_originais['desvio_padrao']) if valores_sagrados_originais['desvio_padrao'] else '0.00000000000000'))
+        log.info("     Média Totalização: %s L", formatar_decimal_14_casas(valores_cert_originais['media_totalizacao']))
+        log.info("     Média Leitura: %s L", formatar_decimal_14_casas(valores_cert_originais['media_leitura_medidor']))
+        
+        log.info("   📊 VALORES CORRIGIDOS (%s):", fonte_valores.upper())
+        log.info("     Vazão Média: %s L/h", formatar_decimal_14_casas(vazao_media_corrigida))
+        log.info("     Tendência: %s %%", formatar_decimal_14_casas(tendencia_corrigida))
+        log.info("     Desvio Padrão: %s %%", (formatar_decimal_14_casas(desvio_padrao_corrigido) if desvio_padrao_corrigido else '0.00000000000000'))
+        log.info("     Média Totalização: %s L", formatar_decimal_14_casas(valores_cert_originais['media_totalizacao']))
+        log.info("     Média Leitura: %s L", formatar_decimal_14_casas(valores_cert_originais['media_leitura_medidor']))
         
         # Mostra status de preservação
         status = dados_ponto['status_preservacao']
-        print(f"   ✅ STATUS DE PRESERVAÇÃO:")
-        print(f"     Vazão Média: {'✅ PRESERVADA' if status['vazao_media_preservada'] else '❌ ALTERADA'}")
-        print(f"     Tendência: {'✅ PRESERVADA' if status['tendencia_preservada'] else '❌ ALTERADA'}")
-        print(f"     Desvio Padrão: {'✅ PRESERVADO' if status['desvio_padrao_preservado'] else '❌ ALTERADO'}")
-        print(f"     Média Totalização: {'✅ PRESERVADA' if status['media_totalizacao_preservada'] else '❌ ALTERADA'}")
-        print(f"     Média Leitura: {'✅ PRESERVADA' if status['media_leitura_medidor_preservada'] else '❌ ALTERADA'}")
-    
-    # Salva o JSON
-    nome_arquivo = "comparativo_valores_certificado.json"
-    with open(nome_arquivo, "w", encoding="utf-8") as f:
-        json.dump(comparativo, f, indent=2, ensure_ascii=False)
-    
-    print(f"\n📄 JSON COMPARATIVO GERADO:")
-    print(f"   Arquivo: {nome_arquivo}")
-    print(f"   Total de pontos: {len(comparativo['pontos_calibracao'])}")
-    print(f"   Precisão: {casas_decimais} casas decimais")
-    print(f"   Planilha corrigida: {arquivo_corrigido}")
-    print(f"   Status: ✅ Arquivo salvo com sucesso")
+        log.info("   ✅ STATUS DE PRESERVAÇÃO:")
+        log.info("     Vazão Média: %s", ('✅ PRESERVADA' if status['vazao_media_preservada'] else '❌ ALTERADA'))
+        log.info("     Tendência: %s", ('✅ PRESERVADA' if status['tendencia_preservada'] else '❌ ALTERADA'))
+        log.info("     Desvio Padrão: %s", ('✅ PRESERVADO' if status['desvio_padrao_preservado'] else '❌ ALTERADO'))
+        log.info("     Média Totalização: %s", ('✅ PRESERVADA' if status['media_totalizacao_preservada'] else '❌ ALTERADA'))
+        log.info("     Média Leitura: %s", ('✅ PRESERVADA' if status['media_leitura_medidor_preservada'] else '❌ ALTERADA'))
+    
+    # Fecha o JSONL com o registro de resumo
+    total_pontos = sum(e['total_pontos'] for e in comparativo.estatisticas.para_dicionario().values())
+    comparativo.concluir()
+    
+    log.info("\n📄 JSON COMPARATIVO GERADO:")
+    log.info("   Arquivo: %s", nome_arquivo)
+    log.info("   Total de pontos: %s", total_pontos)
+    log.info("   Precisão: %s casas decimais", casas_decimais)
+    log.info("   Planilha corrigida: %s", arquivo_corrigido)
+    log.info("   Status: ✅ Arquivo salvo com sucesso")
     
     return nome_arquivo
 
-def ajustar_tempos_coleta_iterativo(leituras_ponto, constantes, valores_certificado_originais, ponto_key):
+def ajustar_tempos_coleta_iterativo(leituras_ponto, constantes, valores_certificado_originais, ponto_key,
+                                    estrategia=None):
     """
     NOVA FUNÇÃO: Ajusta tempos de coleta de forma iterativa com taxa de adição
     Objetivo: Aproximar ao máximo os valores de vazão de referência desejados
-    Restrições: Tempos entre 240.0 e 240.4 segundos
+    Restrições: Tempos entre o nominal e o teto da faixa de ajuste da estratégia (240.0-240.4 s para 240 s)
+    estrategia: estratégia de tempo alvo (None = TEMPO_ALVO, padrão 240 s)
     """
-    print(f"       🔄 INICIANDO AJUSTE ITERATIVO DE TEMPOS DE COLETA para {ponto_key}")
+    restricoes = compilar_estrategia(estrategia)
+    log.info("       🔄 INICIANDO AJUSTE ITERATIVO DE TEMPOS DE COLETA para %s", ponto_key)
     
     # Extrai valores alvo específicos deste ponto
     valores_cert_originais = valores_certificado_originais[ponto_key]
@@ -1883,19 +2017,19 @@ def ajustar_tempos_coleta_iterativo(leituras_ponto, constantes, valores_certific
     media_totalizacao_alvo = valores_cert_originais['media_totalizacao']
     media_leitura_medidor_alvo = valores_cert_originais['media_leitura_medidor']
     
-    print(f"       🎯 VALORES ALVO DO CERTIFICADO:")
-    print(f"         Média Totalização: {float(media_totalizacao_alvo)} L")
-    print(f"         Média Leitura Medidor: {float(media_leitura_medidor_alvo)} L")
+    log.info("       🎯 VALORES ALVO DO CERTIFICADO:")
+    log.info("         Média Totalização: %s L", float(media_totalizacao_alvo))
+    log.info("         Média Leitura Medidor: %s L", float(media_leitura_medidor_alvo))
     
     # Extrai dados originais para calcular proporções
     pulsos_originais = [l['pulsos_padrao'] for l in leituras_ponto]
     leituras_originais = [l['leitura_medidor'] for l in leituras_ponto]
     tempos_originais = [l['tempo_coleta'] for l in leituras_ponto]
     
-    print(f"       📊 DADOS ORIGINAIS:")
-    print(f"         Pulsos: {[int(p) for p in pulsos_originais]}")
-    print(f"         Leituras: {[float(l) for l in leituras_originais]} L")
-    print(f"         Tempos: {[float(t) for t in tempos_originais]} s")
+    log.info("       📊 DADOS ORIGINAIS:")
+    log.info("         Pulsos: %s", [int(p) for p in pulsos_originais])
+    log.info("         Leituras: %s L", ListaFloat(leituras_originais))
+    log.info("         Tempos: %s s", ListaFloat(tempos_originais))
     
     # CALCULA PROPORÇÕES FIXAS DOS DADOS ORIGINAIS
     # Estas proporções serão mantidas para preservar a variabilidade do ensaio
@@ -1918,24 +2052,24 @@ def ajustar_tempos_coleta_iterativo(leituras_ponto, constantes, valores_certific
     else:
         proporcoes_leituras = [Decimal('1'), Decimal('1'), Decimal('1')]
     
-    print(f"       📐 PROPORÇÕES FIXAS CALCULADAS:")
-    print(f"         Proporções Pulsos: {[float(p) for p in proporcoes_pulsos]}")
-    print(f"         Proporções Leituras: {[float(p) for p in proporcoes_leituras]}")
+    log.info("       📐 PROPORÇÕES FIXAS CALCULADAS:")
+    log.info("         Proporções Pulsos: %s", ListaFloat(proporcoes_pulsos))
+    log.info("         Proporções Leituras: %s", ListaFloat(proporcoes_leituras))
     
     # CONFIGURAÇÕES DO MODELO ITERATIVO
-    tempo_base = Decimal('240.0')  # Tempo base de 240 segundos
-    tempo_maximo = Decimal('240.4')  # Limite máximo
+    tempo_base = restricoes.tempo_nominal  # Tempo nominal da estratégia
+    tempo_maximo = restricoes.faixa_ajuste[1]  # Limite máximo
     taxa_adicao_inicial = Decimal('0.0001')  # Taxa de adição inicial pequena
     taxa_adicao = taxa_adicao_inicial  # Taxa de adição atual
     max_iteracoes = 1000  # Máximo de iterações
     tolerancia = Decimal('1e-6')  # Tolerância para convergência
     
-    print(f"       ⚙️  CONFIGURAÇÕES DO MODELO:")
-    print(f"         Tempo base: {float(tempo_base)} s")
-    print(f"         Tempo máximo: {float(tempo_maximo)} s")
-    print(f"         Taxa de adição: {float(taxa_adicao)} s")
-    print(f"         Máximo de iterações: {max_iteracoes}")
-    print(f"         Tolerância: {float(tolerancia)}")
+    log.info("       ⚙️  CONFIGURAÇÕES DO MODELO:")
+    log.info("         Tempo base: %s s", float(tempo_base))
+    log.info("         Tempo máximo: %s s", float(tempo_maximo))
+    log.info("         Taxa de adição: %s s", float(taxa_adicao))
+    log.info("         Máximo de iterações: %s", max_iteracoes)
+    log.info("         Tolerância: %s", float(tolerancia))
     
     def calcular_valores_com_tempos(tempos_ajustados):
         """
@@ -2006,7 +2140,7 @@ def ajustar_tempos_coleta_iterativo(leituras_ponto, constantes, valores_certific
         }
     
     # ALGORITMO DE OTIMIZAÇÃO ITERATIVA COM TAXA DE ADIÇÃO
-    print(f"       🔄 INICIANDO ALGORITMO DE OTIMIZAÇÃO ITERATIVA...")
+    log.info("       🔄 INICIANDO ALGORITMO DE OTIMIZAÇÃO ITERATIVA...")
     
     # Inicialização com tempos base
     tempos_atual = [tempo_base, tempo_base + Decimal('0.1'), tempo_base + Decimal('0.2')]
@@ -2016,19 +2150,19 @@ def ajustar_tempos_coleta_iterativo(leituras_ponto, constantes, valores_certific
     melhor_tempos = tempos_atual.copy()
     melhor_resultados = None
     
-    print(f"       📊 TEMPOS INICIAIS:")
+    log.info("       📊 TEMPOS INICIAIS:")
     for i, tempo in enumerate(tempos_atual):
-        print(f"         Leitura {i+1}: {float(tempo)} s")
+        log.debug("         Leitura %s: %s s", i+1, float(tempo))
     
-    print(f"       ⚙️  CONFIGURAÇÕES DO LOOP:")
-    print(f"         Taxa de adição inicial: {float(taxa_adicao_inicial)} s")
-    print(f"         Limite máximo: {float(tempo_maximo)} s")
-    print(f"         Máximo de iterações: {max_iteracoes}")
-    print(f"         Tolerância: {float(tolerancia)}")
+    log.info("       ⚙️  CONFIGURAÇÕES DO LOOP:")
+    log.info("         Taxa de adição inicial: %s s", float(taxa_adicao_inicial))
+    log.info("         Limite máximo: %s s", float(tempo_maximo))
+    log.info("         Máximo de iterações: %s", max_iteracoes)
+    log.info("         Tolerância: %s", float(tolerancia))
     
     # LOOP PRINCIPAL DE OTIMIZAÇÃO
-    print(f"       🔄 INICIANDO LOOP PRINCIPAL...")
-    print(f"       📊 Taxa de adição inicial: {float(taxa_adicao)} s")
+    log.info("       🔄 INICIANDO LOOP PRINCIPAL...")
+    log.info("       📊 Taxa de adição inicial: %s s", float(taxa_adicao))
     
     for iteracao in range(max_iteracoes):
         # Calcula custo atual
@@ -2040,19 +2174,19 @@ def ajustar_tempos_coleta_iterativo(leituras_ponto, constantes, valores_certific
             melhor_tempos = tempos_atual.copy()
             melhor_resultados = resultados_atual
             
-            print(f"         Iteração {iteracao + 1}: Nova melhor solução encontrada!")
-            print(f"           Custo: {custo_atual}")
-            print(f"           Tempos: {[float(t) for t in tempos_atual]} s")
-            print(f"           Média Totalização: {float(resultados_atual['media_totalizacao'])} L")
-            print(f"           Média Leitura: {float(resultados_atual['media_leitura_medidor'])} L")
-            print(f"           Erro Totalização: {float(resultados_atual['erro_totalizacao'])} L")
-            print(f"           Erro Leitura: {float(resultados_atual['erro_leitura'])} L")
+            log.debug("         Iteração %s: Nova melhor solução encontrada!", iteracao + 1)
+            log.debug("           Custo: %s", custo_atual)
+            log.debug("           Tempos: %s s", ListaFloat(tempos_atual))
+            log.debug("           Média Totalização: %s L", float(resultados_atual['media_totalizacao']))
+            log.debug("           Média Leitura: %s L", float(resultados_atual['media_leitura_medidor']))
+            log.debug("           Erro Totalização: %s L", float(resultados_atual['erro_totalizacao']))
+            log.debug("           Erro Leitura: %s L", float(resultados_atual['erro_leitura']))
         
         # Verifica convergência
         if custo_atual < float(tolerancia):
-            print(f"         ✅ CONVERGÊNCIA ATINGIDA na iteração {iteracao + 1}!")
-            print(f"           Custo final: {custo_atual}")
-            print(f"           Tolerância: {float(tolerancia)}")
+            log.debug("         ✅ CONVERGÊNCIA ATINGIDA na iteração %s!", iteracao + 1)
+            log.debug("           Custo final: %s", custo_atual)
+            log.debug("           Tolerância: %s", float(tolerancia))
             break
         
         # Aplica taxa de adição linear aos tempos
@@ -2065,7 +2199,7 @@ def ajustar_tempos_coleta_iterativo(leituras_ponto, constantes, valores_certific
             if novo_tempo > tempo_maximo:
                 # Se passar do limite, volta para o próximo valor base
                 novo_tempo = tempo_base + (Decimal(str(i)) * Decimal('0.1'))
-                print(f"         ⚠️  Leitura {i+1} passou do limite! Voltando para {float(novo_tempo)} s")
+                log.debug("         ⚠️  Leitura %s passou do limite! Voltando para %s s", i+1, float(novo_tempo))
             
             novos_tempos.append(novo_tempo)
         
@@ -2074,40 +2208,40 @@ def ajustar_tempos_coleta_iterativo(leituras_ponto, constantes, valores_certific
         
         # Mostra primeira aplicação da taxa de adição
         if iteracao == 0:
-            print(f"         ✅ Primeira aplicação da taxa de adição:")
-            print(f"           Taxa aplicada: {float(taxa_adicao)} s")
-            print(f"           Novos tempos: {[float(t) for t in tempos_atual]} s")
+            log.debug("         ✅ Primeira aplicação da taxa de adição:")
+            log.debug("           Taxa aplicada: %s s", float(taxa_adicao))
+            log.debug("           Novos tempos: %s s", ListaFloat(tempos_atual))
         
         # Mostra progresso a cada 50 iterações
         if iteracao % 50 == 0:
-            print(f"         🔄 Iteração {iteracao + 1}: Tempos atuais = {[float(t) for t in tempos_atual]} s")
-            print(f"         📊 Taxa de adição atual: {float(taxa_adicao)} s")
+            log.debug("         🔄 Iteração %s: Tempos atuais = %s s", iteracao + 1, ListaFloat(tempos_atual))
+            log.debug("         📊 Taxa de adição atual: %s s", float(taxa_adicao))
         
         # Reduz taxa de adição gradualmente para convergência mais precisa
         if iteracao % 100 == 0 and iteracao > 0:
             taxa_adicao *= Decimal('0.5')
-            print(f"         🔧 Reduzindo taxa de adição para {float(taxa_adicao)} s")
+            log.debug("         🔧 Reduzindo taxa de adição para %s s", float(taxa_adicao))
     
     else:
-        print(f"         ⚠️  MÁXIMO DE ITERAÇÕES ATINGIDO sem convergência")
+        log.debug("         ⚠️  MÁXIMO DE ITERAÇÕES ATINGIDO sem convergência")
     
     # RESULTADO FINAL
-    print(f"       ✅ OTIMIZAÇÃO CONCLUÍDA:")
-    print(f"         Melhor custo: {melhor_custo}")
-    print(f"         Melhor tempos: {[float(t) for t in melhor_tempos]} s")
-    print(f"         Iterações realizadas: {min(iteracao + 1, max_iteracoes)}")
-    print(f"         Taxa de adição final: {float(taxa_adicao)} s")
-    print(f"         Taxa de adição inicial: {float(taxa_adicao_inicial)} s")
+    log.info("       ✅ OTIMIZAÇÃO CONCLUÍDA:")
+    log.info("         Melhor custo: %s", melhor_custo)
+    log.info("         Melhor tempos: %s s", ListaFloat(melhor_tempos))
+    log.info("         Iterações realizadas: %s", min(iteracao + 1, max_iteracoes))
+    log.info("         Taxa de adição final: %s s", float(taxa_adicao))
+    log.info("         Taxa de adição inicial: %s s", float(taxa_adicao_inicial))
     
     # Calcula valores finais com a melhor solução
     pulsos_ajustados_finais, leituras_ajustadas_finais = calcular_valores_com_tempos(melhor_tempos)
     
-    print(f"       📊 VALORES FINAIS CALCULADOS:")
+    log.info("       📊 VALORES FINAIS CALCULADOS:")
     for i in range(3):
-        print(f"         Leitura {i+1}:")
-        print(f"           Pulsos: {int(pulsos_ajustados_finais[i])}")
-        print(f"           Tempo: {float(melhor_tempos[i])} s")
-        print(f"           Leitura: {float(leituras_ajustadas_finais[i])} L")
+        log.debug("         Leitura %s:", i+1)
+        log.debug("           Pulsos: %s", int(pulsos_ajustados_finais[i]))
+        log.debug("           Tempo: %s s", float(melhor_tempos[i]))
+        log.debug("           Leitura: %s L", float(leituras_ajustadas_finais[i]))
     
     # Prepara resultado final
     resultado = {
@@ -2141,150 +2275,126 @@ def main():
     """Função principal que executa todos os passos conforme documentação"""
     arquivo_excel = "correto/SAN-038-25-09.xlsx"
     
-    print("=== AJUSTADOR DE TEMPO DE COLETA - IMPLEMENTAÇÃO CONFORME DOCUMENTAÇÃO ===")
-    print("Implementa exatamente a lógica especificada na documentação")
-    print("CONFIGURAÇÃO ESPECIAL: Otimização individual para cada ponto")
-    print("Preserva valores sagrados: Vazão Média, Tendência e Desvio Padrão")
-    print("Usa precisão Decimal de 28 dígitos")
+    log.info("=== AJUSTADOR DE TEMPO DE COLETA - IMPLEMENTAÇÃO CONFORME DOCUMENTAÇÃO ===")
+    log.info("Implementa exatamente a lógica especificada na documentação")
+    log.info("CONFIGURAÇÃO ESPECIAL: Otimização individual para cada ponto")
+    log.info("Preserva valores sagrados: Vazão Média, Tendência e Desvio Padrão")
+    log.info("Usa precisão Decimal de 28 dígitos")
     
     # PASSO 1: Extração de Dados
-    dados_originais = extrair_dados_originais(arquivo_excel)
+    with cronometrar('extracao'):
+        dados_originais = extrair_dados_originais(arquivo_excel)
     
     if not dados_originais:
-        print("❌ Falha na extração dos dados originais")
+        log.error("❌ Falha na extração dos dados originais")
         return
     
-    print(f"\n✅ PASSO 1 CONCLUÍDO: {len(dados_originais)} pontos extraídos")
+    log.info("\n✅ PASSO 1 CONCLUÍDO: %s pontos extraídos", len(dados_originais))
     
     # PASSO 1.5: Extração de Constantes e Cálculo dos Valores do Certificado
-    constantes = extrair_constantes_calculo(arquivo_excel)
+    with cronometrar('leitura_constantes'):
+        constantes = extrair_constantes_calculo(arquivo_excel)
     if not constantes:
-        print("❌ Falha na extração das constantes")
+        log.error("❌ Falha na extração das constantes")
         return
     
     valores_certificado_originais = calcular_valores_certificado(dados_originais, constantes)
-    print(f"\n✅ PASSO 1.5 CONCLUÍDO: Valores do certificado calculados")
+    log.info("\n✅ PASSO 1.5 CONCLUÍDO: Valores do certificado calculados")
     
     # PASSO 2: Harmonização dos Tempos de Coleta
-    dados_harmonizados = harmonizar_tempos_coleta(dados_originais, constantes, valores_certificado_originais)
+    with cronometrar('harmonizacao'):
+        dados_harmonizados = harmonizar_tempos_coleta(dados_originais, constantes, valores_certificado_originais)
     
-    print(f"\n✅ PASSO 2 CONCLUÍDO: Tempos harmonizados")
+    log.info("\n✅ PASSO 2 CONCLUÍDO: Tempos harmonizados")
     
     # PASSO 3: Aplicação do Ajuste Proporcional
-    dados_ajustados = aplicar_ajuste_proporcional(dados_harmonizados, constantes, valores_certificado_originais)
+    with cronometrar('ajuste_proporcional'):
+        dados_ajustados = aplicar_ajuste_proporcional(dados_harmonizados, constantes, valores_certificado_originais)
     
-    print(f"\n✅ PASSO 3 CONCLUÍDO: Ajuste proporcional aplicado")
+    log.info("\n✅ PASSO 3 CONCLUÍDO: Ajuste proporcional aplicado")
     
-    # NOVA VERIFICAÇÃO: Verificação individual de cada ponto
-    print(f"\n🔍 NOVA VERIFICAÇÃO INDIVIDUAL DE CADA PONTO")
-    print("=" * 80)
+    # VERIFICAÇÃO CONSOLIDADA: grandezas calculadas uma vez por ponto, todas as verificações sobre elas
+    with cronometrar('verificacao'):
+        verificacao = verificar_certificado_consolidado(dados_ajustados, constantes, valores_certificado_originais)
     
-    resultados_verificacao = {}
-    score_total = 0
     num_pontos = len(dados_ajustados)
+    score_medio = verificacao.score_medio
     
-    for ponto_key in dados_ajustados.keys():
-        print(f"\n{'='*80}")
-        resultado_verificacao = verificar_otimizacao_individual_ponto(
-            dados_ajustados, 
-            constantes, 
-            valores_certificado_originais, 
-            ponto_key
-        )
-        resultados_verificacao[ponto_key] = resultado_verificacao
-        score_total += resultado_verificacao['score_percentual']
-    
-    # Calcula score médio geral
-    score_medio = score_total / num_pontos
-    
-    print(f"\n{'='*80}")
-    print(f"📊 RESUMO GERAL DA OTIMIZAÇÃO")
-    print(f"{'='*80}")
-    print(f"   Pontos processados: {num_pontos}")
-    print(f"   Score médio geral: {float(score_medio)}%")
-    
-    # Mostra resultados por ponto
-    print(f"\n   📋 RESULTADOS POR PONTO:")
-    for ponto_key, resultado in resultados_verificacao.items():
-        print(f"     {ponto_key}: {float(resultado['score_percentual'])}% ({resultado['score']}/4)")
+    log.info("\n%s", '='*80)
+    log.info("📊 RESUMO GERAL DA OTIMIZAÇÃO")
+    log.info("%s", '='*80)
+    log.info("   Pontos processados: %s", num_pontos)
+    log.info("   Score médio geral: %s%%", float(score_medio))
     
     # Avalia qualidade geral
     if score_medio >= 75:
-        print(f"\n   🎉 OTIMIZAÇÃO GERAL EXCELENTE!")
+        log.info("\n   🎉 OTIMIZAÇÃO GERAL EXCELENTE!")
         verificacao_geral_passed = True
     elif score_medio >= 50:
-        print(f"\n   ✅ OTIMIZAÇÃO GERAL BOA")
+        log.info("\n   ✅ OTIMIZAÇÃO GERAL BOA")
         verificacao_geral_passed = True
     else:
-        print(f"\n   ⚠️  OTIMIZAÇÃO GERAL PRECISA MELHORAR")
+        log.warning("\n   ⚠️  OTIMIZAÇÃO GERAL PRECISA MELHORAR")
         verificacao_geral_passed = False
     
-    # PASSO 4: Verificação dos Valores Sagrados (mantém a verificação original)
-    verificacao_passed = verificar_valores_sagrados(dados_ajustados)
+    # PASSO 4: Verificação dos Valores Sagrados
+    verificacao_passed = verificacao.aprovado('valores_sagrados')
     
     if verificacao_passed:
-        print(f"\n✅ PASSO 4 CONCLUÍDO: Valores sagrados preservados")
+        log.info("\n✅ PASSO 4 CONCLUÍDO: Valores sagrados preservados")
         
-        # NOVA VERIFICAÇÃO DE PRECISÃO
-        print(f"\n🔍 NOVA VERIFICAÇÃO DE PRECISÃO")
-        verificacao_precisao_passed = verificar_precisao(dados_ajustados, constantes, valores_certificado_originais)
+        verificacao_precisao_passed = verificacao.aprovado('precisao')
         
         if verificacao_precisao_passed:
-            print(f"\n✅ NOVA VERIFICAÇÃO PASSOU: Precisão excelente alcançada")
+            log.info("\n✅ NOVA VERIFICAÇÃO PASSOU: Precisão excelente alcançada")
         else:
-            print(f"\n❌ NOVA VERIFICAÇÃO FALHOU: Precisão insuficiente")
-        
-        # VERIFICAÇÃO DETALHADA DOS VALORES DO CERTIFICADO
-        print(f"\n🔍 VERIFICAÇÃO DETALHADA DOS VALORES DO CERTIFICADO")
-        verificar_valores_certificado_detalhado(dados_ajustados, constantes, valores_certificado_originais)
-        
-        # VERIFICAÇÃO ESPECÍFICA DA FÓRMULA MÉDIA DO MEDIDOR
-        verificar_formula_media_medidor(dados_ajustados, valores_certificado_originais)
+            log.error("\n❌ NOVA VERIFICAÇÃO FALHOU: Precisão insuficiente")
         
         # PASSO 5: Geração da Planilha Corrigida
-        arquivo_corrigido = gerar_planilha_corrigida(dados_ajustados, arquivo_excel)
+        with cronometrar('gravacao_planilha'):
+            arquivo_corrigido = gerar_planilha_corrigida(dados_ajustados, arquivo_excel)
         
-        print(f"\n✅ PASSO 5 CONCLUÍDO: Planilha corrigida gerada")
+        log.info("\n✅ PASSO 5 CONCLUÍDO: Planilha corrigida gerada")
         gerar_relatorio_final(dados_originais, dados_harmonizados, dados_ajustados, verificacao_passed, arquivo_corrigido)
         
-        print(f"\n🎉 PROCESSO CONCLUÍDO COM SUCESSO!")
-        print(f"   ✅ Todos os passos executados conforme documentação")
-        print(f"   ✅ Otimização individual aplicada para cada ponto")
-        print(f"   ✅ Score médio geral: {float(score_medio)}%")
+        log.info("\n🎉 PROCESSO CONCLUÍDO COM SUCESSO!")
+        log.info("   ✅ Todos os passos executados conforme documentação")
+        log.info("   ✅ Otimização individual aplicada para cada ponto")
+        log.info("   ✅ Score médio geral: %s%%", float(score_medio))
         if verificacao_geral_passed:
-            print(f"   ✅ Otimização geral considerada satisfatória")
+            log.info("   ✅ Otimização geral considerada satisfatória")
         else:
-            print(f"   ⚠️  Otimização geral precisa de refinamento")
+            log.warning("   ⚠️  Otimização geral precisa de refinamento")
         if verificacao_precisao_passed:
-            print(f"   ✅ Nova otimização alcançou precisão excelente")
+            log.info("   ✅ Nova otimização alcançou precisão excelente")
         else:
-            print(f"   ⚠️  Nova otimização precisa de refinamento")
-        print(f"   ✅ Planilha corrigida: {arquivo_corrigido}")
-        print(f"   ✅ Relatórios gerados com sucesso")
+            log.warning("   ⚠️  Nova otimização precisa de refinamento")
+        log.info("   ✅ Planilha corrigida: %s", arquivo_corrigido)
+        log.info("   ✅ Relatórios gerados com sucesso")
         
         # Gerar JSON com valores originais vs corrigidos do certificado
         nome_arquivo_json = gerar_json_comparativo_valores_certificado(dados_originais, dados_ajustados, valores_certificado_originais, constantes)
         
-        print(f"\n🎉 PROCESSO CONCLUÍDO COM SUCESSO!")
-        print(f"   ✅ Todos os passos executados conforme documentação")
-        print(f"   ✅ Otimização individual aplicada para cada ponto")
-        print(f"   ✅ Score médio geral: {float(score_medio)}%")
+        log.info("\n🎉 PROCESSO CONCLUÍDO COM SUCESSO!")
+        log.info("   ✅ Todos os passos executados conforme documentação")
+        log.info("   ✅ Otimização individual aplicada para cada ponto")
+        log.info("   ✅ Score médio geral: %s%%", float(score_medio))
         if verificacao_geral_passed:
-            print(f"   ✅ Otimização geral considerada satisfatória")
+            log.info("   ✅ Otimização geral considerada satisfatória")
         else:
-            print(f"   ⚠️  Otimização geral precisa de refinamento")
+            log.warning("   ⚠️  Otimização geral precisa de refinamento")
         if verificacao_precisao_passed:
-            print(f"   ✅ Nova otimização alcançou precisão excelente")
+            log.info("   ✅ Nova otimização alcançou precisão excelente")
         else:
-            print(f"   ⚠️  Nova otimização precisa de refinamento")
-        print(f"   ✅ Planilha corrigida: {arquivo_corrigido}")
-        print(f"   ✅ Relatórios gerados com sucesso")
-        print(f"   ✅ JSON comparativo: {nome_arquivo_json}")
+            log.warning("   ⚠️  Nova otimização precisa de refinamento")
+        log.info("   ✅ Planilha corrigida: %s", arquivo_corrigido)
+        log.info("   ✅ Relatórios gerados com sucesso")
+        log.info("   ✅ JSON comparativo: %s", nome_arquivo_json)
         
     else:
-        print(f"\n❌ PASSO 4 FALHOU: Valores sagrados foram alterados")
-        print(f"   ⚠️  Revisar implementação do ajuste proporcional")
-        print(f"   ⚠️  Verificar lógica de preservação dos valores")
+        log.error("\n❌ PASSO 4 FALHOU: Valores sagrados foram alterados")
+        log.warning("   ⚠️  Revisar implementação do ajuste proporcional")
+        log.warning("   ⚠️  Verificar lógica de preservação dos valores")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
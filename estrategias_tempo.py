@@ -0,0 +1,215 @@
+# -*- coding: utf-8 -*-
+"""
+Estratégias de Tempo Alvo
+Cada estratégia declara o tempo nominal de coleta (240 s, 360 s, ...), os limites,
+as casas decimais do refinamento e a regra de desempate. As restrições (grades,
+limites, grades já filtradas por direção) são compiladas uma única vez por estratégia
+e compartilhadas pelo otimizador, pelo refinamento híbrido e pelo ultra-preciso
+
+Uso:
+    restricoes = compilar_estrategia('360')      # ou None: variável TEMPO_ALVO (padrão 240)
+    restricoes.grades('INCREMENTAR')             # (principais, fallback, rejeitados)
+"""
+
+from dataclasses import dataclass, asdict
+from decimal import Decimal, getcontext
+from functools import lru_cache
+import os
+
+from registro_log import obter_logger
+
+# Configurar precisão alta
+getcontext().prec = 28
+
+log = obter_logger(__name__)
+
+# Variável de ambiente com a estratégia padrão (herdada pelos processos de trabalho)
+VARIAVEL_AMBIENTE = 'TEMPO_ALVO'
+ESTRATEGIA_PADRAO = '240'
+
+DESEMPATES = ('primeiro', 'mais_proximo_nominal')
+
+QUANTIZACAO_GRADE = Decimal('0.000001')
+
+
+@dataclass(frozen=True)
+class EstrategiaTempo:
+    """
+    Tempo nominal de coleta e as regras da busca em volta dele
+    Os desvios são relativos ao nominal, então qualquer nominal herda as mesmas regras
+    """
+    nome: str
+    tempo_nominal: Decimal
+    # Grade principal: nominal ± janela_principal (sem o próprio nominal)
+    janela_principal: Decimal = Decimal('0.2')
+    # Grade de fallback: de nominal - janela_fallback até a grade principal
+    janela_fallback: Decimal = Decimal('0.4')
+    passo_grade: Decimal = Decimal('0.001')
+    # Regra de validade dos tempos: [nominal - desvio_inferior, nominal + desvio_superior]
+    desvio_inferior: Decimal = Decimal('0.401')
+    desvio_superior: Decimal = Decimal('0.499')
+    # Teto do refinamento ultra-preciso (o piso é o início da grade de fallback)
+    desvio_ultra_superior: Decimal = Decimal('0.49')
+    # Casas decimais do refinamento ultra-preciso (incremento = 10^-casas)
+    casas_decimais: int = 5
+    # Máximo de incrementos ultra-precisos para baixo e para cima
+    passos_ultra: tuple = (6000, 1000)
+    # Faixa do ajustador de tempos de coleta (correto/): nominal ± janela_ajuste
+    janela_ajuste: Decimal = Decimal('0.4')
+    # 'primeiro': mantém o primeiro candidato entre os de mesma diferença
+    # 'mais_proximo_nominal': entre os de mesma diferença, o mais próximo do nominal
+    desempate: str = 'primeiro'
+
+    def __post_init__(self):
+        if self.desempate not in DESEMPATES:
+            raise ValueError(f"desempate inválido: {self.desempate!r} (use {', '.join(DESEMPATES)})")
+        if self.tempo_nominal <= self.janela_fallback:
+            raise ValueError(f"tempo nominal muito pequeno: {self.tempo_nominal}")
+
+    def para_dicionario(self):
+        return {chave: (str(valor) if isinstance(valor, Decimal) else valor)
+                for chave, valor in asdict(self).items()}
+
+
+class RestricoesTempo:
+    """
+    Restrições compiladas de uma estratégia (somente leitura, uma instância por processo)
+    """
+
+    def __init__(self, estrategia):
+        self.estrategia = estrategia
+        nominal = estrategia.tempo_nominal
+        self.tempo_nominal = nominal
+
+        self.limite_inferior = nominal - estrategia.desvio_inferior
+        self.limite_superior = nominal + estrategia.desvio_superior
+        # Comparações em float dos otimizadores antigos
+        self.limites_float = (float(self.limite_inferior), float(self.limite_superior))
+
+        self.incremento_ultra = Decimal(1).scaleb(-estrategia.casas_decimais)
+        self.piso_ultra = nominal - estrategia.janela_fallback
+        self.teto_ultra = nominal + estrategia.desvio_ultra_superior
+        self.passos_ultra = estrategia.passos_ultra
+
+        self.faixa_ajuste = (nominal - estrategia.janela_ajuste, nominal + estrategia.janela_ajuste)
+
+        self.principais, self.fallback = _gerar_grades(estrategia)
+        self.base = tuple(sorted(self.principais + self.fallback))
+
+        # Grades já filtradas por direção do refinamento híbrido (e quantos valores ficaram de fora)
+        total = len(self.principais) + len(self.fallback)
+        self._grades = {}
+        for direcao, manter in (('INCREMENTAR', lambda v: v < nominal), ('DECREMENTAR', lambda v: v > nominal)):
+            principais = tuple(v for v in self.principais if manter(v))
+            fallback = tuple(v for v in self.fallback if manter(v))
+            self._grades[direcao] = (principais, fallback, total - len(principais) - len(fallback))
+
+        # Tempos de partida em volta do nominal (passo de 0.005)
+        passo_inicial = Decimal('0.005')
+        self.tempos_iniciais = tuple(nominal - Decimal('0.010') + passo_inicial * i for i in range(105))
+
+        self.desempatar = _REGRAS_DESEMPATE[estrategia.desempate](nominal)
+
+        # Identifica a estratégia nas chaves do cache de soluções
+        self.assinatura = estrategia.para_dicionario()
+
+    def grades(self, direcao_refinamento):
+        """
+        (principais, fallback, rejeitados) para a direção: INCREMENTAR usa os tempos
+        abaixo do nominal, DECREMENTAR os acima
+        """
+        return self._grades['INCREMENTAR' if direcao_refinamento == 'INCREMENTAR' else 'DECREMENTAR']
+
+    def dentro_dos_limites(self, tempo):
+        return self.limite_inferior <= tempo <= self.limite_superior
+
+
+def _gerar_grades(estrategia):
+    nominal = estrategia.tempo_nominal
+    passo = float(estrategia.passo_grade)
+    quantidade = int(estrategia.janela_principal / estrategia.passo_grade)
+    quantidade_fallback = int((estrategia.janela_fallback - estrategia.janela_principal) / estrategia.passo_grade)
+
+    def faixa(inicio, n):
+        inicio = inicio.quantize(QUANTIZACAO_GRADE)
+        # Mesma construção (passo em float) da grade original de 240 s: as soluções não mudam
+        return tuple(inicio + Decimal(str(i * passo)) for i in range(n))
+
+    principais = (faixa(nominal - estrategia.janela_principal, quantidade)
+                  + faixa(nominal + estrategia.passo_grade, quantidade))
+    fallback = faixa(nominal - estrategia.janela_fallback, quantidade_fallback)
+    return principais, fallback
+
+
+def _desempate_primeiro(nominal):
+    return None
+
+
+def _desempate_mais_proximo(nominal):
+    def desempatar(candidato, atual):
+        return abs(candidato - nominal) < abs(atual - nominal)
+    return desempatar
+
+
+_REGRAS_DESEMPATE = {
+    'primeiro': _desempate_primeiro,
+    'mais_proximo_nominal': _desempate_mais_proximo,
+}
+
+
+ESTRATEGIAS = {}
+
+
+def registrar_estrategia(estrategia):
+    """
+    Registra (ou substitui) uma estratégia pelo nome
+    """
+    ESTRATEGIAS[estrategia.nome] = estrategia
+    return estrategia
+
+
+registrar_estrategia(EstrategiaTempo('240', Decimal('240')))
+registrar_estrategia(EstrategiaTempo('360', Decimal('360')))
+
+
+def obter_estrategia(estrategia=None):
+    """
+    EstrategiaTempo pelo nome, pelo tempo nominal ou a própria instância
+    None usa a variável TEMPO_ALVO (padrão 240); um nominal não registrado
+    gera uma estratégia com as regras padrão em volta dele
+    """
+    if isinstance(estrategia, EstrategiaTempo):
+        return estrategia
+    if estrategia is None:
+        estrategia = os.environ.get(VARIAVEL_AMBIENTE) or ESTRATEGIA_PADRAO
+    nome = str(estrategia).strip()
+    if nome in ESTRATEGIAS:
+        return ESTRATEGIAS[nome]
+    try:
+        nominal = Decimal(nome)
+    except ArithmeticError:
+        raise ValueError(f"estratégia de tempo desconhecida: {nome!r}") from None
+    if not nominal.is_finite() or nominal <= 0:
+        raise ValueError(f"tempo alvo inválido: {nome!r}")
+    nome_normalizado = format(nominal.normalize(), 'f')
+    if nome_normalizado in ESTRATEGIAS:
+        return ESTRATEGIAS[nome_normalizado]
+    return EstrategiaTempo(nome_normalizado, nominal)
+
+
+@lru_cache(maxsize=None)
+def _compilar(estrategia):
+    restricoes = RestricoesTempo(estrategia)
+    log.debug("✅ Estratégia %s compilada: %s valores na grade (%.6f a %.6f), limites %.3f-%.3f",
+              estrategia.nome, len(restricoes.base), restricoes.base[0], restricoes.base[-1],
+              restricoes.limite_inferior, restricoes.limite_superior)
+    return restricoes
+
+
+def compilar_estrategia(estrategia=None):
+    """
+    Restrições compiladas da estratégia (uma vez por processo e estratégia)
+    """
+    if isinstance(estrategia, RestricoesTempo):
+        return estrategia
+    return _compilar(obter_estrategia(estrategia))
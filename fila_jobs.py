@@ -0,0 +1,417 @@
+# -*- coding: utf-8 -*-
+"""
+Fila Persistente de Jobs para Lotes Grandes
+Cada planilha do lote é um job num banco SQLite da pasta de resultados
+(fila_jobs.sqlite3), com estado, tentativas e tempos:
+
+    pendente → executando → concluido
+                          ↘ pendente (nova tentativa) → ... → falho
+
+    • os processos de trabalho reivindicam jobs com um único UPDATE atômico,
+      então vários processos (ou vários comandos "queue work") dividem a fila
+      sem processar a mesma planilha duas vezes;
+    • se o lote cair no meio, rodar o mesmo comando de novo retoma de onde
+      parou: jobs concluídos não são refeitos e jobs de processos que
+      morreram voltam para a fila;
+    • cada job em execução tem uma concessão (expira_em) que o processo de
+      trabalho renova periodicamente; job com a concessão vencida é de um
+      processo que morreu e volta para a fila - sem sondar PIDs, o que
+      funciona igual no Windows e entre máquinas;
+    • "queue status" mostra os estados, a vazão e a estimativa de término,
+      inclusive com o lote em execução.
+
+Cada planilha é processada por processamento_lote.processar_certificado, com
+as mesmas saídas do lote comum; o resumo de cada job fica gravado no banco
+"""
+
+from decimal import getcontext
+from datetime import datetime
+import json
+import multiprocessing
+import os
+import socket
+import sqlite3
+import threading
+import time
+
+from processamento_lote import listar_planilhas, processar_certificado
+
+# Configurar precisão alta
+getcontext().prec = 28
+
+ARQUIVO_FILA = 'fila_jobs.sqlite3'
+
+PENDENTE = 'pendente'
+EXECUTANDO = 'executando'
+CONCLUIDO = 'concluido'
+FALHO = 'falho'
+ESTADOS = (PENDENTE, EXECUTANDO, CONCLUIDO, FALHO)
+
+# Tentativas por planilha antes de marcar o job como falho
+MAX_TENTATIVAS = 3
+
+# Validade da concessão de um job em execução e intervalo de renovação pelo trabalhador (s)
+TEMPO_CONCESSAO = 120
+INTERVALO_RENOVACAO = 30
+
+# Jobs em execução sem concessão (bancos anteriores a ela) são abandonados após esse tempo (s)
+TEMPO_ABANDONO = 3600
+
+# Janela usada no cálculo da vazão (s)
+JANELA_VAZAO = 600
+
+# Intervalo entre as atualizações do andamento no terminal (s)
+INTERVALO_ANDAMENTO = 5
+
+
+def caminho_fila(pasta_saida):
+    return os.path.join(pasta_saida, ARQUIVO_FILA)
+
+
+def identificar_trabalhador():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class FilaJobs:
+    """
+    Fila de jobs de um lote
+    Uso:
+        with FilaJobs(caminho_fila(pasta_saida)) as fila:
+            fila.enfileirar(planilhas, pasta_saida)
+            job = fila.reivindicar()
+    """
+
+    def __init__(self, caminho, max_tentativas=MAX_TENTATIVAS):
+        self.caminho = caminho
+        self.max_tentativas = max_tentativas
+
+        pasta = os.path.dirname(caminho)
+        if pasta:
+            os.makedirs(pasta, exist_ok=True)
+        # Vários processos escrevem no banco: espera o bloqueio em vez de falhar
+        self._conexao = sqlite3.connect(caminho, timeout=60)
+        self._conexao.row_factory = sqlite3.Row
+        self._conexao.execute('PRAGMA journal_mode=WAL')
+        self._conexao.execute(
+            'CREATE TABLE IF NOT EXISTS jobs ('
+            ' id INTEGER PRIMARY KEY, arquivo TEXT NOT NULL UNIQUE, pasta_saida TEXT NOT NULL,'
+            ' opcoes TEXT NOT NULL, estado TEXT NOT NULL, tentativas INTEGER NOT NULL DEFAULT 0,'
+            ' trabalhador TEXT, criado REAL NOT NULL, iniciado REAL, concluido REAL, duracao REAL,'
+            ' erro TEXT, resumo TEXT)'
+        )
+        colunas = {linha['name'] for linha in self._conexao.execute('PRAGMA table_info(jobs)')}
+        if 'expira_em' not in colunas:
+            self._conexao.execute('ALTER TABLE jobs ADD COLUMN expira_em REAL')
+        self._conexao.execute('CREATE INDEX IF NOT EXISTS jobs_estado ON jobs (estado, id)')
+
+    def enfileirar(self, planilhas, pasta_saida, checkpoints=False, log_jsonl=False):
+        """
+        Inclui as planilhas ainda não enfileiradas; retorna quantas foram incluídas
+        """
+        opcoes = json.dumps({'checkpoints': checkpoints, 'log_jsonl': log_jsonl})
+        agora = time.time()
+        with self._conexao:
+            return self._conexao.executemany(
+                'INSERT OR IGNORE INTO jobs (arquivo, pasta_saida, opcoes, estado, criado) VALUES (?, ?, ?, ?, ?)',
+                [(os.path.abspath(p), pasta_saida, opcoes, PENDENTE, agora) for p in planilhas]
+            ).rowcount
+
+    def reivindicar(self, trabalhador=None, tempo_concessao=TEMPO_CONCESSAO):
+        """
+        Passa o próximo job pendente para 'executando' e o retorna (dict), ou None se não houver
+        """
+        agora = time.time()
+        with self._conexao:
+            linha = self._conexao.execute(
+                'UPDATE jobs SET estado = ?, tentativas = tentativas + 1, trabalhador = ?, iniciado = ?,'
+                ' expira_em = ?, concluido = NULL, duracao = NULL'
+                ' WHERE id = (SELECT id FROM jobs WHERE estado = ? ORDER BY id LIMIT 1)'
+                ' RETURNING id, arquivo, pasta_saida, opcoes, tentativas',
+                (EXECUTANDO, trabalhador or identificar_trabalhador(), agora, agora + tempo_concessao, PENDENTE)
+            ).fetchone()
+        if linha is None:
+            return None
+        job = dict(linha)
+        job['opcoes'] = json.loads(job['opcoes'])
+        return job
+
+    def renovar(self, job_id, trabalhador, tempo_concessao=TEMPO_CONCESSAO):
+        """
+        Estende a concessão do job enquanto ele continua com este trabalhador
+        Retorna False se o job já foi recuperado por outro processo
+        """
+        with self._conexao:
+            return self._conexao.execute(
+                'UPDATE jobs SET expira_em = ? WHERE id = ? AND estado = ? AND trabalhador = ?',
+                (time.time() + tempo_concessao, job_id, EXECUTANDO, trabalhador)
+            ).rowcount == 1
+
+    def concluir(self, job_id, resumo):
+        agora = time.time()
+        with self._conexao:
+            self._conexao.execute(
+                'UPDATE jobs SET estado = ?, concluido = ?, duracao = ? - iniciado, erro = NULL, resumo = ?'
+                ' WHERE id = ?',
+                (CONCLUIDO, agora, agora, json.dumps(resumo, ensure_ascii=False, default=str), job_id)
+            )
+
+    def falhar(self, job_id, erro, resumo=None):
+        """
+        Devolve o job para a fila ou, esgotadas as tentativas, marca como falho
+        Retorna o novo estado
+        """
+        agora = time.time()
+        with self._conexao:
+            self._conexao.execute(
+                'UPDATE jobs SET estado = CASE WHEN tentativas >= ? THEN ? ELSE ? END,'
+                ' concluido = ?, duracao = ? - iniciado, erro = ?, resumo = ? WHERE id = ?',
+                (self.max_tentativas, FALHO, PENDENTE, agora, agora, erro,
+                 json.dumps(resumo, ensure_ascii=False, default=str) if resumo else None, job_id)
+            )
+            return self._conexao.execute('SELECT estado FROM jobs WHERE id = ?', (job_id,)).fetchone()[0]
+
+    def recuperar_abandonados(self, trabalhadores=(), tempo_abandono=TEMPO_ABANDONO):
+        """
+        Jobs em execução cuja concessão venceu voltam para a fila (contam como tentativa)
+        Os jobs de 'trabalhadores' (processos que já terminaram) voltam sem esperar a concessão
+        """
+        trabalhadores = list(trabalhadores)
+        marcadores = ', '.join('?' * len(trabalhadores)) or 'NULL'
+        abandonados = [linha[0] for linha in self._conexao.execute(
+            'SELECT id FROM jobs WHERE estado = ?'
+            f' AND (COALESCE(expira_em, iniciado + ?) < ? OR trabalhador IN ({marcadores}))',
+            (EXECUTANDO, tempo_abandono, time.time(), *trabalhadores))]
+
+        for job_id in abandonados:
+            self.falhar(job_id, "processo de trabalho interrompido")
+        return len(abandonados)
+
+    def repetir_falhos(self):
+        """
+        Devolve os jobs falhos para a fila com as tentativas zeradas
+        """
+        with self._conexao:
+            return self._conexao.execute(
+                'UPDATE jobs SET estado = ?, tentativas = 0 WHERE estado = ?', (PENDENTE, FALHO)
+            ).rowcount
+
+    def contagens(self):
+        contagens = dict.fromkeys(ESTADOS, 0)
+        for estado, quantidade in self._conexao.execute('SELECT estado, COUNT(*) FROM jobs GROUP BY estado'):
+            contagens[estado] = quantidade
+        return contagens
+
+    def estado(self, janela=JANELA_VAZAO):
+        """
+        Contagens por estado, vazão (planilhas/min) na janela recente e estimativa de término
+        """
+        contagens = self.contagens()
+        agora = time.time()
+        finalizados = [linha[0] for linha in self._conexao.execute(
+            'SELECT concluido FROM jobs WHERE estado IN (?, ?) AND concluido IS NOT NULL', (CONCLUIDO, FALHO))]
+        primeiro_inicio = self._conexao.execute(
+            'SELECT MIN(iniciado) FROM jobs WHERE iniciado IS NOT NULL').fetchone()[0]
+        duracao_media = self._conexao.execute(
+            'SELECT AVG(duracao) FROM jobs WHERE estado = ?', (CONCLUIDO,)).fetchone()[0]
+
+        vazao = None
+        if finalizados and primeiro_inicio is not None:
+            inicio_janela = max(agora - janela, primeiro_inicio)
+            recentes = sum(1 for t in finalizados if t >= inicio_janela)
+            if recentes:
+                vazao = recentes / max(agora - inicio_janela, 1e-9) * 60
+
+        restantes = contagens[PENDENTE] + contagens[EXECUTANDO]
+        return {
+            'total': sum(contagens.values()),
+            'estados': contagens,
+            'restantes': restantes,
+            'vazao_por_minuto': round(vazao, 3) if vazao else None,
+            'duracao_media': round(duracao_media, 3) if duracao_media is not None else None,
+            'eta_segundos': round(restantes / vazao * 60, 1) if vazao and restantes else (0 if not restantes else None),
+            'trabalhadores': [linha[0] for linha in self._conexao.execute(
+                'SELECT DISTINCT trabalhador FROM jobs WHERE estado = ?', (EXECUTANDO,))],
+        }
+
+    def resumos(self):
+        """
+        Resumo de cada job finalizado (formato de processar_certificado), em ordem de arquivo
+        """
+        resultados = []
+        for linha in self._conexao.execute(
+                'SELECT arquivo, estado, tentativas, erro, resumo FROM jobs WHERE estado IN (?, ?) ORDER BY arquivo',
+                (CONCLUIDO, FALHO)):
+            resumo = json.loads(linha['resumo']) if linha['resumo'] else {'arquivo': linha['arquivo'], 'status': 'erro'}
+            if linha['estado'] == FALHO:
+                resumo['status'] = 'erro'
+                resumo['erro'] = linha['erro']
+            resumo['tentativas'] = linha['tentativas']
+            resultados.append(resumo)
+        return resultados
+
+    def fechar(self):
+        self._conexao.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo, valor, rastreamento):
+        self.fechar()
+        return False
+
+
+def _renovar_concessao(arquivo_fila, job_id, trabalhador, parar, intervalo=INTERVALO_RENOVACAO):
+    """
+    Renova a concessão do job até 'parar' ser sinalizado (roda numa thread, com conexão própria)
+    """
+    with FilaJobs(arquivo_fila) as fila:
+        while not parar.wait(intervalo):
+            if not fila.renovar(job_id, trabalhador):
+                return
+
+
+def trabalhar(arquivo_fila, max_tentativas=MAX_TENTATIVAS):
+    """
+    Processa jobs da fila até ela esvaziar; retorna o número de jobs processados
+    Pode rodar em vários processos ao mesmo tempo sobre o mesmo banco
+    """
+    processados = 0
+    trabalhador = identificar_trabalhador()
+    with FilaJobs(arquivo_fila, max_tentativas) as fila:
+        while True:
+            job = fila.reivindicar(trabalhador)
+            if job is None:
+                return processados
+
+            parar_renovacao = threading.Event()
+            renovacao = threading.Thread(target=_renovar_concessao, daemon=True,
+                                         args=(arquivo_fila, job['id'], trabalhador, parar_renovacao))
+            renovacao.start()
+            try:
+                resumo = processar_certificado(job['arquivo'], job['pasta_saida'],
+                                               job['opcoes'].get('checkpoints', False),
+                                               job['opcoes'].get('log_jsonl', False))
+            except Exception as e:
+                resumo = {'arquivo': job['arquivo'], 'status': 'erro', 'erro': f"{type(e).__name__}: {e}"}
+            finally:
+                parar_renovacao.set()
+                renovacao.join()
+
+            nome = os.path.basename(job['arquivo'])
+            if resumo['status'] == 'erro':
+                estado = fila.falhar(job['id'], resumo.get('erro'), resumo)
+                print(f"   ❌ {nome} (tentativa {job['tentativas']}): {resumo.get('erro')}"
+                      f"{' - falho' if estado == FALHO else ' - volta para a fila'}", flush=True)
+            else:
+                fila.concluir(job['id'], resumo)
+                simbolo = '✅' if resumo['status'] == 'aprovado' else '⚠️ '
+                print(f"   {simbolo} {nome}: {resumo['pontos_aprovados']}/{resumo['pontos']} pontos aprovados"
+                      f" ({resumo['tempo_total']:.1f} s)", flush=True)
+            processados += 1
+
+
+def formatar_duracao(segundos):
+    if segundos is None:
+        return '—'
+    segundos = int(round(segundos))
+    horas, resto = divmod(segundos, 3600)
+    minutos, segundos = divmod(resto, 60)
+    return f"{horas}h{minutos:02d}m{segundos:02d}s" if horas else f"{minutos}m{segundos:02d}s"
+
+
+def imprimir_estado(estado, prefixo='📊 FILA'):
+    estados = estado['estados']
+    vazao = f"{estado['vazao_por_minuto']:.2f} planilhas/min" if estado['vazao_por_minuto'] else '—'
+    print(f"{prefixo}: {estado['total']} job(s) | ⏳ {estados[PENDENTE]} pendente(s) | ⚙️  {estados[EXECUTANDO]} em execução"
+          f" | ✅ {estados[CONCLUIDO]} concluído(s) | ❌ {estados[FALHO]} falho(s)")
+    print(f"   Vazão: {vazao} | duração média: {formatar_duracao(estado['duracao_media'])}"
+          f" | término estimado em: {formatar_duracao(estado['eta_segundos'])}", flush=True)
+
+
+def gravar_resumo(fila, entrada, pasta_saida, processos, tempo_total):
+    """
+    Grava resumo_lote.json (mesmo formato do lote comum) com os jobs finalizados
+    """
+    resultados = fila.resumos()
+    chave_status = {'aprovado': 'aprovadas', 'reprovado': 'reprovadas'}
+    estatisticas = {'total_planilhas': len(resultados), 'aprovadas': 0, 'reprovadas': 0, 'com_erro': 0}
+    for resumo in resultados:
+        estatisticas[chave_status.get(resumo.get('status'), 'com_erro')] += 1
+
+    consolidado = {
+        'metadata': {
+            'data_geracao': datetime.now().isoformat(),
+            'entrada': entrada,
+            'pasta_saida': pasta_saida,
+            'processos': processos,
+            'tempo_total': round(tempo_total, 3),
+            'fila': caminho_fila(pasta_saida),
+        },
+        'estatisticas': estatisticas,
+        'resultados': resultados,
+    }
+    arquivo_resumo = os.path.join(pasta_saida, 'resumo_lote.json')
+    with open(arquivo_resumo, 'w', encoding='utf-8') as f:
+        json.dump(consolidado, f, indent=2, ensure_ascii=False, default=str)
+    return arquivo_resumo, consolidado
+
+
+def executar_fila(entrada, pasta_saida='resultados_lote', max_processos=None, checkpoints=False, log_jsonl=False,
+                  max_tentativas=MAX_TENTATIVAS):
+    """
+    Enfileira as planilhas (as já enfileiradas são mantidas), recupera jobs abandonados
+    e processa a fila com vários processos; grava resumo_lote.json ao final
+    Rodar de novo com a mesma pasta de saída retoma o lote interrompido
+    """
+    planilhas = listar_planilhas(entrada) if entrada else []
+    arquivo_fila = caminho_fila(pasta_saida)
+
+    with FilaJobs(arquivo_fila, max_tentativas) as fila:
+        novos = fila.enfileirar(planilhas, pasta_saida, checkpoints, log_jsonl)
+        recuperados = fila.recuperar_abandonados()
+        contagens = fila.contagens()
+        if not sum(contagens.values()):
+            print(f"❌ Nenhuma planilha encontrada em: {entrada}")
+            return None
+
+        pendentes = contagens[PENDENTE]
+        max_processos = max(1, min(max_processos or os.cpu_count() or 1, pendentes or 1))
+        print(f"🚀 Fila {arquivo_fila}: {novos} job(s) novo(s), {recuperados} recuperado(s),"
+              f" {contagens[CONCLUIDO]} já concluído(s), {pendentes} pendente(s)")
+        if pendentes:
+            print(f"⚙️  Processando com {max_processos} processo(s)")
+
+        inicio = time.perf_counter()
+        processos = [multiprocessing.Process(target=trabalhar, args=(arquivo_fila, max_tentativas), daemon=True)
+                     for _ in range(max_processos if pendentes else 0)]
+        for processo in processos:
+            processo.start()
+        try:
+            while any(p.is_alive() for p in processos):
+                for processo in processos:
+                    processo.join(INTERVALO_ANDAMENTO / max(len(processos), 1))
+                if any(p.is_alive() for p in processos):
+                    imprimir_estado(fila.estado(), '   ⏳ Andamento')
+        except KeyboardInterrupt:
+            print("\n⏹️  Interrompido: rode o mesmo comando para retomar o lote")
+            for processo in processos:
+                processo.terminate()
+            return None
+
+        # Um processo que morreu no meio de um job deixa o job em execução
+        maquina = socket.gethostname()
+        encerrados = [f"{maquina}:{p.pid}" for p in processos]
+        if fila.recuperar_abandonados(encerrados) and fila.contagens()[PENDENTE]:
+            trabalhar(arquivo_fila, max_tentativas)
+
+        tempo_total = time.perf_counter() - inicio
+        arquivo_resumo, consolidado = gravar_resumo(fila, entrada, pasta_saida, max_processos, tempo_total)
+        print()
+        imprimir_estado(fila.estado())
+
+    estatisticas = consolidado['estatisticas']
+    print(f"   ✅ Aprovadas: {estatisticas['aprovadas']} | ⚠️  Reprovadas: {estatisticas['reprovadas']}"
+          f" | ❌ Com erro: {estatisticas['com_erro']}")
+    print(f"   ⏱️  Tempo desta execução: {tempo_total:.2f} segundos")
+    print(f"✅ Resumo consolidado salvo em: {arquivo_resumo}")
+    return consolidado
@@ -0,0 +1,480 @@
+# -*- coding: utf-8 -*-
+"""
+Harness de Regressão dos Motores de Cálculo
+Executa cada implementação do motor sobre todos os pontos de um corpus e
+compara as saídas da planilha (I54, X54, U54, I57, U57, AD57) com a
+referência Decimal exata (calcular_formulas_com_tempo_ajustado +
+calcular_agregados_com_tempo_ajustado), com tolerâncias absolutas e em ULPs
+(float64) por saída: um valor só é aprovado dentro das duas. Informa o pior
+desvio de cada motor/saída (absoluto e em ULPs) e sai com código 1 se alguma
+tolerância for violada
+
+Corpus:
+- certificado: pontos de resultados_planilha_original.json (valores do Excel,
+  também comparados com a referência como saída "dourada")
+- fixtures: todos os pontos das planilhas .xlsx do repositório
+- aleatorio: leituras aleatórias realistas geradas com semente fixa
+
+Para validar um novo motor basta registrá-lo em MOTORES
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from decimal import Decimal, InvalidOperation, getcontext, localcontext
+import argparse
+import glob
+import json
+import math
+import os
+import random
+import sys
+import time
+
+# Configurar precisão alta
+getcontext().prec = 28
+
+RAIZ_PROJETO = os.path.dirname(os.path.abspath(__file__))
+
+ARQUIVO_CERTIFICADO = os.path.join(RAIZ_PROJETO, "resultados_planilha_original.json")
+
+SAIDAS_LEITURA = ('I54', 'X54', 'U54')
+SAIDAS_AGREGADO = ('I57', 'U57', 'AD57')
+
+# Chaves do motor de referência para cada saída
+CHAVES_SAIDA = {
+    'I54': 'vazao_referencia',
+    'X54': 'vazao_medidor',
+    'U54': 'erro_percentual',
+    'I57': 'vazao_media',
+    'U57': 'tendencia',
+    'AD57': 'desvio_padrao',
+}
+
+# Tolerâncias por saída: aprovado se desvio absoluto <= 'abs' E desvio em ULPs <= 'ulp'
+# Motores Decimal com o mesmo arredondamento a 12 casas da referência: como as saídas
+# são múltiplos de 1E-12, qualquer diferença viola 'abs' (na prática, igualdade exata)
+TOLERANCIAS = {
+    'I54': {'abs': Decimal('5E-13'), 'ulp': 4},
+    'X54': {'abs': Decimal('5E-13'), 'ulp': 4},
+    'U54': {'abs': Decimal('5E-13'), 'ulp': 4},
+    'I57': {'abs': Decimal('5E-13'), 'ulp': 4},
+    'U57': {'abs': Decimal('5E-13'), 'ulp': 4},
+    'AD57': {'abs': Decimal('5E-13'), 'ulp': 4},
+}
+
+# Os motores abaixo não arredondam a 12 casas, então o desvio inclui o meio quantum
+# (5E-13) da referência. Nas saídas percentuais (U54, U57, AD57) isso vale milhões de
+# ULPs, e perto de zero o ULP encolhe sem que o desvio absoluto encolha: abaixo de
+# PISO_PERCENTUAL os ULPs são contados na escala do piso e quem decide é 'abs'.
+# Orçamentos com folga de 2 a 4x sobre o pior desvio observado (50000 casos aleatórios)
+PISO_PERCENTUAL = 1e-3
+
+# Motor legado: precisão de 15 dígitos e sem arredondamento intermediário
+TOLERANCIAS_LEGADO = {
+    'I54': {'abs': Decimal('2E-9'), 'ulp': 1024},
+    'X54': {'abs': Decimal('2E-9'), 'ulp': 1024},
+    'U54': {'abs': Decimal('1E-11'), 'ulp': 2 ** 24, 'piso': PISO_PERCENTUAL},
+    'I57': {'abs': Decimal('2E-9'), 'ulp': 512},
+    'U57': {'abs': Decimal('5E-12'), 'ulp': 2 ** 24, 'piso': PISO_PERCENTUAL},
+    # Desvio quantizado a 15 casas em cada etapa (média, soma dos quadrados, variância)
+    'AD57': {'abs': Decimal('2E-10'), 'ulp': 2 ** 30, 'piso': PISO_PERCENTUAL},
+}
+
+# Valores do Excel (float64 sem arredondamento a 12 casas) contra a referência
+TOLERANCIAS_CERTIFICADO = {
+    'I54': {'abs': Decimal('1E-10'), 'ulp': 4},
+    'X54': {'abs': Decimal('1E-10'), 'ulp': 4},
+    'U54': {'abs': Decimal('1E-12'), 'ulp': 2 ** 22, 'piso': PISO_PERCENTUAL},
+    'I57': {'abs': Decimal('1E-10'), 'ulp': 4},
+    'U57': {'abs': Decimal('1E-12'), 'ulp': 2 ** 22, 'piso': PISO_PERCENTUAL},
+    'AD57': {'abs': Decimal('2E-11'), 'ulp': 2 ** 24, 'piso': PISO_PERCENTUAL},
+}
+
+
+# ---------------------------------------------------------------------------
+# Motores
+# ---------------------------------------------------------------------------
+
+def motor_referencia(leituras, constantes, tempos):
+    """
+    Referência Decimal: todas as saídas de leitura e agregados
+    """
+    from otimizador_tempos_inteligente import calcular_formulas_com_tempo_ajustado, calcular_agregados_com_tempo_ajustado
+
+    resultados = calcular_formulas_com_tempo_ajustado(leituras, constantes, tempos)
+    agregados = calcular_agregados_com_tempo_ajustado(resultados)
+
+    saidas = {nome: [r[CHAVES_SAIDA[nome]] for r in resultados] for nome in SAIDAS_LEITURA}
+    saidas.update({nome: agregados[CHAVES_SAIDA[nome]] for nome in SAIDAS_AGREGADO})
+    return saidas
+
+
+def motor_aplicador(leituras, constantes, tempos):
+    from aplicador_tempos_gerados import calcular_vazao_com_tempos
+    return {'I57': calcular_vazao_com_tempos(leituras, constantes, tempos)}
+
+
+def motor_refinador(leituras, constantes, tempos):
+    from refinador_ultra_preciso import calcular_vazao_com_tempos
+    return {'I57': calcular_vazao_com_tempos(leituras, constantes, tempos)}
+
+
+def _modulo_legado():
+    """
+    Importa correto/ajustador_tempo_coleta.py restaurando a precisão global
+    (o módulo fixa getcontext().prec = 15 ao ser importado)
+    """
+    modulo = sys.modules.get('ajustador_tempo_coleta')
+    if modulo is None:
+        pasta = os.path.join(RAIZ_PROJETO, 'correto')
+        if pasta not in sys.path:
+            sys.path.append(pasta)
+        precisao = getcontext().prec
+        import ajustador_tempo_coleta as modulo
+        getcontext().prec = precisao
+    return modulo
+
+
+def motor_legado(leituras, constantes, tempos):
+    """
+    calcular_medicao do ajustador legado, na precisão de 15 dígitos em que roda,
+    e os agregados como o ajustador os calcula (médias e calcular_desvio_padrao_amostral)
+    """
+    legado = _modulo_legado()
+    i51 = constantes['ponto_mlp'] / Decimal('1000')
+    argumentos = (i51, constantes['constante_correcao_temp'], constantes['constante_correcao_inclinacao'],
+                  constantes['correcao_tempo_bu23'], constantes['correcao_tempo_bw23'])
+
+    saidas = {nome: [] for nome in SAIDAS_LEITURA}
+    with localcontext() as contexto:
+        contexto.prec = 15
+        for leitura, tempo in zip(leituras, tempos):
+            _, vazao_referencia, vazao_medidor, erro = legado.calcular_medicao(
+                leitura['pulsos_padrao'], tempo, leitura['leitura_medidor'], *argumentos)
+            saidas['I54'].append(vazao_referencia)
+            saidas['X54'].append(vazao_medidor)
+            saidas['U54'].append(erro)
+        quantidade = Decimal(len(leituras))
+        saidas['I57'] = sum(saidas['I54']) / quantidade
+        saidas['U57'] = sum(saidas['U54']) / quantidade
+        # O desvio legado quantiza a 15 casas com 15 dígitos: para |U54| >= 1 estoura a
+        # precisão (InvalidOperation) e o AD57 fica sem comparação nesse caso
+        try:
+            desvio_padrao = legado.calcular_desvio_padrao_amostral(saidas['U54'])
+        except InvalidOperation:
+            desvio_padrao = None
+        if desvio_padrao is not None:
+            saidas['AD57'] = desvio_padrao
+    return saidas
+
+
+# nome -> (função, tolerâncias específicas ou None para TOLERANCIAS)
+MOTORES = {
+    'aplicador_vazao': (motor_aplicador, None),
+    'refinador_vazao': (motor_refinador, None),
+    'legado_calcular_medicao': (motor_legado, TOLERANCIAS_LEGADO),
+}
+
+
+# ---------------------------------------------------------------------------
+# Corpus
+# ---------------------------------------------------------------------------
+
+def _decimal(valor):
+    return Decimal(str(valor)) if valor is not None else Decimal('0')
+
+
+def carregar_constantes_certificado(arquivo=ARQUIVO_CERTIFICADO):
+    with open(arquivo, 'r', encoding='utf-8') as f:
+        constantes = json.load(f)['constantes']
+    return {nome: valor if isinstance(valor, str) else _decimal(valor) for nome, valor in constantes.items()}
+
+
+def corpus_certificado(arquivo=ARQUIVO_CERTIFICADO):
+    """
+    Pontos do certificado original com os valores calculados pelo Excel
+    """
+    with open(arquivo, 'r', encoding='utf-8') as f:
+        dados = json.load(f)
+
+    constantes = carregar_constantes_certificado(arquivo)
+    casos = []
+    for chave, ponto in dados['pontos'].items():
+        leituras = [{
+            'linha': l['linha'],
+            'pulsos_padrao': _decimal(l['pulsos_padrao']),
+            'leitura_medidor': _decimal(l['leitura_medidor']),
+            'temperatura': _decimal(l['temperatura_bruta']),
+        } for l in ponto['leituras']]
+        esperado = {nome: [_decimal(l[CHAVES_SAIDA[nome]]) for l in ponto['leituras']] for nome in SAIDAS_LEITURA}
+        esperado.update({nome: _decimal(ponto['agregados'][CHAVES_SAIDA[nome]]) for nome in SAIDAS_AGREGADO})
+        casos.append({
+            'id': f"certificado:{chave}",
+            'constantes': constantes,
+            'leituras': leituras,
+            'tempos': [_decimal(l['tempo_coleta_bruto']) for l in ponto['leituras']],
+            'esperado': esperado,
+        })
+    return casos
+
+
+def listar_fixtures():
+    arquivos = glob.glob(os.path.join(RAIZ_PROJETO, '*.xlsx')) + glob.glob(os.path.join(RAIZ_PROJETO, 'correto', '*.xlsx'))
+    return sorted(a for a in arquivos if not os.path.basename(a).startswith('~$'))
+
+
+def corpus_fixture(arquivo):
+    """
+    Pontos de uma planilha de fixture. As fixtures guardam fórmulas sem valores
+    em cache; constantes calculadas ausentes (zero) vêm do certificado de referência
+    """
+    from otimizador_tempos_inteligente import extrair_dados_planilha_original
+
+    constantes_planilha, pontos = extrair_dados_planilha_original(arquivo)
+    if not pontos:
+        return []
+
+    constantes = carregar_constantes_certificado()
+    constantes.update({nome: valor for nome, valor in constantes_planilha.items() if valor})
+
+    nome = os.path.relpath(arquivo, RAIZ_PROJETO)
+    return [{
+        'id': f"fixture:{nome}:ponto_{ponto['numero']}",
+        'constantes': constantes,
+        'leituras': ponto['leituras'],
+        'tempos': [l['tempo_coleta'] for l in ponto['leituras']],
+    } for ponto in pontos]
+
+
+def corpus_aleatorio(quantidade, semente=20250801):
+    """
+    Leituras aleatórias realistas: vazões de 1 a 60 m³/h, tempos de 60 a 300 s,
+    medidor com erro de até ±1 %, constantes perturbadas em torno do certificado
+    """
+    gerador = random.Random(semente)
+    base = carregar_constantes_certificado()
+    casos = []
+
+    for indice in range(quantidade):
+        constantes = dict(base)
+        constantes['ponto_mlp'] = Decimal(gerador.choice(('100', '200', '500', '1000')))
+        constantes['constante_correcao_temp'] = _decimal(round(gerador.uniform(-0.05, 0.05), 14))
+        constantes['constante_correcao_inclinacao'] = _decimal(round(gerador.uniform(-1e-6, 1e-6), 20))
+        constantes['correcao_tempo_bu23'] = _decimal(round(gerador.uniform(0, 1e-4), 10))
+        constantes['correcao_tempo_bw23'] = _decimal(round(gerador.uniform(0, 0.05), 8))
+
+        pulso_lp = float(constantes['ponto_mlp']) / 1000
+        vazao = gerador.uniform(1000, 60000)                  # L/h
+        leituras, tempos = [], []
+        for k in range(3):
+            tempo = round(gerador.uniform(60, 300), 3)
+            volume = vazao * tempo / 3600
+            pulsos = max(1, round(volume / pulso_lp))
+            leituras.append({
+                'linha': 54 + k,
+                'pulsos_padrao': Decimal(pulsos),
+                'leitura_medidor': _decimal(round(volume * (1 + gerador.uniform(-0.01, 0.01)), 2)),
+                'temperatura': _decimal(round(gerador.uniform(15, 35), 1)),
+            })
+            tempos.append(_decimal(tempo))
+
+        casos.append({
+            'id': f"aleatorio:{indice}",
+            'constantes': constantes,
+            'leituras': leituras,
+            'tempos': tempos,
+        })
+    return casos
+
+
+# ---------------------------------------------------------------------------
+# Comparação
+# ---------------------------------------------------------------------------
+
+def desvio(valor, referencia, piso=0.0):
+    """
+    (desvio absoluto, desvio em ULPs do float64 da referência)
+    Abaixo de piso os ULPs são os de piso: perto de zero quem decide é o desvio absoluto
+    """
+    absoluto = abs(Decimal(valor) - Decimal(referencia))
+    ref = float(referencia)
+    ulp = math.ulp(max(abs(ref), piso))
+    return absoluto, abs(float(valor) - ref) / ulp
+
+
+class Estatistica:
+    """
+    Pior desvio de um motor/saída
+    """
+    __slots__ = ('comparacoes', 'violacoes', 'max_abs', 'max_ulp', 'caso_pior', 'caso_pior_ulp', 'erros')
+
+    def __init__(self):
+        self.comparacoes = 0
+        self.violacoes = 0
+        self.max_abs = Decimal('0')
+        self.max_ulp = 0.0
+        self.caso_pior = None
+        self.caso_pior_ulp = None
+        self.erros = 0
+
+    def registrar(self, caso_id, valor, referencia, tolerancia):
+        absoluto, ulps = desvio(valor, referencia, tolerancia.get('piso', 0.0))
+        self.comparacoes += 1
+        if absoluto > tolerancia['abs'] or ulps > tolerancia['ulp']:
+            self.violacoes += 1
+        if absoluto > self.max_abs or self.caso_pior is None:
+            self.max_abs = absoluto
+            self.caso_pior = caso_id
+        if ulps > self.max_ulp or self.caso_pior_ulp is None:
+            self.max_ulp = ulps
+            self.caso_pior_ulp = caso_id
+
+    def juntar(self, outra):
+        self.comparacoes += outra.comparacoes
+        self.violacoes += outra.violacoes
+        self.erros += outra.erros
+        if outra.caso_pior is not None and (self.caso_pior is None or outra.max_abs > self.max_abs):
+            self.max_abs = outra.max_abs
+            self.caso_pior = outra.caso_pior
+        if outra.caso_pior_ulp is not None and (self.caso_pior_ulp is None or outra.max_ulp > self.max_ulp):
+            self.max_ulp = outra.max_ulp
+            self.caso_pior_ulp = outra.caso_pior_ulp
+
+    def para_dicionario(self):
+        return {
+            'comparacoes': self.comparacoes,
+            'violacoes': self.violacoes,
+            'erros': self.erros,
+            'max_abs': str(self.max_abs),
+            'max_ulp': round(self.max_ulp, 2),
+            'caso_pior': self.caso_pior,
+            'caso_pior_ulp': self.caso_pior_ulp,
+        }
+
+    def __getstate__(self):
+        return {nome: getattr(self, nome) for nome in self.__slots__}
+
+    def __setstate__(self, estado):
+        for nome, valor in estado.items():
+            setattr(self, nome, valor)
+
+
+def comparar_saidas(estatisticas, motor, caso_id, saidas, referencia, tolerancias):
+    for nome, valor in saidas.items():
+        chave = (motor, nome)
+        estatistica = estatisticas.setdefault(chave, Estatistica())
+        tolerancia = tolerancias.get(nome, TOLERANCIAS[nome])
+        if isinstance(valor, list):
+            for v, r in zip(valor, referencia[nome]):
+                estatistica.registrar(caso_id, v, r, tolerancia)
+        else:
+            estatistica.registrar(caso_id, valor, referencia[nome], tolerancia)
+
+
+def avaliar_casos(casos, nomes_motores):
+    """
+    Avalia um lote de casos (executado em um processo do pool)
+    Retorna {(motor, saída): Estatistica}
+    """
+    from registro_log import configurar_log
+    configurar_log(modo='silencioso')
+    getcontext().prec = 28
+
+    estatisticas = {}
+    for caso in casos:
+        try:
+            referencia = motor_referencia(caso['leituras'], caso['constantes'], caso['tempos'])
+        except ArithmeticError:
+            estatisticas.setdefault(('referencia', '-'), Estatistica()).erros += 1
+            continue
+
+        if 'esperado' in caso:
+            comparar_saidas(estatisticas, 'excel_certificado', caso['id'], caso['esperado'], referencia,
+                            TOLERANCIAS_CERTIFICADO)
+
+        for motor in nomes_motores:
+            funcao, tolerancias = MOTORES[motor]
+            try:
+                saidas = funcao(caso['leituras'], caso['constantes'], caso['tempos'])
+            except ArithmeticError:
+                estatisticas.setdefault((motor, '-'), Estatistica()).erros += 1
+                continue
+            comparar_saidas(estatisticas, motor, caso['id'], saidas, referencia, tolerancias or {})
+
+    return estatisticas
+
+
+def executar_harness(quantidade_aleatoria=2000, incluir_fixtures=True, nomes_motores=None, max_processos=None):
+    """
+    Monta o corpus, distribui os casos entre processos e consolida o pior desvio
+    """
+    inicio = time.perf_counter()
+    nomes_motores = list(nomes_motores or MOTORES)
+    max_processos = max_processos or os.cpu_count() or 1
+
+    casos = corpus_certificado()
+    fixtures = listar_fixtures() if incluir_fixtures else []
+    with ProcessPoolExecutor(max_workers=max_processos) as executor:
+        for casos_fixture in executor.map(corpus_fixture, fixtures):
+            casos.extend(casos_fixture)
+        casos.extend(corpus_aleatorio(quantidade_aleatoria))
+
+        tamanho_lote = max(1, math.ceil(len(casos) / (max_processos * 4)))
+        lotes = [casos[i:i + tamanho_lote] for i in range(0, len(casos), tamanho_lote)]
+
+        estatisticas = {}
+        for parcial in executor.map(avaliar_casos, lotes, [nomes_motores] * len(lotes)):
+            for chave, estatistica in parcial.items():
+                estatisticas.setdefault(chave, Estatistica()).juntar(estatistica)
+
+    return {
+        'casos': len(casos),
+        'fixtures': [os.path.relpath(f, RAIZ_PROJETO) for f in fixtures],
+        'tempo': round(time.perf_counter() - inicio, 3),
+        'aprovado': all(e.violacoes == 0 and e.erros == 0 for e in estatisticas.values()),
+        'resultados': {f"{motor}:{saida}": e.para_dicionario() for (motor, saida), e in sorted(estatisticas.items())},
+    }
+
+
+def main():
+    """
+    Função principal - HARNESS DE REGRESSÃO
+    """
+    parser = argparse.ArgumentParser(description="Valida os motores de cálculo contra a referência Decimal")
+    parser.add_argument('-n', '--aleatorios', type=int, default=2000, help="casos aleatórios (padrão: 2000)")
+    parser.add_argument('--sem-fixtures', action='store_true', help="não lê as planilhas de fixture")
+    parser.add_argument('--motores', default=None, help="motores separados por vírgula: " + ', '.join(MOTORES))
+    parser.add_argument('-p', '--processos', type=int, default=None, help="número de processos (padrão: núcleos da CPU)")
+    parser.add_argument('--json', default=None, help="grava o relatório completo neste arquivo")
+    args = parser.parse_args()
+
+    motores = [m.strip() for m in args.motores.split(',')] if args.motores else None
+    desconhecidos = set(motores or ()) - set(MOTORES)
+    if desconhecidos:
+        print(f"❌ Motores desconhecidos: {', '.join(sorted(desconhecidos))}")
+        return 2
+
+    relatorio = executar_harness(args.aleatorios, not args.sem_fixtures, motores, args.processos)
+
+    print(f"🔬 HARNESS DE REGRESSÃO: {relatorio['casos']} pontos em {relatorio['tempo']:.2f} segundos")
+    print(f"   {'motor:saída':<34}{'comparações':>12}{'violações':>11}{'máx. abs':>14}{'máx. ULP':>14}")
+    for chave, r in relatorio['resultados'].items():
+        simbolo = '✅' if r['violacoes'] == 0 and r['erros'] == 0 else '❌'
+        print(f" {simbolo} {chave:<34}{r['comparacoes']:>12}{r['violacoes']:>11}"
+              f"{float(Decimal(r['max_abs'])):>14.3e}{r['max_ulp']:>14.4g}")
+        if r['violacoes'] or r['erros']:
+            print(f"      pior caso: {r['caso_pior']} (abs), {r['caso_pior_ulp']} (ULP) | erros: {r['erros']}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(relatorio, f, indent=2, ensure_ascii=False)
+        print(f"✅ Relatório salvo em: {args.json}")
+
+    if relatorio['aprovado']:
+        print("✅ Todos os motores dentro das tolerâncias")
+        return 0
+    print("❌ Há motores fora das tolerâncias")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
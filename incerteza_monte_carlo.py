@@ -0,0 +1,402 @@
+# -*- coding: utf-8 -*-
+"""
+Propagação de Incerteza por Monte Carlo (GUM Suplemento 1)
+Sorteia M amostras das grandezas de entrada de cada ponto (pulsos, tempo,
+leitura do medidor e constantes de correção da aba "Estimativa da Incerteza"),
+passa todas pelas fórmulas das linhas de leitura de uma vez, como
+arrays NumPy, e informa a incerteza padrão e os intervalos de abrangência da
+Vazão Média (I57) e da Tendência (U57) de cada ponto.
+
+As amostras são processadas em blocos de tamanho fixo: a memória usada é a dos
+dois vetores de saída (M valores por grandeza de saída) mais um bloco de
+intermediários, independentemente de M.
+
+O orçamento padrão (ORCAMENTO_PADRAO) usa a resolução de indicação de cada
+instrumento; para o certificado deve ser substituído pelo orçamento do
+laboratório (arquivo JSON, ver carregar_orcamento)
+"""
+
+from dataclasses import dataclass, field
+from decimal import getcontext
+import argparse
+import json
+import math
+import os
+import sys
+import time
+
+import numpy as np
+
+from instrumentacao import cronometrar
+from registro_log import configurar_log, obter_logger
+
+# Configurar precisão alta
+getcontext().prec = 28
+
+log = obter_logger(__name__)
+
+# Grandezas sorteadas por leitura (uma amostra independente por leitura)
+GRANDEZAS_LEITURA = ('pulsos_padrao', 'tempo_coleta', 'leitura_medidor')
+
+# Constantes sorteadas uma vez por amostra (comuns a todas as leituras do ponto)
+GRANDEZAS_CONSTANTES = (
+    'ponto_mlp',
+    'correcao_tempo_bu23',
+    'correcao_tempo_bw23',
+    'constante_correcao_temp',
+    'constante_correcao_inclinacao',
+)
+
+# Temperatura e sua correção (BU26/BW26) só entram na temperatura corrigida (AD54),
+# que não participa de I57/U57: ficam no orçamento, mas não são sorteadas
+GRANDEZAS_SEM_EFEITO = ('temperatura', 'correcao_temp_bu26', 'correcao_temp_bw26')
+
+# Orçamento de incerteza: grandeza -> (distribuição, valor, relativo)
+#   normal:     valor = incerteza padrão
+#   retangular: valor = semi-amplitude (u = a/√3)
+#   triangular: valor = semi-amplitude (u = a/√6)
+#   relativo:   valor multiplica |estimativa|
+ORCAMENTO_PADRAO = {
+    'pulsos_padrao': ('retangular', 0.5, False),           # resolução: 1 pulso
+    'tempo_coleta': ('retangular', 0.005, False),          # resolução: 0,01 s
+    'leitura_medidor': ('retangular', 0.005, False),       # resolução: 0,01 L
+    'temperatura': ('retangular', 0.05, False),            # resolução: 0,1 °C
+    'ponto_mlp': ('normal', 0.0, False),                   # constante do padrão (sem incerteza declarada)
+    'correcao_tempo_bu23': ('normal', 0.01, True),
+    'correcao_tempo_bw23': ('normal', 0.01, True),
+    'correcao_temp_bu26': ('normal', 0.01, True),
+    'correcao_temp_bw26': ('normal', 0.01, True),
+    'constante_correcao_temp': ('normal', 0.01, True),
+    'constante_correcao_inclinacao': ('normal', 0.01, True),
+}
+
+DISTRIBUICOES = ('normal', 'retangular', 'triangular')
+
+SAIDAS = {'vazao_media': 'I57', 'tendencia': 'U57'}
+
+# Padrões da simulação
+AMOSTRAS_PADRAO = 200_000
+TAMANHO_BLOCO = 65_536
+PROBABILIDADE_ABRANGENCIA = 0.95
+
+
+def carregar_orcamento(arquivo=None):
+    """
+    Orçamento padrão, sobrescrito pelas grandezas do arquivo JSON:
+        {"tempo_coleta": {"distribuicao": "normal", "valor": 0.002, "relativo": false}, ...}
+    """
+    orcamento = dict(ORCAMENTO_PADRAO)
+    if not arquivo:
+        return orcamento
+
+    with open(arquivo, 'r', encoding='utf-8') as f:
+        dados = json.load(f)
+
+    for grandeza, entrada in dados.items():
+        if grandeza not in orcamento:
+            raise ValueError(f"grandeza desconhecida no orçamento: {grandeza}")
+        distribuicao = entrada.get('distribuicao', orcamento[grandeza][0])
+        if distribuicao not in DISTRIBUICOES:
+            raise ValueError(f"distribuição desconhecida para {grandeza}: {distribuicao}")
+        orcamento[grandeza] = (distribuicao, float(entrada.get('valor', orcamento[grandeza][1])),
+                               bool(entrada.get('relativo', orcamento[grandeza][2])))
+    return orcamento
+
+
+def incerteza_padrao_entrada(estimativa, distribuicao, valor, relativo):
+    """
+    Incerteza padrão u(x) da entrada descrita no orçamento
+    """
+    escala = abs(estimativa) * valor if relativo else valor
+    if distribuicao == 'retangular':
+        return escala / math.sqrt(3)
+    if distribuicao == 'triangular':
+        return escala / math.sqrt(6)
+    return escala
+
+
+def sortear(rng, estimativa, distribuicao, valor, relativo, forma):
+    """
+    Amostras da grandeza em torno da estimativa (array float64 com a forma pedida)
+    estimativa pode ser escalar ou array compatível com a forma
+    As operações são feitas no próprio array sorteado (sem temporários)
+    """
+    escala = np.abs(estimativa) * valor if relativo else valor
+    if np.all(escala == 0):
+        return np.broadcast_to(np.asarray(estimativa, dtype=np.float64), forma)
+    if distribuicao == 'retangular':
+        amostras = rng.random(forma)
+        amostras *= 2.0
+        amostras -= 1.0
+    elif distribuicao == 'triangular':
+        amostras = rng.triangular(-1.0, 0.0, 1.0, forma)
+    else:
+        amostras = rng.standard_normal(forma)
+    amostras *= escala
+    amostras += estimativa
+    return amostras
+
+
+def calcular_saidas(pulsos, tempo, leitura_medidor, constantes):
+    """
+    Fórmulas das linhas de leitura (AA54, L54, I54, U54) e agregados I57/U57/AD57
+    sobre arrays (amostras × leituras); constantes com forma (amostras, 1) ou escalares
+    Mesmas fórmulas de calcular_formulas_com_tempo_ajustado, em float64 e sem o
+    arredondamento a 12 casas (desprezível frente às incertezas)
+    AD57 é o STDEV.S dos erros % (NaN com menos de duas leituras); a planilha
+    descarta erros exatamente nulos, o que não acontece com entradas perturbadas
+    """
+    n_leituras = np.shape(pulsos)[-1]
+
+    # AA54: tempo de coleta corrigido = t - (t·BU23 + BW23); guardado como 3600/AA54
+    fator_vazao = tempo * (1.0 - constantes['correcao_tempo_bu23'])
+    fator_vazao -= constantes['correcao_tempo_bw23']
+    np.divide(3600.0, fator_vazao, out=fator_vazao)
+
+    # L54: totalização no padrão corrigido = volume - (R51 + U51·vazão bruta)/100·volume
+    volume_bruto = pulsos * (constantes['ponto_mlp'] / 1000.0)
+    totalizacao = volume_bruto * fator_vazao
+    totalizacao *= constantes['constante_correcao_inclinacao']
+    totalizacao += constantes['constante_correcao_temp']
+    totalizacao /= -100.0
+    totalizacao += 1.0
+    totalizacao *= volume_bruto
+
+    # I54 = L54/AA54·3600 e U54 = (O54 - L54)/L54·100
+    vazao_referencia = totalizacao * fator_vazao
+    erro_percentual = np.divide(leitura_medidor, totalizacao, out=volume_bruto)
+    erro_percentual -= 1.0
+
+    # I57 e U57 (médias das leituras) e AD57 (desvio padrão amostral dos erros %)
+    tendencia = erro_percentual.sum(axis=-1)
+    tendencia *= 100.0 / n_leituras
+    if n_leituras < 2:
+        desvio_padrao = np.full(np.shape(tendencia), np.nan)
+    else:
+        desvio_padrao = erro_percentual.std(axis=-1, ddof=1)
+        desvio_padrao *= 100.0
+    return vazao_referencia.sum(axis=-1) / n_leituras, tendencia, desvio_padrao
+
+
+def intervalo_mais_curto(ordenadas, probabilidade):
+    """
+    Menor intervalo que contém a fração 'probabilidade' das amostras ordenadas
+    (GUM S1, 7.7.2)
+    """
+    m = len(ordenadas)
+    q = int(probabilidade * m + 0.5)
+    if q >= m:
+        return float(ordenadas[0]), float(ordenadas[-1])
+    larguras = ordenadas[q:] - ordenadas[:m - q]
+    r = int(np.argmin(larguras))
+    return float(ordenadas[r]), float(ordenadas[r + q])
+
+
+def intervalo_simetrico(ordenadas, probabilidade):
+    """
+    Intervalo probabilisticamente simétrico (quantis (1-p)/2 e (1+p)/2)
+    """
+    m = len(ordenadas)
+    q = int(probabilidade * m + 0.5)
+    r = (m - q) // 2
+    return float(ordenadas[r]), float(ordenadas[min(r + q, m - 1)])
+
+
+@dataclass
+class ResultadoSaida:
+    """
+    Distribuição de uma saída (I57 ou U57) de um ponto
+    """
+    nominal: float
+    media: float
+    incerteza_padrao: float
+    intervalo_simetrico: tuple
+    intervalo_mais_curto: tuple
+
+    @property
+    def incerteza_expandida(self):
+        """
+        Meia largura do intervalo mais curto
+        """
+        return (self.intervalo_mais_curto[1] - self.intervalo_mais_curto[0]) / 2
+
+    def para_dicionario(self):
+        return {
+            'nominal': self.nominal,
+            'media': self.media,
+            'incerteza_padrao': self.incerteza_padrao,
+            'incerteza_expandida': self.incerteza_expandida,
+            'intervalo_simetrico': list(self.intervalo_simetrico),
+            'intervalo_mais_curto': list(self.intervalo_mais_curto),
+        }
+
+
+@dataclass
+class ResultadoIncertezaPonto:
+    """
+    Resultado da simulação de um ponto de calibração
+    """
+    numero: int
+    amostras: int
+    probabilidade: float
+    saidas: dict = field(default_factory=dict)
+    tempo: float = 0.0
+
+    def para_dicionario(self):
+        return {
+            'numero': self.numero,
+            'amostras': self.amostras,
+            'probabilidade': self.probabilidade,
+            'tempo': round(self.tempo, 4),
+            **{nome: saida.para_dicionario() for nome, saida in self.saidas.items()},
+        }
+
+
+def _estimativas(ponto, constantes):
+    """
+    Estimativas (float64) das entradas: arrays por leitura e escalares das constantes
+    """
+    leituras = ponto['leituras']
+    entradas = {g: np.array([float(l[g]) for l in leituras], dtype=np.float64) for g in GRANDEZAS_LEITURA}
+    faltando = [c for c in GRANDEZAS_CONSTANTES if constantes.get(c) is None]
+    if faltando:
+        raise ValueError(f"constantes ausentes: {', '.join(faltando)}")
+    return entradas, {c: float(constantes[c]) for c in GRANDEZAS_CONSTANTES}
+
+
+def simular_ponto(ponto, constantes, orcamento=None, amostras=AMOSTRAS_PADRAO,
+                  probabilidade=PROBABILIDADE_ABRANGENCIA, tamanho_bloco=TAMANHO_BLOCO, rng=None):
+    """
+    Propaga o orçamento de incerteza pelas fórmulas de um ponto
+    Retorna ResultadoIncertezaPonto com I57 ('vazao_media') e U57 ('tendencia')
+    """
+    orcamento = orcamento or ORCAMENTO_PADRAO
+    rng = rng or np.random.default_rng()
+    inicio = time.perf_counter()
+
+    entradas, estimativas_constantes = _estimativas(ponto, constantes)
+    n_leituras = len(ponto['leituras'])
+
+    vazoes = np.empty(amostras, dtype=np.float64)
+    tendencias = np.empty(amostras, dtype=np.float64)
+
+    for bloco_inicio in range(0, amostras, tamanho_bloco):
+        bloco_fim = min(bloco_inicio + tamanho_bloco, amostras)
+        m = bloco_fim - bloco_inicio
+
+        leituras = {g: sortear(rng, entradas[g], *orcamento[g], (m, n_leituras)) for g in GRANDEZAS_LEITURA}
+        constantes_bloco = {c: sortear(rng, estimativas_constantes[c], *orcamento[c], (m, 1))
+                            for c in GRANDEZAS_CONSTANTES}
+
+        vazoes[bloco_inicio:bloco_fim], tendencias[bloco_inicio:bloco_fim], _ = calcular_saidas(
+            leituras['pulsos_padrao'], leituras['tempo_coleta'], leituras['leitura_medidor'], constantes_bloco
+        )
+
+    nominal_vazao, nominal_tendencia, _ = calcular_saidas(
+        entradas['pulsos_padrao'], entradas['tempo_coleta'], entradas['leitura_medidor'], estimativas_constantes
+    )
+
+    resultado = ResultadoIncertezaPonto(ponto.get('numero'), amostras, probabilidade)
+    for nome, valores, nominal in (('vazao_media', vazoes, nominal_vazao), ('tendencia', tendencias, nominal_tendencia)):
+        valores.sort()
+        resultado.saidas[nome] = ResultadoSaida(
+            nominal=float(nominal),
+            media=float(valores.mean()),
+            incerteza_padrao=float(valores.std(ddof=1)),
+            intervalo_simetrico=intervalo_simetrico(valores, probabilidade),
+            intervalo_mais_curto=intervalo_mais_curto(valores, probabilidade),
+        )
+    resultado.tempo = time.perf_counter() - inicio
+    return resultado
+
+
+def simular_certificado(constantes, pontos, orcamento=None, amostras=AMOSTRAS_PADRAO,
+                        probabilidade=PROBABILIDADE_ABRANGENCIA, tamanho_bloco=TAMANHO_BLOCO, semente=None):
+    """
+    Simula todos os pontos do certificado
+    Cada ponto recebe um gerador próprio derivado da semente (resultados reprodutíveis
+    e independentes da ordem dos pontos)
+    """
+    sementes = np.random.SeedSequence(semente).spawn(len(pontos))
+    resultados = []
+    with cronometrar('monte_carlo'):
+        for ponto, semente_ponto in zip(pontos, sementes):
+            resultados.append(simular_ponto(ponto, constantes, orcamento, amostras, probabilidade,
+                                            tamanho_bloco, np.random.default_rng(semente_ponto)))
+    return resultados
+
+
+def registrar_resultados(resultados):
+    """
+    Tabela dos intervalos de abrangência por ponto no log
+    """
+    if not resultados:
+        return
+    p = resultados[0].probabilidade
+    log.info("\n📊 INCERTEZA POR MONTE CARLO (%s amostras, p = %.0f%%)", resultados[0].amostras, p * 100)
+    for r in resultados:
+        log.info("\n   PONTO %s (%.3f s):", r.numero, r.tempo)
+        for nome, celula in SAIDAS.items():
+            saida = r.saidas[nome]
+            log.info("     • %s %s: %.6f | u = %.6f | U = %.6f | [%.6f, %.6f]",
+                     celula, nome, saida.nominal, saida.incerteza_padrao, saida.incerteza_expandida,
+                     *saida.intervalo_mais_curto)
+
+
+def executar_incerteza(planilha, amostras=AMOSTRAS_PADRAO, probabilidade=PROBABILIDADE_ABRANGENCIA,
+                       arquivo_orcamento=None, semente=None, tamanho_bloco=TAMANHO_BLOCO, arquivo_json=None):
+    """
+    Extrai a planilha, simula todos os pontos e registra (e opcionalmente grava) os intervalos
+    Retorna o código de saída (0 = sucesso)
+    """
+    if not os.path.exists(planilha):
+        log.error("❌ Arquivo não encontrado: %s", planilha)
+        return 2
+
+    from otimizador_tempos_inteligente import extrair_dados_planilha_original
+
+    constantes, pontos = extrair_dados_planilha_original(planilha)
+    if pontos is None:
+        return 1
+
+    try:
+        orcamento = carregar_orcamento(arquivo_orcamento)
+        inicio = time.perf_counter()
+        resultados = simular_certificado(constantes, pontos, orcamento, amostras, probabilidade,
+                                         tamanho_bloco, semente)
+    except (ValueError, OSError) as e:
+        log.error("❌ %s", e)
+        return 1
+
+    registrar_resultados(resultados)
+    log.info("\n⏱️  Tempo total: %.2f segundos", time.perf_counter() - inicio, extra={'resumo': True})
+
+    if arquivo_json:
+        with open(arquivo_json, 'w', encoding='utf-8') as f:
+            json.dump({'planilha': planilha, 'orcamento': orcamento,
+                       'pontos': [r.para_dicionario() for r in resultados]}, f, indent=2, ensure_ascii=False)
+        log.info("✅ Resultados salvos em: %s", arquivo_json, extra={'resumo': True})
+    return 0
+
+
+def main(argv=None):
+    """
+    Função principal - INCERTEZA POR MONTE CARLO
+    """
+    parser = argparse.ArgumentParser(description="Propaga a incerteza das entradas até I57/U57 por Monte Carlo")
+    parser.add_argument('planilha', help="planilha de certificado")
+    parser.add_argument('-n', '--amostras', type=int, default=AMOSTRAS_PADRAO, help=f"amostras por ponto (padrão: {AMOSTRAS_PADRAO})")
+    parser.add_argument('-p', '--probabilidade', type=float, default=PROBABILIDADE_ABRANGENCIA, help="probabilidade de abrangência (padrão: 0.95)")
+    parser.add_argument('--orcamento', default=None, help="arquivo JSON com o orçamento de incerteza")
+    parser.add_argument('--semente', type=int, default=None, help="semente do gerador (resultados reprodutíveis)")
+    parser.add_argument('--bloco', type=int, default=TAMANHO_BLOCO, help=f"amostras por bloco (padrão: {TAMANHO_BLOCO})")
+    parser.add_argument('--json', default=None, help="grava os resultados neste arquivo")
+    args = parser.parse_args(argv)
+
+    configurar_log()
+    return executar_incerteza(args.planilha, args.amostras, args.probabilidade, args.orcamento,
+                              args.semente, args.bloco, args.json)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
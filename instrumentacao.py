@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+"""
+Instrumentação de Desempenho
+Cronômetros por etapa (relógio perf_counter_ns) e contadores por etapa e por
+ponto: chamadas do motor de cálculo, acertos/faltas do cache de planilhas,
+iterações das buscas e candidatos rejeitados pelos limites de tempo.
+Cada evento custa um incremento em dicionário, então fica sempre ligada;
+o relatório é gravado junto com os resultados em JSON
+
+A pilha de etapas e o ponto atual são de cada thread (as threads leitoras do
+pipeline assíncrono cronometram em paralelo); os totais são do processo. Os
+tempos são somados sob trava; os contadores não, para não encarecer o motor
+(incrementos simultâneos de threads diferentes podem se perder)
+"""
+
+from collections import defaultdict
+from contextlib import contextmanager
+from functools import wraps
+import os
+import threading
+import time
+
+# Relógio monotônico em nanossegundos
+relogio = time.perf_counter_ns
+
+# Contadores padronizados
+CHAMADAS_MOTOR = 'chamadas_motor'
+ACERTOS_CACHE = 'acertos_cache'
+FALTAS_CACHE = 'faltas_cache'
+ITERACOES = 'iteracoes'
+REJEITADOS_LIMITE = 'rejeitados_limite'
+
+
+class _EstadoThread(threading.local):
+    """
+    Pilha de etapas e ponto atual de uma thread
+    """
+
+    def __init__(self):
+        self.pilha = []
+        self.ponto = None
+
+
+class Instrumentacao:
+    """
+    Acumula tempos e contadores de uma execução (um processo)
+    """
+    __slots__ = ('inicio', 'etapas', 'contadores', 'contadores_etapa', 'pontos', '_estado', '_trava')
+
+    def __init__(self):
+        self._trava = threading.Lock()
+        self.reiniciar()
+
+    def reiniciar(self):
+        self.inicio = relogio()
+        self.etapas = {}                                          # etapa -> [chamadas, ns_total, ns_max]
+        self.contadores = defaultdict(int)                        # totais
+        self.contadores_etapa = defaultdict(lambda: defaultdict(int))
+        self.pontos = {}                                          # (etapa, ponto) -> [ns, contadores]
+        self._estado = _EstadoThread()
+
+    @property
+    def etapa_atual(self):
+        pilha = self._estado.pilha
+        return pilha[-1] if pilha else None
+
+    def contar(self, nome, quantidade=1):
+        """
+        Soma no contador total, no da etapa atual e no do ponto atual (da thread)
+        """
+        estado = self._estado
+        self.contadores[nome] += quantidade
+        if estado.pilha:
+            self.contadores_etapa[estado.pilha[-1]][nome] += quantidade
+        if estado.ponto is not None:
+            estado.ponto[1][nome] += quantidade
+
+    def registrar_tempo(self, etapa, decorrido_ns):
+        with self._trava:
+            registro = self.etapas.get(etapa)
+            if registro is None:
+                self.etapas[etapa] = [1, decorrido_ns, decorrido_ns]
+            else:
+                registro[0] += 1
+                registro[1] += decorrido_ns
+                if decorrido_ns > registro[2]:
+                    registro[2] = decorrido_ns
+
+    @contextmanager
+    def cronometrar(self, etapa):
+        """
+        Mede o tempo de um bloco; contadores do bloco (na mesma thread) são atribuídos à etapa
+        """
+        pilha = self._estado.pilha
+        pilha.append(etapa)
+        inicio = relogio()
+        try:
+            yield
+        finally:
+            self.registrar_tempo(etapa, relogio() - inicio)
+            pilha.pop()
+
+    @contextmanager
+    def medir_ponto(self, numero):
+        """
+        Mede o tempo e os contadores de um ponto dentro da etapa atual
+        """
+        chave = (self.etapa_atual, numero)
+        with self._trava:
+            registro = self.pontos.get(chave)
+            if registro is None:
+                registro = self.pontos[chave] = [0, defaultdict(int)]
+        estado = self._estado
+        anterior = estado.ponto
+        estado.ponto = registro
+        inicio = relogio()
+        try:
+            yield
+        finally:
+            with self._trava:
+                registro[0] += relogio() - inicio
+            estado.ponto = anterior
+
+    def relatorio(self):
+        """
+        Dicionário serializável em JSON (tempos em milissegundos)
+        """
+        etapas = {}
+        for nome, (chamadas, total_ns, max_ns) in self.etapas.items():
+            etapas[nome] = {
+                'chamadas': chamadas,
+                'total_ms': round(total_ns / 1e6, 3),
+                'max_ms': round(max_ns / 1e6, 3),
+                'contadores': dict(self.contadores_etapa.get(nome, {})),
+                'pontos': {},
+            }
+        for (etapa, numero), (ns, contadores) in self.pontos.items():
+            destino = etapas.setdefault(etapa or 'sem_etapa', {'chamadas': 0, 'total_ms': 0.0, 'max_ms': 0.0,
+                                                               'contadores': {}, 'pontos': {}})
+            destino['pontos'][str(numero)] = {'tempo_ms': round(ns / 1e6, 3), 'contadores': dict(contadores)}
+
+        return {
+            'relogio': 'perf_counter_ns',
+            'decorrido_ms': round((relogio() - self.inicio) / 1e6, 3),
+            'etapas': etapas,
+            'contadores': dict(self.contadores),
+        }
+
+
+# Instância do processo (cada worker do lote tem a sua)
+INSTRUMENTACAO = Instrumentacao()
+
+if hasattr(os, 'register_at_fork'):
+    # Um processo criado por fork enquanto uma thread leitora segurava a trava a herdaria fechada
+    os.register_at_fork(after_in_child=lambda: setattr(INSTRUMENTACAO, '_trava', threading.Lock()))
+
+contar = INSTRUMENTACAO.contar
+cronometrar = INSTRUMENTACAO.cronometrar
+medir_ponto = INSTRUMENTACAO.medir_ponto
+relatorio = INSTRUMENTACAO.relatorio
+reiniciar = INSTRUMENTACAO.reiniciar
+
+
+def cronometrado(etapa=None):
+    """
+    Decorador: mede cada chamada da função como a etapa indicada (padrão: nome da função)
+    """
+    def decorador(funcao):
+        nome = etapa or funcao.__name__
+
+        @wraps(funcao)
+        def envoltorio(*args, **kwargs):
+            with cronometrar(nome):
+                return funcao(*args, **kwargs)
+        return envoltorio
+    return decorador
@@ -0,0 +1,354 @@
+# -*- coding: utf-8 -*-
+"""
+Layout da Planilha de Certificado
+Descrição declarativa das células usadas pelos scripts (ver correto/mapeamento.md),
+compilada em arrays de endereços (linha, coluna). Com o layout compilado, a
+leitura de todos os pontos é uma única coleta vetorizada sobre a grade de
+valores da aba, sem varreduras heurísticas célula a célula.
+Os blocos de calibração são detectados numa única passagem pela coluna C
+(rótulos "N° Ponto" e "Vazão Média • L/h"), com qualquer número de pontos e
+de leituras por ponto
+"""
+
+import re
+
+from openpyxl.utils.cell import coordinate_from_string, column_index_from_string
+import numpy as np
+
+from instrumentacao import cronometrar
+
+# Layout do modelo SAN-038 (correto/mapeamento.md)
+LAYOUT_CERTIFICADO = {
+    'abas': {
+        'coleta': 'Coleta de Dados',
+        'incerteza': 'Estimativa da Incerteza',
+    },
+    # Cada ponto de calibração ocupa um bloco a partir do rótulo "N° Ponto • mL/P"
+    # na coluna C: +0/+1 configuração, +2/+3 títulos, leituras a partir de +4 até
+    # a linha anterior ao rótulo "Vazão Média • L/h" (linha de agregados).
+    # Modelo padrão: blocos de 9 linhas a partir da linha 50 (54-56 leituras, 57
+    # agregados), usado quando os rótulos não são encontrados
+    'bloco': {
+        'coluna_rotulos': 'C',
+        'padrao_cabecalho': r'^\s*\d+\s*[°º]?\s*ponto\b',
+        'rotulo_agregados': 'Vazão Média • L/h',
+        'linha_inicial': 50,
+        'passo': 9,
+        'deslocamento_leituras': 4,
+        'leituras_por_ponto': 3,
+        'deslocamento_agregados': 7,
+    },
+    # Constantes (aba, célula)
+    'constantes': {
+        'ponto_mlp': ('coleta', 'I50'),
+        'pulso_equipamento_mlp': ('coleta', 'AD50'),
+        'constante_correcao_temp': ('coleta', 'R51'),
+        'constante_correcao_inclinacao': ('coleta', 'U51'),
+        'modo_calibracao': ('coleta', 'X16'),
+        'correcao_tempo_bu23': ('incerteza', 'BU23'),
+        'correcao_tempo_bw23': ('incerteza', 'BW23'),
+        'correcao_temp_bu26': ('incerteza', 'BU26'),
+        'correcao_temp_bw26': ('incerteza', 'BW26'),
+    },
+    # Constantes lidas como texto (sem conversão para Decimal)
+    'constantes_texto': ('modo_calibracao',),
+    # Colunas das linhas de leitura: (coluna, papel)
+    'colunas_leitura': {
+        'pulsos_padrao': ('C', 'entrada'),
+        'tempo_coleta': ('F', 'entrada'),
+        'leitura_medidor': ('O', 'entrada'),
+        'temperatura': ('R', 'entrada'),
+        'tempo_coleta_corrigido': ('AA', 'calculada'),
+        'temperatura_corrigida': ('AD', 'calculada'),
+        'totalizacao_padrao_corrigido': ('L', 'calculada'),
+        'vazao_referencia': ('I', 'calculada'),
+        'vazao_medidor': ('X', 'calculada'),
+        'erro_percentual': ('U', 'calculada'),
+    },
+    # Colunas da linha de agregados (valores sagrados)
+    'colunas_agregado': {
+        'vazao_media': 'I',
+        'tendencia': 'U',
+        'desvio_padrao': 'AD',
+    },
+}
+
+
+def endereco_para_indices(endereco):
+    """
+    Converte 'AD50' em (50, 30)
+    """
+    letras, linha = coordinate_from_string(endereco)
+    return linha, column_index_from_string(letras)
+
+
+def coluna_para_indice(letras):
+    """
+    Converte 'AD' em 30
+    """
+    return column_index_from_string(letras)
+
+
+class BlocosCalibracao:
+    """
+    Limites dos blocos de calibração da aba de coleta (arrays com um item por bloco)
+    """
+    __slots__ = ('linhas_cabecalho', 'linhas_iniciais', 'leituras_por_bloco', 'linhas_agregados')
+
+    def __init__(self, linhas_cabecalho, linhas_iniciais, leituras_por_bloco, linhas_agregados):
+        self.linhas_cabecalho = np.asarray(linhas_cabecalho, dtype=np.int32)
+        self.linhas_iniciais = np.asarray(linhas_iniciais, dtype=np.int32)
+        self.leituras_por_bloco = np.asarray(leituras_por_bloco, dtype=np.int32)
+        self.linhas_agregados = np.asarray(linhas_agregados, dtype=np.int32)
+
+    def __len__(self):
+        return len(self.linhas_iniciais)
+
+    def limitar(self, n_blocos):
+        return BlocosCalibracao(self.linhas_cabecalho[:n_blocos], self.linhas_iniciais[:n_blocos],
+                                self.leituras_por_bloco[:n_blocos], self.linhas_agregados[:n_blocos])
+
+    def para_dicionario(self):
+        return [
+            {'cabecalho': int(c), 'primeira_leitura': int(i), 'leituras': int(n), 'agregados': int(a)}
+            for c, i, n, a in zip(self.linhas_cabecalho, self.linhas_iniciais,
+                                  self.leituras_por_bloco, self.linhas_agregados)
+        ]
+
+
+def blocos_fixos(n_blocos, layout=LAYOUT_CERTIFICADO):
+    """
+    Blocos do modelo padrão (passo e número de leituras fixos)
+    """
+    bloco = layout['bloco']
+    base = bloco['linha_inicial'] + bloco['passo'] * np.arange(n_blocos, dtype=np.int32)
+    return BlocosCalibracao(base, base + bloco['deslocamento_leituras'],
+                            np.full(n_blocos, bloco['leituras_por_ponto'], dtype=np.int32),
+                            base + bloco['deslocamento_agregados'])
+
+
+class LayoutCompilado:
+    """
+    Layout com os endereços já resolvidos em arrays de índices
+    As linhas de leitura de todos os pontos ficam num único array (linhas_leituras),
+    com os pontos delimitados por deslocamentos (pontos com números diferentes de leituras)
+    """
+    __slots__ = ('abas', 'n_pontos', 'linhas_iniciais', 'linhas_leituras', 'deslocamentos', 'linhas_agregados',
+                 'colunas_leitura', 'papeis', 'colunas_agregado', 'constantes', 'constantes_texto')
+
+    def __init__(self, layout, blocos):
+        self.abas = dict(layout['abas'])
+        self.n_pontos = len(blocos)
+
+        # Linha "inicial" de cada ponto é a primeira linha de leitura (54, 63, ...)
+        self.linhas_iniciais = blocos.linhas_iniciais
+        self.deslocamentos = np.concatenate(([0], np.cumsum(blocos.leituras_por_bloco))).astype(np.int32)
+        total = int(self.deslocamentos[-1])
+        # Linha de cada leitura: início do seu bloco + posição dentro do bloco
+        bloco_da_leitura = np.repeat(np.arange(self.n_pontos), blocos.leituras_por_bloco)
+        posicao = np.arange(total, dtype=np.int32) - self.deslocamentos[:-1][bloco_da_leitura]
+        self.linhas_leituras = (self.linhas_iniciais[bloco_da_leitura] + posicao).astype(np.int32)
+        self.linhas_agregados = blocos.linhas_agregados
+
+        self.colunas_leitura = {nome: coluna_para_indice(col) for nome, (col, _) in layout['colunas_leitura'].items()}
+        self.papeis = {nome: papel for nome, (_, papel) in layout['colunas_leitura'].items()}
+        self.colunas_agregado = {nome: coluna_para_indice(col) for nome, col in layout['colunas_agregado'].items()}
+        self.constantes = {nome: (self.abas[aba],) + endereco_para_indices(endereco)
+                           for nome, (aba, endereco) in layout['constantes'].items()}
+        self.constantes_texto = frozenset(layout.get('constantes_texto', ()))
+
+    def leituras_do_ponto(self, p):
+        """
+        Fatia (início, fim) do ponto p no array de leituras
+        """
+        return int(self.deslocamentos[p]), int(self.deslocamentos[p + 1])
+
+    @property
+    def linha_maxima(self):
+        return int(max(self.linhas_agregados.max(initial=0), self.linhas_leituras.max(initial=0)))
+
+    @property
+    def coluna_maxima(self):
+        return max(list(self.colunas_leitura.values()) + list(self.colunas_agregado.values()))
+
+    def colunas_por_papel(self, papel):
+        """
+        Lista as colunas de leitura com o papel indicado ('entrada' ou 'calculada')
+        """
+        return [nome for nome, p in self.papeis.items() if p == papel]
+
+
+def compilar_layout(blocos, layout=LAYOUT_CERTIFICADO):
+    """
+    Compila o layout para os blocos de calibração detectados
+    (ou para n blocos do modelo padrão, se blocos for um inteiro)
+    """
+    if isinstance(blocos, (int, np.integer)):
+        blocos = blocos_fixos(int(blocos), layout)
+    return LayoutCompilado(layout, blocos)
+
+
+def ler_grade(sheet, linha_maxima=None, coluna_maxima=None):
+    """
+    Lê a aba de uma só vez como grade de valores (array de objetos, índices base 1)
+    """
+    linha_maxima = linha_maxima or sheet.max_row
+    coluna_maxima = coluna_maxima or sheet.max_column
+    grade = np.empty((linha_maxima + 1, coluna_maxima + 1), dtype=object)
+    for indice, linha in enumerate(sheet.iter_rows(min_row=1, max_row=linha_maxima,
+                                                   max_col=coluna_maxima, values_only=True), start=1):
+        grade[indice, 1:len(linha) + 1] = linha
+    return grade
+
+
+def _valor_nulo(valor):
+    return valor is None or valor == '' or valor == 0
+
+
+def _texto_normalizado(valor):
+    return ' '.join(valor.split()).casefold() if isinstance(valor, str) else ''
+
+
+def detectar_blocos(grade, layout=LAYOUT_CERTIFICADO, converter=None):
+    """
+    Detecta todos os blocos de calibração numa única passagem pela coluna de rótulos:
+    cabeçalhos "N° Ponto", linhas de agregados "Vazão Média • L/h" e leituras entre eles.
+    Cada bloco tem tantas leituras quantas linhas preenchidas houver até o agregado;
+    o primeiro bloco sem nenhuma leitura encerra a lista (mesma regra dos extratores
+    originais). Sem rótulos na aba, usa o passo fixo do modelo padrão
+    """
+    def nulo(valor):
+        if converter is None:
+            return _valor_nulo(valor)
+        try:
+            return converter(valor) == 0
+        except (ArithmeticError, ValueError, TypeError):
+            # Texto não numérico (rótulos) não é leitura
+            return True
+
+    bloco = layout['bloco']
+    coluna = grade[:, coluna_para_indice(bloco['coluna_rotulos'])]
+
+    textos = np.frompyfunc(_texto_normalizado, 1, 1)(coluna)
+    padrao = re.compile(bloco['padrao_cabecalho'], re.IGNORECASE)
+    cabecalhos = np.flatnonzero(np.frompyfunc(lambda t: bool(t) and padrao.match(t) is not None, 1, 1)(textos).astype(bool))
+    agregados = np.flatnonzero(textos == _texto_normalizado(bloco['rotulo_agregados']))
+
+    if len(cabecalhos) == 0 or len(agregados) == 0:
+        blocos = blocos_fixos(max(0, (grade.shape[0] - bloco['linha_inicial'] - bloco['deslocamento_agregados'])
+                                  // bloco['passo'] + 1), layout)
+        return blocos.limitar(_blocos_preenchidos(coluna, blocos, nulo))
+
+    # Agregado de cada cabeçalho: o primeiro abaixo dele e antes do próximo cabeçalho
+    indice = np.searchsorted(agregados, cabecalhos)
+    proximos = np.append(cabecalhos[1:], grade.shape[0])
+    validos = indice < len(agregados)
+    cabecalhos, indice, proximos = cabecalhos[validos], indice[validos], proximos[validos]
+    linhas_agregados = agregados[indice]
+    validos = linhas_agregados < proximos
+    cabecalhos, linhas_agregados = cabecalhos[validos], linhas_agregados[validos]
+
+    iniciais = cabecalhos + bloco['deslocamento_leituras']
+    validos = iniciais < linhas_agregados
+    cabecalhos, iniciais, linhas_agregados = cabecalhos[validos], iniciais[validos], linhas_agregados[validos]
+
+    # Leituras até a última linha preenchida antes do agregado
+    preenchidas = np.flatnonzero(~np.frompyfunc(nulo, 1, 1)(coluna).astype(bool))
+    ultima = np.searchsorted(preenchidas, linhas_agregados) - 1
+    ultima_linha = np.where(ultima >= 0, preenchidas[np.maximum(ultima, 0)] if len(preenchidas) else -1, -1)
+    leituras = np.where(ultima_linha >= iniciais, ultima_linha - iniciais + 1, 0)
+
+    vazios = np.flatnonzero(leituras == 0)
+    n_blocos = int(vazios[0]) if len(vazios) else len(cabecalhos)
+    return BlocosCalibracao(cabecalhos, iniciais, leituras, linhas_agregados).limitar(n_blocos)
+
+
+def _blocos_preenchidos(coluna, blocos, nulo):
+    """
+    Número de blocos até o primeiro com todas as leituras vazias/zero
+    """
+    if len(blocos) == 0:
+        return 0
+    linhas = blocos.linhas_iniciais[:, None] + np.arange(int(blocos.leituras_por_bloco.max()))
+    linhas = np.minimum(linhas, len(coluna) - 1)
+    vazios = np.frompyfunc(nulo, 1, 1)(coluna[linhas]).astype(bool).all(axis=1)
+    encerramento = np.flatnonzero(vazios)
+    return int(encerramento[0]) if len(encerramento) else len(blocos)
+
+
+def contar_pontos(grade, layout=LAYOUT_CERTIFICADO, converter=None):
+    """
+    Conta os blocos de calibração preenchidos da aba
+    """
+    return len(detectar_blocos(grade, layout, converter))
+
+
+def coletar(grade, linhas, coluna, converter=None):
+    """
+    Coleta vetorizada dos valores nas linhas indicadas de uma coluna
+    """
+    valores = grade[linhas, coluna]
+    if converter is None:
+        return valores
+    return np.frompyfunc(converter, 1, 1)(valores)
+
+
+def ler_constantes(wb, compilado, converter):
+    """
+    Lê as constantes do layout (endereços fixos)
+    """
+    constantes = {}
+    for nome, (aba, linha, coluna) in compilado.constantes.items():
+        valor = wb[aba].cell(row=linha, column=coluna).value
+        constantes[nome] = valor if nome in compilado.constantes_texto else converter(valor)
+    return constantes
+
+
+def ler_certificado(wb, converter, layout=LAYOUT_CERTIFICADO):
+    """
+    Lê constantes, pontos, leituras e agregados de uma pasta de trabalho aberta,
+    no mesmo formato de dicionários usado pelos scripts do pipeline
+    """
+    coleta_sheet = wb[layout['abas']['coleta']]
+    coluna_maxima = max(compilar_layout(0, layout).coluna_maxima, coluna_para_indice(layout['bloco']['coluna_rotulos']))
+    with cronometrar('leitura_grade'):
+        grade = ler_grade(coleta_sheet, coluna_maxima=coluna_maxima)
+
+    compilado = compilar_layout(detectar_blocos(grade, layout, converter), layout)
+    with cronometrar('leitura_constantes'):
+        constantes = ler_constantes(wb, compilado, converter)
+
+    colunas = {nome: coletar(grade, compilado.linhas_leituras, coluna, converter)
+               for nome, coluna in compilado.colunas_leitura.items()}
+    agregados = {nome: coletar(grade, compilado.linhas_agregados, coluna, converter)
+                 for nome, coluna in compilado.colunas_agregado.items()}
+
+    pontos = []
+    for p in range(compilado.n_pontos):
+        inicio, fim = compilado.leituras_do_ponto(p)
+        leituras = []
+        for k in range(inicio, fim):
+            leitura = {'linha': int(compilado.linhas_leituras[k])}
+            for nome in compilado.colunas_leitura:
+                leitura[nome] = colunas[nome][k]
+            leituras.append(leitura)
+
+        pontos.append({
+            'numero': p + 1,
+            'linha_inicial': int(compilado.linhas_iniciais[p]),
+            'leituras': leituras,
+            'valores_originais': {nome: agregados[nome][p] for nome in compilado.colunas_agregado},
+        })
+
+    return {
+        'constantes': constantes,
+        'pontos': pontos,
+    }
+
+
+def escrever_coluna(sheet, linhas, coluna, valores):
+    """
+    Grava os valores nas linhas indicadas de uma coluna (endereços pré-compilados)
+    """
+    for linha, valor in zip(np.ravel(linhas), valores):
+        sheet.cell(row=int(linha), column=coluna).value = valor
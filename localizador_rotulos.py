@@ -0,0 +1,227 @@
+# -*- coding: utf-8 -*-
+"""
+Localizador de Valores por Rótulo
+Índice construído uma vez por modelo de planilha que associa cada rótulo de
+texto ("Vazão Média • L/h", "Tendência", "DESVIO PADRÃO AMOSTRAL", ...) às
+coordenadas exatas do rótulo e da célula de valor à sua direita, em cada aba.
+A busca de um valor passa a ser uma consulta em dicionário, sem varrer faixas
+de células nem adivinhar pelo intervalo numérico.
+
+O índice é guardado por assinatura do modelo (abas, dimensões e células
+mescladas), em memória e na pasta do cache de planilhas: certificados do mesmo
+modelo reaproveitam o índice sem nova varredura
+"""
+
+import hashlib
+import json
+import os
+import weakref
+
+from openpyxl.utils.cell import get_column_letter
+
+from cache_planilhas import PASTA_CACHE
+from instrumentacao import contar, cronometrar, ACERTOS_CACHE, FALTAS_CACHE
+from registro_log import obter_logger
+
+# Versão do formato do índice - incrementar quando a construção mudar
+VERSAO_INDICE = 1
+
+# Rótulos dos valores sagrados na linha de agregados de cada bloco (aba Coleta de Dados)
+ROTULOS_CERTIFICADO = {
+    'vazao_media': 'Vazão Média • L/h',
+    'tendencia': 'Tendência',
+    'desvio_padrao': 'DESVIO PADRÃO AMOSTRAL',
+}
+
+ABA_COLETA = 'Coleta de Dados'
+
+# Índices já carregados neste processo (assinatura -> IndiceRotulos)
+_INDICES = {}
+
+# Assinatura de cada pasta de trabalho aberta (calculada uma vez por objeto)
+_ASSINATURAS = weakref.WeakKeyDictionary()
+
+log = obter_logger(__name__)
+
+
+def normalizar_rotulo(texto):
+    """
+    Chave de busca do rótulo: sem diferença de maiúsculas e de espaços
+    """
+    return ' '.join(str(texto).split()).casefold()
+
+
+def assinatura_modelo(wb):
+    """
+    SHA-256 da estrutura do modelo: nomes e dimensões das abas e células
+    mescladas. Não depende dos valores medidos, então é a mesma para todos os
+    certificados gerados a partir do mesmo modelo
+    """
+    assinatura = _ASSINATURAS.get(wb)
+    if assinatura is not None:
+        return assinatura
+
+    sha = hashlib.sha256()
+    for ws in wb.worksheets:
+        mescladas = sorted(str(intervalo) for intervalo in ws.merged_cells.ranges)
+        sha.update(f"{ws.title}|{ws.max_row}|{ws.max_column}|{','.join(mescladas)}\n".encode('utf-8'))
+    assinatura = _ASSINATURAS[wb] = sha.hexdigest()
+    return assinatura
+
+
+class IndiceRotulos:
+    """
+    Rótulo normalizado -> lista de (aba, coordenada do rótulo, coordenada do valor)
+    na ordem de leitura da aba (linha, coluna)
+    """
+    __slots__ = ('assinatura', 'entradas')
+
+    def __init__(self, assinatura, entradas=None):
+        self.assinatura = assinatura
+        self.entradas = entradas or {}
+
+    def __len__(self):
+        return len(self.entradas)
+
+    def celulas(self, rotulo, aba=None):
+        """
+        Todas as ocorrências do rótulo (opcionalmente só de uma aba)
+        """
+        ocorrencias = self.entradas.get(normalizar_rotulo(rotulo), ())
+        if aba is None:
+            return list(ocorrencias)
+        return [o for o in ocorrencias if o[0] == aba]
+
+    def celula_valor(self, rotulo, ocorrencia=0, aba=None):
+        """
+        (aba, coordenada) da célula de valor da n-ésima ocorrência do rótulo, ou None
+        """
+        ocorrencias = self.celulas(rotulo, aba)
+        if ocorrencia >= len(ocorrencias):
+            return None
+        aba_rotulo, _, coordenada_valor = ocorrencias[ocorrencia]
+        return aba_rotulo, coordenada_valor
+
+    def ler(self, wb, rotulo, ocorrencia=0, aba=None):
+        """
+        {'valor', 'coordenada', 'aba'} da n-ésima ocorrência do rótulo, ou None
+        """
+        celula = self.celula_valor(rotulo, ocorrencia, aba)
+        if celula is None:
+            return None
+        aba_rotulo, coordenada = celula
+        return {'valor': wb[aba_rotulo][coordenada].value, 'coordenada': coordenada, 'aba': aba_rotulo}
+
+    def confere(self, wb):
+        """
+        Confere por amostragem que os rótulos indexados estão onde o índice diz
+        (protege contra colisão de assinatura entre modelos diferentes)
+        """
+        for chave, ocorrencias in self.entradas.items():
+            aba, coordenada_rotulo, _ = ocorrencias[0]
+            if aba not in wb.sheetnames:
+                return False
+            valor = wb[aba][coordenada_rotulo].value
+            if not isinstance(valor, str) or normalizar_rotulo(valor) != chave:
+                return False
+            break
+        return True
+
+    def para_dicionario(self):
+        return {'versao': VERSAO_INDICE, 'assinatura': self.assinatura,
+                'entradas': {chave: [list(o) for o in ocorrencias] for chave, ocorrencias in self.entradas.items()}}
+
+    @classmethod
+    def de_dicionario(cls, dados):
+        if dados.get('versao') != VERSAO_INDICE:
+            return None
+        entradas = {chave: [tuple(o) for o in ocorrencias] for chave, ocorrencias in dados['entradas'].items()}
+        return cls(dados['assinatura'], entradas)
+
+
+def construir_indice(wb, assinatura=None):
+    """
+    Varre uma única vez as células de texto de todas as abas
+    A célula de valor é a primeira à direita do rótulo (após a mesclagem do rótulo)
+    """
+    assinatura = assinatura or assinatura_modelo(wb)
+    entradas = {}
+
+    with cronometrar('indice_rotulos'):
+        for ws in wb.worksheets:
+            # Última coluna de cada intervalo mesclado, pela célula de origem
+            fim_mescla = {(intervalo.min_row, intervalo.min_col): intervalo.max_col
+                          for intervalo in ws.merged_cells.ranges}
+
+            for linha in ws.iter_rows():
+                for celula in linha:
+                    valor = celula.value
+                    if not isinstance(valor, str) or not valor.strip() or valor.startswith('='):
+                        continue
+                    coluna_valor = fim_mescla.get((celula.row, celula.column), celula.column) + 1
+                    entradas.setdefault(normalizar_rotulo(valor), []).append(
+                        (ws.title, celula.coordinate, f"{get_column_letter(coluna_valor)}{celula.row}")
+                    )
+
+    return IndiceRotulos(assinatura, entradas)
+
+
+def caminho_indice(assinatura, pasta_cache=None):
+    pasta_cache = pasta_cache or PASTA_CACHE
+    return os.path.join(pasta_cache, f"rotulos-{assinatura}-v{VERSAO_INDICE}.json")
+
+
+def obter_indice(wb, pasta_cache=None):
+    """
+    Índice de rótulos do modelo da planilha: memória → disco → construção
+    """
+    assinatura = assinatura_modelo(wb)
+
+    indice = _INDICES.get(assinatura)
+    if indice is None:
+        try:
+            with open(caminho_indice(assinatura, pasta_cache), 'r', encoding='utf-8') as f:
+                indice = IndiceRotulos.de_dicionario(json.load(f))
+        except (OSError, ValueError, KeyError):
+            indice = None
+
+    if indice is not None and indice.confere(wb):
+        contar(ACERTOS_CACHE)
+        _INDICES[assinatura] = indice
+        return indice
+
+    contar(FALTAS_CACHE)
+    indice = construir_indice(wb, assinatura)
+    _INDICES[assinatura] = indice
+
+    try:
+        pasta = pasta_cache or PASTA_CACHE
+        os.makedirs(pasta, exist_ok=True)
+        caminho = caminho_indice(assinatura, pasta_cache)
+        temporario = f"{caminho}.{os.getpid()}.tmp"
+        with open(temporario, 'w', encoding='utf-8') as f:
+            json.dump(indice.para_dicionario(), f, ensure_ascii=False)
+        os.replace(temporario, caminho)
+    except OSError as e:
+        log.warning("   ⚠️  Não foi possível gravar o índice de rótulos: %s", e)
+
+    return indice
+
+
+def ler_valores_certificado(wb, aba=ABA_COLETA, rotulos=ROTULOS_CERTIFICADO):
+    """
+    Vazão média, tendência e desvio padrão de cada ponto, pelos rótulos da linha
+    de agregados. A n-ésima ocorrência de cada rótulo na aba é o n-ésimo ponto
+    Retorna {'ponto_N': {'numero_ponto', 'vazao_media', 'tendencia', 'desvio_padrao'}}
+    com cada valor no formato {'valor', 'coordenada', 'aba'} (None se ausente)
+    """
+    indice = obter_indice(wb)
+    total_pontos = max((len(indice.celulas(rotulo, aba)) for rotulo in rotulos.values()), default=0)
+
+    valores = {}
+    for i in range(total_pontos):
+        ponto = {'numero_ponto': i + 1}
+        for nome, rotulo in rotulos.items():
+            ponto[nome] = indice.ler(wb, rotulo, i, aba)
+        valores[f"ponto_{i + 1}"] = ponto
+    return valores
@@ -0,0 +1,483 @@
+# -*- coding: utf-8 -*-
+"""
+Tabela de Pontos em Memória Compartilhada
+Coloca a TabelaPontos (modelo_dados) em blocos de multiprocessing.shared_memory
+para que processos de trabalho leiam os pontos sem receber dicionários de
+Decimal por pickle a cada tarefa:
+
+    • bloco de dados: números, linhas e deslocamentos dos pontos, colunas
+      float64 e os arrays de resultado (por leitura e por ponto);
+    • bloco de textos: os valores exatos (Decimal) de todas as colunas, dos
+      valores sagrados e das constantes, como texto UTF-8 contíguo.
+
+Cada tarefa leva só o descritor (nomes dos blocos e dimensões) e a faixa de
+pontos; o processo se anexa aos blocos pelo nome uma única vez, reconstrói
+apenas os pontos da faixa e grava o resultado direto nos arrays
+compartilhados (valor float64 e texto exato de largura fixa). Com isso o
+custo por tarefa fica pequeno o bastante para paralelizar por ponto
+
+O refinamento ultra-preciso usa este caminho com refinar_pontos_ultra_preciso(...,
+processos=N) (pipeline_certificado --processos-ultra N)
+"""
+
+from decimal import Decimal, getcontext
+from functools import partial
+from multiprocessing import resource_tracker, shared_memory
+import multiprocessing
+import os
+
+import numpy as np
+
+from estrategias_tempo import compilar_estrategia
+from instrumentacao import contar, ITERACOES
+from modelo_dados import COLUNAS, COLUNAS_ENTRADA, COLUNAS_PONTO, TabelaPontos
+from orcamento_otimizacao import (ENCERRAMENTO_BUSCA, ENCERRAMENTO_CONVERGENCIA, ENCERRAMENTO_PRAZO, Prazo,
+                                  criar_orcamento, repassar_interrompidos, residuos_valores_sagrados)
+from registro_log import configurar_log, obter_logger
+
+# Configurar precisão alta
+getcontext().prec = 28
+
+log = obter_logger(__name__)
+
+# Bytes reservados para o texto exato de cada valor de resultado
+LARGURA_EXATO = 48
+
+# Valores de resultado gravados por ponto (além dos valores por leitura)
+CAMPOS_PONTO = 4
+
+# Valores do ponto gravados pelo refinamento ultra-preciso (encerramento pelo índice em ENCERRAMENTOS)
+CAMPOS_ULTRA = ('vazao_atual', 'diferenca', 'diferenca_inicial', 'iteracoes', 'objetivo_atingido',
+                'melhorias_encontradas', 'encerramento', 'tempo_busca')
+ENCERRAMENTOS = (ENCERRAMENTO_CONVERGENCIA, ENCERRAMENTO_PRAZO, ENCERRAMENTO_BUSCA)
+
+# Estado de cada ponto no array de resultado
+PENDENTE, CONCLUIDO, FALHOU = 0, 1, 2
+
+# Prefixo do texto de cada constante: valor Decimal ou texto
+MARCA_DECIMAL, MARCA_TEXTO = 'D', 'T'
+
+# Blocos anexados neste processo: {nome do bloco de dados: TabelaCompartilhada}
+_ANEXADAS = {}
+
+
+def _layout(n_pontos, n_leituras, campos_ponto=CAMPOS_PONTO, n_textos=0):
+    """
+    (deslocamento, dtype, forma) de cada array do bloco de dados e o tamanho total
+    """
+    arrays = [
+        ('numeros', np.int64, (n_pontos,)),
+        ('linhas_iniciais', np.int64, (n_pontos,)),
+        ('deslocamentos', np.int64, (n_pontos + 1,)),
+        ('linhas', np.int64, (n_leituras,)),
+        ('valores', np.float64, (len(COLUNAS), n_leituras)),
+        ('limites_textos', np.int64, (n_textos + 1,)),
+        ('estado', np.int64, (n_pontos,)),
+        ('resultado_leituras', np.float64, (n_leituras,)),
+        ('resultado_pontos', np.float64, (n_pontos, campos_ponto)),
+        ('exatos_leituras', f'S{LARGURA_EXATO}', (n_leituras,)),
+        ('exatos_pontos', f'S{LARGURA_EXATO}', (n_pontos, campos_ponto)),
+    ]
+    layout, deslocamento = {}, 0
+    for nome, dtype, forma in arrays:
+        tamanho = int(np.dtype(dtype).itemsize * np.prod(forma))
+        layout[nome] = (deslocamento, dtype, forma)
+        deslocamento += -(-tamanho // 8) * 8
+    return layout, max(deslocamento, 8)
+
+
+class TabelaCompartilhada:
+    """
+    Visão de uma TabelaPontos em memória compartilhada
+    No processo principal: TabelaCompartilhada.criar(tabela) (dono, libera os blocos)
+    Nos processos de trabalho: anexar(descritor)
+    """
+
+    def __init__(self, descritor, dados, textos, dono=False):
+        self.descritor = descritor
+        self.dono = dono
+        self._dados = dados
+        self._textos = textos
+        layout, _ = _layout(descritor['pontos'], descritor['leituras'], descritor['campos_ponto'],
+                            descritor['textos'])
+        self.arrays = {nome: np.ndarray(forma, dtype=dtype, buffer=dados.buf, offset=deslocamento)
+                       for nome, (deslocamento, dtype, forma) in layout.items()}
+
+    @classmethod
+    def criar(cls, tabela, campos_ponto=CAMPOS_PONTO):
+        """
+        Copia a tabela (e suas constantes) para novos blocos compartilhados
+        """
+        textos = [str(v) for coluna in COLUNAS for v in tabela.decimais[coluna]]
+        textos += [str(v) for nome in COLUNAS_PONTO for v in tabela.valores_originais[nome]]
+        for chave, valor in tabela.constantes.items():
+            # Constantes não numéricas (ex.: modo de calibração) voltam como texto
+            textos += [str(chave), (MARCA_DECIMAL if isinstance(valor, Decimal) else MARCA_TEXTO) + str(valor)]
+        codificados = [texto.encode('utf-8') for texto in textos]
+        buffer_textos = b''.join(codificados)
+
+        n_pontos, n_leituras = len(tabela), tabela.total_leituras
+        _, tamanho = _layout(n_pontos, n_leituras, campos_ponto, len(textos))
+        dados = shared_memory.SharedMemory(create=True, size=tamanho)
+        blocos_textos = shared_memory.SharedMemory(create=True, size=max(len(buffer_textos), 1))
+        blocos_textos.buf[:len(buffer_textos)] = buffer_textos
+
+        descritor = {
+            'dados': dados.name,
+            'textos_nome': blocos_textos.name,
+            'pontos': n_pontos,
+            'leituras': n_leituras,
+            'campos_ponto': campos_ponto,
+            'textos': len(textos),
+            'constantes': len(tabela.constantes),
+        }
+        compartilhada = cls(descritor, dados, blocos_textos, dono=True)
+        arrays = compartilhada.arrays
+        arrays['numeros'][:] = tabela.numeros
+        arrays['linhas_iniciais'][:] = tabela.linhas_iniciais
+        arrays['deslocamentos'][:] = tabela.deslocamentos
+        arrays['linhas'][:] = tabela.linhas
+        for i, coluna in enumerate(COLUNAS):
+            arrays['valores'][i] = tabela.valores[coluna]
+        arrays['limites_textos'][0] = 0
+        arrays['limites_textos'][1:] = np.cumsum([len(c) for c in codificados], dtype=np.int64)
+        arrays['estado'][:] = PENDENTE
+        arrays['resultado_leituras'][:] = np.nan
+        arrays['resultado_pontos'][:] = np.nan
+        return compartilhada
+
+    def _texto(self, indice):
+        inicio, fim = self.arrays['limites_textos'][indice:indice + 2].tolist()
+        return bytes(self._textos.buf[inicio:fim]).decode('utf-8')
+
+    def _decimais(self, inicio, fim):
+        limites = self.arrays['limites_textos'][inicio:fim + 1].tolist()
+        base = limites[0]
+        bruto = bytes(self._textos.buf[base:limites[-1]]).decode('utf-8')
+        return [Decimal(bruto[a - base:b - base]) for a, b in zip(limites, limites[1:])]
+
+    def constantes(self):
+        """
+        Constantes do certificado (Decimal exato; as não numéricas como texto)
+        """
+        primeiro = len(COLUNAS) * self.descritor['leituras'] + len(COLUNAS_PONTO) * self.descritor['pontos']
+        constantes = {}
+        for k in range(self.descritor['constantes']):
+            valor = self._texto(primeiro + 2 * k + 1)
+            constantes[self._texto(primeiro + 2 * k)] = Decimal(valor[1:]) if valor[0] == MARCA_DECIMAL else valor[1:]
+        return constantes
+
+    def ponto(self, indice, colunas=COLUNAS):
+        """
+        Reconstrói o ponto (dicionário do formato dos otimizadores) lendo só as suas leituras
+        colunas: colunas das leituras a reconstruir (os motores só usam as de entrada)
+        """
+        arrays = self.arrays
+        inicio, fim = int(arrays['deslocamentos'][indice]), int(arrays['deslocamentos'][indice + 1])
+        n_leituras, n_pontos = self.descritor['leituras'], self.descritor['pontos']
+
+        valores = {coluna: self._decimais(COLUNAS.index(coluna) * n_leituras + inicio,
+                                          COLUNAS.index(coluna) * n_leituras + fim)
+                   for coluna in colunas}
+        leituras = []
+        for j, linha in enumerate(arrays['linhas'][inicio:fim].tolist()):
+            leitura = {'linha': linha}
+            for coluna in colunas:
+                leitura[coluna] = valores[coluna][j]
+            leituras.append(leitura)
+
+        base = len(COLUNAS) * n_leituras
+        valores_originais = {nome: Decimal(self._texto(base + p * n_pontos + indice))
+                             for p, nome in enumerate(COLUNAS_PONTO)}
+        return {
+            'numero': int(arrays['numeros'][indice]),
+            'linha_inicial': int(arrays['linhas_iniciais'][indice]),
+            'leituras': leituras,
+            'valores_originais': valores_originais,
+        }
+
+    def gravar_resultado(self, indice, valores_leituras, valores_ponto=()):
+        """
+        Grava o resultado do ponto: um valor por leitura e até campos_ponto valores do ponto
+        """
+        arrays = self.arrays
+        inicio, fim = int(arrays['deslocamentos'][indice]), int(arrays['deslocamentos'][indice + 1])
+        if len(valores_leituras) != fim - inicio:
+            raise ValueError(f"ponto {indice}: {len(valores_leituras)} valores para {fim - inicio} leituras")
+        if len(valores_ponto) > self.descritor['campos_ponto']:
+            raise ValueError(f"ponto {indice}: mais de {self.descritor['campos_ponto']} valores do ponto")
+
+        for j, valor in enumerate(valores_leituras):
+            arrays['resultado_leituras'][inicio + j] = float(valor)
+            arrays['exatos_leituras'][inicio + j] = _texto_exato(valor)
+        for k, valor in enumerate(valores_ponto):
+            arrays['resultado_pontos'][indice, k] = float(valor)
+            arrays['exatos_pontos'][indice, k] = _texto_exato(valor)
+        arrays['estado'][indice] = CONCLUIDO
+
+    def marcar_falha(self, indice):
+        self.arrays['estado'][indice] = FALHOU
+
+    def resultado(self, indice):
+        """
+        (valores por leitura, valores do ponto) exatos do ponto, ou None se não concluído
+        """
+        arrays = self.arrays
+        if arrays['estado'][indice] != CONCLUIDO:
+            return None
+        inicio, fim = int(arrays['deslocamentos'][indice]), int(arrays['deslocamentos'][indice + 1])
+        valores_leituras = [Decimal(t.decode('ascii')) for t in arrays['exatos_leituras'][inicio:fim]]
+        valores_ponto = [Decimal(t.decode('ascii')) for t in arrays['exatos_pontos'][indice] if t]
+        return valores_leituras, valores_ponto
+
+    def fechar(self):
+        """
+        Solta as visões e fecha os blocos; o dono também os remove do sistema
+        """
+        self.arrays = {}
+        for bloco in (self._dados, self._textos):
+            bloco.close()
+            if self.dono:
+                bloco.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo, valor, rastreamento):
+        self.fechar()
+        return False
+
+
+def _texto_exato(valor):
+    texto = str(valor).encode('ascii')
+    if len(texto) > LARGURA_EXATO:
+        raise ValueError(f"valor com mais de {LARGURA_EXATO} caracteres: {valor}")
+    return texto
+
+
+def anexar(descritor):
+    """
+    Tabela compartilhada do descritor; a anexação é feita uma vez por processo
+    (a de uma tabela anterior é fechada)
+    """
+    tabela = _ANEXADAS.get(descritor['dados'])
+    if tabela is None:
+        for anterior in _ANEXADAS.values():
+            anterior.fechar()
+        _ANEXADAS.clear()
+        tabela = TabelaCompartilhada(descritor, shared_memory.SharedMemory(name=descritor['dados']),
+                                     shared_memory.SharedMemory(name=descritor['textos_nome']))
+        tabela.constantes_exatas = tabela.constantes()
+        _ANEXADAS[descritor['dados']] = tabela
+    return tabela
+
+
+def _executar_faixa(funcao, descritor, inicio, fim, colunas=COLUNAS_ENTRADA):
+    """
+    Tarefa do pool: resolve os pontos [inicio, fim) e grava os resultados na tabela compartilhada
+    funcao(ponto, constantes) → (valores por leitura, valores do ponto) ou None
+    Retorna o número de pontos concluídos
+    """
+    tabela = anexar(descritor)
+    concluidos = 0
+    for indice in range(inicio, fim):
+        try:
+            resultado = funcao(tabela.ponto(indice, colunas), tabela.constantes_exatas)
+        except Exception as e:
+            log.error("❌ Ponto %s: %s: %s", indice, type(e).__name__, e)
+            resultado = None
+        if resultado is None:
+            tabela.marcar_falha(indice)
+            continue
+        tabela.gravar_resultado(indice, *resultado)
+        concluidos += 1
+    return concluidos
+
+
+def _iniciar_processo():
+    configurar_log(os.environ.get('LOG_NIVEL', 'WARNING'), 'silencioso')
+
+
+class ExecutorPontos:
+    """
+    Pool de processos que resolve os pontos de uma TabelaPontos em paralelo
+    pela memória compartilhada (o pool é reaproveitado entre tabelas)
+    Uso:
+        with ExecutorPontos(refinar_ponto_ultra, processos=4) as executor:
+            resultados = executor.executar(tabela)   # [(valores por leitura, valores do ponto) ou None]
+    funcao deve ser uma função de módulo (enviada por referência); recebe as
+    leituras só com as colunas indicadas (padrão: as de entrada)
+    """
+
+    def __init__(self, funcao, processos=None, pontos_por_tarefa=1, campos_ponto=CAMPOS_PONTO,
+                 colunas=COLUNAS_ENTRADA):
+        self.funcao = funcao
+        self.colunas = colunas
+        self.processos = processos or os.cpu_count() or 1
+        self.pontos_por_tarefa = pontos_por_tarefa
+        self.campos_ponto = campos_ponto
+        # Os processos precisam herdar o rastreador de recursos do principal: com um
+        # rastreador próprio, o fim de um processo removeria os blocos ainda em uso
+        resource_tracker.ensure_running()
+        self._pool = multiprocessing.Pool(self.processos, initializer=_iniciar_processo)
+
+    def executar(self, tabela, funcao=None, campos_ponto=None):
+        """
+        Resolve os pontos da tabela; funcao e campos_ponto substituem os do executor nesta chamada
+        """
+        with TabelaCompartilhada.criar(tabela, campos_ponto or self.campos_ponto) as compartilhada:
+            tarefas = [(funcao or self.funcao, compartilhada.descritor, inicio,
+                        min(inicio + self.pontos_por_tarefa, len(tabela)), self.colunas)
+                       for inicio in range(0, len(tabela), self.pontos_por_tarefa)]
+            concluidos = sum(self._pool.starmap(_executar_faixa, tarefas, chunksize=1))
+            log.info("   ⚙️  %s/%s ponto(s) resolvidos em %s processo(s)", concluidos, len(tabela), self.processos)
+            return [compartilhada.resultado(i) for i in range(len(tabela))]
+
+    def fechar(self):
+        self._pool.close()
+        self._pool.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo, valor, rastreamento):
+        self.fechar()
+        return False
+
+
+def refinar_ponto_ultra(ponto, constantes, estrategia=None, segundos=None):
+    """
+    Refinamento ultra-preciso de um ponto partindo dos tempos da coluna tempo_coleta
+    estrategia: EstrategiaTempo (None = TEMPO_ALVO); segundos: prazo da busca (None = sem limite)
+    Retorna (tempos ultra-refinados, valores do ponto na ordem de CAMPOS_ULTRA)
+    """
+    from refinador_ultra_preciso import processar_ponto_ultra_preciso
+
+    ponto['tempos_refinados'] = [leitura['tempo_coleta'] for leitura in ponto['leituras']]
+    resultado = processar_ponto_ultra_preciso(ponto, constantes, estrategia=compilar_estrategia(estrategia),
+                                              prazo=Prazo(segundos) if segundos is not None else None)
+    if resultado is None:
+        return None
+    exatos = resultado['exatos']
+    tempo_busca = resultado['tempo_busca']
+    return exatos['tempos_ultra_refinados'], [
+        exatos['vazao_atual'], exatos['diferenca'], exatos['diferenca_inicial'], resultado['iteracoes'],
+        int(resultado['objetivo_atingido']), resultado['melhorias_encontradas'],
+        ENCERRAMENTOS.index(resultado['encerramento']),
+        Decimal('NaN') if tempo_busca is None else Decimal(repr(tempo_busca)),
+    ]
+
+
+def _resultado_ultra(ponto, constantes, bruto):
+    """
+    Resultado do ponto no formato de processar_ponto_ultra_preciso a partir dos valores
+    gravados pelo processo de trabalho (os resíduos são recalculados com os tempos exatos)
+    """
+    from refinador_ultra_preciso import montar_resultado_ultra
+
+    if bruto is None:
+        return None
+    tempos, valores = bruto
+    campos = dict(zip(CAMPOS_ULTRA, valores))
+    residuos = residuos_valores_sagrados(ponto['leituras'], constantes, tempos, ponto['valores_originais'])
+    campos_qualidade = {
+        'encerramento': ENCERRAMENTOS[int(campos['encerramento'])],
+        'residuos': {chave: float(valor) for chave, valor in residuos.items()},
+        'tempo_busca': None if campos['tempo_busca'].is_nan() else float(campos['tempo_busca']),
+    }
+    resultado = {
+        'tempos': tempos,
+        'vazao_atual': campos['vazao_atual'],
+        'diferenca': campos['diferenca'],
+        'objetivo_atingido': bool(campos['objetivo_atingido']),
+        'iteracoes': int(campos['iteracoes']),
+        'melhorias_encontradas': int(campos['melhorias_encontradas']),
+    }
+    return montar_resultado_ultra(ponto, resultado, campos['diferenca_inicial'], campos_qualidade, residuos)
+
+
+def _refinar_em_paralelo(executor, funcao, pontos, constantes, partidas):
+    """
+    {índice: resultado} dos pontos em partidas ({índice: tempos de partida}) refinados pelo executor
+    """
+    if not partidas:
+        return {}
+    indices = list(partidas)
+    # Os tempos de partida seguem para os processos na coluna tempo_coleta
+    tabela = TabelaPontos.de_pontos(
+        [dict(pontos[i], leituras=[dict(leitura, tempo_coleta=tempo)
+                                   for leitura, tempo in zip(pontos[i]['leituras'], partidas[i])])
+         for i in indices], constantes)
+    brutos = executor.executar(tabela, funcao, len(CAMPOS_ULTRA))
+    return {i: _resultado_ultra(dict(pontos[i], tempos_refinados=list(partidas[i])), constantes, bruto)
+            for i, bruto in zip(indices, brutos)}
+
+
+def refinar_pontos_ultra_compartilhado(pontos, constantes, relatorio=None, cache=None, estrategia=None,
+                                       orcamento=None, processos=None, executor=None):
+    """
+    Refinamento ultra-preciso de todos os pontos em paralelo (um ponto por tarefa), com os
+    mesmos argumentos e resultados de refinar_pontos_ultra_preciso:
+        • cache: acertos servidos sem refinar; partidas vizinhas refinadas no mesmo lote e,
+          se não convergirem, refeitas num segundo lote a partir dos tempos de partida;
+        • orcamento: cada ponto tem o prazo de segundos_por_ponto (não há sobra entre pontos
+          que rodam juntos); os interrompidos voltam no repasse com a sobra da etapa
+    executor: ExecutorPontos já aberto (reaproveitado entre chamadas); senão um próprio com processos
+    """
+    from refinador_ultra_preciso import ETAPA_RELATORIO, TOLERANCIA_ULTRA, processar_ponto_ultra_preciso
+
+    restricoes = compilar_estrategia(estrategia)
+    agenda = criar_orcamento(orcamento, len(pontos))
+    funcao = partial(refinar_ponto_ultra, estrategia=restricoes.estrategia,
+                     segundos=agenda.segundos_por_ponto if agenda is not None else None)
+    resultados = [None] * len(pontos)
+    chaves, partidas, vizinhas = {}, {}, set()
+    for i, ponto in enumerate(pontos):
+        partidas[i] = list(ponto['tempos_refinados'])
+        if cache is None:
+            continue
+        chave, solucao, partida = cache.consultar(
+            ETAPA_RELATORIO, ponto, constantes, ponto['tempos_refinados'], TOLERANCIA_ULTRA,
+            extras={'tempo_alvo': restricoes.assinatura}, campo_tempos='tempos_ultra_refinados')
+        if solucao is not None:
+            resultados[i] = solucao
+            del partidas[i]
+            continue
+        chaves[i] = chave
+        if partida is not None:
+            partidas[i] = partida
+            vizinhas.add(i)
+
+    proprio = executor is None
+    executor = executor or ExecutorPontos(funcao, processos)
+    try:
+        refinados = _refinar_em_paralelo(executor, funcao, pontos, constantes, partidas)
+        aceitas = {i for i in vizinhas if cache.aceitar_vizinha(pontos[i], refinados[i], TOLERANCIA_ULTRA)}
+        refinados.update(_refinar_em_paralelo(executor, funcao, pontos, constantes,
+                                              {i: list(pontos[i]['tempos_refinados']) for i in vizinhas - aceitas}))
+    finally:
+        if proprio:
+            executor.fechar()
+
+    for i, resultado in refinados.items():
+        if resultado is not None and cache is not None:
+            resultado = cache.concluir(chaves[i], resultado, 'partida_vizinha' if i in aceitas else 'falta')
+        resultados[i] = resultado
+
+    for i, (ponto, resultado) in enumerate(zip(pontos, resultados)):
+        if resultado and resultado.get('cache') != 'acerto':
+            contar(ITERACOES, resultado['iteracoes'])
+        # Pontos interrompidos pelo prazo vão para o relatório depois do repasse
+        adiado = agenda is not None and agenda.concluir_ponto(i, ponto, resultado)
+        if relatorio is not None and not adiado:
+            relatorio.ponto(resultado, ETAPA_RELATORIO, ponto['numero'])
+
+    if agenda is not None:
+        repassar_interrompidos(
+            agenda, resultados,
+            lambda ponto, anterior, prazo: processar_ponto_ultra_preciso(
+                dict(ponto, tempos_refinados=anterior['exatos']['tempos_ultra_refinados']), constantes,
+                estrategia=restricoes, prazo=prazo),
+            relatorio, ETAPA_RELATORIO,
+        )
+    return resultados
@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+"""
+Modelo de Dados em Colunas
+Guarda todas as leituras de um certificado em uma única tabela contígua:
+cada coluna é um array NumPy (float64) acompanhado de uma lista paralela de
+Decimal com o valor exato. Os pontos são faixas da tabela e são acessados por
+visões, sem copiar dicionários a cada candidato avaliado pelos otimizadores
+"""
+
+from decimal import Decimal
+import numpy as np
+
+# Colunas de entrada (valores brutos da planilha)
+COLUNAS_ENTRADA = ('pulsos_padrao', 'tempo_coleta', 'leitura_medidor', 'temperatura')
+
+# Colunas derivadas (calculadas pelas fórmulas da planilha)
+COLUNAS_DERIVADAS = (
+    'tempo_coleta_corrigido',
+    'temperatura_corrigida',
+    'totalizacao_padrao_corrigido',
+    'vazao_referencia',
+    'vazao_medidor',
+    'erro_percentual',
+)
+
+COLUNAS = COLUNAS_ENTRADA + COLUNAS_DERIVADAS
+
+# Valores sagrados guardados por ponto
+COLUNAS_PONTO = ('vazao_media', 'tendencia', 'desvio_padrao')
+
+ZERO = Decimal('0')
+
+
+def _decimal(valor):
+    """
+    Normaliza o valor lido (Decimal, número ou None) para Decimal
+    """
+    if valor is None:
+        return ZERO
+    if isinstance(valor, Decimal):
+        return valor
+    return Decimal(str(valor))
+
+
+class VistaPonto:
+    """
+    Visão de um ponto dentro da TabelaPontos (não copia os dados)
+    """
+    __slots__ = ('tabela', 'indice', 'inicio', 'fim')
+
+    def __init__(self, tabela, indice):
+        self.tabela = tabela
+        self.indice = indice
+        self.inicio = int(tabela.deslocamentos[indice])
+        self.fim = int(tabela.deslocamentos[indice + 1])
+
+    def __len__(self):
+        return self.fim - self.inicio
+
+    @property
+    def numero(self):
+        return int(self.tabela.numeros[self.indice])
+
+    @property
+    def linha_inicial(self):
+        return int(self.tabela.linhas_iniciais[self.indice])
+
+    @property
+    def linhas(self):
+        return self.tabela.linhas[self.inicio:self.fim]
+
+    def valores(self, coluna):
+        """
+        Retorna a coluna do ponto como visão float64 (compartilha memória com a tabela)
+        """
+        return self.tabela.valores[coluna][self.inicio:self.fim]
+
+    def decimais(self, coluna):
+        """
+        Retorna os valores exatos (Decimal) da coluna para as leituras do ponto
+        """
+        return self.tabela.decimais[coluna][self.inicio:self.fim]
+
+    def valor_original(self, nome):
+        """
+        Retorna um valor sagrado (vazao_media, tendencia, desvio_padrao) do ponto
+        """
+        return self.tabela.valores_originais[nome][self.indice]
+
+    def definir(self, coluna, valores):
+        """
+        Grava os valores (Decimal) de uma coluna para as leituras do ponto
+        """
+        self.tabela.definir(coluna, self.inicio, valores)
+
+    def leituras(self):
+        """
+        Reconstrói as leituras no formato de dicionário usado pelos scripts
+        """
+        return [self.tabela.leitura(i) for i in range(self.inicio, self.fim)]
+
+
+class TabelaPontos:
+    """
+    Tabela contígua com todas as leituras de um certificado
+
+    deslocamentos[i]:deslocamentos[i + 1] delimita as leituras do ponto i,
+    permitindo pontos com quantidades diferentes de leituras
+    """
+    __slots__ = ('numeros', 'linhas_iniciais', 'deslocamentos', 'linhas',
+                 'valores', 'decimais', 'valores_originais', 'constantes')
+
+    def __init__(self, numeros, linhas_iniciais, deslocamentos, linhas, decimais,
+                 valores_originais=None, constantes=None):
+        self.numeros = np.asarray(numeros, dtype=np.int32)
+        self.linhas_iniciais = np.asarray(linhas_iniciais, dtype=np.int32)
+        self.deslocamentos = np.asarray(deslocamentos, dtype=np.int64)
+        self.linhas = np.asarray(linhas, dtype=np.int32)
+        self.decimais = {coluna: list(decimais.get(coluna, [ZERO] * len(self.linhas))) for coluna in COLUNAS}
+        self.valores = {coluna: np.array([float(v) for v in self.decimais[coluna]], dtype=np.float64)
+                        for coluna in COLUNAS}
+        valores_originais = valores_originais or {}
+        self.valores_originais = {nome: list(valores_originais.get(nome, [ZERO] * len(self.numeros)))
+                                  for nome in COLUNAS_PONTO}
+        self.constantes = constantes or {}
+
+    @classmethod
+    def de_pontos(cls, pontos, constantes=None):
+        """
+        Monta a tabela a partir da lista de pontos extraída pelo otimizador
+        (cada ponto com 'numero', 'linha_inicial', 'leituras' e 'valores_originais')
+        """
+        numeros, linhas_iniciais, deslocamentos, linhas = [], [], [0], []
+        decimais = {coluna: [] for coluna in COLUNAS}
+        originais = {nome: [] for nome in COLUNAS_PONTO}
+
+        for posicao, ponto in enumerate(pontos):
+            leituras = ponto['leituras']
+            numeros.append(ponto.get('numero', posicao + 1))
+            linhas_iniciais.append(ponto.get('linha_inicial', leituras[0]['linha'] if leituras else 0))
+            for leitura in leituras:
+                linhas.append(leitura.get('linha', 0))
+                for coluna in COLUNAS:
+                    decimais[coluna].append(_decimal(leitura.get(coluna)))
+            deslocamentos.append(len(linhas))
+
+            valores_ponto = ponto.get('valores_originais') or ponto.get('valores_sagrados') or {}
+            for nome in COLUNAS_PONTO:
+                originais[nome].append(_decimal(valores_ponto.get(nome)))
+
+        return cls(numeros, linhas_iniciais, deslocamentos, linhas, decimais, originais, constantes)
+
+    @classmethod
+    def de_dados_originais(cls, dados_originais, constantes=None):
+        """
+        Monta a tabela a partir do dicionário {ponto_key: ponto} do ajustador
+        """
+        return cls.de_pontos(list(dados_originais.values()), constantes)
+
+    @classmethod
+    def de_leituras(cls, leituras, constantes=None):
+        """
+        Monta uma tabela de um único ponto a partir de uma lista de leituras
+        """
+        return cls.de_pontos([{'numero': 1, 'leituras': leituras}], constantes)
+
+    def __len__(self):
+        return len(self.numeros)
+
+    @property
+    def total_leituras(self):
+        return len(self.linhas)
+
+    def ponto(self, indice):
+        """
+        Retorna a visão do ponto na posição indicada
+        """
+        return VistaPonto(self, indice)
+
+    def pontos(self):
+        """
+        Itera sobre as visões de todos os pontos
+        """
+        return (VistaPonto(self, i) for i in range(len(self.numeros)))
+
+    def definir(self, coluna, inicio, valores):
+        """
+        Grava valores exatos a partir da posição inicio, mantendo o float64 em sincronia
+        """
+        exatos = self.decimais[coluna]
+        aproximados = self.valores[coluna]
+        for deslocamento, valor in enumerate(valores):
+            valor = _decimal(valor)
+            exatos[inicio + deslocamento] = valor
+            aproximados[inicio + deslocamento] = float(valor)
+
+    def leitura(self, posicao):
+        """
+        Reconstrói uma leitura (dicionário) a partir da posição na tabela
+        """
+        leitura = {'linha': int(self.linhas[posicao])}
+        for coluna in COLUNAS:
+            leitura[coluna] = self.decimais[coluna][posicao]
+        return leitura
+
+    def para_pontos(self):
+        """
+        Converte a tabela de volta para a lista de pontos em dicionários
+        """
+        return [
+            {
+                'numero': vista.numero,
+                'linha_inicial': vista.linha_inicial,
+                'leituras': vista.leituras(),
+                'valores_originais': {nome: vista.valor_original(nome) for nome in COLUNAS_PONTO},
+            }
+            for vista in self.pontos()
+        ]
@@ -0,0 +1,284 @@
+# -*- coding: utf-8 -*-
+"""
+Monitor de Pasta de Entrada
+Serviço contínuo que observa uma pasta de entrada e processa cada nova planilha
+de certificado assim que ela termina de ser gravada. Usa eventos do sistema de
+arquivos (watchdog/inotify) quando disponível e varredura periódica caso contrário
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+import argparse
+import json
+import os
+import queue
+import threading
+import time
+import zipfile
+
+from processamento_lote import aquecer_motores, cache_processo, eh_planilha_entrada, processar_certificado
+
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+    WATCHDOG_DISPONIVEL = True
+except ImportError:
+    WATCHDOG_DISPONIVEL = False
+
+# Tempo (s) sem alteração de tamanho/data para considerar o arquivo completo
+TEMPO_ESTABILIDADE = 2.0
+
+# Intervalo (s) da varredura da pasta quando não há eventos do sistema
+INTERVALO_VARREDURA = 1.0
+
+
+def _aquecer_worker():
+    """
+    Inicializador dos processos do pool: o mesmo aquecimento do serviço HTTP
+    (módulos, estratégias de tempo e layout compilados) e o cache de soluções
+    que processar_certificado reaproveita
+    """
+    aquecer_motores()
+    cache_processo()
+
+
+def assinatura_arquivo(caminho):
+    """
+    Retorna (tamanho, mtime_ns) do arquivo, ou None se ele não existir mais
+    """
+    try:
+        info = os.stat(caminho)
+    except OSError:
+        return None
+    return (info.st_size, info.st_mtime_ns)
+
+
+def planilha_completa(caminho):
+    """
+    Verifica se o .xlsx já pode ser lido - o diretório central do zip fica no
+    final do arquivo, então uma gravação parcial não passa nesta verificação
+    """
+    try:
+        return zipfile.is_zipfile(caminho)
+    except OSError:
+        return False
+
+
+if WATCHDOG_DISPONIVEL:
+    class _ManipuladorEventos(FileSystemEventHandler):
+        """
+        Encaminha criações, modificações e renomeações para a fila de candidatos
+        """
+
+        def __init__(self, fila_eventos):
+            super().__init__()
+            self.fila_eventos = fila_eventos
+
+        def on_created(self, event):
+            if not event.is_directory:
+                self.fila_eventos.put(event.src_path)
+
+        def on_modified(self, event):
+            if not event.is_directory:
+                self.fila_eventos.put(event.src_path)
+
+        def on_moved(self, event):
+            if not event.is_directory:
+                self.fila_eventos.put(event.dest_path)
+
+
+class MonitorPasta:
+    """
+    Observa a pasta de entrada, aplica o debounce de arquivos em gravação e
+    envia as planilhas prontas para um pool de processos já aquecido
+    """
+
+    def __init__(self, pasta_entrada, pasta_saida='resultados_lote', max_processos=None,
+                 tempo_estabilidade=TEMPO_ESTABILIDADE, intervalo_varredura=INTERVALO_VARREDURA,
+                 usar_watchdog=True, processar_existentes=True):
+        self.pasta_entrada = pasta_entrada
+        self.pasta_saida = pasta_saida
+        self.max_processos = max_processos or os.cpu_count() or 1
+        self.tempo_estabilidade = tempo_estabilidade
+        self.intervalo_varredura = intervalo_varredura
+        self.usar_watchdog = usar_watchdog and WATCHDOG_DISPONIVEL
+        self.processar_existentes = processar_existentes
+
+        self.fila_eventos = queue.Queue()
+        self.pendentes = {}      # caminho -> (assinatura, instante da última mudança)
+        self.processados = {}    # caminho -> assinatura já enviada ao pool
+        self.em_execucao = {}    # futuro -> caminho
+        self.parar = threading.Event()
+        self.arquivo_historico = os.path.join(pasta_saida, 'historico_monitor.jsonl')
+
+    def _registrar_candidato(self, caminho):
+        """
+        Marca o arquivo como pendente, reiniciando o debounce se ele mudou
+        """
+        if not eh_planilha_entrada(caminho):
+            return
+        assinatura = assinatura_arquivo(caminho)
+        if assinatura is None or self.processados.get(caminho) == assinatura:
+            return
+        anterior = self.pendentes.get(caminho)
+        if anterior is None or anterior[0] != assinatura:
+            self.pendentes[caminho] = (assinatura, time.monotonic())
+
+    def _listar_planilhas(self):
+        """
+        Caminhos das planilhas de entrada presentes na pasta (None se ela não existe)
+        """
+        try:
+            with os.scandir(self.pasta_entrada) as entradas:
+                return [entrada.path for entrada in entradas
+                        if entrada.is_file() and eh_planilha_entrada(entrada.path)]
+        except FileNotFoundError:
+            print(f"⚠️  Pasta de entrada não encontrada: {self.pasta_entrada}")
+            return None
+
+    def _varrer_pasta(self):
+        """
+        Varredura completa da pasta (modo sem eventos e reconciliação periódica)
+        """
+        caminhos = self._listar_planilhas()
+        if caminhos is None:
+            return
+        for caminho in caminhos:
+            self._registrar_candidato(caminho)
+
+        # Esquece arquivos que sumiram da pasta para o monitor não crescer sem limite
+        presentes = set(caminhos)
+        for caminho in [c for c in self.processados if c not in presentes]:
+            del self.processados[caminho]
+
+    def _despachar_prontos(self, executor):
+        """
+        Envia ao pool os arquivos que ficaram estáveis pelo tempo de debounce
+        """
+        agora = time.monotonic()
+        for caminho, (assinatura, instante) in list(self.pendentes.items()):
+            if agora - instante < self.tempo_estabilidade:
+                continue
+            atual = assinatura_arquivo(caminho)
+            if atual is None:
+                del self.pendentes[caminho]
+                continue
+            if atual != assinatura:
+                self.pendentes[caminho] = (atual, agora)
+                continue
+            if not planilha_completa(caminho):
+                # Ainda sendo gravada (ou inválida) - aguarda nova mudança
+                self.pendentes[caminho] = (atual, agora)
+                continue
+
+            del self.pendentes[caminho]
+            self.processados[caminho] = atual
+            futuro = executor.submit(processar_certificado, caminho, self.pasta_saida)
+            self.em_execucao[futuro] = caminho
+            print(f"📥 Na fila: {os.path.basename(caminho)}")
+
+    def _coletar_concluidos(self):
+        """
+        Registra o resultado dos certificados concluídos no histórico
+        """
+        for futuro in [f for f in self.em_execucao if f.done()]:
+            caminho = self.em_execucao.pop(futuro)
+            try:
+                resumo = futuro.result()
+            except Exception as e:
+                resumo = {'arquivo': caminho, 'status': 'erro', 'erro': f"{type(e).__name__}: {e}"}
+
+            resumo['data_conclusao'] = datetime.now().isoformat()
+            with open(self.arquivo_historico, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(resumo, ensure_ascii=False, default=str) + '\n')
+
+            simbolo = {'aprovado': '✅', 'reprovado': '⚠️ '}.get(resumo['status'], '❌')
+            detalhe = resumo.get('erro') or f"{resumo['pontos_aprovados']}/{resumo['pontos']} pontos aprovados"
+            print(f"{simbolo} {os.path.basename(caminho)}: {detalhe} ({resumo.get('tempo_total', 0):.2f}s)")
+
+    def executar(self):
+        """
+        Laço principal do monitor - roda até Ctrl+C ou até parar.set()
+        """
+        os.makedirs(self.pasta_saida, exist_ok=True)
+        # O observador do watchdog exige que a pasta exista ao ser agendado
+        os.makedirs(self.pasta_entrada, exist_ok=True)
+
+        print(f"👀 Monitorando: {self.pasta_entrada}")
+        print(f"📁 Resultados em: {self.pasta_saida}")
+        print(f"🔧 Modo: {'eventos (watchdog)' if self.usar_watchdog else 'varredura periódica'}")
+        print(f"⚙️  Processos: {self.max_processos}")
+
+        if self.processar_existentes:
+            self._varrer_pasta()
+        else:
+            for caminho in self._listar_planilhas() or []:
+                self.processados[caminho] = assinatura_arquivo(caminho)
+
+        observador = None
+        if self.usar_watchdog:
+            observador = Observer()
+            observador.schedule(_ManipuladorEventos(self.fila_eventos), self.pasta_entrada, recursive=False)
+            observador.start()
+
+        # Com eventos, a varredura completa serve apenas de reconciliação
+        intervalo_reconciliacao = self.intervalo_varredura * (30 if observador else 1)
+        ultima_varredura = time.monotonic()
+
+        try:
+            with ProcessPoolExecutor(max_workers=self.max_processos, initializer=_aquecer_worker) as executor:
+                while not self.parar.is_set():
+                    espera = min(self.intervalo_varredura, self.tempo_estabilidade / 2)
+                    try:
+                        self._registrar_candidato(self.fila_eventos.get(timeout=espera))
+                        while True:
+                            self._registrar_candidato(self.fila_eventos.get_nowait())
+                    except queue.Empty:
+                        pass
+
+                    if time.monotonic() - ultima_varredura >= intervalo_reconciliacao:
+                        self._varrer_pasta()
+                        ultima_varredura = time.monotonic()
+
+                    self._despachar_prontos(executor)
+                    self._coletar_concluidos()
+
+                if self.em_execucao:
+                    print(f"⏳ Aguardando {len(self.em_execucao)} certificado(s) em andamento...")
+                    while self.em_execucao:
+                        time.sleep(0.2)
+                        self._coletar_concluidos()
+        except KeyboardInterrupt:
+            print("\n🛑 Monitor interrompido pelo usuário")
+        finally:
+            if observador is not None:
+                observador.stop()
+                observador.join()
+
+
+def main():
+    """
+    Função principal - MONITOR DE PASTA DE ENTRADA
+    """
+    parser = argparse.ArgumentParser(description="Processa automaticamente as planilhas que chegam em uma pasta")
+    parser.add_argument('entrada', help="pasta monitorada")
+    parser.add_argument('-o', '--saida', default='resultados_lote', help="pasta de resultados (padrão: resultados_lote)")
+    parser.add_argument('-p', '--processos', type=int, default=None, help="número de processos (padrão: núcleos da CPU)")
+    parser.add_argument('--estabilidade', type=float, default=TEMPO_ESTABILIDADE,
+                        help=f"segundos sem alteração para considerar o arquivo completo (padrão: {TEMPO_ESTABILIDADE})")
+    parser.add_argument('--varredura', action='store_true', help="força o modo de varredura periódica")
+    parser.add_argument('--ignorar-existentes', action='store_true', help="não processa os arquivos já presentes na pasta")
+    args = parser.parse_args()
+
+    if not args.varredura and not WATCHDOG_DISPONIVEL:
+        print("💡 watchdog não instalado - usando varredura periódica (pip install watchdog)")
+
+    monitor = MonitorPasta(args.entrada, args.saida, args.processos,
+                           tempo_estabilidade=args.estabilidade,
+                           usar_watchdog=not args.varredura,
+                           processar_existentes=not args.ignorar_existentes)
+    monitor.executar()
+
+
+if __name__ == "__main__":
+    main()
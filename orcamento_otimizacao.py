@@ -0,0 +1,243 @@
+# -*- coding: utf-8 -*-
+"""
+Orçamento de Tempo das Buscas
+Prazo de relógio por ponto para as buscas de tempos (refinamento híbrido e
+ultra-preciso): esgotado o prazo, a busca devolve a melhor solução encontrada
+até ali e informa o motivo do encerramento. O orçamento de uma etapa é dividido
+entre os pontos; a sobra dos pontos que convergem cedo passa para os seguintes e,
+no fim, para um repasse dos pontos interrompidos pelo prazo
+
+Uso:
+    orcamento = criar_orcamento(segundos_por_ponto, len(pontos))
+    for indice, ponto in enumerate(pontos):
+        resultados.append(processar(ponto, prazo=orcamento.prazo_ponto()))
+        orcamento.concluir_ponto(indice, ponto, resultados[-1])
+    repassar_interrompidos(orcamento, resultados, lambda ponto, anterior, prazo: ...)
+"""
+
+from decimal import Decimal, getcontext
+import os
+import time
+
+from registro_log import obter_logger
+
+# Configurar precisão alta
+getcontext().prec = 28
+
+log = obter_logger(__name__)
+
+# Variável de ambiente com o orçamento padrão por ponto, em segundos (herdada pelos processos de trabalho)
+VARIAVEL_AMBIENTE = 'ORCAMENTO_PONTO'
+
+# Motivos de encerramento de uma busca
+ENCERRAMENTO_CONVERGENCIA = 'convergencia'
+ENCERRAMENTO_PRAZO = 'prazo'
+ENCERRAMENTO_BUSCA = 'busca_esgotada'
+
+# Valores sagrados do certificado (resíduo informado para cada um)
+VALORES_SAGRADOS = ('vazao_media', 'tendencia', 'desvio_padrao')
+
+# Fração mínima do orçamento restante para valer um repasse
+FRACAO_MINIMA_REPASSE = 0.05
+
+
+class Prazo:
+    """
+    Prazo de relógio (perf_counter) de uma busca; segundos=None é sem limite
+    """
+    __slots__ = ('inicio', 'limite', 'expirado')
+
+    def __init__(self, segundos=None):
+        self.inicio = time.perf_counter()
+        self.limite = None if segundos is None else self.inicio + max(0.0, segundos)
+        self.expirado = False
+
+    def esgotado(self):
+        if self.limite is not None and time.perf_counter() >= self.limite:
+            self.expirado = True
+        return self.expirado
+
+    @property
+    def decorrido(self):
+        return time.perf_counter() - self.inicio
+
+    @property
+    def restante(self):
+        return None if self.limite is None else max(0.0, self.limite - time.perf_counter())
+
+
+def limitar(candidatos, prazo):
+    """
+    Candidatos da busca até o prazo se esgotar (o candidato em curso é sempre avaliado)
+    """
+    if prazo is None:
+        return candidatos
+    return _limitar(candidatos, prazo)
+
+
+def _limitar(candidatos, prazo):
+    for candidato in candidatos:
+        yield candidato
+        if prazo.esgotado():
+            return
+
+
+def encerramento(objetivo_atingido, prazo):
+    """
+    Motivo do encerramento de uma busca
+    """
+    if objetivo_atingido:
+        return ENCERRAMENTO_CONVERGENCIA
+    if prazo is not None and prazo.expirado:
+        return ENCERRAMENTO_PRAZO
+    return ENCERRAMENTO_BUSCA
+
+
+def orcamento_padrao():
+    """
+    Segundos por ponto da variável ORCAMENTO_PONTO (None = sem limite)
+    """
+    valor = os.environ.get(VARIAVEL_AMBIENTE)
+    return validar_orcamento(valor) if valor else None
+
+
+def validar_orcamento(valor):
+    """
+    Segundos por ponto como float positivo (None = sem limite)
+    """
+    if valor is None:
+        return None
+    try:
+        segundos = float(valor)
+    except (TypeError, ValueError):
+        raise ValueError(f"orçamento por ponto inválido: {valor!r}") from None
+    if not segundos > 0 or segundos == float('inf'):
+        raise ValueError(f"orçamento por ponto deve ser positivo: {valor!r}")
+    return segundos
+
+
+def residuos_valores_sagrados(leituras, constantes, tempos, valores_sagrados):
+    """
+    |obtido - sagrado| de cada valor sagrado com os tempos informados (Decimal)
+    """
+    from otimizador_tempos_inteligente import calcular_formulas_com_tempo_ajustado, calcular_agregados_com_tempo_ajustado
+
+    agregados = calcular_agregados_com_tempo_ajustado(
+        calcular_formulas_com_tempo_ajustado(leituras, constantes, tempos)
+    )
+    return {chave: abs(agregados[chave] - Decimal(valores_sagrados[chave]))
+            for chave in VALORES_SAGRADOS if valores_sagrados.get(chave) is not None}
+
+
+def qualidade(leituras, constantes, tempos, valores_sagrados, resultado, prazo):
+    """
+    Campos de qualidade do resultado de um ponto: motivo do encerramento, resíduo
+    de cada valor sagrado e tempo de busca
+    """
+    residuos = residuos_valores_sagrados(leituras, constantes, tempos, valores_sagrados)
+    return {
+        'encerramento': encerramento(resultado['objetivo_atingido'], prazo),
+        'residuos': {chave: float(valor) for chave, valor in residuos.items()},
+        'tempo_busca': round(prazo.decorrido, 6) if prazo is not None else None,
+    }, residuos
+
+
+class OrcamentoEtapa:
+    """
+    Orçamento de tempo de uma etapa (segundos_por_ponto × pontos)
+    Cada ponto recebe o restante dividido pelos pontos pendentes, então a sobra dos
+    pontos fáceis fica para os seguintes; os interrompidos pelo prazo voltam no repasse
+    com o que sobrar no fim
+    """
+
+    def __init__(self, segundos_por_ponto, total_pontos):
+        self.segundos_por_ponto = segundos_por_ponto
+        self.total = segundos_por_ponto * total_pontos
+        self.inicio = time.perf_counter()
+        self.pendentes = total_pontos
+        self.interrompidos = []
+        self.repasses = 0
+
+    @property
+    def restante(self):
+        return max(0.0, self.total - (time.perf_counter() - self.inicio))
+
+    def prazo_ponto(self):
+        return Prazo(self.restante / max(1, self.pendentes))
+
+    def concluir_ponto(self, indice, ponto, resultado):
+        """
+        Registra o fim do ponto; True se foi interrompido pelo prazo (fica para o repasse)
+        """
+        self.pendentes = max(0, self.pendentes - 1)
+        if resultado and resultado.get('encerramento') == ENCERRAMENTO_PRAZO:
+            self.interrompidos.append((indice, ponto, resultado))
+            return True
+        return False
+
+    def repasse(self):
+        """
+        (índice, ponto, resultado anterior, prazo) dos pontos interrompidos, dividindo a
+        sobra do orçamento; prazo None quando a sobra não vale um novo refinamento
+        """
+        while self.interrompidos:
+            indice, ponto, resultado = self.interrompidos.pop(0)
+            parcela = self.restante / (len(self.interrompidos) + 1)
+            if parcela < self.segundos_por_ponto * FRACAO_MINIMA_REPASSE:
+                yield indice, ponto, resultado, None
+                continue
+            self.repasses += 1
+            log.info("   ⏱️  Repasse do Ponto %s com %.3fs de sobra do orçamento", ponto['numero'], parcela)
+            yield indice, ponto, resultado, Prazo(parcela)
+
+    def resumo(self):
+        return {
+            'segundos_por_ponto': self.segundos_por_ponto,
+            'orcamento_total': round(self.total, 6),
+            'tempo_usado': round(time.perf_counter() - self.inicio, 6),
+            'repasses': self.repasses,
+        }
+
+
+def criar_orcamento(orcamento, total_pontos):
+    """
+    OrcamentoEtapa para segundos por ponto (None = ORCAMENTO_PONTO), ou None sem limite
+    """
+    segundos = orcamento_padrao() if orcamento is None else validar_orcamento(orcamento)
+    return OrcamentoEtapa(segundos, total_pontos) if segundos else None
+
+
+def melhor_resultado(anterior, novo):
+    """
+    Resultado do repasse quando melhora a diferença (iterações e tempo de busca somados)
+    """
+    if novo is None:
+        return anterior
+    escolhido = dict(novo if novo['diferenca'] <= anterior['diferenca'] else anterior)
+    escolhido['iteracoes'] = anterior['iteracoes'] + novo['iteracoes']
+    escolhido['tempo_busca'] = (anterior.get('tempo_busca') or 0) + (novo.get('tempo_busca') or 0)
+    escolhido['repasse'] = True
+    return escolhido
+
+
+def repassar_interrompidos(orcamento, resultados, refinar, relatorio=None, etapa=None):
+    """
+    Refina de novo os pontos interrompidos pelo prazo com a sobra do orçamento,
+    partindo da melhor aproximação anterior; refinar(ponto, anterior, prazo) → resultado
+    Atualiza resultados[índice] e grava os pontos adiados no relatório em fluxo
+    """
+    from instrumentacao import contar, medir_ponto, ITERACOES
+
+    for indice, ponto, anterior, prazo in orcamento.repasse():
+        resultado = anterior
+        if prazo is not None:
+            with medir_ponto(ponto['numero']):
+                novo = refinar(ponto, anterior, prazo)
+                if novo:
+                    contar(ITERACOES, novo['iteracoes'])
+            resultado = resultados[indice] = melhor_resultado(anterior, novo)
+            log.info("   ⏱️  Ponto %s após o repasse: diferença %.8f (%s)", ponto['numero'],
+                     resultado['diferenca'], resultado['encerramento'])
+        if relatorio is not None:
+            relatorio.ponto(resultado, etapa, ponto['numero'])
+    log.info("   ⏱️  Orçamento da etapa: %s", orcamento.resumo())
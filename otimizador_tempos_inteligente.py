@@ -4,18 +4,22 @@ Otimizador de Tempos de Coleta - Versão Simples e Eficiente
 Decrementa tempos até encontrar valores exatos
 """
 
-import pandas as pd
-from openpyxl import load_workbook, Workbook
 from decimal import Decimal, ROUND_HALF_UP, getcontext
 import json
 import os
 import time
-import numpy as np
 import shutil
+from cache_planilhas import obter_snapshot_planilha
+from estrategias_tempo import compilar_estrategia
+from instrumentacao import (contar, cronometrar, medir_ponto, reiniciar, CHAMADAS_MOTOR,
+                            relatorio as relatorio_instrumentacao)
+from registro_log import obter_logger, ListaFloat
 
 # Configura precisão máxima
 getcontext().prec = 28
 
+log = obter_logger(__name__)
+
 
 
 def converter_para_decimal_padrao(valor):
@@ -44,7 +48,7 @@ def ler_valor_exato(sheet, linha, coluna):
         valor = sheet.cell(row=linha, column=coluna).value
         return converter_para_decimal_padrao(valor)
     except Exception as e:
-        print(f"       ERRO ao ler valor na linha {linha}, coluna {coluna}: {e}")
+        log.error("       ERRO ao ler valor na linha %s, coluna %s: %s", linha, coluna, e)
         return Decimal('0')
 
 def calcular_desvio_padrao_amostral(valores):
@@ -77,109 +81,43 @@ def calcular_desvio_padrao_amostral(valores):
     
     return desvio_padrao
 
-def extrair_dados_planilha_original(arquivo_excel):
+def extrair_dados_planilha_original(arquivo_excel, usar_cache=True):
     """
     Extrai todos os dados necessários da planilha original
+    Usa o cache de snapshots quando a planilha não mudou desde a última leitura
+    """
+    if usar_cache:
+        snapshot = obter_snapshot_planilha(arquivo_excel, ler_snapshot_planilha)
+    else:
+        snapshot = ler_snapshot_planilha(arquivo_excel)
+    
+    if snapshot is None:
+        return None, None
+    
+    return snapshot['constantes'], snapshot['pontos']
+
+def ler_snapshot_planilha(arquivo_excel):
     """
+    Lê constantes, pontos e valores sagrados diretamente da planilha (openpyxl)
+    Os endereços das células vêm do layout declarativo (layout_planilha.py)
+    """
+    # openpyxl e o layout (numpy) só são carregados quando o cache não tem a planilha
+    from openpyxl import load_workbook
+    from layout_planilha import ler_certificado
+
     try:
         wb = load_workbook(arquivo_excel, data_only=True)
-        coleta_sheet = wb["Coleta de Dados"]
-        estimativa_sheet = wb["Estimativa da Incerteza"]
-        
-        # Extrai constantes
-        constantes = {}
-        constantes['ponto_mlp'] = ler_valor_exato(coleta_sheet, 50, 9)  # I50
-        constantes['pulso_equipamento_mlp'] = ler_valor_exato(coleta_sheet, 50, 30)  # AD50
-        constantes['constante_correcao_temp'] = ler_valor_exato(coleta_sheet, 51, 18)  # R51
-        constantes['constante_correcao_inclinacao'] = ler_valor_exato(coleta_sheet, 51, 21)  # U51
-        constantes['modo_calibracao'] = coleta_sheet.cell(row=16, column=24).value  # X16
-        constantes['correcao_tempo_bu23'] = ler_valor_exato(estimativa_sheet, 23, 73)  # BU23
-        constantes['correcao_tempo_bw23'] = ler_valor_exato(estimativa_sheet, 23, 75)  # BW23
-        constantes['correcao_temp_bu26'] = ler_valor_exato(estimativa_sheet, 26, 73)  # BU26
-        constantes['correcao_temp_bw26'] = ler_valor_exato(estimativa_sheet, 26, 75)  # BW26
-        
-        # Extrai dados dos pontos
-        pontos = []
-        linha_atual = 54
-        num_ponto = 1
-        
-        while True:
-            pulsos = ler_valor_exato(coleta_sheet, linha_atual, 3)
-            
-            if pulsos == 0:
-                pulsos2 = ler_valor_exato(coleta_sheet, linha_atual + 1, 3)
-                pulsos3 = ler_valor_exato(coleta_sheet, linha_atual + 2, 3)
-                
-                if pulsos2 == 0 and pulsos3 == 0:
-                    break
-            
-            ponto = {
-                'numero': num_ponto,
-                'linha_inicial': linha_atual,
-                'leituras': [],
-                'valores_originais': {}
-            }
-            
-            # Extrai valores brutos e calculados
-            for i in range(3):
-                linha = linha_atual + i
-                
-                # Valores brutos
-                pulsos_padrao = ler_valor_exato(coleta_sheet, linha, 3)
-                tempo_coleta = ler_valor_exato(coleta_sheet, linha, 6)
-                leitura_medidor = ler_valor_exato(coleta_sheet, linha, 15)
-                temperatura = ler_valor_exato(coleta_sheet, linha, 18)
-                
-                # Valores calculados (para manter iguais)
-                tempo_coleta_corrigido = ler_valor_exato(coleta_sheet, linha, 27)
-                temperatura_corrigida = ler_valor_exato(coleta_sheet, linha, 30)
-                totalizacao_padrao_corrigido = ler_valor_exato(coleta_sheet, linha, 12)
-                vazao_referencia = ler_valor_exato(coleta_sheet, linha, 9)
-                vazao_medidor = ler_valor_exato(coleta_sheet, linha, 24)
-                erro_percentual = ler_valor_exato(coleta_sheet, linha, 21)
-                
-                leitura = {
-                    'linha': linha,
-                    'pulsos_padrao': pulsos_padrao,
-                    'tempo_coleta': tempo_coleta,
-                    'leitura_medidor': leitura_medidor,
-                    'temperatura': temperatura,
-                    'tempo_coleta_corrigido': tempo_coleta_corrigido,
-                    'temperatura_corrigida': temperatura_corrigida,
-                    'totalizacao_padrao_corrigido': totalizacao_padrao_corrigido,
-                    'vazao_referencia': vazao_referencia,
-                    'vazao_medidor': vazao_medidor,
-                    'erro_percentual': erro_percentual
-                }
-                
-                ponto['leituras'].append(leitura)
-            
-            # Valores agregados originais
-            linha_agregados = linha_atual + 3
-            vazao_media_original = ler_valor_exato(coleta_sheet, linha_agregados, 9)
-            tendencia_original = ler_valor_exato(coleta_sheet, linha_agregados, 21)
-            desvio_padrao_original = ler_valor_exato(coleta_sheet, linha_agregados, 30)
-            
-            ponto['valores_originais'] = {
-                'vazao_media': vazao_media_original,
-                'tendencia': tendencia_original,
-                'desvio_padrao': desvio_padrao_original
-            }
-            
-            pontos.append(ponto)
-            num_ponto += 1
-            linha_atual += 9
-        
-        return constantes, pontos
+        return ler_certificado(wb, converter_para_decimal_padrao)
         
     except Exception as e:
-        print(f"ERRO: Erro ao extrair dados: {e}")
-        return None, None
+        log.error("ERRO: Erro ao extrair dados: %s", e)
+        return None
 
 def calcular_formulas_com_tempo_ajustado(leituras, constantes, tempos_ajustados):
     """
     Calcula todas as fórmulas com tempos ajustados usando precisão máxima
     """
+    contar(CHAMADAS_MOTOR)
     resultados = []
     
     for i, leitura in enumerate(leituras):
@@ -274,23 +212,24 @@ def calcular_agregados_com_tempo_ajustado(resultados):
         'desvio_padrao': desvio_padrao
     }
 
-def otimizar_tempos_ponto_simples(leituras, constantes, valores_originais):
+def otimizar_tempos_ponto_simples(leituras, constantes, valores_originais, estrategia=None):
     """
     Otimiza os tempos de coleta usando decremento simples até encontrar valores exatos
     """
-    print(f"   🔍 Iniciando otimização SIMPLES para Ponto {leituras[0]['linha']}...")
-    print(f"   🎯 OBJETIVO: Vazão média exata = {float(valores_originais['vazao_media']):.3f}")
+    limite_inferior, limite_superior = compilar_estrategia(estrategia).limites_float
+    log.info("   🔍 Iniciando otimização SIMPLES para Ponto %s...", leituras[0]['linha'])
+    log.info("   🎯 OBJETIVO: Vazão média exata = %.3f", valores_originais['vazao_media'])
     
     # Começa com tempos originais
     tempos_atuais = [leitura['tempo_coleta'] for leitura in leituras]
-    print(f"   📊 Tempos iniciais: {[float(t) for t in tempos_atuais]}")
+    log.info("   📊 Tempos iniciais: %s", ListaFloat(tempos_atuais))
     
     # Calcula vazão inicial
     resultados_iniciais = calcular_formulas_com_tempo_ajustado(leituras, constantes, tempos_atuais)
     agregados_iniciais = calcular_agregados_com_tempo_ajustado(resultados_iniciais)
     
-    print(f"   📊 Vazão inicial: {float(agregados_iniciais['vazao_media']):.6f}")
-    print(f"   📊 Vazão desejada: {float(valores_originais['vazao_media']):.6f}")
+    log.info("   📊 Vazão inicial: %.6f", agregados_iniciais['vazao_media'])
+    log.info("   📊 Vazão desejada: %.6f", valores_originais['vazao_media'])
     
     # Verifica se já está correto
     vazao_desejada = valores_originais['vazao_media']
@@ -301,7 +240,7 @@ def otimizar_tempos_ponto_simples(leituras, constantes, valores_originais):
     vazao_desejada_3casas = vazao_desejada.quantize(Decimal('0.001'), rounding=ROUND_HALF_UP)
     
     if vazao_atual_3casas == vazao_desejada_3casas:
-        print(f"   ✅ Vazão já está correta! {float(vazao_atual_3casas):.3f}")
+        log.info("   ✅ Vazão já está correta! %.3f", vazao_atual_3casas)
         return {
             'tempos': tempos_atuais,
             'agregados': agregados_iniciais,
@@ -310,8 +249,8 @@ def otimizar_tempos_ponto_simples(leituras, constantes, valores_originais):
     
     # Se a vazão atual é maior que a desejada, precisa diminuir os tempos
     if vazao_atual > vazao_desejada:
-        print(f"   📉 Vazão atual ({float(vazao_atual):.6f}) > desejada ({float(vazao_desejada):.6f})")
-        print(f"   🔧 Diminuindo tempos de coleta...")
+        log.info("   📉 Vazão atual (%.6f) > desejada (%.6f)", vazao_atual, vazao_desejada)
+        log.info("   🔧 Diminuindo tempos de coleta...")
         
         iteracoes = 0
         max_iteracoes = 10000  # Limite de segurança
@@ -323,11 +262,11 @@ def otimizar_tempos_ponto_simples(leituras, constantes, valores_originais):
             for i in range(len(tempos_atuais)):
                 novo_tempo = tempos_atuais[i] - Decimal('0.001')
                 
-                # Verifica se está dentro da regra 239.599-240.499
-                if 239.599 <= float(novo_tempo) <= 240.499:
+                # Verifica se está dentro da regra da estratégia (239.599-240.499 em 240 s)
+                if limite_inferior <= float(novo_tempo) <= limite_superior:
                     tempos_atuais[i] = novo_tempo
                 else:
-                    print(f"   ⚠️  Tempo {i+1} atingiu limite mínimo: {float(novo_tempo):.3f}")
+                    log.debug("   ⚠️  Tempo %s atingiu limite mínimo: %.3f", i+1, novo_tempo)
                     # Se um tempo atingiu o limite, para de decrementar
                     break
             else:
@@ -340,8 +279,8 @@ def otimizar_tempos_ponto_simples(leituras, constantes, valores_originais):
                 vazao_atual_3casas = vazao_atual.quantize(Decimal('0.001'), rounding=ROUND_HALF_UP)
                 
                 if vazao_atual_3casas == vazao_desejada_3casas:
-                    print(f"   ✅ Vazão encontrada após {iteracoes} iterações!")
-                    print(f"   📊 Vazão final: {float(vazao_atual):.6f}")
+                    log.debug("   ✅ Vazão encontrada após %s iterações!", iteracoes)
+                    log.debug("   📊 Vazão final: %.6f", vazao_atual)
                     return {
                         'tempos': tempos_atuais.copy(),
                         'agregados': agregados,
@@ -350,7 +289,7 @@ def otimizar_tempos_ponto_simples(leituras, constantes, valores_originais):
                 
                 # Se a vazão ficou menor que a desejada, voltou um passo
                 if vazao_atual < vazao_desejada:
-                    print(f"   ⚠️  Vazão ficou menor que o desejado: {float(vazao_atual):.6f} < {float(vazao_desejada):.6f}")
+                    log.debug("   ⚠️  Vazão ficou menor que o desejado: %.6f < %.6f", vazao_atual, vazao_desejada)
                     # Volta um passo
                     for i in range(len(tempos_atuais)):
                         tempos_atuais[i] += Decimal('0.001')
@@ -370,24 +309,24 @@ def otimizar_tempos_ponto_simples(leituras, constantes, valores_originais):
             # Se chegou aqui, um tempo atingiu o limite
             break
         
-        print(f"   ❌ Não foi possível encontrar vazão exata após {iteracoes} iterações")
+        log.error("   ❌ Não foi possível encontrar vazão exata após %s iterações", iteracoes)
         return None
     
     else:
-        print(f"   📈 Vazão atual ({float(vazao_atual):.6f}) < desejada ({float(vazao_desejada):.6f})")
-        print(f"   🔧 Aumentando tempos de coleta...")
+        log.info("   📈 Vazão atual (%.6f) < desejada (%.6f)", vazao_atual, vazao_desejada)
+        log.info("   🔧 Aumentando tempos de coleta...")
         
         # Verifica se os tempos já estão no limite máximo
-        tempos_no_limite = [t for t in tempos_atuais if float(t) >= 240.499]
+        tempos_no_limite = [t for t in tempos_atuais if float(t) >= limite_superior]
         if len(tempos_no_limite) > 0:
-            print(f"   ⚠️  ALGUNS TEMPOS JÁ ESTÃO NO LIMITE MÁXIMO!")
-            print(f"   📊 Tempos no limite: {[float(t) for t in tempos_no_limite]}")
+            log.warning("   ⚠️  ALGUNS TEMPOS JÁ ESTÃO NO LIMITE MÁXIMO!")
+            log.info("   📊 Tempos no limite: %s", ListaFloat(tempos_no_limite))
             
             # Tenta uma abordagem diferente: diminui os tempos que não estão no limite
-            tempos_nao_limite = [i for i, t in enumerate(tempos_atuais) if float(t) < 240.499]
+            tempos_nao_limite = [i for i, t in enumerate(tempos_atuais) if float(t) < limite_superior]
             
             if len(tempos_nao_limite) > 0:
-                print(f"   🔧 Tentando diminuir tempos que não estão no limite...")
+                log.info("   🔧 Tentando diminuir tempos que não estão no limite...")
                 
                 iteracoes = 0
                 max_iteracoes = 1000
@@ -399,14 +338,14 @@ def otimizar_tempos_ponto_simples(leituras, constantes, valores_originais):
                     for i in tempos_nao_limite:
                         novo_tempo = tempos_atuais[i] - Decimal('0.001')
                         
-                        if 239.599 <= float(novo_tempo) <= 240.499:
+                        if limite_inferior <= float(novo_tempo) <= limite_superior:
                             tempos_atuais[i] = novo_tempo
                         else:
                             tempos_nao_limite.remove(i)
-                            print(f"   ⚠️  Tempo {i+1} agora atingiu limite: {float(novo_tempo):.3f}")
+                            log.debug("   ⚠️  Tempo %s agora atingiu limite: %.3f", i+1, novo_tempo)
                     
                     if not tempos_nao_limite:
-                        print(f"   ❌ Todos os tempos atingiram o limite")
+                        log.error("   ❌ Todos os tempos atingiram o limite")
                         break
                     
                     # Calcula nova vazão
@@ -418,8 +357,8 @@ def otimizar_tempos_ponto_simples(leituras, constantes, valores_originais):
                     vazao_atual_3casas = vazao_atual.quantize(Decimal('0.001'), rounding=ROUND_HALF_UP)
                     
                     if vazao_atual_3casas == vazao_desejada_3casas:
-                        print(f"   ✅ Vazão encontrada após {iteracoes} iterações!")
-                        print(f"   📊 Vazão final: {float(vazao_atual):.6f}")
+                        log.debug("   ✅ Vazão encontrada após %s iterações!", iteracoes)
+                        log.debug("   📊 Vazão final: %.6f", vazao_atual)
                         return {
                             'tempos': tempos_atuais.copy(),
                             'agregados': agregados,
@@ -428,7 +367,7 @@ def otimizar_tempos_ponto_simples(leituras, constantes, valores_originais):
                     
                     # Se a vazão ficou menor que a desejada, voltou um passo
                     if vazao_atual < vazao_desejada:
-                        print(f"   ⚠️  Vazão ficou menor que o desejado: {float(vazao_atual):.6f} < {float(vazao_desejada):.6f}")
+                        log.debug("   ⚠️  Vazão ficou menor que o desejado: %.6f < %.6f", vazao_atual, vazao_desejada)
                         # Volta um passo
                         for i in tempos_nao_limite:
                             tempos_atuais[i] += Decimal('0.001')
@@ -443,7 +382,7 @@ def otimizar_tempos_ponto_simples(leituras, constantes, valores_originais):
                             'iteracoes': iteracoes - 1
                         }
             
-            print(f"   ❌ Não foi possível otimizar com tempos no limite")
+            log.error("   ❌ Não foi possível otimizar com tempos no limite")
             return None
         
         iteracoes = 0
@@ -456,11 +395,11 @@ def otimizar_tempos_ponto_simples(leituras, constantes, valores_originais):
             for i in range(len(tempos_atuais)):
                 novo_tempo = tempos_atuais[i] + Decimal('0.001')
                 
-                # Verifica se está dentro da regra 239.599-240.499
-                if 239.599 <= float(novo_tempo) <= 240.499:
+                # Verifica se está dentro da regra da estratégia (239.599-240.499 em 240 s)
+                if limite_inferior <= float(novo_tempo) <= limite_superior:
                     tempos_atuais[i] = novo_tempo
                 else:
-                    print(f"   ⚠️  Tempo {i+1} atingiu limite máximo: {float(novo_tempo):.3f}")
+                    log.debug("   ⚠️  Tempo %s atingiu limite máximo: %.3f", i+1, novo_tempo)
                     # Se um tempo atingiu o limite, para de incrementar
                     break
             else:
@@ -473,8 +412,8 @@ def otimizar_tempos_ponto_simples(leituras, constantes, valores_originais):
                 vazao_atual_3casas = vazao_atual.quantize(Decimal('0.001'), rounding=ROUND_HALF_UP)
                 
                 if vazao_atual_3casas == vazao_desejada_3casas:
-                    print(f"   ✅ Vazão encontrada após {iteracoes} iterações!")
-                    print(f"   📊 Vazão final: {float(vazao_atual):.6f}")
+                    log.debug("   ✅ Vazão encontrada após %s iterações!", iteracoes)
+                    log.debug("   📊 Vazão final: %.6f", vazao_atual)
                     return {
                         'tempos': tempos_atuais.copy(),
                         'agregados': agregados,
@@ -483,7 +422,7 @@ def otimizar_tempos_ponto_simples(leituras, constantes, valores_originais):
                 
                 # Se a vazão ficou maior que a desejada, voltou um passo
                 if vazao_atual > vazao_desejada:
-                    print(f"   ⚠️  Vazão ficou maior que o desejado: {float(vazao_atual):.6f} > {float(vazao_desejada):.6f}")
+                    log.debug("   ⚠️  Vazão ficou maior que o desejado: %.6f > %.6f", vazao_atual, vazao_desejada)
                     # Volta um passo
                     for i in range(len(tempos_atuais)):
                         tempos_atuais[i] -= Decimal('0.001')
@@ -503,26 +442,27 @@ def otimizar_tempos_ponto_simples(leituras, constantes, valores_originais):
             # Se chegou aqui, um tempo atingiu o limite
             break
         
-        print(f"   ❌ Não foi possível encontrar vazão exata após {iteracoes} iterações")
+        log.error("   ❌ Não foi possível encontrar vazão exata após %s iterações", iteracoes)
         return None
 
-def otimizar_tempos_ponto_inteligente_v2(leituras, constantes, valores_originais):
+def otimizar_tempos_ponto_inteligente_v2(leituras, constantes, valores_originais, estrategia=None):
     """
     Otimiza os tempos de coleta usando busca inteligente com incrementos menores
     """
-    print(f"   🔍 Iniciando otimização INTELIGENTE V2 para Ponto {leituras[0]['linha']}...")
-    print(f"   🎯 OBJETIVO: Vazão média exata = {float(valores_originais['vazao_media']):.3f}")
+    limite_inferior, limite_superior = compilar_estrategia(estrategia).limites_float
+    log.info("   🔍 Iniciando otimização INTELIGENTE V2 para Ponto %s...", leituras[0]['linha'])
+    log.info("   🎯 OBJETIVO: Vazão média exata = %.3f", valores_originais['vazao_media'])
     
     # Começa com tempos originais
     tempos_atuais = [leitura['tempo_coleta'] for leitura in leituras]
-    print(f"   📊 Tempos iniciais: {[float(t) for t in tempos_atuais]}")
+    log.info("   📊 Tempos iniciais: %s", ListaFloat(tempos_atuais))
     
     # Calcula vazão inicial
     resultados_iniciais = calcular_formulas_com_tempo_ajustado(leituras, constantes, tempos_atuais)
     agregados_iniciais = calcular_agregados_com_tempo_ajustado(resultados_iniciais)
     
-    print(f"   📊 Vazão inicial: {float(agregados_iniciais['vazao_media']):.6f}")
-    print(f"   📊 Vazão desejada: {float(valores_originais['vazao_media']):.6f}")
+    log.info("   📊 Vazão inicial: %.6f", agregados_iniciais['vazao_media'])
+    log.info("   📊 Vazão desejada: %.6f", valores_originais['vazao_media'])
     
     # Verifica se já está correto
     vazao_desejada = valores_originais['vazao_media']
@@ -533,7 +473,7 @@ def otimizar_tempos_ponto_inteligente_v2(leituras, constantes, valores_originais
     vazao_desejada_3casas = vazao_desejada.quantize(Decimal('0.001'), rounding=ROUND_HALF_UP)
     
     if vazao_atual_3casas == vazao_desejada_3casas:
-        print(f"   ✅ Vazão já está correta! {float(vazao_atual_3casas):.3f}")
+        log.info("   ✅ Vazão já está correta! %.3f", vazao_atual_3casas)
         return {
             'tempos': tempos_atuais,
             'agregados': agregados_iniciais,
@@ -547,21 +487,21 @@ def otimizar_tempos_ponto_inteligente_v2(leituras, constantes, valores_originais
     melhor_agregados = agregados_iniciais
     
     # Verifica se os tempos estão no limite máximo
-    tempos_no_limite = [t for t in tempos_atuais if float(t) >= 240.499]
+    tempos_no_limite = [t for t in tempos_atuais if float(t) >= limite_superior]
     if len(tempos_no_limite) > 0:
-        print(f"   ⚠️  ALGUNS TEMPOS ESTÃO NO LIMITE MÁXIMO!")
-        print(f"   📊 Tempos no limite: {[float(t) for t in tempos_no_limite]}")
+        log.warning("   ⚠️  ALGUNS TEMPOS ESTÃO NO LIMITE MÁXIMO!")
+        log.info("   📊 Tempos no limite: %s", ListaFloat(tempos_no_limite))
         
         # Se a vazão atual é menor que a desejada e os tempos estão no limite,
         # precisa diminuir os tempos para aumentar a vazão
         if vazao_atual < vazao_desejada:
-            print(f"   🔧 Diminuindo tempos para aumentar vazão...")
+            log.info("   🔧 Diminuindo tempos para aumentar vazão...")
             
             # Tenta diferentes decrementos
             decrementos = [Decimal('0.0001'), Decimal('0.0005'), Decimal('0.001')]
             
             for decremento in decrementos:
-                print(f"   🔧 Tentando com decremento: {float(decremento)}")
+                log.debug("   🔧 Tentando com decremento: %s", float(decremento))
                 
                 # Reinicia com tempos originais
                 tempos_teste = [leitura['tempo_coleta'] for leitura in leituras]
@@ -577,12 +517,12 @@ def otimizar_tempos_ponto_inteligente_v2(leituras, constantes, valores_originais
                     for i in range(len(tempos_teste)):
                         novo_tempo = tempos_teste[i] - decremento
                         
-                        if 239.599 <= float(novo_tempo) <= 240.499:
+                        if limite_inferior <= float(novo_tempo) <= limite_superior:
                             tempos_teste[i] = novo_tempo
                             tempos_alterados = True
                     
                     if not tempos_alterados:
-                        print(f"   ⚠️  Todos os tempos atingiram o limite com decremento {float(decremento)}")
+                        log.debug("   ⚠️  Todos os tempos atingiram o limite com decremento %s", float(decremento))
                         break
                     
                     # Calcula nova vazão
@@ -605,7 +545,7 @@ def otimizar_tempos_ponto_inteligente_v2(leituras, constantes, valores_originais
                     # Se chegou ao valor exato, para
                     vazao_teste_3casas = vazao_teste.quantize(Decimal('0.001'), rounding=ROUND_HALF_UP)
                     if vazao_teste_3casas == vazao_desejada_3casas:
-                        print(f"   ✅ Vazão exata encontrada com decremento {float(decremento)}!")
+                        log.debug("   ✅ Vazão exata encontrada com decremento %s!", float(decremento))
                         return {
                             'tempos': tempos_teste.copy(),
                             'agregados': agregados,
@@ -614,14 +554,14 @@ def otimizar_tempos_ponto_inteligente_v2(leituras, constantes, valores_originais
                     
                     # Se passou do valor desejado, para
                     if vazao_teste > vazao_desejada:
-                        print(f"   ⚠️  Vazão passou do desejado: {float(vazao_teste):.6f} > {float(vazao_desejada):.6f}")
+                        log.debug("   ⚠️  Vazão passou do desejado: %.6f > %.6f", vazao_teste, vazao_desejada)
                         break
     
     # Tenta diferentes incrementos para casos normais
     incrementos = [Decimal('0.0001'), Decimal('0.0005'), Decimal('0.001')]
     
     for incremento in incrementos:
-        print(f"   🔧 Tentando com incremento: {float(incremento)}")
+        log.debug("   🔧 Tentando com incremento: %s", float(incremento))
         
         # Reinicia com tempos originais
         tempos_teste = [leitura['tempo_coleta'] for leitura in leituras]
@@ -639,12 +579,12 @@ def otimizar_tempos_ponto_inteligente_v2(leituras, constantes, valores_originais
                 for i in range(len(tempos_teste)):
                     novo_tempo = tempos_teste[i] + incremento
                     
-                    if 239.599 <= float(novo_tempo) <= 240.499:
+                    if limite_inferior <= float(novo_tempo) <= limite_superior:
                         tempos_teste[i] = novo_tempo
                         tempos_alterados = True
                 
                 if not tempos_alterados:
-                    print(f"   ⚠️  Todos os tempos atingiram o limite com incremento {float(incremento)}")
+                    log.debug("   ⚠️  Todos os tempos atingiram o limite com incremento %s", float(incremento))
                     break
                 
                 # Calcula nova vazão
@@ -667,7 +607,7 @@ def otimizar_tempos_ponto_inteligente_v2(leituras, constantes, valores_originais
                 # Se chegou ao valor exato, para
                 vazao_teste_3casas = vazao_teste.quantize(Decimal('0.001'), rounding=ROUND_HALF_UP)
                 if vazao_teste_3casas == vazao_desejada_3casas:
-                    print(f"   ✅ Vazão exata encontrada com incremento {float(incremento)}!")
+                    log.debug("   ✅ Vazão exata encontrada com incremento %s!", float(incremento))
                     return {
                         'tempos': tempos_teste.copy(),
                         'agregados': agregados,
@@ -676,7 +616,7 @@ def otimizar_tempos_ponto_inteligente_v2(leituras, constantes, valores_originais
                 
                 # Se passou do valor desejado, para
                 if vazao_teste > vazao_desejada:
-                    print(f"   ⚠️  Vazão passou do desejado: {float(vazao_teste):.6f} > {float(vazao_desejada):.6f}")
+                    log.debug("   ⚠️  Vazão passou do desejado: %.6f > %.6f", vazao_teste, vazao_desejada)
                     break
         
         # Se a vazão atual é maior que a desejada, tenta diminuir
@@ -692,12 +632,12 @@ def otimizar_tempos_ponto_inteligente_v2(leituras, constantes, valores_originais
                 for i in range(len(tempos_teste)):
                     novo_tempo = tempos_teste[i] - incremento
                     
-                    if 239.599 <= float(novo_tempo) <= 240.499:
+                    if limite_inferior <= float(novo_tempo) <= limite_superior:
                         tempos_teste[i] = novo_tempo
                         tempos_alterados = True
                 
                 if not tempos_alterados:
-                    print(f"   ⚠️  Todos os tempos atingiram o limite com incremento {float(incremento)}")
+                    log.debug("   ⚠️  Todos os tempos atingiram o limite com incremento %s", float(incremento))
                     break
                 
                 # Calcula nova vazão
@@ -720,7 +660,7 @@ def otimizar_tempos_ponto_inteligente_v2(leituras, constantes, valores_originais
                 # Se chegou ao valor exato, para
                 vazao_teste_3casas = vazao_teste.quantize(Decimal('0.001'), rounding=ROUND_HALF_UP)
                 if vazao_teste_3casas == vazao_desejada_3casas:
-                    print(f"   ✅ Vazão exata encontrada com incremento {float(incremento)}!")
+                    log.debug("   ✅ Vazão exata encontrada com incremento %s!", float(incremento))
                     return {
                         'tempos': tempos_teste.copy(),
                         'agregados': agregados,
@@ -729,63 +669,40 @@ def otimizar_tempos_ponto_inteligente_v2(leituras, constantes, valores_originais
                 
                 # Se passou do valor desejado, para
                 if vazao_teste < vazao_desejada:
-                    print(f"   ⚠️  Vazão passou do desejado: {float(vazao_teste):.6f} < {float(vazao_desejada):.6f}")
+                    log.debug("   ⚠️  Vazão passou do desejado: %.6f < %.6f", vazao_teste, vazao_desejada)
                     break
     
     if melhor_combinacao:
-        print(f"   ✅ Melhor aproximação encontrada!")
-        print(f"   📊 Vazão final: {float(melhor_combinacao['agregados']['vazao_media']):.6f}")
-        print(f"   📊 Diferença: {float(melhor_diferenca):.6f}")
+        log.info("   ✅ Melhor aproximação encontrada!")
+        log.info("   📊 Vazão final: %.6f", melhor_combinacao['agregados']['vazao_media'])
+        log.info("   📊 Diferença: %.6f", melhor_diferenca)
         return melhor_combinacao
     else:
-        print(f"   ❌ Não foi possível encontrar uma boa aproximação")
+        log.error("   ❌ Não foi possível encontrar uma boa aproximação")
         return None
 
-def gerar_tempos_iniciais():
+def gerar_tempos_iniciais(estrategia=None):
     """
-    Gera valores próximos de 240.000000 para aproximação inicial
+    Gera valores próximos do tempo nominal para aproximação inicial
+    (nominal - 0.010 até nominal + 0.510, passo 0.005)
     """
-    # Valores próximos de 240.000000 para aproximação inicial
-    valores_base = [
-        Decimal('239.990'), Decimal('239.995'), Decimal('240.000'), Decimal('240.005'), Decimal('240.010'),
-        Decimal('240.015'), Decimal('240.020'), Decimal('240.025'), Decimal('240.030'), Decimal('240.035'),
-        Decimal('240.040'), Decimal('240.045'), Decimal('240.050'), Decimal('240.055'), Decimal('240.060'),
-        Decimal('240.065'), Decimal('240.070'), Decimal('240.075'), Decimal('240.080'), Decimal('240.085'),
-        Decimal('240.090'), Decimal('240.095'), Decimal('240.100'), Decimal('240.105'), Decimal('240.110'),
-        Decimal('240.115'), Decimal('240.120'), Decimal('240.125'), Decimal('240.130'), Decimal('240.135'),
-        Decimal('240.140'), Decimal('240.145'), Decimal('240.150'), Decimal('240.155'), Decimal('240.160'),
-        Decimal('240.165'), Decimal('240.170'), Decimal('240.175'), Decimal('240.180'), Decimal('240.185'),
-        Decimal('240.190'), Decimal('240.195'), Decimal('240.200'), Decimal('240.205'), Decimal('240.210'),
-        Decimal('240.215'), Decimal('240.220'), Decimal('240.225'), Decimal('240.230'), Decimal('240.235'),
-        Decimal('240.240'), Decimal('240.245'), Decimal('240.250'), Decimal('240.255'), Decimal('240.260'),
-        Decimal('240.265'), Decimal('240.270'), Decimal('240.275'), Decimal('240.280'), Decimal('240.285'),
-        Decimal('240.290'), Decimal('240.295'), Decimal('240.300'), Decimal('240.305'), Decimal('240.310'),
-        Decimal('240.315'), Decimal('240.320'), Decimal('240.325'), Decimal('240.330'), Decimal('240.335'),
-        Decimal('240.340'), Decimal('240.345'), Decimal('240.350'), Decimal('240.355'), Decimal('240.360'),
-        Decimal('240.365'), Decimal('240.370'), Decimal('240.375'), Decimal('240.380'), Decimal('240.385'),
-        Decimal('240.390'), Decimal('240.395'), Decimal('240.400'), Decimal('240.405'), Decimal('240.410'),
-        Decimal('240.415'), Decimal('240.420'), Decimal('240.425'), Decimal('240.430'), Decimal('240.435'),
-        Decimal('240.440'), Decimal('240.445'), Decimal('240.450'), Decimal('240.455'), Decimal('240.460'),
-        Decimal('240.465'), Decimal('240.470'), Decimal('240.475'), Decimal('240.480'), Decimal('240.485'),
-        Decimal('240.490'), Decimal('240.495'), Decimal('240.500'), Decimal('240.505'), Decimal('240.510')
-    ]
-    
-    return valores_base
+    return list(compilar_estrategia(estrategia).tempos_iniciais)
 
-def otimizar_tempos_ponto_simples_240(leituras, constantes, valores_originais):
+def otimizar_tempos_ponto_simples_240(leituras, constantes, valores_originais, estrategia=None):
     """
-    Define todos os tempos de coleta como 240.000 segundos
+    Define todos os tempos de coleta como o tempo nominal da estratégia (240.000 segundos por padrão)
     Apenas faz ajustes proporcionais nos outros valores
     """
-    print(f"   🔍 Definindo tempos como 240.000 para Ponto {leituras[0]['linha']}...")
-    print(f"   🎯 OBJETIVO: Vazão média = {float(valores_originais['vazao_media']):.6f}")
+    nominal = compilar_estrategia(estrategia).tempo_nominal.quantize(Decimal('0.001'))
+    log.info("   🔍 Definindo tempos como %s para Ponto %s...", nominal, leituras[0]['linha'])
+    log.info("   🎯 OBJETIVO: Vazão média = %.6f", valores_originais['vazao_media'])
     
-    # Define todos os tempos como 240.000
-    tempos_240 = [Decimal('240.000') for _ in range(3)]
-    print(f"   📊 Tempos definidos: {[float(t) for t in tempos_240]}")
+    # Define todos os tempos como o nominal
+    tempos_nominais = [nominal for _ in leituras]
+    log.info("   📊 Tempos definidos: %s", ListaFloat(tempos_nominais))
     
-    # Calcula vazão com tempos 240.000
-    resultados = calcular_formulas_com_tempo_ajustado(leituras, constantes, tempos_240)
+    # Calcula vazão com tempos nominais
+    resultados = calcular_formulas_com_tempo_ajustado(leituras, constantes, tempos_nominais)
     agregados = calcular_agregados_com_tempo_ajustado(resultados)
     vazao_atual = agregados['vazao_media']
     
@@ -793,55 +710,90 @@ def otimizar_tempos_ponto_simples_240(leituras, constantes, valores_originais):
     vazao_desejada = valores_originais['vazao_media']
     diferenca = vazao_atual - vazao_desejada
     
-    print(f"   📊 Vazão com tempos 240.000: {float(vazao_atual):.6f}")
-    print(f"   📊 Vazão desejada: {float(vazao_desejada):.6f}")
-    print(f"   📊 Diferença: {float(diferenca):.6f} ({'POSITIVA' if diferenca > 0 else 'NEGATIVA'})")
+    log.info("   📊 Vazão com tempos %s: %.6f", nominal, vazao_atual)
+    log.info("   📊 Vazão desejada: %.6f", vazao_desejada)
+    log.info("   📊 Diferença: %.6f (%s)", diferenca, ('POSITIVA' if diferenca > 0 else 'NEGATIVA'))
     
     return {
-        'tempos': tempos_240,
+        'tempos': tempos_nominais,
         'agregados': agregados,
         'iteracoes': 1,
         'diferenca': diferenca
     }
 
-def gerar_planilha_corrigida(resultados_todos_pontos, arquivo_original, arquivo_corrigido):
+def otimizar_pontos(constantes_corrigido, pontos_original, pontos_corrigido, relatorio=None, estrategia=None):
     """
-    Gera a planilha corrigida com os tempos otimizados aplicados
-    AJUSTANDO PROPORCIONALMENTE os outros valores
-    CALCULA DIFERENÇAS para orientar o refinamento
+    Otimiza os tempos de todos os pontos (valores desejados vêm da original)
+    Retorna a lista de resultados por ponto (gravados também no relatório em fluxo, se houver)
+    estrategia: estratégia de tempo alvo (None = TEMPO_ALVO, padrão 240 s)
     """
-    print(f"\n📄 GERANDO PLANILHA CORRIGIDA...")
+    resultados_todos_pontos = []
     
-    # Tenta criar cópia do arquivo original
-    try:
-        shutil.copy2(arquivo_original, arquivo_corrigido)
-        print(f"   ✅ Arquivo copiado com sucesso: {arquivo_corrigido}")
-    except PermissionError:
-        print(f"   ⚠️  Erro de permissão ao copiar arquivo. Arquivo pode estar em uso.")
-        print(f"   🔧 Tentando criar novo arquivo...")
+    # Processa todos os pontos
+    for i, (ponto_original, ponto_corrigido) in enumerate(zip(pontos_original, pontos_corrigido)):
+        log.info("\n🔍 PROCESSANDO Ponto %s (linha %s)...", ponto_original['numero'], ponto_original['linha_inicial'])
         
-        # Tenta criar um novo arquivo com nome diferente
-        arquivo_corrigido = arquivo_corrigido.replace('.xlsx', '_NOVO.xlsx')
-        try:
-            shutil.copy2(arquivo_original, arquivo_corrigido)
-            print(f"   ✅ Arquivo criado com sucesso: {arquivo_corrigido}")
-        except Exception as e:
-            print(f"   ❌ Erro ao criar arquivo: {e}")
-            print(f"   💡 Feche o Excel e tente novamente")
-            return False
-    except Exception as e:
-        print(f"   ❌ Erro inesperado ao copiar arquivo: {e}")
-        return False
-    
-    # Carrega a planilha corrigida
-    try:
-        wb = load_workbook(arquivo_corrigido)
-        coleta_sheet = wb["Coleta de Dados"]
-    except Exception as e:
-        print(f"   ❌ Erro ao carregar planilha: {e}")
-        return False
+        log.info("   📊 Vazão desejada (original): %.6f", ponto_original['valores_originais']['vazao_media'])
+        log.info("   📊 Vazão atual (corrigida): %.6f", ponto_corrigido['valores_originais']['vazao_media'])
+        
+        # Define tempos como o nominal e calcula diferença
+        with medir_ponto(ponto_original['numero']):
+            melhor_combinacao = otimizar_tempos_ponto_simples_240(
+                ponto_corrigido['leituras'], 
+                constantes_corrigido, 
+                ponto_original['valores_originais'],  # Usa valores originais como objetivo
+                estrategia
+            )
+        
+        if melhor_combinacao is None:
+            log.error("❌ Não foi possível otimizar os tempos do Ponto %s!", ponto_original['numero'])
+            continue
+        
+        # Calcula resultados com tempos otimizados
+        resultados_otimizados = calcular_formulas_com_tempo_ajustado(
+            ponto_corrigido['leituras'], 
+            constantes_corrigido, 
+            melhor_combinacao['tempos']
+        )
+        
+        # Verifica se os valores estão corretos
+        vazao_diff = abs(float(melhor_combinacao['agregados']['vazao_media'] - ponto_original['valores_originais']['vazao_media']))
+        tendencia_diff = abs(float(melhor_combinacao['agregados']['tendencia'] - ponto_original['valores_originais']['tendencia']))
+        
+        log.info("   📊 Vazão Média Desejada: %.6f", ponto_original['valores_originais']['vazao_media'])
+        log.info("   📊 Vazão Média Otimizada: %.6f", melhor_combinacao['agregados']['vazao_media'])
+        log.info("   📊 Diferença: %.8f", vazao_diff)
+        log.info("   📊 Tempos Otimizados: %s", ListaFloat(melhor_combinacao['tempos']))
+        log.info("   📊 Iterações necessárias: %s", melhor_combinacao['iteracoes'])
+        
+        # Salva resultado do ponto
+        resultado_ponto = {
+            'numero': ponto_original['numero'],
+            'linha_inicial': ponto_original['linha_inicial'],
+            'tempos_otimizados': [float(t) for t in melhor_combinacao['tempos']],
+            'agregados_otimizados': {k: float(v) if isinstance(v, Decimal) else v for k, v in melhor_combinacao['agregados'].items()},
+            'valores_desejados': {k: float(v) if isinstance(v, Decimal) else v for k, v in ponto_original['valores_originais'].items()},
+            'valores_corrigidos': {k: float(v) if isinstance(v, Decimal) else v for k, v in ponto_corrigido['valores_originais'].items()},
+            'iteracoes': melhor_combinacao['iteracoes'],
+            'diferenca': float(melhor_combinacao['diferenca']),  # Inclui a diferença calculada
+            'diferencas': {
+                'vazao': vazao_diff,
+                'tendencia': tendencia_diff
+            }
+        }
+        
+        resultados_todos_pontos.append(resultado_ponto)
+        if relatorio is not None:
+            relatorio.ponto(resultado_ponto, 'otimizacao')
     
-    pontos_aplicados = 0
+    return resultados_todos_pontos
+
+def aplicar_tempos_otimizados_na_aba(resultados_todos_pontos, coleta_sheet):
+    """
+    Aplica os tempos otimizados na aba "Coleta de Dados" (em memória)
+    AJUSTANDO PROPORCIONALMENTE pulsos e leitura do medidor
+    Retorna as informações de refinamento de cada ponto
+    """
     informacoes_refinamento = []
     
     for resultado in resultados_todos_pontos:
@@ -849,21 +801,21 @@ def gerar_planilha_corrigida(resultados_todos_pontos, arquivo_original, arquivo_
         linha_inicial = resultado['linha_inicial']
         tempos_otimizados = resultado['tempos_otimizados']
         
-        print(f"   📊 Aplicando Ponto {numero_ponto} (linha {linha_inicial})...")
-        print(f"      Tempos otimizados: {tempos_otimizados}")
+        log.info("   📊 Aplicando Ponto %s (linha %s)...", numero_ponto, linha_inicial)
+        log.info("      Tempos otimizados: %s", tempos_otimizados)
         
         # Usa a diferença já calculada pela função otimizar_tempos_ponto_simples_240
         vazao_original = resultado['valores_desejados']['vazao_media']
         vazao_otimizada = resultado['agregados_otimizados']['vazao_media']
         diferenca_vazao = resultado['diferenca']  # Usa a diferença já calculada
         
-        print(f"      Vazão original: {float(vazao_original):.6f}")
-        print(f"      Vazão otimizada: {float(vazao_otimizada):.6f}")
-        print(f"      Diferença: {float(diferenca_vazao):.6f} ({'POSITIVA' if diferenca_vazao > 0 else 'NEGATIVA'})")
+        log.info("      Vazão original: %.6f", vazao_original)
+        log.info("      Vazão otimizada: %.6f", vazao_otimizada)
+        log.info("      Diferença: %.6f (%s)", diferenca_vazao, ('POSITIVA' if diferenca_vazao > 0 else 'NEGATIVA'))
         
         # Verifica se a diferença é aceitável (menor que 1.0)
         if abs(diferenca_vazao) > 1.0:
-            print(f"      ⚠️  DIFERENÇA MUITO ALTA! Ajustando proporcionalmente...")
+            log.warning("      ⚠️  DIFERENÇA MUITO ALTA! Ajustando proporcionalmente...")
         
         # Aplica os 3 tempos de coleta para o ponto AJUSTANDO PROPORCIONALMENTE
         for i, tempo_otimizado in enumerate(tempos_otimizados):
@@ -884,10 +836,10 @@ def gerar_planilha_corrigida(resultados_todos_pontos, arquivo_original, arquivo_
                 fator_minimo = 0.5   # Mínimo 50% de variação
                 
                 if fator_tempo > fator_maximo:
-                    print(f"      ⚠️  Fator muito alto ({fator_tempo:.3f}), limitando a {fator_maximo}")
+                    log.debug("      ⚠️  Fator muito alto (%.3f), limitando a %s", fator_tempo, fator_maximo)
                     fator_tempo = fator_maximo
                 elif fator_tempo < fator_minimo:
-                    print(f"      ⚠️  Fator muito baixo ({fator_tempo:.3f}), limitando a {fator_minimo}")
+                    log.debug("      ⚠️  Fator muito baixo (%.3f), limitando a %s", fator_tempo, fator_minimo)
                     fator_tempo = fator_minimo
                 
                 # Ajusta os pulsos proporcionalmente
@@ -909,15 +861,15 @@ def gerar_planilha_corrigida(resultados_todos_pontos, arquivo_original, arquivo_
                 # Aplica o tempo otimizado
                 coleta_sheet.cell(row=linha, column=6).value = float(tempo_otimizado)
                 
-                print(f"      Linha {linha}:")
-                print(f"        Tempo: {float(tempo_original):.6f}s → {float(tempo_otimizado):.6f}s")
-                print(f"        Pulsos: {pulsos_original} → {pulsos_ajustados}")
-                print(f"        Leitura: {leitura_medidor_original:.2f} → {leitura_medidor_ajustada:.2f}")
-                print(f"        Fator: {fator_tempo:.6f}")
+                log.debug("      Linha %s:", linha)
+                log.debug("        Tempo: %.6fs → %.6fs", tempo_original, tempo_otimizado)
+                log.debug("        Pulsos: %s → %s", pulsos_original, pulsos_ajustados)
+                log.debug("        Leitura: %.2f → %.2f", leitura_medidor_original, leitura_medidor_ajustada)
+                log.debug("        Fator: %.6f", fator_tempo)
             else:
                 # Se não tem tempo original, apenas aplica o tempo otimizado
                 coleta_sheet.cell(row=linha, column=6).value = float(tempo_otimizado)
-                print(f"      Linha {linha}: {float(tempo_otimizado):.6f}s (sem ajuste proporcional)")
+                log.debug("      Linha %s: %.6fs (sem ajuste proporcional)", linha, tempo_otimizado)
         
         # Salva informações para o refinamento
         # LÓGICA CORRIGIDA: Se a vazão atual é MENOR que a desejada, precisa INCREMENTAR os tempos
@@ -935,136 +887,125 @@ def gerar_planilha_corrigida(resultados_todos_pontos, arquivo_original, arquivo_
             'magnitude_diferenca': abs(float(diferenca_vazao))
         }
         informacoes_refinamento.append(info_refinamento)
+    
+    return informacoes_refinamento
+
+def gerar_planilha_corrigida(resultados_todos_pontos, arquivo_original, arquivo_corrigido, arquivo_informacoes='informacoes_refinamento.json'):
+    """
+    Gera a planilha corrigida com os tempos otimizados aplicados
+    AJUSTANDO PROPORCIONALMENTE os outros valores
+    CALCULA DIFERENÇAS para orientar o refinamento
+    """
+    log.info("\n📄 GERANDO PLANILHA CORRIGIDA...")
+    
+    # Tenta criar cópia do arquivo original
+    try:
+        shutil.copy2(arquivo_original, arquivo_corrigido)
+        log.info("   ✅ Arquivo copiado com sucesso: %s", arquivo_corrigido)
+    except PermissionError:
+        log.warning("   ⚠️  Erro de permissão ao copiar arquivo. Arquivo pode estar em uso.")
+        log.info("   🔧 Tentando criar novo arquivo...")
         
-        pontos_aplicados += 1
+        # Tenta criar um novo arquivo com nome diferente
+        arquivo_corrigido = arquivo_corrigido.replace('.xlsx', '_NOVO.xlsx')
+        try:
+            shutil.copy2(arquivo_original, arquivo_corrigido)
+            log.info("   ✅ Arquivo criado com sucesso: %s", arquivo_corrigido)
+        except Exception as e:
+            log.error("   ❌ Erro ao criar arquivo: %s", e)
+            log.info("   💡 Feche o Excel e tente novamente")
+            return None
+    except Exception as e:
+        log.error("   ❌ Erro inesperado ao copiar arquivo: %s", e)
+        return None
+    
+    # Carrega a planilha corrigida
+    from openpyxl import load_workbook
+
+    try:
+        wb = load_workbook(arquivo_corrigido)
+        coleta_sheet = wb["Coleta de Dados"]
+    except Exception as e:
+        log.error("   ❌ Erro ao carregar planilha: %s", e)
+        return None
+    
+    informacoes_refinamento = aplicar_tempos_otimizados_na_aba(resultados_todos_pontos, coleta_sheet)
+    pontos_aplicados = len(informacoes_refinamento)
     
     # Salva a planilha corrigida
     try:
         wb.save(arquivo_corrigido)
-        print(f"   ✅ Planilha salva com sucesso: {arquivo_corrigido}")
+        log.info("   ✅ Planilha salva com sucesso: %s", arquivo_corrigido)
     except PermissionError:
-        print(f"   ⚠️  Erro de permissão ao salvar planilha. Arquivo pode estar em uso.")
-        print(f"   💡 Feche o Excel e tente novamente")
-        return False
+        log.warning("   ⚠️  Erro de permissão ao salvar planilha. Arquivo pode estar em uso.")
+        log.info("   💡 Feche o Excel e tente novamente")
+        return None
     except Exception as e:
-        print(f"   ❌ Erro ao salvar planilha: {e}")
-        return False
+        log.error("   ❌ Erro ao salvar planilha: %s", e)
+        return None
     
     # Salva informações de refinamento
     try:
-        with open('informacoes_refinamento.json', 'w', encoding='utf-8') as f:
+        with open(arquivo_informacoes, 'w', encoding='utf-8') as f:
             json.dump(informacoes_refinamento, f, indent=2, ensure_ascii=False)
-        print(f"   ✅ Informações de refinamento salvas: informacoes_refinamento.json")
+        log.info("   ✅ Informações de refinamento salvas: %s", arquivo_informacoes)
     except Exception as e:
-        print(f"   ❌ Erro ao salvar informações de refinamento: {e}")
-        return False
+        log.error("   ❌ Erro ao salvar informações de refinamento: %s", e)
+        return None
     
-    print(f"\n✅ Planilha corrigida gerada com sucesso!")
-    print(f"   Pontos processados: {pontos_aplicados}")
-    print(f"   Arquivo salvo: {arquivo_corrigido}")
-    print(f"   Informações de refinamento salvas: informacoes_refinamento.json")
+    log.info("\n✅ Planilha corrigida gerada com sucesso!")
+    log.info("   Pontos processados: %s", pontos_aplicados)
+    log.info("   Arquivo salvo: %s", arquivo_corrigido)
+    log.info("   Informações de refinamento salvas: %s", arquivo_informacoes)
     
     return True
 
-def main():
+def executar_otimizacao(arquivo_original, arquivo_corrigido,
+                        arquivo_informacoes='informacoes_refinamento.json',
+                        arquivo_resultados='resultados_otimizacao_tempos_corrigidos.json'):
     """
-    Função principal - PROCESSA TODOS OS PONTOS DA PLANILHA CORRIGIDA
+    Executa a otimização de todos os pontos e gera a planilha corrigida
+    Se a planilha corrigida ainda não existir, os valores atuais vêm da original
+    Retorna a lista de resultados por ponto, ou None em caso de erro
     """
-    arquivo_original = "SAN-038-25-09.xlsx"
-    arquivo_corrigido = "SAN-038-25-09_CORRIGIDO.xlsx"
-    
-    if not os.path.exists(arquivo_original):
-        print(f"❌ Arquivo original não encontrado: {arquivo_original}")
-        return
-    
-    if not os.path.exists(arquivo_corrigido):
-        print(f"❌ Arquivo corrigido não encontrado: {arquivo_corrigido}")
-        return
+    arquivo_fonte = arquivo_corrigido if os.path.exists(arquivo_corrigido) else arquivo_original
+    reiniciar()
     
-    print("🚀 Iniciando otimização de tempos de coleta - VERSÃO SIMPLES...")
-    print("=" * 60)
-    print("🔧 PROCESSANDO PLANILHA CORRIGIDA!")
-    print("=" * 60)
+    log.info("🚀 Iniciando otimização de tempos de coleta - VERSÃO SIMPLES...")
+    log.info("%s", "=" * 60)
+    log.info("🔧 PROCESSANDO PLANILHA CORRIGIDA!")
+    log.info("%s", "=" * 60)
     
     # Extrai dados da planilha original (para obter valores desejados)
-    constantes_original, pontos_original = extrair_dados_planilha_original(arquivo_original)
+    with cronometrar('extracao'):
+        constantes_original, pontos_original = extrair_dados_planilha_original(arquivo_original)
     if constantes_original is None or pontos_original is None:
-        return
+        return None
     
-    print(f"✅ Extraídos {len(pontos_original)} pontos da planilha original")
+    log.info("✅ Extraídos %s pontos da planilha original", len(pontos_original))
     
     # Extrai dados da planilha corrigida (para obter valores atuais)
-    constantes_corrigido, pontos_corrigido = extrair_dados_planilha_original(arquivo_corrigido)
+    with cronometrar('extracao'):
+        constantes_corrigido, pontos_corrigido = extrair_dados_planilha_original(arquivo_fonte)
     if constantes_corrigido is None or pontos_corrigido is None:
-        return
+        return None
     
-    print(f"✅ Extraídos {len(pontos_corrigido)} pontos da planilha corrigida")
+    log.info("✅ Extraídos %s pontos da planilha corrigida", len(pontos_corrigido))
     
     tempo_inicio = time.time()
-    resultados_todos_pontos = []
-    
-    # Processa todos os pontos
-    for i, (ponto_original, ponto_corrigido) in enumerate(zip(pontos_original, pontos_corrigido)):
-        print(f"\n🔍 PROCESSANDO Ponto {ponto_original['numero']} (linha {ponto_original['linha_inicial']})...")
-        
-        print(f"   📊 Vazão desejada (original): {float(ponto_original['valores_originais']['vazao_media']):.6f}")
-        print(f"   📊 Vazão atual (corrigida): {float(ponto_corrigido['valores_originais']['vazao_media']):.6f}")
-        
-        # Define tempos como 240.000 e calcula diferença
-        melhor_combinacao = otimizar_tempos_ponto_simples_240(
-            ponto_corrigido['leituras'], 
-            constantes_corrigido, 
-            ponto_original['valores_originais']  # Usa valores originais como objetivo
-        )
-        
-        if melhor_combinacao is None:
-            print(f"❌ Não foi possível otimizar os tempos do Ponto {ponto_original['numero']}!")
-            continue
-        
-        # Calcula resultados com tempos otimizados
-        resultados_otimizados = calcular_formulas_com_tempo_ajustado(
-            ponto_corrigido['leituras'], 
-            constantes_corrigido, 
-            melhor_combinacao['tempos']
-        )
-        
-        # Verifica se os valores estão corretos
-        vazao_diff = abs(float(melhor_combinacao['agregados']['vazao_media'] - ponto_original['valores_originais']['vazao_media']))
-        tendencia_diff = abs(float(melhor_combinacao['agregados']['tendencia'] - ponto_original['valores_originais']['tendencia']))
-        
-        print(f"   📊 Vazão Média Desejada: {float(ponto_original['valores_originais']['vazao_media']):.6f}")
-        print(f"   📊 Vazão Média Otimizada: {float(melhor_combinacao['agregados']['vazao_media']):.6f}")
-        print(f"   📊 Diferença: {vazao_diff:.8f}")
-        print(f"   📊 Tempos Otimizados: {[float(t) for t in melhor_combinacao['tempos']]}")
-        print(f"   📊 Iterações necessárias: {melhor_combinacao['iteracoes']}")
-        
-        # Salva resultado do ponto
-        resultado_ponto = {
-            'numero': ponto_original['numero'],
-            'linha_inicial': ponto_original['linha_inicial'],
-            'tempos_otimizados': [float(t) for t in melhor_combinacao['tempos']],
-            'agregados_otimizados': {k: float(v) if isinstance(v, Decimal) else v for k, v in melhor_combinacao['agregados'].items()},
-            'valores_desejados': {k: float(v) if isinstance(v, Decimal) else v for k, v in ponto_original['valores_originais'].items()},
-            'valores_corrigidos': {k: float(v) if isinstance(v, Decimal) else v for k, v in ponto_corrigido['valores_originais'].items()},
-            'iteracoes': melhor_combinacao['iteracoes'],
-            'diferenca': float(melhor_combinacao['diferenca']),  # Inclui a diferença calculada
-            'diferencas': {
-                'vazao': vazao_diff,
-                'tendencia': tendencia_diff
-            }
-        }
-        
-        resultados_todos_pontos.append(resultado_ponto)
+    with cronometrar('otimizacao'):
+        resultados_todos_pontos = otimizar_pontos(constantes_corrigido, pontos_original, pontos_corrigido)
     
     tempo_decorrido = time.time() - tempo_inicio
     
-    print(f"\n📊 RESUMO FINAL:")
-    print(f"   Pontos processados: {len(resultados_todos_pontos)}/{len(pontos_original)}")
-    print(f"   Tempo total: {tempo_decorrido:.2f} segundos")
-    print(f"   Tempo médio por ponto: {tempo_decorrido/len(pontos_original):.2f} segundos")
+    log.info("\n📊 RESUMO FINAL:")
+    log.info("   Pontos processados: %s/%s", len(resultados_todos_pontos), len(pontos_original))
+    log.info("   Tempo total: %.2f segundos", tempo_decorrido)
+    log.info("   Tempo médio por ponto: %.2f segundos", tempo_decorrido/len(pontos_original))
     
     # Gera a planilha corrigida com os tempos otimizados
-    sucesso_planilha = gerar_planilha_corrigida(resultados_todos_pontos, arquivo_original, arquivo_corrigido)
+    with cronometrar('gravacao_planilha'):
+        sucesso_planilha = gerar_planilha_corrigida(resultados_todos_pontos, arquivo_original, arquivo_corrigido, arquivo_informacoes)
     
     if sucesso_planilha:
         # Salva resultado completo
@@ -1076,17 +1017,37 @@ def main():
                 'pontos_processados': len(resultados_todos_pontos),
                 'tempo_total': tempo_decorrido,
                 'tempo_medio_por_ponto': tempo_decorrido/len(pontos_original) if pontos_original else 0
-            }
+            },
+            'instrumentacao': relatorio_instrumentacao()
         }
         
-        with open('resultados_otimizacao_tempos_corrigidos.json', 'w', encoding='utf-8') as f:
+        with open(arquivo_resultados, 'w', encoding='utf-8') as f:
             json.dump(resultado_completo, f, indent=2, ensure_ascii=False)
         
-        print(f"\n✅ Resultado completo salvo em: resultados_otimizacao_tempos_corrigidos.json")
-        print(f"✅ Planilha corrigida gerada: {arquivo_corrigido}")
-        print("🎉 Otimização de todos os pontos da planilha corrigida concluída!")
+        log.info("\n✅ Resultado completo salvo em: %s", arquivo_resultados)
+        log.info("✅ Planilha corrigida gerada: %s", arquivo_corrigido)
+        log.info("🎉 Otimização de todos os pontos da planilha corrigida concluída!")
     else:
-        print("❌ Erro ao gerar planilha corrigida!")
+        log.error("❌ Erro ao gerar planilha corrigida!")
+    
+    return resultados_todos_pontos if sucesso_planilha else None
+
+def main():
+    """
+    Função principal - PROCESSA TODOS OS PONTOS DA PLANILHA CORRIGIDA
+    """
+    arquivo_original = "SAN-038-25-09.xlsx"
+    arquivo_corrigido = "SAN-038-25-09_CORRIGIDO.xlsx"
+    
+    if not os.path.exists(arquivo_original):
+        log.error("❌ Arquivo original não encontrado: %s", arquivo_original)
+        return
+    
+    if not os.path.exists(arquivo_corrigido):
+        log.error("❌ Arquivo corrigido não encontrado: %s", arquivo_corrigido)
+        return
+    
+    executar_otimizacao(arquivo_original, arquivo_corrigido)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -0,0 +1,339 @@
+# -*- coding: utf-8 -*-
+"""
+Lote Assíncrono com Leitura, Cálculo e Gravação Sobrepostos
+No lote comum cada planilha é lida, calculada e gravada em sequência pelo
+mesmo processo. Aqui as três fases são estágios ligados por filas limitadas
+(asyncio), então enquanto a planilha N é calculada a N+1 já está sendo lida
+e a N-1 gravada:
+
+    leitura (threads)  →  fila  →  cálculo (processos)  →  fila  →  gravação (threads)
+
+    • leitura: carrega a pasta de trabalho e extrai constantes e valores sagrados;
+    • cálculo: otimização, refinamentos, robustez e verificação num processo do
+      pool, sobre uma cópia da pasta de trabalho; devolve só as células
+      alteradas da aba de coleta;
+    • gravação: aplica as células alteradas à pasta de trabalho lida e grava o
+      certificado e o resultado.
+
+As filas limitadas seguram a leitura quando o cálculo ou a gravação ficam para
+trás, então o número de pastas de trabalho em memória não passa de
+leitores + limite_fila + processos + limite_fila + gravadores. A vazão tende à
+do estágio mais lento. As saídas são as mesmas do lote comum (sem o log por
+planilha: o log dos processos segue LOG_NIVEL, padrão WARNING)
+"""
+
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from decimal import getcontext
+from datetime import datetime
+import asyncio
+import json
+import os
+import time
+
+from registro_log import configurar_log, obter_logger
+from relatorio_streaming import EscritorRelatorio, ler_registros, PLANILHA
+from pipeline_certificado import TOLERANCIA_VERIFICACAO
+from processamento_lote import aquecer_motores, cache_processo, listar_planilhas, nomes_saida
+
+# Configurar precisão alta
+getcontext().prec = 28
+
+log = obter_logger(__name__)
+
+# Pastas de trabalho aguardando entre um estágio e o seguinte
+LIMITE_FILA = 2
+
+# Threads de leitura e de gravação
+LEITORES = 1
+GRAVADORES = 1
+
+ESTAGIOS = ('leitura', 'calculo', 'gravacao')
+
+# Marca o fim das planilhas numa fila
+_FIM = None
+
+# Cache de soluções do processo de cálculo (aberto uma vez, na inicialização)
+_CACHE_PROCESSO = None
+
+
+def iniciar_processo_calculo(usar_cache_solucoes=True):
+    """
+    Inicialização de cada processo de cálculo: log, módulos dos motores e cache de soluções
+    (a mesma regra do lote comum, para os dois modos gerarem os mesmos certificados)
+    """
+    global _CACHE_PROCESSO
+
+    configurar_log(os.environ.get('LOG_NIVEL', 'WARNING'), 'silencioso')
+
+    aquecer_motores()
+    _CACHE_PROCESSO = cache_processo(usar_cache_solucoes)
+
+
+def valores_aba(sheet):
+    """
+    {coordenada: valor} de todas as células da aba
+    """
+    return {celula.coordinate: celula.value for linha in sheet.iter_rows() for celula in linha}
+
+
+def ler_planilha(arquivo_original):
+    """
+    Estágio de leitura (thread): pipeline com a pasta de trabalho e os dados originais carregados
+    """
+    from pipeline_certificado import PipelineCertificado
+
+    pipeline = PipelineCertificado(arquivo_original)
+    pipeline.carregar()
+    return pipeline
+
+
+def calcular_planilha(arquivo_original, original, wb, arquivo_pontos, arquivo_certificado, tolerancia):
+    """
+    Estágio de cálculo (processo do pool): executa as etapas sobre a cópia da pasta de trabalho
+    Retorna as células alteradas da aba de coleta e os resultados das etapas
+    """
+    from instrumentacao import reiniciar, relatorio as relatorio_instrumentacao
+    from pipeline_certificado import PipelineCertificado, ResultadoPipeline
+
+    inicio = time.perf_counter()
+    reiniciar()
+    with EscritorRelatorio(arquivo_pontos, 'pipeline', arquivo_original=arquivo_original) as relatorio:
+        pipeline = PipelineCertificado(arquivo_original, relatorio=relatorio, cache=_CACHE_PROCESSO,
+                                       tolerancia=tolerancia)
+        pipeline.wb, pipeline.original = wb, original
+        antes = valores_aba(pipeline.coleta_sheet)
+
+        resultado = ResultadoPipeline(arquivo_original, arquivo_certificado)
+        resultado.verificacao = pipeline.executar_etapas()
+        resultado.etapas = list(pipeline.etapas)
+        resultado.tempo_total = time.perf_counter() - inicio
+        resultado.instrumentacao = relatorio_instrumentacao()
+        relatorio.concluir(aprovado=resultado.aprovado, arquivo_certificado=arquivo_certificado,
+                           tempo_total=round(resultado.tempo_total, 3), instrumentacao=resultado.instrumentacao)
+
+    alteracoes = {coordenada: valor for coordenada, valor in valores_aba(pipeline.coleta_sheet).items()
+                  if antes.get(coordenada) != valor}
+    return alteracoes, resultado
+
+
+def gravar_planilha(pipeline, alteracoes, resultado, saida):
+    """
+    Estágio de gravação (thread): aplica as células alteradas, grava o certificado e o resultado
+    """
+    sheet = pipeline.coleta_sheet
+    for coordenada, valor in alteracoes.items():
+        sheet[coordenada].value = valor
+    pipeline.salvar(saida['certificado'])
+
+    with open(saida['resultado'], 'w', encoding='utf-8') as f:
+        json.dump(resultado.para_dicionario(), f, indent=2, ensure_ascii=False, default=str)
+
+
+class PipelineAssincrono:
+    """
+    Estágios do lote ligados por filas limitadas
+    Uso:
+        consolidado = asyncio.run(PipelineAssincrono(pasta_saida, processos).executar(planilhas))
+    """
+
+    def __init__(self, pasta_saida, processos=None, leitores=LEITORES, gravadores=GRAVADORES,
+                 limite_fila=LIMITE_FILA, tolerancia=TOLERANCIA_VERIFICACAO, usar_cache_solucoes=True):
+        self.pasta_saida = pasta_saida
+        self.processos = processos or os.cpu_count() or 1
+        self.leitores = leitores
+        self.gravadores = gravadores
+        self.limite_fila = limite_fila
+        self.tolerancia = tolerancia
+        self.usar_cache_solucoes = usar_cache_solucoes
+        # Tempo ocupado de cada estágio (soma entre as planilhas)
+        self.tempos = dict.fromkeys(ESTAGIOS, 0.0)
+        self.resumos = []
+
+    async def _medir(self, estagio, executor, funcao, *args):
+        inicio = time.perf_counter()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(executor, funcao, *args)
+        finally:
+            self.tempos[estagio] += time.perf_counter() - inicio
+
+    def _resumo_erro(self, arquivo, estagio, erro):
+        log.error("❌ %s (%s): %s", os.path.basename(arquivo), estagio, erro)
+        return {'arquivo': arquivo, 'status': 'erro', 'ultima_etapa_concluida': None,
+                'estagio': estagio, 'erro': f"{type(erro).__name__}: {erro}"}
+
+    async def _ler(self, entrada, fila_calculo, fila_resumos, threads):
+        while True:
+            arquivo = await entrada.get()
+            if arquivo is _FIM:
+                return
+            try:
+                pipeline = await self._medir('leitura', threads, ler_planilha, arquivo)
+            except Exception as e:
+                await fila_resumos.put(self._resumo_erro(arquivo, 'leitura', e))
+                continue
+            # Bloqueia enquanto o cálculo estiver atrasado (contrapressão)
+            await fila_calculo.put((arquivo, pipeline, time.perf_counter()))
+
+    async def _calcular(self, fila_calculo, fila_gravacao, fila_resumos, processos):
+        while True:
+            item = await fila_calculo.get()
+            if item is _FIM:
+                return
+            arquivo, pipeline, inicio = item
+            saida = nomes_saida(arquivo, self.pasta_saida)
+            os.makedirs(saida['pasta'], exist_ok=True)
+            try:
+                alteracoes, resultado = await self._medir(
+                    'calculo', processos, calcular_planilha, arquivo, pipeline.original, pipeline.wb,
+                    saida['pontos'], saida['certificado'], self.tolerancia)
+            except Exception as e:
+                await fila_resumos.put(self._resumo_erro(arquivo, 'calculo', e))
+                continue
+            await fila_gravacao.put((arquivo, pipeline, alteracoes, resultado, saida, inicio))
+
+    async def _gravar(self, fila_gravacao, fila_resumos, threads):
+        while True:
+            item = await fila_gravacao.get()
+            if item is _FIM:
+                return
+            arquivo, pipeline, alteracoes, resultado, saida, inicio = item
+            try:
+                await self._medir('gravacao', threads, gravar_planilha, pipeline, alteracoes, resultado, saida)
+            except Exception as e:
+                await fila_resumos.put(self._resumo_erro(arquivo, 'gravacao', e))
+                continue
+
+            resultado.tempo_total = time.perf_counter() - inicio
+            await fila_resumos.put({
+                'arquivo': arquivo,
+                'pasta_resultado': saida['pasta'],
+                'status': 'aprovado' if resultado.aprovado else 'reprovado',
+                'ultima_etapa_concluida': resultado.etapas[-1].nome if resultado.etapas else None,
+                'tempos_etapas': {etapa.nome: round(etapa.tempo, 3) for etapa in resultado.etapas},
+                'contadores': resultado.instrumentacao['contadores'],
+                'verificacao': resultado.verificacao,
+                'pontos': len(resultado.verificacao),
+                'pontos_aprovados': sum(1 for v in resultado.verificacao if v['aprovado']),
+                'certificado': saida['certificado'],
+                'tempo_total': round(resultado.tempo_total, 3),
+            })
+
+    async def _encerrar(self, tarefas, fila, quantidade):
+        """
+        Aguarda os trabalhadores de um estágio e avisa o fim ao estágio seguinte
+        """
+        await asyncio.gather(*tarefas)
+        for _ in range(quantidade):
+            await fila.put(_FIM)
+
+    async def executar(self, planilhas, ao_concluir=None):
+        """
+        Processa as planilhas; ao_concluir(resumo) é chamado a cada planilha terminada
+        Retorna os resumos em ordem de término
+        """
+        entrada = asyncio.Queue()
+        for arquivo in planilhas:
+            entrada.put_nowait(arquivo)
+        for _ in range(self.leitores):
+            entrada.put_nowait(_FIM)
+        fila_calculo = asyncio.Queue(self.limite_fila)
+        fila_gravacao = asyncio.Queue(self.limite_fila)
+        fila_resumos = asyncio.Queue()
+
+        with ThreadPoolExecutor(self.leitores, thread_name_prefix='leitura') as leitura, \
+                ThreadPoolExecutor(self.gravadores, thread_name_prefix='gravacao') as gravacao, \
+                ProcessPoolExecutor(self.processos, initializer=iniciar_processo_calculo,
+                                    initargs=(self.usar_cache_solucoes,)) as calculo:
+            leitores = [asyncio.create_task(self._ler(entrada, fila_calculo, fila_resumos, leitura))
+                        for _ in range(self.leitores)]
+            calculadores = [asyncio.create_task(self._calcular(fila_calculo, fila_gravacao, fila_resumos, calculo))
+                            for _ in range(self.processos)]
+            gravadores = [asyncio.create_task(self._gravar(fila_gravacao, fila_resumos, gravacao))
+                          for _ in range(self.gravadores)]
+            encerramento = asyncio.gather(
+                self._encerrar(leitores, fila_calculo, self.processos),
+                self._encerrar(calculadores, fila_gravacao, self.gravadores),
+                asyncio.gather(*gravadores),
+            )
+
+            while len(self.resumos) < len(planilhas):
+                resumo = await fila_resumos.get()
+                self.resumos.append(resumo)
+                if ao_concluir is not None:
+                    ao_concluir(resumo)
+            await encerramento
+
+        return self.resumos
+
+
+def processar_lote_assincrono(entrada, pasta_saida='resultados_lote', max_processos=None, limite_fila=LIMITE_FILA,
+                              usar_cache_solucoes=True):
+    """
+    Lote com os estágios sobrepostos; grava resumo_lote.jsonl e resumo_lote.json como o lote comum
+    """
+    planilhas = listar_planilhas(entrada)
+    if not planilhas:
+        print(f"❌ Nenhuma planilha encontrada em: {entrada}")
+        return None
+
+    os.makedirs(pasta_saida, exist_ok=True)
+    max_processos = max_processos or min(len(planilhas), os.cpu_count() or 1)
+
+    print(f"🚀 Processando {len(planilhas)} planilha(s): leitura → {max_processos} processo(s) de cálculo → gravação")
+    print(f"📁 Resultados em: {pasta_saida}")
+
+    inicio = time.perf_counter()
+    estatisticas = {'total_planilhas': 0, 'aprovadas': 0, 'reprovadas': 0, 'com_erro': 0}
+    chave_status = {'aprovado': 'aprovadas', 'reprovado': 'reprovadas'}
+    arquivo_fluxo = os.path.join(pasta_saida, 'resumo_lote.jsonl')
+    pipeline = PipelineAssincrono(pasta_saida, max_processos, limite_fila=limite_fila,
+                                  usar_cache_solucoes=usar_cache_solucoes)
+
+    with EscritorRelatorio(arquivo_fluxo, 'lote', entrada=entrada, pasta_saida=pasta_saida,
+                           processos=max_processos, planilhas=len(planilhas), assincrono=True) as fluxo:
+
+        def ao_concluir(resumo):
+            fluxo.planilha(resumo)
+            estatisticas['total_planilhas'] += 1
+            estatisticas[chave_status.get(resumo['status'], 'com_erro')] += 1
+            simbolo = {'aprovado': '✅', 'reprovado': '⚠️ '}.get(resumo['status'], '❌')
+            detalhe = resumo.get('erro') or f"{resumo['pontos_aprovados']}/{resumo['pontos']} pontos aprovados"
+            print(f"   {simbolo} [{estatisticas['total_planilhas']}/{len(planilhas)}] {os.path.basename(resumo['arquivo'])}: {detalhe}",
+                  flush=True)
+
+        asyncio.run(pipeline.executar(planilhas, ao_concluir))
+        tempo_total = time.perf_counter() - inicio
+        fluxo.concluir(estatisticas=estatisticas, tempo_total=round(tempo_total, 3),
+                       tempos_estagios={estagio: round(t, 3) for estagio, t in pipeline.tempos.items()})
+
+    resultados = []
+    for registro in ler_registros(arquivo_fluxo, (PLANILHA,)):
+        registro.pop('registro')
+        resultados.append(registro)
+    resultados.sort(key=lambda r: r['arquivo'])
+
+    consolidado = {
+        'metadata': {
+            'data_geracao': datetime.now().isoformat(),
+            'entrada': entrada,
+            'pasta_saida': pasta_saida,
+            'processos': max_processos,
+            'tempo_total': round(tempo_total, 3),
+            'tempos_estagios': {estagio: round(t, 3) for estagio, t in pipeline.tempos.items()},
+        },
+        'estatisticas': estatisticas,
+        'resultados': resultados,
+    }
+    arquivo_resumo = os.path.join(pasta_saida, 'resumo_lote.json')
+    with open(arquivo_resumo, 'w', encoding='utf-8') as f:
+        json.dump(consolidado, f, indent=2, ensure_ascii=False, default=str)
+
+    print(f"\n📊 RESUMO DO LOTE:")
+    print(f"   Planilhas: {estatisticas['total_planilhas']}")
+    print(f"   ✅ Aprovadas: {estatisticas['aprovadas']}")
+    print(f"   ⚠️  Reprovadas: {estatisticas['reprovadas']}")
+    print(f"   ❌ Com erro: {estatisticas['com_erro']}")
+    print("   ⚙️  Tempo ocupado por estágio: " + ', '.join(f"{estagio} {t:.2f} s" for estagio, t in pipeline.tempos.items()))
+    print(f"   ⏱️  Tempo total: {tempo_total:.2f} segundos")
+    print(f"✅ Resumo consolidado salvo em: {arquivo_resumo}")
+    return consolidado
@@ -0,0 +1,406 @@
+# -*- coding: utf-8 -*-
+"""
+Pipeline de Certificado em Memória
+Executa otimização → refinamento híbrido → refinamento ultra-preciso → robustez
+sobre uma única pasta de trabalho carregada em memória. As etapas trocam resultados
+diretamente (sem planilhas intermediárias nem informacoes_refinamento.json) e
+o certificado é gravado apenas no final. Pontos de verificação opcionais
+gravam a planilha e os resultados de cada etapa para depuração
+"""
+
+from dataclasses import dataclass, field
+from decimal import Decimal, getcontext
+from datetime import datetime
+import argparse
+import json
+import os
+import time
+
+from instrumentacao import cronometrar, reiniciar, relatorio as relatorio_instrumentacao
+from registro_log import configurar_log, obter_logger
+from relatorio_streaming import EscritorRelatorio
+from cache_solucoes import CacheSolucoes
+from estrategias_tempo import compilar_estrategia
+from orcamento_otimizacao import Prazo, VALORES_SAGRADOS, orcamento_padrao, validar_orcamento
+from otimizador_tempos_inteligente import (
+    extrair_dados_planilha_original,
+    converter_para_decimal_padrao,
+    calcular_formulas_com_tempo_ajustado,
+    calcular_agregados_com_tempo_ajustado,
+    otimizar_pontos,
+    aplicar_tempos_otimizados_na_aba,
+)
+
+# Configurar precisão alta
+getcontext().prec = 28
+
+log = obter_logger(__name__)
+
+# Diferença máxima aceita entre a vazão média final e a original
+TOLERANCIA_VERIFICACAO = Decimal('0.00001')
+
+VALORES_VAZIOS = {
+    'vazao_media': Decimal('0'),
+    'tendencia': Decimal('0'),
+    'desvio_padrao': Decimal('0')
+}
+
+
+@dataclass
+class DadosCertificado:
+    """
+    Constantes e pontos do certificado no estado atual do pipeline
+    """
+    constantes: dict
+    pontos: list
+
+
+@dataclass
+class ResultadoEtapa:
+    """
+    Resultado de uma etapa do pipeline
+    """
+    nome: str
+    resultados: list
+    tempo: float
+    informacoes: list = field(default_factory=list)
+
+    @property
+    def pontos_processados(self):
+        return sum(1 for r in self.resultados if r is not None)
+
+
+@dataclass
+class ResultadoPipeline:
+    """
+    Resultado completo do pipeline de um certificado
+    """
+    arquivo_original: str
+    arquivo_certificado: str = None
+    etapas: list = field(default_factory=list)
+    verificacao: list = field(default_factory=list)
+    tempo_total: float = 0.0
+    instrumentacao: dict = None
+    tempo_alvo: str = None
+    orcamento_ponto: float = None
+
+    @property
+    def aprovado(self):
+        return bool(self.verificacao) and all(v['aprovado'] for v in self.verificacao)
+
+    def para_dicionario(self):
+        return {
+            'arquivo_original': self.arquivo_original,
+            'arquivo_certificado': self.arquivo_certificado,
+            'aprovado': self.aprovado,
+            'tempo_alvo': self.tempo_alvo,
+            'orcamento_ponto': self.orcamento_ponto,
+            'tempo_total': self.tempo_total,
+            'etapas': [
+                {
+                    'nome': etapa.nome,
+                    'tempo': etapa.tempo,
+                    'pontos_processados': etapa.pontos_processados,
+                    'resultados': etapa.resultados,
+                }
+                for etapa in self.etapas
+            ],
+            'verificacao': self.verificacao,
+            'instrumentacao': self.instrumentacao,
+        }
+
+
+def verificar_pontos(constantes, pontos_original, pontos_final, tolerancia=TOLERANCIA_VERIFICACAO):
+    """
+    Recalcula os agregados com os tempos finais e compara a vazão média com
+    o valor sagrado da planilha original
+    """
+    finais_por_linha = {p['linha_inicial']: p for p in pontos_final}
+    verificacao = []
+
+    for ponto in pontos_original:
+        ponto_final = finais_por_linha.get(ponto['linha_inicial'])
+        if ponto_final is None:
+            verificacao.append({'ponto': ponto['numero'], 'aprovado': False, 'erro': 'ponto ausente'})
+            continue
+
+        tempos = [l['tempo_coleta'] for l in ponto_final['leituras']]
+        agregados = calcular_agregados_com_tempo_ajustado(
+            calcular_formulas_com_tempo_ajustado(ponto['leituras'], constantes, tempos)
+        )
+        diferenca = abs(agregados['vazao_media'] - ponto['valores_originais']['vazao_media'])
+
+        verificacao.append({
+            'ponto': ponto['numero'],
+            'tempos': [str(t) for t in tempos],
+            'vazao_media': str(agregados['vazao_media']),
+            'diferenca_vazao': str(diferenca),
+            'residuos': {chave: str(abs(agregados[chave] - ponto['valores_originais'][chave]))
+                         for chave in VALORES_SAGRADOS},
+            'aprovado': diferenca <= tolerancia,
+        })
+
+    return verificacao
+
+
+class PipelineCertificado:
+    """
+    Orquestra as etapas sobre uma pasta de trabalho mantida em memória
+    """
+
+    def __init__(self, arquivo_original, pasta_checkpoints=None, relatorio=None, cache=None,
+                 tolerancia=TOLERANCIA_VERIFICACAO, estrategia=None, orcamento_ponto=None, processos_ultra=None):
+        self.arquivo_original = arquivo_original
+        self.pasta_checkpoints = pasta_checkpoints
+        # EscritorRelatorio opcional: cada ponto de cada etapa é gravado ao terminar
+        self.relatorio = relatorio
+        # CacheSolucoes opcional: pontos já resolvidos não são refinados de novo
+        self.cache = cache
+        # Diferença máxima aceita na verificação da vazão média
+        self.tolerancia = tolerancia
+        # Estratégia de tempo alvo (None = TEMPO_ALVO, padrão 240 s), compilada uma vez
+        self.restricoes = compilar_estrategia(estrategia)
+        # Segundos de busca por ponto em cada etapa (None = ORCAMENTO_PONTO; sem limite se ausente)
+        self.orcamento_ponto = orcamento_padrao() if orcamento_ponto is None else validar_orcamento(orcamento_ponto)
+        # Processos do refinamento ultra-preciso em paralelo (None = sequencial; não usar dentro de um pool)
+        self.processos_ultra = processos_ultra
+        self.wb = None
+        self.original = None
+        self.etapas = []
+
+    def carregar(self):
+        """
+        Abre a planilha original (fórmulas preservadas para a gravação final) e
+        lê constantes e valores sagrados pelo cache de snapshots
+        """
+        with cronometrar('extracao'):
+            constantes, pontos = extrair_dados_planilha_original(self.arquivo_original)
+        if constantes is None or pontos is None:
+            raise ValueError(f"não foi possível extrair os dados de {self.arquivo_original}")
+
+        self.original = DadosCertificado(constantes, pontos)
+        from openpyxl import load_workbook
+
+        with cronometrar('carga_planilha'):
+            self.wb = load_workbook(self.arquivo_original)
+        return self.original
+
+    @property
+    def coleta_sheet(self):
+        return self.wb["Coleta de Dados"]
+
+    def dados_atuais(self):
+        """
+        Pontos com as entradas atuais da aba em memória e os valores sagrados da original
+        As constantes são sempre as da original (valores calculados pelo Excel)
+        """
+        from layout_planilha import ler_certificado
+
+        atual = ler_certificado(self.wb, converter_para_decimal_padrao)
+        valores_desejados = {p['linha_inicial']: p['valores_originais'] for p in self.original.pontos}
+
+        for ponto in atual['pontos']:
+            ponto['valores_originais'] = valores_desejados.get(ponto['linha_inicial'], dict(VALORES_VAZIOS))
+
+        return DadosCertificado(self.original.constantes, atual['pontos'])
+
+    def _registrar(self, etapa):
+        self.etapas.append(etapa)
+        log.info("✅ Etapa '%s': %s pontos em %.2fs", etapa.nome, etapa.pontos_processados, etapa.tempo)
+
+        if self.pasta_checkpoints:
+            os.makedirs(self.pasta_checkpoints, exist_ok=True)
+            prefixo = os.path.join(self.pasta_checkpoints, f"{len(self.etapas):02d}_{etapa.nome}")
+            self.wb.save(f"{prefixo}.xlsx")
+            with open(f"{prefixo}.json", 'w', encoding='utf-8') as f:
+                json.dump({'resultados': etapa.resultados, 'informacoes': etapa.informacoes},
+                          f, indent=2, ensure_ascii=False, default=str)
+            log.info("   💾 Checkpoint: %s.xlsx", prefixo)
+
+        return etapa
+
+    def otimizar(self):
+        """
+        Etapa 1: tempos no nominal da estratégia (240.000 por padrão) com ajuste proporcional
+        """
+        inicio = time.perf_counter()
+        with cronometrar('otimizacao'):
+            resultados = otimizar_pontos(self.original.constantes, self.original.pontos, self.original.pontos,
+                                         self.relatorio, self.restricoes)
+            informacoes = aplicar_tempos_otimizados_na_aba(resultados, self.coleta_sheet)
+        return self._registrar(ResultadoEtapa('otimizacao', resultados, time.perf_counter() - inicio, informacoes))
+
+    def refinar_hibrido(self, informacoes_refinamento):
+        """
+        Etapa 2: refinamento híbrido orientado pelas informações da etapa 1
+        """
+        from aplicador_tempos_gerados import refinar_pontos_hibrido, aplicar_tempos_refinados_na_aba
+
+        inicio = time.perf_counter()
+        with cronometrar('refinamento_hibrido'):
+            dados = self.dados_atuais()
+            for ponto in dados.pontos:
+                ponto['tempos_aproximados'] = [l['tempo_coleta'] for l in ponto['leituras']]
+
+            mapeamento_refinamento = {info['numero']: info for info in informacoes_refinamento}
+            resultados = refinar_pontos_hibrido(dados.pontos, dados.constantes, mapeamento_refinamento, self.relatorio,
+                                                self.cache, self.restricoes, self.orcamento_ponto)
+            aplicar_tempos_refinados_na_aba(resultados, self.coleta_sheet)
+        return self._registrar(ResultadoEtapa('refinamento_hibrido', resultados, time.perf_counter() - inicio))
+
+    def refinar_ultra_preciso(self):
+        """
+        Etapa 3: refinamento ultra-preciso para o certificado final
+        """
+        from refinador_ultra_preciso import refinar_pontos_ultra_preciso, aplicar_tempos_ultra_refinados_na_aba
+
+        inicio = time.perf_counter()
+        with cronometrar('refinamento_ultra_preciso'):
+            dados = self.dados_atuais()
+            for ponto in dados.pontos:
+                ponto['tempos_refinados'] = [l['tempo_coleta'] for l in ponto['leituras']]
+
+            resultados = refinar_pontos_ultra_preciso(dados.pontos, dados.constantes, self.relatorio, self.cache,
+                                                      self.restricoes, self.orcamento_ponto, self.processos_ultra)
+            aplicar_tempos_ultra_refinados_na_aba(resultados, self.coleta_sheet)
+        return self._registrar(ResultadoEtapa('refinamento_ultra_preciso', resultados, time.perf_counter() - inicio))
+
+    def reforcar_robustez(self):
+        """
+        Etapa 4: probabilidade de os valores sagrados resistirem ao arredondamento
+        das entradas gravadas; pontos com a vazão média frágil são refinados de novo
+        e a nova solução só fica se for mais robusta sem piorar os resíduos
+        """
+        from refinador_ultra_preciso import aplicar_tempos_ultra_refinados_na_aba
+        from robustez_solucoes import reforcar_ponto
+
+        inicio = time.perf_counter()
+        resultados = []
+        with cronometrar('robustez_solucoes'):
+            dados = self.dados_atuais()
+            originais = {p['linha_inicial']: p for p in self.original.pontos}
+
+            for ponto in dados.pontos:
+                robustez = reforcar_ponto(
+                    ponto, dados.constantes, originais[ponto['linha_inicial']]['valores_originais'], self.tolerancia,
+                    self.coleta_sheet,
+                    gravar_tempos=lambda refinado: aplicar_tempos_ultra_refinados_na_aba([refinado], self.coleta_sheet),
+                    estrategia=self.restricoes,
+                    criar_prazo=(lambda: Prazo(self.orcamento_ponto)) if self.orcamento_ponto else None,
+                )
+
+                resultado = robustez.para_dicionario()
+                resultados.append(resultado)
+                if self.relatorio is not None:
+                    self.relatorio.ponto(resultado, 'robustez')
+        return self._registrar(ResultadoEtapa('robustez', resultados, time.perf_counter() - inicio))
+
+    def verificar(self):
+        """
+        Verifica os valores sagrados com os tempos atuais da aba em memória
+        """
+        with cronometrar('verificacao'):
+            verificacao = verificar_pontos(self.original.constantes, self.original.pontos, self.dados_atuais().pontos,
+                                           self.tolerancia)
+        if self.relatorio is not None:
+            for v in verificacao:
+                self.relatorio.ponto(v, 'verificacao')
+        return verificacao
+
+    def salvar(self, arquivo_saida):
+        """
+        Grava o certificado final (única gravação do pipeline)
+        """
+        with cronometrar('gravacao_planilha'):
+            self.wb.save(arquivo_saida)
+        log.info("📄 Certificado final: %s", arquivo_saida)
+        return arquivo_saida
+
+    def executar_etapas(self):
+        """
+        Etapas de cálculo e verificação sobre a planilha já carregada (sem gravar)
+        """
+        otimizacao = self.otimizar()
+        self.refinar_hibrido(otimizacao.informacoes)
+        self.refinar_ultra_preciso()
+        self.reforcar_robustez()
+        return self.verificar()
+
+    def executar(self, arquivo_saida):
+        """
+        Executa todas as etapas e grava o certificado final
+        """
+        inicio = time.perf_counter()
+        reiniciar()
+        resultado = ResultadoPipeline(self.arquivo_original, tempo_alvo=self.restricoes.estrategia.nome,
+                                      orcamento_ponto=self.orcamento_ponto)
+
+        self.carregar()
+        resultado.verificacao = self.executar_etapas()
+        resultado.arquivo_certificado = self.salvar(arquivo_saida)
+        resultado.etapas = list(self.etapas)
+        resultado.tempo_total = time.perf_counter() - inicio
+        resultado.instrumentacao = relatorio_instrumentacao()
+
+        if self.relatorio is not None:
+            self.relatorio.concluir(aprovado=resultado.aprovado, arquivo_certificado=resultado.arquivo_certificado,
+                                    tempo_total=round(resultado.tempo_total, 3),
+                                    instrumentacao=resultado.instrumentacao)
+        return resultado
+
+
+def main():
+    """
+    Função principal - PIPELINE EM MEMÓRIA
+    """
+    parser = argparse.ArgumentParser(description="Gera o certificado final sem planilhas intermediárias")
+    parser.add_argument('original', nargs='?', default="SAN-038-25-09.xlsx", help="planilha original")
+    parser.add_argument('-o', '--saida', default=None, help="certificado final (padrão: <original>_CERTIFICADO_FINAL.xlsx)")
+    parser.add_argument('--checkpoints', default=None, help="pasta para gravar a planilha e os resultados de cada etapa")
+    parser.add_argument('--log-nivel', default=None, help="DEBUG, INFO (padrão), WARNING ou ERROR")
+    parser.add_argument('--progresso', action='store_true', help="mostra apenas barras de progresso e o resumo")
+    parser.add_argument('--log-jsonl', default=None, help="arquivo JSONL para gravar também o log")
+    parser.add_argument('--sem-cache-solucoes', action='store_true', help="refina todos os pontos sem o cache de soluções")
+    parser.add_argument('--tempo-alvo', default=None, help="estratégia de tempo alvo: 240 (padrão), 360 ou outro nominal")
+    parser.add_argument('--orcamento-ponto', type=float, default=None,
+                        help="segundos de busca por ponto em cada etapa (padrão: sem limite)")
+    parser.add_argument('--processos-ultra', type=int, default=None,
+                        help="processos do refinamento ultra-preciso em paralelo (padrão: sequencial)")
+    args = parser.parse_args()
+
+    configurar_log(args.log_nivel, 'progresso' if args.progresso else 'texto', args.log_jsonl)
+
+    if not os.path.exists(args.original):
+        log.error("❌ Arquivo original não encontrado: %s", args.original)
+        return
+
+    arquivo_saida = args.saida or args.original.replace('.xlsx', '_CERTIFICADO_FINAL.xlsx')
+
+    arquivo_pontos = arquivo_saida.replace('.xlsx', '_pontos.jsonl')
+    cache = None if args.sem_cache_solucoes else CacheSolucoes()
+    try:
+        with EscritorRelatorio(arquivo_pontos, 'pipeline', arquivo_original=args.original) as relatorio:
+            resultado = PipelineCertificado(args.original, args.checkpoints, relatorio, cache,
+                                            estrategia=args.tempo_alvo,
+                                            orcamento_ponto=args.orcamento_ponto,
+                                            processos_ultra=args.processos_ultra).executar(arquivo_saida)
+    finally:
+        if cache is not None:
+            log.info("♻️  Cache de soluções: %s", cache.estatisticas(), extra={'resumo': True})
+            cache.fechar()
+
+    arquivo_resultado = arquivo_saida.replace('.xlsx', '_pipeline.json')
+    dados = resultado.para_dicionario()
+    dados['data_geracao'] = datetime.now().isoformat()
+    with open(arquivo_resultado, 'w', encoding='utf-8') as f:
+        json.dump(dados, f, indent=2, ensure_ascii=False, default=str)
+
+    aprovados = sum(1 for v in resultado.verificacao if v['aprovado'])
+    log.info("\n📊 Pontos aprovados: %s/%s", aprovados, len(resultado.verificacao), extra={'resumo': True})
+    log.info("⏱️  Tempo total: %.2f segundos", resultado.tempo_total, extra={'resumo': True})
+    log.info("✅ Resultado salvo em: %s", arquivo_resultado, extra={'resumo': True})
+    log.info("✅ Resultados por ponto em: %s", arquivo_pontos, extra={'resumo': True})
+
+
+if __name__ == "__main__":
+    main()
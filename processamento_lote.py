@@ -0,0 +1,292 @@
+# -*- coding: utf-8 -*-
+"""
+Processamento em Lote de Certificados
+Executa o pipeline completo (extração → otimização → refinamento híbrido →
+refinamento ultra-preciso → verificação) para todas as planilhas de uma pasta
+ou padrão glob, distribuindo as planilhas entre processos paralelos.
+Cada planilha passa pelo pipeline em memória (pipeline_certificado.py)
+"""
+
+from contextlib import redirect_stdout, redirect_stderr
+from decimal import getcontext
+from datetime import datetime
+import argparse
+import glob
+import hashlib
+import json
+import os
+import time
+import traceback
+
+from pipeline_certificado import TOLERANCIA_VERIFICACAO
+from registro_log import configurar_log
+from relatorio_streaming import EscritorRelatorio, ler_registros, PLANILHA
+
+# Configurar precisão alta
+getcontext().prec = 28
+
+# Sufixos das planilhas geradas pelo pipeline (não são reprocessadas)
+SUFIXOS_GERADOS = ('_CORRIGIDO', '_CORRIGIDO_NOVO', '_REFINADO_BRUTO', '_REFINADO_HIBRIDO',
+                   '_REFINADO_PRECISO', '_CERTIFICADO_FINAL')
+
+# Cache de soluções do processo (aberto na primeira planilha e reaproveitado pelo pool)
+_CACHE_PROCESSO = None
+
+
+def eh_planilha_entrada(caminho):
+    """
+    Indica se o arquivo é uma planilha de certificado a ser processada
+    Ignora arquivos de bloqueio do Excel (~$) e planilhas geradas pelo pipeline
+    """
+    nome = os.path.basename(caminho)
+    if nome.startswith('~$') or not nome.lower().endswith('.xlsx'):
+        return False
+    base = os.path.splitext(nome)[0]
+    return not base.endswith(SUFIXOS_GERADOS)
+
+
+def listar_planilhas(entrada):
+    """
+    Lista as planilhas de entrada a partir de uma pasta ou de um padrão glob
+    """
+    if os.path.isdir(entrada):
+        candidatos = glob.glob(os.path.join(entrada, '*.xlsx'))
+    else:
+        candidatos = glob.glob(entrada)
+    return sorted(c for c in candidatos if os.path.isfile(c) and eh_planilha_entrada(c))
+
+
+def nomes_saida(arquivo_original, pasta_saida):
+    """
+    Monta os caminhos de saída de uma planilha dentro da sua subpasta de resultado
+    A subpasta leva o nome da planilha e um resumo da pasta de origem, para que
+    a/X.xlsx e b/X.xlsx do mesmo lote não gravem no mesmo lugar
+    """
+    base = os.path.splitext(os.path.basename(arquivo_original))[0]
+    origem = os.path.dirname(os.path.abspath(arquivo_original))
+    pasta = os.path.join(pasta_saida, f"{base}-{hashlib.sha1(origem.encode('utf-8')).hexdigest()[:8]}")
+    return {
+        'pasta': pasta,
+        'certificado': os.path.join(pasta, f"{base}_CERTIFICADO_FINAL.xlsx"),
+        'resultado': os.path.join(pasta, 'resultado_pipeline.json'),
+        'pontos': os.path.join(pasta, 'pontos.jsonl'),
+        'checkpoints': os.path.join(pasta, 'checkpoints'),
+        'log': os.path.join(pasta, 'processamento.log'),
+        'log_jsonl': os.path.join(pasta, 'processamento.jsonl'),
+    }
+
+
+def cache_processo(usar_cache_solucoes=True):
+    """
+    Cache de soluções do processo atual, ou None sem cache
+    Todos os modos de lote usam a mesma regra, então geram os mesmos certificados
+    """
+    global _CACHE_PROCESSO
+
+    if not usar_cache_solucoes:
+        return None
+    if _CACHE_PROCESSO is None:
+        from cache_solucoes import CacheSolucoes
+
+        _CACHE_PROCESSO = CacheSolucoes()
+    return _CACHE_PROCESSO
+
+
+def aquecer_motores():
+    """
+    Aquecimento dos processos de trabalho (pool do lote, monitor de pasta e serviço
+    HTTP): importa os módulos pesados e compila as restrições de cada estratégia de
+    tempo alvo registrada e o layout, para cada certificado pagar só o cálculo
+    """
+    import openpyxl  # noqa: F401
+    import numpy  # noqa: F401
+    import aplicador_tempos_gerados  # noqa: F401
+    import refinador_ultra_preciso  # noqa: F401
+    import robustez_solucoes  # noqa: F401
+    from estrategias_tempo import ESTRATEGIAS, compilar_estrategia
+    from layout_planilha import blocos_fixos, compilar_layout
+
+    for nome in ESTRATEGIAS:
+        compilar_estrategia(nome)
+    compilar_layout(blocos_fixos(8))
+
+
+def verificar_certificado(arquivo_original, arquivo_final, tolerancia=TOLERANCIA_VERIFICACAO):
+    """
+    Recalcula os agregados do certificado final gravado com os tempos da planilha e
+    compara com os valores sagrados da planilha original
+    """
+    from otimizador_tempos_inteligente import extrair_dados_planilha_original
+    from pipeline_certificado import verificar_pontos
+
+    constantes, pontos_original = extrair_dados_planilha_original(arquivo_original)
+    _, pontos_final = extrair_dados_planilha_original(arquivo_final)
+    if pontos_original is None or pontos_final is None:
+        return None
+
+    return verificar_pontos(constantes, pontos_original, pontos_final, tolerancia)
+
+
+def processar_certificado(arquivo_original, pasta_saida, checkpoints=False, log_jsonl=False, usar_cache_solucoes=True):
+    """
+    Executa o pipeline completo para uma planilha, isolando qualquer erro
+    Toda a saída dos scripts é gravada no log da própria planilha
+    (nível pela variável LOG_NIVEL; log_jsonl grava também processamento.jsonl)
+    Os resultados de cada ponto vão para pontos.jsonl à medida que terminam
+    usar_cache_solucoes: False refina todos os pontos sem o cache de soluções
+    """
+    saida = nomes_saida(arquivo_original, pasta_saida)
+    os.makedirs(saida['pasta'], exist_ok=True)
+    # Reconfigura a cada planilha: o processo do pool é reaproveitado entre arquivos
+    configurar_log(arquivo_jsonl=saida['log_jsonl'] if log_jsonl else None)
+
+    resumo = {
+        'arquivo': arquivo_original,
+        'pasta_resultado': saida['pasta'],
+        'status': 'erro',
+        'ultima_etapa_concluida': None,
+        'tempos_etapas': {},
+    }
+    inicio = time.perf_counter()
+
+    pipeline = None
+
+    with open(saida['log'], 'w', encoding='utf-8') as log, redirect_stdout(log), redirect_stderr(log):
+        try:
+            from pipeline_certificado import PipelineCertificado
+
+            with EscritorRelatorio(saida['pontos'], 'pipeline', arquivo_original=arquivo_original) as relatorio:
+                pipeline = PipelineCertificado(arquivo_original, saida['checkpoints'] if checkpoints else None, relatorio,
+                                               cache=cache_processo(usar_cache_solucoes))
+                resultado = pipeline.executar(saida['certificado'])
+
+            with open(saida['resultado'], 'w', encoding='utf-8') as f:
+                json.dump(resultado.para_dicionario(), f, indent=2, ensure_ascii=False, default=str)
+
+            resumo['tempos_etapas'] = {etapa.nome: round(etapa.tempo, 3) for etapa in resultado.etapas}
+            resumo['contadores'] = resultado.instrumentacao['contadores']
+            resumo['verificacao'] = resultado.verificacao
+            resumo['pontos'] = len(resultado.verificacao)
+            resumo['pontos_aprovados'] = sum(1 for v in resultado.verificacao if v['aprovado'])
+            resumo['status'] = 'aprovado' if resultado.aprovado else 'reprovado'
+            resumo['certificado'] = resultado.arquivo_certificado
+
+        except Exception as e:
+            if pipeline is not None and pipeline.etapas:
+                resumo['ultima_etapa_concluida'] = pipeline.etapas[-1].nome
+            resumo['erro'] = f"{type(e).__name__}: {e}"
+            traceback.print_exc()
+
+    resumo['tempo_total'] = round(time.perf_counter() - inicio, 3)
+    return resumo
+
+
+def processar_lote(entrada, pasta_saida='resultados_lote', max_processos=None, checkpoints=False, log_jsonl=False,
+                   usar_cache_solucoes=True):
+    """
+    Processa todas as planilhas encontradas em paralelo e grava o resumo consolidado
+    O resumo de cada planilha é gravado em resumo_lote.jsonl assim que ela termina
+    (legível durante o lote); em memória ficam apenas as contagens
+    """
+    planilhas = listar_planilhas(entrada)
+    if not planilhas:
+        print(f"❌ Nenhuma planilha encontrada em: {entrada}")
+        return None
+
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    os.makedirs(pasta_saida, exist_ok=True)
+    max_processos = max_processos or min(len(planilhas), os.cpu_count() or 1)
+
+    print(f"🚀 Processando {len(planilhas)} planilha(s) com {max_processos} processo(s)")
+    print(f"📁 Resultados em: {pasta_saida}")
+
+    inicio = time.perf_counter()
+    estatisticas = {'total_planilhas': 0, 'aprovadas': 0, 'reprovadas': 0, 'com_erro': 0}
+    chave_status = {'aprovado': 'aprovadas', 'reprovado': 'reprovadas'}
+    arquivo_fluxo = os.path.join(pasta_saida, 'resumo_lote.jsonl')
+
+    with EscritorRelatorio(arquivo_fluxo, 'lote', entrada=entrada, pasta_saida=pasta_saida,
+                           processos=max_processos, planilhas=len(planilhas)) as fluxo:
+        with ProcessPoolExecutor(max_workers=max_processos) as executor:
+            futuros = {executor.submit(processar_certificado, p, pasta_saida, checkpoints, log_jsonl,
+                                       usar_cache_solucoes): p for p in planilhas}
+
+            for futuro in as_completed(futuros):
+                arquivo = futuros[futuro]
+                try:
+                    resumo = futuro.result()
+                except Exception as e:
+                    # Falha do próprio processo (ex.: processo encerrado abruptamente)
+                    resumo = {'arquivo': arquivo, 'status': 'erro', 'erro': f"{type(e).__name__}: {e}"}
+
+                fluxo.planilha(resumo)
+                estatisticas['total_planilhas'] += 1
+                estatisticas[chave_status.get(resumo['status'], 'com_erro')] += 1
+                simbolo = {'aprovado': '✅', 'reprovado': '⚠️ '}.get(resumo['status'], '❌')
+                detalhe = resumo.get('erro') or f"{resumo['pontos_aprovados']}/{resumo['pontos']} pontos aprovados"
+                print(f"   {simbolo} [{estatisticas['total_planilhas']}/{len(planilhas)}] {os.path.basename(arquivo)}: {detalhe}")
+
+        tempo_total = time.perf_counter() - inicio
+        fluxo.concluir(estatisticas=estatisticas, tempo_total=round(tempo_total, 3))
+
+    # Resumo consolidado montado a partir do fluxo, em ordem de arquivo
+    resultados = []
+    for registro in ler_registros(arquivo_fluxo, (PLANILHA,)):
+        registro.pop('registro')
+        resultados.append(registro)
+    resultados.sort(key=lambda r: r['arquivo'])
+
+    consolidado = {
+        'metadata': {
+            'data_geracao': datetime.now().isoformat(),
+            'entrada': entrada,
+            'pasta_saida': pasta_saida,
+            'processos': max_processos,
+            'tempo_total': round(tempo_total, 3),
+        },
+        'estatisticas': estatisticas,
+        'resultados': resultados,
+    }
+
+    arquivo_resumo = os.path.join(pasta_saida, 'resumo_lote.json')
+    with open(arquivo_resumo, 'w', encoding='utf-8') as f:
+        json.dump(consolidado, f, indent=2, ensure_ascii=False, default=str)
+
+    estatisticas = consolidado['estatisticas']
+    print(f"\n📊 RESUMO DO LOTE:")
+    print(f"   Planilhas: {estatisticas['total_planilhas']}")
+    print(f"   ✅ Aprovadas: {estatisticas['aprovadas']}")
+    print(f"   ⚠️  Reprovadas: {estatisticas['reprovadas']}")
+    print(f"   ❌ Com erro: {estatisticas['com_erro']}")
+    print(f"   ⏱️  Tempo total: {tempo_total:.2f} segundos")
+    print(f"✅ Resumo consolidado salvo em: {arquivo_resumo}")
+    print(f"✅ Resumo em fluxo (JSONL): {arquivo_fluxo}")
+
+    return consolidado
+
+
+def main():
+    """
+    Função principal - PROCESSAMENTO EM LOTE
+    """
+    parser = argparse.ArgumentParser(description="Processa em paralelo uma pasta de planilhas de certificado")
+    parser.add_argument('entrada', help="pasta com planilhas .xlsx ou padrão glob (ex.: 'entrada/SAN-*.xlsx')")
+    parser.add_argument('-o', '--saida', default='resultados_lote', help="pasta de resultados (padrão: resultados_lote)")
+    parser.add_argument('-p', '--processos', type=int, default=None, help="número de processos (padrão: núcleos da CPU)")
+    parser.add_argument('--checkpoints', action='store_true', help="grava a planilha e os resultados de cada etapa")
+    parser.add_argument('--log-nivel', default=None, help="nível do log de cada planilha: DEBUG, INFO (padrão), WARNING, ERROR")
+    parser.add_argument('--log-jsonl', action='store_true', help="grava também o log de cada planilha em JSONL")
+    parser.add_argument('--sem-cache-solucoes', action='store_true', help="refina todos os pontos sem o cache de soluções")
+    args = parser.parse_args()
+
+    if args.log_nivel:
+        # Herdado pelos processos do pool
+        os.environ['LOG_NIVEL'] = args.log_nivel.upper()
+
+    processar_lote(args.entrada, args.saida, args.processos, args.checkpoints, args.log_jsonl,
+                   not args.sem_cache_solucoes)
+
+
+if __name__ == "__main__":
+    main()
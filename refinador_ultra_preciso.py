@@ -4,32 +4,40 @@ Refinador Ultra-Preciso
 Ajusta valores em incrementos de 0.00001 até atingir exatamente os valores do certificado original
 """
 
-import pandas as pd
-from openpyxl import load_workbook, Workbook
 from decimal import Decimal, ROUND_HALF_UP, getcontext
 import json
+import logging
 import os
 import time
 import shutil
 from datetime import datetime
+from otimizador_tempos_inteligente import extrair_dados_planilha_original
+from estrategias_tempo import compilar_estrategia
+from orcamento_otimizacao import criar_orcamento, limitar, qualidade, repassar_interrompidos
+from registro_log import obter_logger, ListaFloat, Progresso
+from instrumentacao import (contar, cronometrar, medir_ponto, reiniciar, CHAMADAS_MOTOR, ITERACOES,
+                            REJEITADOS_LIMITE, relatorio as relatorio_instrumentacao)
+from relatorio_streaming import EscritorRelatorio, renderizar_texto
+from sensibilidade_tempos import (calcular_sensibilidades, ordem_por_sensibilidade, passos_necessarios,
+                                  candidatos_por_sensibilidade, indice_grade_uniforme)
 
 # Configura precisão máxima
 getcontext().prec = 28
 
-def ler_valor_exato(sheet, linha, coluna):
-    """
-    Lê valor exato da célula com precisão máxima
-    """
-    valor = sheet.cell(row=linha, column=coluna).value
-    if valor is None:
-        return Decimal('0')
-    return Decimal(str(valor))
+log = obter_logger(__name__)
+
+# Etapa dos registros de ponto no relatório em fluxo
+ETAPA_RELATORIO = 'refinamento_ultra_preciso'
+
+# Tolerância da vazão média no refinamento ultra-preciso
+TOLERANCIA_ULTRA = Decimal('0.00001')
 
 def calcular_vazao_com_tempos(leituras, constantes, tempos_teste):
     """
     Calcula a vazão média usando os tempos fornecidos
     CÁLCULOS CORRETOS E COMPLETOS - VERSÃO ULTRA-PRECISA
     """
+    contar(CHAMADAS_MOTOR)
     resultados = []
     
     for i, leitura in enumerate(leituras):
@@ -85,102 +93,132 @@ def calcular_vazao_com_tempos(leituras, constantes, tempos_teste):
     
     return vazao_media
 
-def buscar_refinamento_ultra_preciso(leituras, constantes, vazao_desejada, tempos_iniciais, tolerancia_objetivo=Decimal('0.00001')):
+def buscar_refinamento_ultra_preciso(leituras, constantes, vazao_desejada, tempos_iniciais, tolerancia_objetivo=Decimal('0.00001'),
+                                     estrategia=None, prazo=None, ordem=None):
     """
-    Refina os tempos com incrementos ultra-precisos de 0.00001
+    Refina os tempos com incrementos ultra-precisos (0.00001 com 5 casas decimais)
+    A sensibilidade de cada leitura define a ordem do refinamento e o número de
+    incrementos até a vazão desejada (só os candidatos em volta são avaliados);
+    dentro da tolerância fica o primeiro incremento, como na varredura completa
+    estrategia: estratégia de tempo alvo (None = TEMPO_ALVO, padrão 240 s)
+    prazo: Prazo opcional; esgotado, retorna a melhor aproximação até ali
+    ordem: ordem fixa dos tempos (None = do mais para o menos sensível)
     """
-    print(f"   🎯 Refinamento ULTRA-PRECISO...")
-    print(f"   📊 Vazão desejada: {float(vazao_desejada):.8f}")
-    print(f"   📊 Tolerância objetivo: ±{float(tolerancia_objetivo)}")
-    print(f"   📊 Tempos iniciais: {[float(t) for t in tempos_iniciais]}")
+    log.info("   🎯 Refinamento ULTRA-PRECISO...")
+    log.info("   📊 Vazão desejada: %.8f", vazao_desejada)
+    log.info("   📊 Tolerância objetivo: ±%s", float(tolerancia_objetivo))
+    log.info("   📊 Tempos iniciais: %s", ListaFloat(tempos_iniciais))
     
     # Calcula vazão inicial
     vazao_inicial = calcular_vazao_com_tempos(leituras, constantes, tempos_iniciais)
     diferenca_inicial = abs(vazao_inicial - vazao_desejada)
-    print(f"   📊 Vazão inicial: {float(vazao_inicial):.8f}")
-    print(f"   📊 Diferença inicial: {float(diferenca_inicial):.8f}")
+    log.info("   📊 Vazão inicial: %.8f", vazao_inicial)
+    log.info("   📊 Diferença inicial: %.8f", diferenca_inicial)
     
     # Começa com os tempos iniciais
     tempos_atual = tempos_iniciais.copy()
     total_iteracoes = 0
     melhorias_encontradas = 0
-    incremento = Decimal('0.00001')
-    
-    # Testa cada tempo individualmente
-    for tempo_idx in range(3):
-        print(f"   🔍 Refinando tempo {tempo_idx + 1}...")
+    # Incremento, limites e desempate da estratégia (compilados uma vez por processo)
+    restricoes = compilar_estrategia(estrategia)
+    incremento = restricoes.incremento_ultra
+    passos_abaixo, passos_acima = restricoes.passos_ultra
+    desempatar = restricoes.desempatar
+    # Mensagens por candidato só são montadas com o log em DEBUG
+    depurar = log.isEnabledFor(logging.DEBUG)
+    
+    # Sensibilidade d(vazão)/d(tempo) de cada leitura: a de maior efeito é refinada primeiro
+    sensibilidades = calcular_sensibilidades(calcular_vazao_com_tempos, leituras, constantes, tempos_atual,
+                                             vazao_base=vazao_inicial)
+    if ordem is None:
+        ordem = ordem_por_sensibilidade(sensibilidades)
+    log.info("   📊 Sensibilidades (L/h por s): %s | ordem: %s",
+             ListaFloat(sensibilidades), [i + 1 for i in ordem])
+    
+    # Testa cada tempo individualmente, do mais para o menos sensível
+    # Melhor aproximação até aqui (os tempos de partida, se o prazo acabar antes do primeiro tempo)
+    melhor_vazao, melhor_diferenca = vazao_inicial, diferenca_inicial
+    for tempo_idx in ordem:
+        if prazo is not None and prazo.esgotado():
+            log.info("   ⏱️  Prazo esgotado antes do tempo %s: mantendo a melhor aproximação", tempo_idx + 1)
+            break
+        log.debug("   🔍 Refinando tempo %s...", tempo_idx + 1)
         
         melhor_tempo = tempos_atual[tempo_idx]
         melhor_vazao = calcular_vazao_com_tempos(leituras, constantes, tempos_atual)
         melhor_diferenca = abs(melhor_vazao - vazao_desejada)
         
-        print(f"   📊 Estado atual antes do refinamento:")
-        print(f"      Tempo {tempo_idx + 1}: {float(melhor_tempo):.8f}")
-        print(f"      Vazão atual: {float(melhor_vazao):.8f}")
-        print(f"      Diferença atual: {float(melhor_diferenca):.8f}")
+        log.debug("   📊 Estado atual antes do refinamento:")
+        log.debug("      Tempo %s: %.8f", tempo_idx + 1, melhor_tempo)
+        log.debug("      Vazão atual: %.8f", melhor_vazao)
+        log.debug("      Diferença atual: %.8f", melhor_diferenca)
         
-        # Determina direção baseada na diferença
+        # Determina direção baseada na diferença; a grade é melhor_tempo ± k·incremento,
+        # com os limites da estratégia (em 240 s: até 6000 passos para baixo, 1000 para cima)
         if melhor_vazao < vazao_desejada:
             # Vazão atual < desejada → precisa diminuir tempos
             direcao = 'diminuir'
-            valores_teste = []
-            valor_atual = melhor_tempo
-            for _ in range(6000):  # Testa até 4000 incrementos
-                valor_atual -= incremento
-                if valor_atual >= Decimal('239.600000'):  # Limite mínimo
-                    valores_teste.append(valor_atual)
-                else:
-                    break
+            passos_validos = min(passos_abaixo, max(0, int((melhor_tempo - restricoes.piso_ultra) / incremento)))
+            contar(REJEITADOS_LIMITE, passos_abaixo - passos_validos)
+            limites = (-passos_validos, -1)
+            inicio = -1
         else:
             # Vazão atual > desejada → precisa aumentar tempos
             direcao = 'aumentar'
-            valores_teste = []
-            valor_atual = melhor_tempo
-            for _ in range(1000):  # Testa até 1000 incrementos
-                valor_atual += incremento
-                if valor_atual <= Decimal('240.4900000'):  # Limite máximo
-                    valores_teste.append(valor_atual)
-                else:
-                    break
+            passos_validos = min(passos_acima, max(0, int((restricoes.teto_ultra - melhor_tempo) / incremento)))
+            contar(REJEITADOS_LIMITE, passos_acima - passos_validos)
+            limites = (1, passos_validos)
+            inicio = 1
         
-        print(f"   📊 Direção: {direcao}")
-        print(f"   📊 Testando {len(valores_teste)} valores com incremento {float(incremento)}")
+        if passos_validos == 0:
+            log.debug("   ⚠️  Tempo %s no limite da grade (%s)", tempo_idx + 1, direcao)
+            continue
         
-        # Testa valores com incremento ultra-preciso
-        for i, valor_teste in enumerate(valores_teste):
-            total_iteracoes += 1
-            
-            # Cria uma cópia dos tempos e altera apenas o tempo atual
+        # Passos calculados pela sensibilidade; só os candidatos em volta são avaliados
+        tempo_base = melhor_tempo
+        passos = passos_necessarios(vazao_desejada - melhor_vazao, sensibilidades[tempo_idx], incremento)
+        log.debug("   📊 Direção: %s | passos estimados: %s (limite %s)", direcao, passos, passos_validos)
+        
+        def avaliar(valor_teste):
             tempos_teste = tempos_atual.copy()
             tempos_teste[tempo_idx] = valor_teste
-            
-            # Calcula vazão com este tempo alterado
-            vazao_atual = calcular_vazao_com_tempos(leituras, constantes, tempos_teste)
+            return calcular_vazao_com_tempos(leituras, constantes, tempos_teste)
+        
+        candidatos = limitar(candidatos_por_sensibilidade(
+            avaliar,
+            lambda k: tempo_base + incremento * k,
+            indice_grade_uniforme(tempo_base, incremento, *limites),
+            limites, tempo_base, melhor_vazao, sensibilidades[tempo_idx], vazao_desejada,
+            tolerancia=tolerancia_objetivo, inicio=inicio,
+        ), prazo)
+        
+        for valor_teste, vazao_atual in candidatos:
+            total_iteracoes += 1
             diferenca = abs(vazao_atual - vazao_desejada)
             
-            # Log a cada 100 testes para acompanhar o progresso
-            if i % 100 == 0:
-                print(f"      Teste {i+1}/{len(valores_teste)}: {float(valor_teste):.8f} → {float(vazao_atual):.8f} (dif: {float(diferenca):.8f})")
+            if depurar:
+                log.debug("      Teste %s: %.8f → %.8f (dif: %.8f)", total_iteracoes, valor_teste, vazao_atual, diferenca)
             
-            # Se encontrou uma melhor aproximação
-            if diferenca < melhor_diferenca:
+            # Se encontrou uma melhor aproximação (empates pela regra da estratégia)
+            if diferenca < melhor_diferenca or (desempatar is not None and diferenca == melhor_diferenca
+                                                and desempatar(valor_teste, melhor_tempo)):
                 melhor_diferenca = diferenca
                 melhor_tempo = valor_teste
                 melhor_vazao = vazao_atual
                 melhorias_encontradas += 1
                 
-                print(f"   📊 ✅ NOVA MELHOR APROXIMAÇÃO para tempo {tempo_idx + 1}!")
-                print(f"      Tempo {tempo_idx + 1}: {float(valor_teste):.8f}")
-                print(f"      Vazão: {float(vazao_atual):.8f}")
-                print(f"      Diferença: {float(diferenca):.8f}")
-                print(f"      Melhoria: {float(melhor_diferenca - diferenca):.8f}")
+                if depurar:
+                    log.debug("   📊 ✅ NOVA MELHOR APROXIMAÇÃO para tempo %s!", tempo_idx + 1)
+                    log.debug("      Tempo %s: %.8f", tempo_idx + 1, valor_teste)
+                    log.debug("      Vazão: %.8f", vazao_atual)
+                    log.debug("      Diferença: %.8f", diferenca)
             
             # Se atingiu o objetivo, para imediatamente
             if diferenca <= tolerancia_objetivo:
-                print(f"   ✅ OBJETIVO ULTRA-PRECISO ATINGIDO no tempo {tempo_idx + 1}!")
-                print(f"      Tempo {tempo_idx + 1}: {float(valor_teste):.8f}")
-                print(f"      Vazão: {float(vazao_atual):.8f}")
-                print(f"      Diferença: {float(diferenca):.8f}")
+                log.debug("   ✅ OBJETIVO ULTRA-PRECISO ATINGIDO no tempo %s!", tempo_idx + 1)
+                log.debug("      Tempo %s: %.8f", tempo_idx + 1, valor_teste)
+                log.debug("      Vazão: %.8f", vazao_atual)
+                log.debug("      Diferença: %.8f", diferenca)
                 
                 # Atualiza o tempo e retorna
                 tempos_atual[tempo_idx] = valor_teste
@@ -199,17 +237,17 @@ def buscar_refinamento_ultra_preciso(leituras, constantes, vazao_desejada, tempo
         
         # Verifica se houve melhoria
         if melhor_tempo != tempos_iniciais[tempo_idx]:
-            print(f"   ✅ Tempo {tempo_idx + 1} refinado: {float(tempos_iniciais[tempo_idx]):.8f} → {float(melhor_tempo):.8f}")
-            print(f"   📊 Vazão após tempo {tempo_idx + 1}: {float(melhor_vazao):.8f}")
-            print(f"   📊 Diferença após tempo {tempo_idx + 1}: {float(melhor_diferenca):.8f}")
+            log.debug("   ✅ Tempo %s refinado: %.8f → %.8f", tempo_idx + 1, tempos_iniciais[tempo_idx], melhor_tempo)
+            log.debug("   📊 Vazão após tempo %s: %.8f", tempo_idx + 1, melhor_vazao)
+            log.debug("   📊 Diferença após tempo %s: %.8f", tempo_idx + 1, melhor_diferenca)
         else:
-            print(f"   ⚠️  Tempo {tempo_idx + 1} não foi refinado (manteve {float(melhor_tempo):.8f})")
-            print(f"   📊 Vazão mantida: {float(melhor_vazao):.8f}")
-            print(f"   📊 Diferença mantida: {float(melhor_diferenca):.8f}")
+            log.debug("   ⚠️  Tempo %s não foi refinado (manteve %.8f)", tempo_idx + 1, melhor_tempo)
+            log.debug("   📊 Vazão mantida: %.8f", melhor_vazao)
+            log.debug("   📊 Diferença mantida: %.8f", melhor_diferenca)
     
     # Retorna a melhor aproximação encontrada
-    print(f"   📊 Total de iterações: {total_iteracoes}")
-    print(f"   📊 Melhorias encontradas: {melhorias_encontradas}")
+    log.info("   📊 Total de iterações: %s", total_iteracoes)
+    log.info("   📊 Melhorias encontradas: %s", melhorias_encontradas)
     
     return {
         'tempos': tempos_atual.copy(),
@@ -225,117 +263,39 @@ def extrair_dados_planilha_refinada(arquivo_refinado, arquivo_original):
     """
     Extrai dados da planilha refinada e valores desejados da original
     """
-    try:
-        # Carrega planilha refinada (com valores híbridos)
-        wb_refinado = load_workbook(arquivo_refinado, data_only=True)
-        coleta_refinado = wb_refinado["Coleta de Dados"]
-        estimativa_refinado = wb_refinado["Estimativa da Incerteza"]
-        
-        # Carrega planilha original (para valores desejados)
-        wb_original = load_workbook(arquivo_original, data_only=True)
-        coleta_original = wb_original["Coleta de Dados"]
-        
-        # Extrai constantes da planilha refinada
-        constantes = {}
-        constantes['ponto_mlp'] = ler_valor_exato(coleta_refinado, 50, 9)  # I50
-        constantes['pulso_equipamento_mlp'] = ler_valor_exato(coleta_refinado, 50, 30)  # AD50
-        constantes['constante_correcao_temp'] = ler_valor_exato(coleta_refinado, 51, 18)  # R51
-        constantes['constante_correcao_inclinacao'] = ler_valor_exato(coleta_refinado, 51, 21)  # U51
-        constantes['modo_calibracao'] = coleta_refinado.cell(row=16, column=24).value  # X16
-        constantes['correcao_tempo_bu23'] = ler_valor_exato(estimativa_refinado, 23, 73)  # BU23
-        constantes['correcao_tempo_bw23'] = ler_valor_exato(estimativa_refinado, 23, 75)  # BW23
-        constantes['correcao_temp_bu26'] = ler_valor_exato(estimativa_refinado, 26, 73)  # BU26
-        constantes['correcao_temp_bw26'] = ler_valor_exato(estimativa_refinado, 26, 75)  # BW26
-        
-        # Extrai dados dos pontos
-        pontos = []
-        linha_atual = 54
-        num_ponto = 1
-        
-        while True:
-            pulsos = ler_valor_exato(coleta_refinado, linha_atual, 3)
-            
-            if pulsos == 0:
-                pulsos2 = ler_valor_exato(coleta_refinado, linha_atual + 1, 3)
-                pulsos3 = ler_valor_exato(coleta_refinado, linha_atual + 2, 3)
-                
-                if pulsos2 == 0 and pulsos3 == 0:
-                    break
-            
-            ponto = {
-                'numero': num_ponto,
-                'linha_inicial': linha_atual,
-                'leituras': [],
-                'valores_originais': {},
-                'tempos_refinados': []
-            }
-            
-            # Extrai valores da planilha refinada
-            for i in range(3):
-                linha = linha_atual + i
-                
-                # Valores brutos da planilha refinada
-                pulsos_padrao = ler_valor_exato(coleta_refinado, linha, 3)
-                tempo_coleta = ler_valor_exato(coleta_refinado, linha, 6)  # Tempo refinado
-                leitura_medidor = ler_valor_exato(coleta_refinado, linha, 15)
-                temperatura = ler_valor_exato(coleta_refinado, linha, 18)
-                
-                # Valores calculados da planilha refinada
-                tempo_coleta_corrigido = ler_valor_exato(coleta_refinado, linha, 27)
-                temperatura_corrigida = ler_valor_exato(coleta_refinado, linha, 30)
-                totalizacao_padrao_corrigido = ler_valor_exato(coleta_refinado, linha, 12)
-                vazao_referencia = ler_valor_exato(coleta_refinado, linha, 9)
-                vazao_medidor = ler_valor_exato(coleta_refinado, linha, 24)
-                erro_percentual = ler_valor_exato(coleta_refinado, linha, 21)
-                
-                leitura = {
-                    'linha': linha,
-                    'pulsos_padrao': pulsos_padrao,
-                    'tempo_coleta': tempo_coleta,
-                    'leitura_medidor': leitura_medidor,
-                    'temperatura': temperatura,
-                    'tempo_coleta_corrigido': tempo_coleta_corrigido,
-                    'temperatura_corrigida': temperatura_corrigida,
-                    'totalizacao_padrao_corrigido': totalizacao_padrao_corrigido,
-                    'vazao_referencia': vazao_referencia,
-                    'vazao_medidor': vazao_medidor,
-                    'erro_percentual': erro_percentual
-                }
-                
-                ponto['leituras'].append(leitura)
-                ponto['tempos_refinados'].append(tempo_coleta)
-            
-            # Valores desejados da planilha original
-            linha_agregados = linha_atual + 3
-            vazao_media_original = ler_valor_exato(coleta_original, linha_agregados, 9)
-            tendencia_original = ler_valor_exato(coleta_original, linha_agregados, 21)
-            desvio_padrao_original = ler_valor_exato(coleta_original, linha_agregados, 30)
-            
-            ponto['valores_originais'] = {
-                'vazao_media': vazao_media_original,
-                'tendencia': tendencia_original,
-                'desvio_padrao': desvio_padrao_original
-            }
-            
-            pontos.append(ponto)
-            num_ponto += 1
-            linha_atual += 9
-        
-        return constantes, pontos
-        
-    except Exception as e:
-        print(f"ERRO: Erro ao extrair dados: {e}")
+    # Ambas as planilhas passam pelo cache de snapshots (sem reabrir no openpyxl)
+    constantes, pontos = extrair_dados_planilha_original(arquivo_refinado)
+    if constantes is None or pontos is None:
+        return None, None
+    
+    constantes_original, pontos_original = extrair_dados_planilha_original(arquivo_original)
+    if constantes_original is None or pontos_original is None:
         return None, None
+    
+    # Valores desejados da planilha original, indexados pela linha inicial do ponto
+    valores_desejados = {p['linha_inicial']: p['valores_originais'] for p in pontos_original}
+    valores_vazios = {
+        'vazao_media': Decimal('0'),
+        'tendencia': Decimal('0'),
+        'desvio_padrao': Decimal('0')
+    }
+    
+    for ponto in pontos:
+        ponto['tempos_refinados'] = [leitura['tempo_coleta'] for leitura in ponto['leituras']]
+        ponto['valores_originais'] = valores_desejados.get(ponto['linha_inicial'], dict(valores_vazios))
+    
+    return constantes, pontos
 
-def processar_ponto_ultra_preciso(ponto, constantes, tolerancia_objetivo=Decimal('0.00001')):
+def processar_ponto_ultra_preciso(ponto, constantes, tolerancia_objetivo=TOLERANCIA_ULTRA, estrategia=None, prazo=None):
     """
     Processa um ponto individual com refinamento ultra-preciso
+    prazo: Prazo opcional da busca (o resultado informa o encerramento e os resíduos)
     """
-    print(f"\n🔍 REFINAMENTO ULTRA-PRECISO Ponto {ponto['numero']} (linha {ponto['linha_inicial']})...")
-    print(f"   📊 Vazão desejada: {float(ponto['valores_originais']['vazao_media']):.8f}")
-    print(f"   📊 Tendência desejada: {float(ponto['valores_originais']['tendencia']):.8f}")
-    print(f"   📊 Desvio padrão desejado: {float(ponto['valores_originais']['desvio_padrao']):.8f}")
-    print(f"   📊 Tempos refinados: {[float(t) for t in ponto['tempos_refinados']]}")
+    log.info("\n🔍 REFINAMENTO ULTRA-PRECISO Ponto %s (linha %s)...", ponto['numero'], ponto['linha_inicial'])
+    log.info("   📊 Vazão desejada: %.8f", ponto['valores_originais']['vazao_media'])
+    log.info("   📊 Tendência desejada: %.8f", ponto['valores_originais']['tendencia'])
+    log.info("   📊 Desvio padrão desejado: %.8f", ponto['valores_originais']['desvio_padrao'])
+    log.info("   📊 Tempos refinados: %s", ListaFloat(ponto['tempos_refinados']))
     
     vazao_desejada = ponto['valores_originais']['vazao_media']
     leituras = ponto['leituras']
@@ -344,33 +304,45 @@ def processar_ponto_ultra_preciso(ponto, constantes, tolerancia_objetivo=Decimal
     # Calcula vazão inicial para comparação
     vazao_inicial = calcular_vazao_com_tempos(leituras, constantes, tempos_refinados)
     diferenca_inicial = abs(vazao_inicial - vazao_desejada)
-    print(f"   📊 Vazão inicial: {float(vazao_inicial):.8f}")
-    print(f"   📊 Diferença inicial: {float(diferenca_inicial):.8f}")
+    log.info("   📊 Vazão inicial: %.8f", vazao_inicial)
+    log.info("   📊 Diferença inicial: %.8f", diferenca_inicial)
     
     # Refina os tempos com ultra-precisão
-    resultado = buscar_refinamento_ultra_preciso(leituras, constantes, vazao_desejada, tempos_refinados, tolerancia_objetivo)
+    resultado = buscar_refinamento_ultra_preciso(leituras, constantes, vazao_desejada, tempos_refinados, tolerancia_objetivo,
+                                                 estrategia, prazo)
     
     if resultado is None:
-        print(f"   ❌ Não foi possível refinar os tempos do Ponto {ponto['numero']}!")
+        log.error("   ❌ Não foi possível refinar os tempos do Ponto %s!", ponto['numero'])
         return None
     
-    # Calcula melhoria
+    campos_qualidade, residuos = qualidade(leituras, constantes, resultado['tempos'], ponto['valores_originais'],
+                                           resultado, prazo)
+    resultado_ponto = montar_resultado_ultra(ponto, resultado, diferenca_inicial, campos_qualidade, residuos)
+    
+    log.info("   ✅ Ponto %s refinado com ULTRA-PRECISÃO!", ponto['numero'])
+    log.info("   📊 Tempos ultra-refinados: %s", ListaFloat(resultado['tempos']))
+    log.info("   📊 Vazão obtida: %.8f", resultado['vazao_atual'])
+    log.info("   📊 Diferença: %.8f", resultado['diferenca'])
+    log.info("   📊 Melhoria: %.8f", resultado_ponto['exatos']['melhoria'])
+    log.info("   📊 Objetivo atingido: %s", ('✅' if resultado['objetivo_atingido'] else '❌'))
+    log.info("   📊 Iterações realizadas: %s", resultado['iteracoes'])
+    log.info("   📊 Melhorias encontradas: %s", resultado['melhorias_encontradas'])
+    log.info("   📊 Encerramento: %s", campos_qualidade['encerramento'])
+    
+    return resultado_ponto
+
+def montar_resultado_ultra(ponto, resultado, diferenca_inicial, campos_qualidade, residuos):
+    """
+    Resultado do ponto no formato do relatório a partir da busca ultra-precisa
+    (também usado pelo refinamento em paralelo de memoria_compartilhada)
+    """
+    vazao_desejada = ponto['valores_originais']['vazao_media']
     melhoria = diferenca_inicial - resultado['diferenca']
-    
-    print(f"   ✅ Ponto {ponto['numero']} refinado com ULTRA-PRECISÃO!")
-    print(f"   📊 Tempos ultra-refinados: {[float(t) for t in resultado['tempos']]}")
-    print(f"   📊 Vazão obtida: {float(resultado['vazao_atual']):.8f}")
-    print(f"   📊 Diferença: {float(resultado['diferenca']):.8f}")
-    print(f"   📊 Melhoria: {float(melhoria):.8f}")
-    print(f"   📊 Objetivo atingido: {'✅' if resultado['objetivo_atingido'] else '❌'}")
-    print(f"   📊 Iterações realizadas: {resultado['iteracoes']}")
-    print(f"   📊 Melhorias encontradas: {resultado['melhorias_encontradas']}")
-    
     return {
         'numero': ponto['numero'],
         'linha_inicial': ponto['linha_inicial'],
         'tempos_ultra_refinados': [float(t) for t in resultado['tempos']],
-        'tempos_refinados': [float(t) for t in tempos_refinados],
+        'tempos_refinados': [float(t) for t in ponto['tempos_refinados']],
         'vazao_atual': float(resultado['vazao_atual']),
         'vazao_desejada': float(vazao_desejada),
         'diferenca': float(resultado['diferenca']),
@@ -379,264 +351,303 @@ def processar_ponto_ultra_preciso(ponto, constantes, tolerancia_objetivo=Decimal
         'objetivo_atingido': resultado['objetivo_atingido'],
         'iteracoes': resultado['iteracoes'],
         'melhorias_encontradas': resultado['melhorias_encontradas'],
-        'estrategia': resultado.get('estrategia', 'ultra-preciso')
+        'estrategia': resultado.get('estrategia', 'ultra-preciso'),
+        **campos_qualidade,
+        # Valores Decimal sem arredondamento para o relatório em fluxo
+        'exatos': {
+            'tempos_ultra_refinados': list(resultado['tempos']),
+            'vazao_atual': resultado['vazao_atual'],
+            'vazao_desejada': vazao_desejada,
+            'diferenca': resultado['diferenca'],
+            'diferenca_inicial': diferenca_inicial,
+            'melhoria': melhoria,
+            'residuos': residuos
+        }
     }
 
+def aplicar_tempos_ultra_refinados_na_aba(resultados_pontos, coleta_sheet):
+    """
+    Aplica os tempos ultra-refinados na aba "Coleta de Dados" (em memória)
+    """
+    pontos_aplicados = 0
+    
+    for resultado in resultados_pontos:
+        if resultado is None:
+            continue
+            
+        numero_ponto = resultado['numero']
+        linha_inicial = resultado['linha_inicial']
+        tempos_ultra_refinados = resultado['tempos_ultra_refinados']
+        tempos_refinados = resultado['tempos_refinados']
+        
+        log.info("   📊 Aplicando Ponto %s (linha %s)...", numero_ponto, linha_inicial)
+        log.info("      Tempos refinados: %s", tempos_refinados)
+        log.info("      Tempos ultra-refinados: %s", tempos_ultra_refinados)
+        
+        # Aplica os 3 tempos ultra-refinados para o ponto
+        for i, tempo in enumerate(tempos_ultra_refinados):
+            linha = linha_inicial + i
+            
+            # Aplica o tempo ultra-refinado na coluna F (6) - TEMPO DE COLETA
+            coleta_sheet.cell(row=linha, column=6).value = float(tempo)
+            
+            log.debug("      Linha %s: %.8fs → %.8fs", linha, tempos_refinados[i], tempo)
+        
+        pontos_aplicados += 1
+    
+    return pontos_aplicados
+
 def aplicar_tempos_ultra_refinados_na_planilha(resultados_pontos, arquivo_refinado, arquivo_resultado):
     """
     Aplica os tempos ultra-refinados na planilha Excel
     """
-    print(f"\n📄 Aplicando tempos ultra-refinados na planilha...")
+    log.info("\n📄 Aplicando tempos ultra-refinados na planilha...")
     
     # Tenta criar cópia da planilha refinada
     try:
         shutil.copy2(arquivo_refinado, arquivo_resultado)
-        print(f"   ✅ Arquivo copiado com sucesso: {arquivo_resultado}")
+        log.info("   ✅ Arquivo copiado com sucesso: %s", arquivo_resultado)
     except PermissionError:
-        print(f"   ⚠️  Erro de permissão ao copiar arquivo. Arquivo pode estar em uso.")
-        print(f"   🔧 Tentando criar novo arquivo...")
+        log.warning("   ⚠️  Erro de permissão ao copiar arquivo. Arquivo pode estar em uso.")
+        log.info("   🔧 Tentando criar novo arquivo...")
         
         # Tenta criar um novo arquivo com nome diferente
         arquivo_resultado = arquivo_resultado.replace('.xlsx', '_NOVO.xlsx')
         try:
             shutil.copy2(arquivo_refinado, arquivo_resultado)
-            print(f"   ✅ Arquivo criado com sucesso: {arquivo_resultado}")
+            log.info("   ✅ Arquivo criado com sucesso: %s", arquivo_resultado)
         except Exception as e:
-            print(f"   ❌ Erro ao criar arquivo: {e}")
-            print(f"   💡 Feche o Excel e tente novamente")
+            log.error("   ❌ Erro ao criar arquivo: %s", e)
+            log.info("   💡 Feche o Excel e tente novamente")
             return False
     except Exception as e:
-        print(f"   ❌ Erro inesperado ao copiar arquivo: {e}")
+        log.error("   ❌ Erro inesperado ao copiar arquivo: %s", e)
         return False
     
     # Carrega a planilha
+    from openpyxl import load_workbook
+
     try:
         wb = load_workbook(arquivo_resultado)
         coleta_sheet = wb["Coleta de Dados"]
     except Exception as e:
-        print(f"   ❌ Erro ao carregar planilha: {e}")
+        log.error("   ❌ Erro ao carregar planilha: %s", e)
         return False
     
-    pontos_aplicados = 0
-    
-    for resultado in resultados_pontos:
-        if resultado is None:
-            continue
-            
-        numero_ponto = resultado['numero']
-        linha_inicial = resultado['linha_inicial']
-        tempos_ultra_refinados = resultado['tempos_ultra_refinados']
-        tempos_refinados = resultado['tempos_refinados']
-        
-        print(f"   📊 Aplicando Ponto {numero_ponto} (linha {linha_inicial})...")
-        print(f"      Tempos refinados: {tempos_refinados}")
-        print(f"      Tempos ultra-refinados: {tempos_ultra_refinados}")
-        
-        # Aplica os 3 tempos ultra-refinados para o ponto
-        for i, tempo in enumerate(tempos_ultra_refinados):
-            linha = linha_inicial + i
-            
-            # Aplica o tempo ultra-refinado na coluna F (6) - TEMPO DE COLETA
-            coleta_sheet.cell(row=linha, column=6).value = float(tempo)
-            
-            print(f"      Linha {linha}: {tempos_refinados[i]:.8f}s → {float(tempo):.8f}s")
-        
-        pontos_aplicados += 1
+    pontos_aplicados = aplicar_tempos_ultra_refinados_na_aba(resultados_pontos, coleta_sheet)
     
     # Salva a planilha
     try:
         wb.save(arquivo_resultado)
-        print(f"   ✅ Planilha salva com sucesso: {arquivo_resultado}")
+        log.info("   ✅ Planilha salva com sucesso: %s", arquivo_resultado)
     except PermissionError:
-        print(f"   ⚠️  Erro de permissão ao salvar planilha. Arquivo pode estar em uso.")
-        print(f"   💡 Feche o Excel e tente novamente")
+        log.warning("   ⚠️  Erro de permissão ao salvar planilha. Arquivo pode estar em uso.")
+        log.info("   💡 Feche o Excel e tente novamente")
         return False
     except Exception as e:
-        print(f"   ❌ Erro ao salvar planilha: {e}")
+        log.error("   ❌ Erro ao salvar planilha: %s", e)
         return False
     
-    print(f"\n✅ Tempos ultra-refinados aplicados com sucesso!")
-    print(f"   Pontos processados: {pontos_aplicados}")
-    print(f"   Arquivo salvo: {arquivo_resultado}")
-    print(f"   🎯 CERTIFICADO FINAL GERADO!")
+    log.info("\n✅ Tempos ultra-refinados aplicados com sucesso!")
+    log.info("   Pontos processados: %s", pontos_aplicados)
+    log.info("   Arquivo salvo: %s", arquivo_resultado)
+    log.info("   🎯 CERTIFICADO FINAL GERADO!")
     
     return True
 
-def gerar_relatorio_final_ultra_preciso(resultados_pontos, arquivo_resultado):
+def abrir_relatorio_ultra_preciso(prefixo_relatorio='relatorio_ultra_preciso'):
     """
-    Gera relatório final ultra-preciso
+    Abre o relatório em fluxo (<prefixo>.jsonl): cada ponto é gravado ao terminar
     """
-    print(f"\n📋 GERANDO RELATÓRIO FINAL ULTRA-PRECISO")
-    
-    # Filtra resultados válidos
-    resultados_validos = [r for r in resultados_pontos if r is not None]
-    
-    # Estatísticas
-    total_pontos = len(resultados_pontos)
-    pontos_processados = len(resultados_validos)
-    objetivos_atingidos = sum(1 for r in resultados_validos if r['objetivo_atingido'])
-    diferenca_media = sum(r['diferenca'] for r in resultados_validos) / len(resultados_validos) if resultados_validos else 0
-    diferenca_inicial_media = sum(r['diferenca_inicial'] for r in resultados_validos) / len(resultados_validos) if resultados_validos else 0
-    melhoria_media = sum(r['melhoria'] for r in resultados_validos) / len(resultados_validos) if resultados_validos else 0
-    iteracoes_total = sum(r['iteracoes'] for r in resultados_validos)
-    melhorias_total = sum(r['melhorias_encontradas'] for r in resultados_validos)
-    
-    relatorio = {
-        "metadata": {
-            "data_geracao": datetime.now().isoformat(),
-            "descricao": "Refinamento ULTRA-PRECISO de tempos com tolerância de 0.00001",
-            "precisao": "Decimal com 28 dígitos",
-            "arquivo_resultado": arquivo_resultado,
-            "tolerancia_objetivo": 0.00001,
-            "estrategia": "Ultra-preciso com incremento 0.00001",
-            "incremento": "0.00001",
-            "certificado_final": True
-        },
-        "estatisticas": {
-            "total_pontos": total_pontos,
-            "pontos_processados": pontos_processados,
-            "objetivos_atingidos": objetivos_atingidos,
-            "diferenca_inicial_media": diferenca_inicial_media,
-            "diferenca_media": diferenca_media,
-            "melhoria_media": melhoria_media,
-            "iteracoes_total": iteracoes_total,
-            "melhorias_total": melhorias_total
-        },
-        "resultados": resultados_validos
-    }
-    
-    # Salvar em JSON
-    with open("relatorio_ultra_preciso.json", "w", encoding="utf-8") as f:
-        json.dump(relatorio, f, indent=2, ensure_ascii=False, default=str)
-    
-    # Salvar relatório legível
-    with open("relatorio_ultra_preciso.txt", "w", encoding="utf-8") as f:
-        f.write("=== RELATÓRIO DE REFINAMENTO ULTRA-PRECISO ===\n\n")
-        f.write("🎯 OBJETIVO:\n")
-        f.write("   • Refinar tempos com ULTRA-PRECISÃO\n")
-        f.write("   • Atingir diferença de vazão de ±0.00001\n")
-        f.write("   • Gerar CERTIFICADO FINAL\n")
-        f.write("   • Incremento de 0.00001 para máxima precisão\n\n")
-        
-        f.write("✅ ESTRATÉGIA ULTRA-PRECISA:\n")
-        f.write("   • Etapa 1: otimizador_tempos_inteligente.py gera valores aproximados\n")
-        f.write("   • Etapa 2: aplicador_tempos_gerados.py refina com estratégia híbrida\n")
-        f.write("   • Etapa 3: refinador_ultra_preciso.py refina com incremento 0.00001\n")
-        f.write("   • Incremento: 0.00001\n")
-        f.write("   • Precisão: Decimal com 28 dígitos\n")
-        f.write("   • Certificado: FINAL\n\n")
-        
-        f.write("📊 ESTATÍSTICAS GERAIS:\n")
-        f.write(f"   • Total de pontos: {total_pontos}\n")
-        f.write(f"   • Pontos processados: {pontos_processados}\n")
-        f.write(f"   • Objetivos atingidos: {objetivos_atingidos}\n")
-        f.write(f"   • Diferença inicial média: {diferenca_inicial_media:.8f}\n")
-        f.write(f"   • Diferença final média: {diferenca_media:.8f}\n")
-        f.write(f"   • Melhoria média: {melhoria_media:.8f}\n")
-        f.write(f"   • Total de iterações: {iteracoes_total}\n")
-        f.write(f"   • Total de melhorias encontradas: {melhorias_total}\n\n")
-        
-        f.write("🎯 RESULTADOS POR PONTO:\n")
-        for resultado in resultados_validos:
-            f.write(f"\n   PONTO {resultado['numero']}:\n")
-            f.write(f"     • Vazão desejada: {resultado['vazao_desejada']:.8f} L/h\n")
-            f.write(f"     • Vazão obtida: {resultado['vazao_atual']:.8f} L/h\n")
-            f.write(f"     • Diferença inicial: {resultado['diferenca_inicial']:.8f}\n")
-            f.write(f"     • Diferença final: {resultado['diferenca']:.8f}\n")
-            f.write(f"     • Melhoria: {resultado['melhoria']:.8f}\n")
-            f.write(f"     • Objetivo atingido: {'✅' if resultado['objetivo_atingido'] else '❌'}\n")
-            f.write(f"     • Iterações: {resultado['iteracoes']}\n")
-            f.write(f"     • Melhorias encontradas: {resultado['melhorias_encontradas']}\n")
-            f.write(f"     • Tempos refinados: {resultado['tempos_refinados']}\n")
-            f.write(f"     • Tempos ultra-refinados: {resultado['tempos_ultra_refinados']}\n")
-        
-        f.write(f"\n🎉 CERTIFICADO FINAL:\n")
-        f.write(f"   ✅ Refinamento ultra-preciso concluído\n")
-        f.write(f"   ✅ {objetivos_atingidos}/{pontos_processados} pontos atingiram o objetivo\n")
-        f.write(f"   ✅ Melhoria média: {melhoria_media:.8f}\n")
-        f.write(f"   ✅ Diferença final média: {diferenca_media:.8f}\n")
-        f.write(f"   ✅ Total de melhorias encontradas: {melhorias_total}\n")
-        f.write(f"   ✅ CERTIFICADO FINAL: {arquivo_resultado}\n")
+    return EscritorRelatorio(
+        f"{prefixo_relatorio}.jsonl", ETAPA_RELATORIO,
+        titulo="RELATÓRIO DE REFINAMENTO ULTRA-PRECISO",
+        descricao="Refinamento ULTRA-PRECISO de tempos com tolerância de 0.00001",
+        precisao="Decimal com 28 dígitos",
+        tolerancia_objetivo=Decimal('0.00001'),
+        incremento=Decimal('0.00001'),
+        certificado_final=True,
+        objetivo=[
+            "Refinar tempos com ULTRA-PRECISÃO",
+            "Atingir diferença de vazão de ±0.00001",
+            "Gerar CERTIFICADO FINAL",
+            "Incremento de 0.00001 para máxima precisão",
+        ],
+        estrategia=[
+            "Etapa 1: otimizador_tempos_inteligente.py gera valores aproximados",
+            "Etapa 2: aplicador_tempos_gerados.py refina com estratégia híbrida",
+            "Etapa 3: refinador_ultra_preciso.py refina com incremento 0.00001",
+            "Precisão: Decimal com 28 dígitos",
+        ],
+    )
 
-def main():
+def gerar_relatorio_final_ultra_preciso(relatorio, arquivo_resultado, prefixo_relatorio='relatorio_ultra_preciso'):
     """
-    Função principal - REFINAMENTO ULTRA-PRECISO PARA CERTIFICADO FINAL
+    Conclui o relatório em fluxo (registro de resumo) e gera o relatório legível a partir dele
     """
-    arquivo_original = "SAN-038-25-09.xlsx"
-    arquivo_refinado = "SAN-038-25-09_REFINADO_HIBRIDO.xlsx"
-    arquivo_resultado = "SAN-038-25-09_CERTIFICADO_FINAL.xlsx"
-    
-    if not os.path.exists(arquivo_original):
-        print(f"❌ Arquivo original não encontrado: {arquivo_original}")
-        return
-    
-    if not os.path.exists(arquivo_refinado):
-        print(f"❌ Arquivo refinado não encontrado: {arquivo_refinado}")
-        print(f"💡 Execute primeiro: python aplicador_tempos_gerados.py")
-        return
-    
-    print("🚀 Iniciando REFINAMENTO ULTRA-PRECISO para CERTIFICADO FINAL...")
-    print("=" * 70)
-    print("🎯 OBJETIVO: Refinar valores com ULTRA-PRECISÃO para certificado final")
-    print("🔧 ESTRATÉGIA: Incremento de 0.00001 até atingir valores exatos")
-    print("📊 PRECISÃO: Tolerância de ±0.00001")
-    print("🎯 RESULTADO: CERTIFICADO FINAL")
-    print("=" * 70)
-    
-    # Extrai dados da planilha refinada e valores desejados da original
-    constantes, pontos = extrair_dados_planilha_refinada(arquivo_refinado, arquivo_original)
-    if constantes is None or pontos is None:
-        return
-    
-    print(f"✅ Extraídos {len(pontos)} pontos da planilha refinada")
-    print(f"✅ Valores desejados obtidos da planilha original")
-    
+    log.info("\n📋 GERANDO RELATÓRIO FINAL ULTRA-PRECISO")
+    
+    estatisticas = relatorio.estatisticas.para_dicionario().get(ETAPA_RELATORIO, {})
+    objetivos_atingidos = estatisticas.get('objetivos_atingidos', 0)
+    pontos_processados = estatisticas.get('pontos_processados', 0)
+    
+    relatorio.concluir(
+        arquivo_resultado=arquivo_resultado,
+        instrumentacao=relatorio_instrumentacao(),
+        conclusao=[
+            "✅ Refinamento ultra-preciso concluído",
+            f"✅ {objetivos_atingidos}/{pontos_processados} pontos atingiram o objetivo",
+            f"✅ CERTIFICADO FINAL: {arquivo_resultado}",
+        ],
+    )
+    renderizar_texto(relatorio.caminho, f"{prefixo_relatorio}.txt")
+
+def refinar_pontos_ultra_preciso(pontos, constantes, relatorio=None, cache=None, estrategia=None, orcamento=None,
+                                 processos=None):
+    """
+    Refina os tempos de todos os pontos com ultra-precisão
+    Retorna a lista de resultados por ponto (gravados também no relatório em fluxo, se houver)
+    cache: CacheSolucoes opcional (pontos inalterados não são refinados de novo)
+    estrategia: estratégia de tempo alvo (None = TEMPO_ALVO, padrão 240 s)
+    orcamento: segundos por ponto (None = ORCAMENTO_PONTO; sem limite se ausente)
+    processos: mais de 1 refina os pontos em paralelo pela memória compartilhada
+    """
+    restricoes = compilar_estrategia(estrategia)
+    if processos is not None and processos > 1:
+        from memoria_compartilhada import refinar_pontos_ultra_compartilhado
+        return refinar_pontos_ultra_compartilhado(pontos, constantes, relatorio, cache, restricoes, orcamento,
+                                                  processos)
+    agenda = criar_orcamento(orcamento, len(pontos))
     tempo_inicio = time.time()
     resultados_pontos = []
+    progresso = Progresso(len(pontos), "Refinamento ultra-preciso", log)
     
     # Processa cada ponto individualmente
     for i, ponto in enumerate(pontos):
-        print(f"\n{'='*70}")
-        print(f"🔍 REFINAMENTO ULTRA-PRECISO PONTO {i+1}/{len(pontos)}")
-        print(f"{'='*70}")
-        
-        # Processa o ponto individual
-        resultado_ponto = processar_ponto_ultra_preciso(ponto, constantes)
+        log.info("\n%s", '='*70)
+        log.info("🔍 REFINAMENTO ULTRA-PRECISO PONTO %s/%s", i+1, len(pontos))
+        log.info("%s", '='*70)
+        
+        # Processa o ponto individual (com o prazo do orçamento, se houver)
+        prazo = agenda.prazo_ponto() if agenda is not None else None
+        with medir_ponto(ponto['numero']):
+            if cache is None:
+                resultado_ponto = processar_ponto_ultra_preciso(ponto, constantes, estrategia=restricoes, prazo=prazo)
+            else:
+                resultado_ponto = cache.resolver(
+                    ETAPA_RELATORIO, ponto, constantes, ponto['tempos_refinados'], TOLERANCIA_ULTRA,
+                    lambda tempos: processar_ponto_ultra_preciso(dict(ponto, tempos_refinados=tempos), constantes,
+                                                                 estrategia=restricoes, prazo=prazo),
+                    extras={'tempo_alvo': restricoes.assinatura},
+                    campo_tempos='tempos_ultra_refinados',
+                )
+            if resultado_ponto and resultado_ponto.get('cache') != 'acerto':
+                contar(ITERACOES, resultado_ponto['iteracoes'])
         resultados_pontos.append(resultado_ponto)
+        # Pontos interrompidos pelo prazo vão para o relatório depois do repasse
+        adiado = agenda is not None and agenda.concluir_ponto(i, ponto, resultado_ponto)
+        if relatorio is not None and not adiado:
+            relatorio.ponto(resultado_ponto, ETAPA_RELATORIO, ponto['numero'])
         
         # Se atingiu o objetivo, pode parar este ponto
         if resultado_ponto and resultado_ponto['objetivo_atingido']:
-            print(f"   ✅ Ponto {ponto['numero']} ATINGIU O OBJETIVO ULTRA-PRECISO!")
-            print(f"   🎯 Próximo ponto...")
+            log.info("   ✅ Ponto %s ATINGIU O OBJETIVO ULTRA-PRECISO!", ponto['numero'])
+            log.info("   🎯 Próximo ponto...")
         else:
-            print(f"   ⚠️  Ponto {ponto['numero']} não atingiu o objetivo ultra-preciso")
-            print(f"   📊 Melhor aproximação ultra-refinada encontrada")
+            log.warning("   ⚠️  Ponto %s não atingiu o objetivo ultra-preciso", ponto['numero'])
+            log.info("   📊 Melhor aproximação ultra-refinada encontrada")
         
         # Mostra progresso
         tempo_decorrido = time.time() - tempo_inicio
-        print(f"   ⏱️  Tempo decorrido: {tempo_decorrido:.2f} segundos")
-        print(f"   📊 Progresso: {i+1}/{len(pontos)} pontos")
+        log.info("   ⏱️  Tempo decorrido: %.2f segundos", tempo_decorrido)
+        log.info("   📊 Progresso: %s/%s pontos", i+1, len(pontos))
+        progresso.avancar()
+    
+    # Sobra do orçamento para os pontos interrompidos, partindo da melhor aproximação
+    if agenda is not None:
+        repassar_interrompidos(
+            agenda, resultados_pontos,
+            lambda ponto, anterior, prazo: processar_ponto_ultra_preciso(
+                dict(ponto, tempos_refinados=anterior['exatos']['tempos_ultra_refinados']), constantes,
+                estrategia=restricoes, prazo=prazo),
+            relatorio, ETAPA_RELATORIO,
+        )
+    
+    progresso.concluir()
+    return resultados_pontos
+
+def executar_refinamento_ultra_preciso(arquivo_original, arquivo_refinado, arquivo_resultado,
+                                      prefixo_relatorio='relatorio_ultra_preciso'):
+    """
+    Executa o refinamento ultra-preciso de todos os pontos e gera o certificado final
+    Retorna a lista de resultados por ponto, ou None em caso de erro
+    """
+    reiniciar()
+    log.info("🚀 Iniciando REFINAMENTO ULTRA-PRECISO para CERTIFICADO FINAL...")
+    log.info("%s", "=" * 70)
+    log.info("🎯 OBJETIVO: Refinar valores com ULTRA-PRECISÃO para certificado final")
+    log.info("🔧 ESTRATÉGIA: Incremento de 0.00001 até atingir valores exatos")
+    log.info("📊 PRECISÃO: Tolerância de ±0.00001")
+    log.info("🎯 RESULTADO: CERTIFICADO FINAL")
+    log.info("%s", "=" * 70)
+    
+    # Extrai dados da planilha refinada e valores desejados da original
+    with cronometrar('extracao'):
+        constantes, pontos = extrair_dados_planilha_refinada(arquivo_refinado, arquivo_original)
+    if constantes is None or pontos is None:
+        return None
+    
+    log.info("✅ Extraídos %s pontos da planilha refinada", len(pontos))
+    log.info("✅ Valores desejados obtidos da planilha original")
+    
+    tempo_inicio = time.time()
+    relatorio = abrir_relatorio_ultra_preciso(prefixo_relatorio)
+    with cronometrar('refinamento_ultra_preciso'):
+        resultados_pontos = refinar_pontos_ultra_preciso(pontos, constantes, relatorio)
     
     tempo_total = time.time() - tempo_inicio
     
-    print(f"\n📊 RESUMO FINAL ULTRA-PRECISO:")
-    print(f"   Pontos processados: {len(resultados_pontos)}/{len(pontos)}")
-    print(f"   Tempo total: {tempo_total:.2f} segundos")
-    print(f"   Tempo médio por ponto: {tempo_total/len(pontos):.2f} segundos")
+    log.info("\n📊 RESUMO FINAL ULTRA-PRECISO:")
+    log.info("   Pontos processados: %s/%s", len(resultados_pontos), len(pontos))
+    log.info("   Tempo total: %.2f segundos", tempo_total)
+    log.info("   Tempo médio por ponto: %.2f segundos", tempo_total/len(pontos))
     
     # Aplica os tempos ultra-refinados na planilha
-    sucesso = aplicar_tempos_ultra_refinados_na_planilha(resultados_pontos, arquivo_refinado, arquivo_resultado)
+    with cronometrar('gravacao_planilha'):
+        sucesso = aplicar_tempos_ultra_refinados_na_planilha(resultados_pontos, arquivo_refinado, arquivo_resultado)
     
     if sucesso:
         # Gera relatório final
-        gerar_relatorio_final_ultra_preciso(resultados_pontos, arquivo_resultado)
+        gerar_relatorio_final_ultra_preciso(relatorio, arquivo_resultado, prefixo_relatorio)
         
-        print(f"\n✅ Relatório salvo em: relatorio_ultra_preciso.json")
-        print(f"✅ Relatório legível salvo em: relatorio_ultra_preciso.txt")
-        print("🎉 CERTIFICADO FINAL GERADO COM ULTRA-PRECISÃO!")
-        print(f"📄 Certificado final: {arquivo_resultado}")
+        log.info("\n✅ Relatório salvo em: %s.jsonl", prefixo_relatorio)
+        log.info("✅ Relatório legível salvo em: %s.txt", prefixo_relatorio)
+        log.info("🎉 CERTIFICADO FINAL GERADO COM ULTRA-PRECISÃO!")
+        log.info("📄 Certificado final: %s", arquivo_resultado)
     else:
-        print("❌ Erro ao aplicar tempos ultra-refinados!")
+        relatorio.concluir(False)
+        log.error("❌ Erro ao aplicar tempos ultra-refinados!")
+    
+    return resultados_pontos if sucesso else None
+
+def main():
+    """
+    Função principal - REFINAMENTO ULTRA-PRECISO PARA CERTIFICADO FINAL
+    """
+    arquivo_original = "SAN-038-25-09.xlsx"
+    arquivo_refinado = "SAN-038-25-09_REFINADO_HIBRIDO.xlsx"
+    arquivo_resultado = "SAN-038-25-09_CERTIFICADO_FINAL.xlsx"
+    
+    if not os.path.exists(arquivo_original):
+        log.error("❌ Arquivo original não encontrado: %s", arquivo_original)
+        return
+    
+    if not os.path.exists(arquivo_refinado):
+        log.error("❌ Arquivo refinado não encontrado: %s", arquivo_refinado)
+        log.info("💡 Execute primeiro: python aplicador_tempos_gerados.py")
+        return
+    
+    executar_refinamento_ultra_preciso(arquivo_original, arquivo_refinado, arquivo_resultado)
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*-
+"""
+Registro de Log
+Camada de log com níveis sobre o módulo logging da biblioteca padrão:
+- mensagens com argumentos no estilo %, formatadas apenas se o nível estiver ativo
+- console no mesmo formato dos antigos print (somente a mensagem, em stdout)
+- modo de progresso (barra em stderr, sem mensagens informativas)
+- gravação opcional em JSONL para leitura por máquina
+
+Nível padrão: INFO (variável de ambiente LOG_NIVEL). Os laços de busca usam DEBUG
+"""
+
+import json
+import logging
+import os
+import sys
+import time
+
+RAIZ_LOG = 'certificado'
+
+FORMATO_CONSOLE = '%(message)s'
+
+_configurado = False
+
+
+class ManipuladorConsole(logging.StreamHandler):
+    """
+    Escreve no sys.stdout vigente no momento da emissão, para que
+    contextlib.redirect_stdout continue funcionando (ex.: logs por planilha no lote)
+    """
+
+    def __init__(self):
+        super().__init__(sys.stdout)
+
+    @property
+    def stream(self):
+        return sys.stdout
+
+    @stream.setter
+    def stream(self, valor):
+        pass
+
+
+class ManipuladorJSONL(logging.Handler):
+    """
+    Grava um objeto JSON por linha: instante, nível, módulo, mensagem e dados extras
+    (passados com extra={'dados': {...}})
+    """
+
+    def __init__(self, arquivo):
+        super().__init__()
+        self.arquivo = arquivo
+        self._fluxo = open(arquivo, 'a', encoding='utf-8')
+
+    def emit(self, record):
+        try:
+            registro = {
+                'instante': record.created,
+                'nivel': record.levelname,
+                'modulo': record.name,
+                'mensagem': record.getMessage(),
+            }
+            dados = getattr(record, 'dados', None)
+            if dados:
+                registro['dados'] = dados
+            self._fluxo.write(json.dumps(registro, ensure_ascii=False, default=str) + '\n')
+            self._fluxo.flush()
+        except Exception:
+            self.handleError(record)
+
+    def close(self):
+        try:
+            self._fluxo.close()
+        finally:
+            super().close()
+
+
+class FiltroResumo(logging.Filter):
+    """
+    Modo de progresso: deixa passar avisos, erros e as mensagens de resumo
+    (emitidas com extra={'resumo': True})
+    """
+
+    def filter(self, record):
+        return record.levelno >= logging.WARNING or getattr(record, 'resumo', False)
+
+
+def _nivel(nivel):
+    if nivel is None:
+        nivel = os.environ.get('LOG_NIVEL', 'INFO')
+    if isinstance(nivel, str):
+        return logging.getLevelName(nivel.upper())
+    return nivel
+
+
+def configurar_log(nivel=None, modo='texto', arquivo_jsonl=None):
+    """
+    Configura o log de todos os módulos
+
+    modo='texto'      mensagens no console a partir do nível indicado
+    modo='progresso'  console só com avisos, erros e resumos; use Progresso para acompanhar
+    modo='silencioso' console só com erros
+    arquivo_jsonl     grava também todas as mensagens do nível em JSONL
+    """
+    global _configurado, MODO_PROGRESSO
+
+    raiz = logging.getLogger(RAIZ_LOG)
+    for manipulador in list(raiz.handlers):
+        raiz.removeHandler(manipulador)
+        manipulador.close()
+
+    nivel = _nivel(nivel)
+    raiz.setLevel(nivel)
+    raiz.propagate = False
+
+    console = ManipuladorConsole()
+    console.setFormatter(logging.Formatter(FORMATO_CONSOLE))
+    console.setLevel(nivel)
+    if modo == 'progresso':
+        console.addFilter(FiltroResumo())
+    elif modo == 'silencioso':
+        console.setLevel(max(nivel, logging.ERROR))
+    raiz.addHandler(console)
+
+    if arquivo_jsonl:
+        raiz.addHandler(ManipuladorJSONL(arquivo_jsonl))
+
+    # Sem manipuladores abaixo do nível da raiz, o nível efetivo é o menor dos manipuladores
+    raiz.setLevel(min(m.level or nivel for m in raiz.handlers))
+
+    MODO_PROGRESSO = modo == 'progresso'
+    _configurado = True
+    return raiz
+
+
+def obter_logger(nome):
+    """
+    Retorna o logger de um módulo; na primeira chamada aplica a configuração padrão
+    """
+    if not _configurado:
+        configurar_log()
+    nome = nome.rsplit('.', 1)[-1] if nome != '__main__' else os.path.splitext(os.path.basename(sys.argv[0] or 'main'))[0]
+    return logging.getLogger(f"{RAIZ_LOG}.{nome}")
+
+
+class ListaFloat:
+    """
+    Lista de Decimal exibida como lista de float somente quando a mensagem é formatada
+    """
+    __slots__ = ('valores',)
+
+    def __init__(self, valores):
+        self.valores = valores
+
+    def __str__(self):
+        return str([float(v) for v in self.valores])
+
+    __repr__ = __str__
+
+
+MODO_PROGRESSO = False
+
+
+class Progresso:
+    """
+    Acompanhamento de progresso: barra em stderr no modo 'progresso' e uma linha
+    de resumo no log ao concluir
+    """
+
+    def __init__(self, total, descricao, log=None, largura=30):
+        self.total = max(int(total), 1)
+        self.descricao = descricao
+        self.log = log or obter_logger('progresso')
+        self.largura = largura
+        self.atual = 0
+        self.inicio = time.perf_counter()
+        self.ativo = MODO_PROGRESSO and sys.stderr.isatty()
+        self._desenhar()
+
+    def _desenhar(self):
+        if not self.ativo:
+            return
+        preenchido = int(self.largura * self.atual / self.total)
+        barra = '█' * preenchido + '░' * (self.largura - preenchido)
+        sys.stderr.write(f"\r{self.descricao} {barra} {self.atual}/{self.total}")
+        sys.stderr.flush()
+
+    def avancar(self, passos=1):
+        self.atual = min(self.total, self.atual + passos)
+        self._desenhar()
+
+    def concluir(self):
+        decorrido = time.perf_counter() - self.inicio
+        if self.ativo:
+            sys.stderr.write('\n')
+            sys.stderr.flush()
+        self.log.info("⏱️  %s: %d/%d em %.2f segundos", self.descricao, self.atual, self.total, decorrido,
+                      extra={'resumo': True,
+                             'dados': {'etapa': self.descricao, 'concluidos': self.atual,
+                                       'total': self.total, 'segundos': decorrido}})
+        return decorrido
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.concluir()
+        return False
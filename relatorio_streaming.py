@@ -0,0 +1,316 @@
+# -*- coding: utf-8 -*-
+"""
+Relatórios em Fluxo (JSONL)
+Cada ponto é gravado como um registro JSON compacto, em uma linha, assim que
+termina. Decimais são gravados como texto exato (sem passar por float), então o
+relatório reproduz o valor calculado dígito a dígito.
+
+Formato (VERSAO_ESQUEMA):
+    {"registro":"cabecalho","esquema":1,"tipo":...,"data_geracao":...,"metadata":{...}}
+    {"registro":"ponto","etapa":...,"numero":N,"processado":true,...campos do resultado}
+    {"registro":"planilha",...resumo da planilha}          (relatório de lote)
+    {"registro":"resumo","concluido":true,"estatisticas":{etapa:{...}},...}
+
+Só as estatísticas acumuladas ficam em memória (o uso não cresce com o lote) e o
+arquivo pode ser lido enquanto ainda está sendo gravado. O relatório legível
+(.txt) é gerado a partir do fluxo, sob demanda
+"""
+
+from decimal import Decimal, InvalidOperation, getcontext
+from datetime import date, datetime
+import json
+import os
+import sys
+
+# Configurar precisão alta
+getcontext().prec = 28
+
+# Versão do formato dos registros - incrementar quando o esquema mudar
+VERSAO_ESQUEMA = 1
+
+CABECALHO = 'cabecalho'
+PONTO = 'ponto'
+PLANILHA = 'planilha'
+RESUMO = 'resumo'
+
+# Campos somados para as médias e totais das estatísticas
+CAMPOS_MEDIA = ('diferenca_inicial', 'diferenca', 'melhoria')
+CAMPOS_TOTAL = ('iteracoes', 'melhorias_encontradas')
+
+
+def codificar_valor(valor):
+    """
+    Conversão dos tipos que o json não conhece
+    Decimal vira texto exato em notação fixa (sem expoente)
+    """
+    if isinstance(valor, Decimal):
+        return format(valor, 'f')
+    if isinstance(valor, (datetime, date)):
+        return valor.isoformat()
+    if isinstance(valor, (set, frozenset, tuple)):
+        return list(valor)
+    return str(valor)
+
+
+def codificar_registro(registro):
+    """
+    Uma linha JSON compacta (sem espaços, UTF-8 legível)
+    """
+    return json.dumps(registro, ensure_ascii=False, separators=(',', ':'), default=codificar_valor)
+
+
+def para_decimal(valor):
+    """
+    Decimal exato de um campo lido do fluxo (texto, inteiro ou float), ou None
+    """
+    if valor is None or isinstance(valor, bool):
+        return None
+    try:
+        return Decimal(valor) if isinstance(valor, str) else Decimal(str(valor))
+    except (InvalidOperation, ValueError):
+        return None
+
+
+class EstatisticasRelatorio:
+    """
+    Estatísticas por etapa acumuladas registro a registro (memória constante)
+    """
+    __slots__ = ('etapas',)
+
+    def __init__(self):
+        self.etapas = {}
+
+    def acumular(self, registro):
+        etapa = self.etapas.get(registro.get('etapa'))
+        if etapa is None:
+            etapa = self.etapas[registro.get('etapa')] = {
+                'pontos': 0, 'processados': 0, 'objetivos_atingidos': 0, 'encerrados_prazo': 0,
+                'somas': {}, 'contagens': {}
+            }
+
+        etapa['pontos'] += 1
+        if not registro.get('processado', True):
+            return
+        etapa['processados'] += 1
+        if registro.get('objetivo_atingido', registro.get('aprovado')):
+            etapa['objetivos_atingidos'] += 1
+        if registro.get('encerramento') == 'prazo':
+            etapa['encerrados_prazo'] += 1
+
+        for campo in CAMPOS_MEDIA + CAMPOS_TOTAL:
+            valor = para_decimal(registro.get(campo))
+            if valor is not None:
+                etapa['somas'][campo] = etapa['somas'].get(campo, Decimal('0')) + valor
+                etapa['contagens'][campo] = etapa['contagens'].get(campo, 0) + 1
+
+    def para_dicionario(self):
+        estatisticas = {}
+        for nome, etapa in self.etapas.items():
+            dados = {
+                'total_pontos': etapa['pontos'],
+                'pontos_processados': etapa['processados'],
+                'objetivos_atingidos': etapa['objetivos_atingidos'],
+            }
+            # Só com orçamento de tempo: pontos que ficaram com a melhor solução até o prazo
+            if etapa['encerrados_prazo']:
+                dados['encerrados_por_prazo'] = etapa['encerrados_prazo']
+            for campo in CAMPOS_MEDIA:
+                if campo in etapa['somas']:
+                    dados[f"{campo}_media"] = etapa['somas'][campo] / etapa['contagens'][campo]
+            for campo in CAMPOS_TOTAL:
+                if campo in etapa['somas']:
+                    dados[f"{campo}_total"] = int(etapa['somas'][campo])
+            estatisticas[nome if nome is not None else '-'] = dados
+        return estatisticas
+
+
+class EscritorRelatorio:
+    """
+    Grava o relatório JSONL registro a registro, com flush a cada linha
+    Uso:
+        with EscritorRelatorio('relatorio.jsonl', 'refinamento', descricao=...) as relatorio:
+            relatorio.ponto(resultado, 'refinamento_hibrido')
+            relatorio.concluir(arquivo_resultado=...)
+    """
+
+    def __init__(self, caminho, tipo, **metadata):
+        self.caminho = caminho
+        self.estatisticas = EstatisticasRelatorio()
+        self.concluido = False
+        pasta = os.path.dirname(caminho)
+        if pasta:
+            os.makedirs(pasta, exist_ok=True)
+        self._fluxo = open(caminho, 'w', encoding='utf-8')
+        self._gravar({
+            'registro': CABECALHO,
+            'esquema': VERSAO_ESQUEMA,
+            'tipo': tipo,
+            'data_geracao': datetime.now().isoformat(),
+            'metadata': metadata,
+        })
+
+    def _gravar(self, registro):
+        self._fluxo.write(codificar_registro(registro) + '\n')
+        self._fluxo.flush()
+
+    def ponto(self, resultado, etapa=None, numero=None):
+        """
+        Registra o resultado de um ponto (None = ponto não processado)
+        Se o resultado tiver 'exatos', esses valores Decimal substituem os campos em float
+        """
+        registro = {'registro': PONTO, 'etapa': etapa}
+        if resultado is None:
+            registro.update({'numero': numero, 'processado': False})
+        else:
+            registro['numero'] = numero if numero is not None else resultado.get('numero', resultado.get('ponto'))
+            registro['processado'] = True
+            registro.update(resultado)
+            # Valores Decimal exatos substituem as cópias em float do resultado
+            registro.update(registro.pop('exatos', None) or {})
+        self.estatisticas.acumular(registro)
+        self._gravar(registro)
+
+    def planilha(self, resumo):
+        """
+        Registra o resumo de uma planilha concluída (processamento em lote)
+        """
+        self._gravar({'registro': PLANILHA, **resumo})
+
+    def concluir(self, concluido=True, **dados):
+        """
+        Grava o registro de resumo (estatísticas acumuladas e dados finais) e fecha
+        'estatisticas' em dados substitui as estatísticas acumuladas dos pontos
+        """
+        if self._fluxo.closed:
+            return
+        self._gravar({'registro': RESUMO, 'concluido': concluido,
+                      'estatisticas': self.estatisticas.para_dicionario(), **dados})
+        self.concluido = concluido
+        self._fluxo.close()
+
+    def fechar(self):
+        self._fluxo.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo, valor, rastreamento):
+        # Execução interrompida: fecha sem resumo, o fluxo continua legível
+        if tipo is not None:
+            self.fechar()
+        else:
+            self.concluir()
+        return False
+
+
+def ler_registros(caminho, tipos=None):
+    """
+    Percorre os registros do arquivo (gerador, uma linha por vez)
+    Uma última linha incompleta (arquivo ainda em gravação) é ignorada
+    """
+    with open(caminho, 'r', encoding='utf-8') as f:
+        for linha in f:
+            if not linha.strip():
+                continue
+            try:
+                registro = json.loads(linha)
+            except ValueError:
+                if not linha.endswith('\n'):
+                    break
+                raise
+            if tipos is None or registro.get('registro') in tipos:
+                yield registro
+
+
+def resumir_relatorio(caminho):
+    """
+    (cabecalho, resumo) do relatório; com a gravação em andamento o resumo é
+    calculado a partir dos pontos já gravados (concluido=False)
+    """
+    cabecalho, resumo = None, None
+    estatisticas = EstatisticasRelatorio()
+    for registro in ler_registros(caminho):
+        tipo = registro.get('registro')
+        if tipo == CABECALHO:
+            cabecalho = registro
+        elif tipo == PONTO:
+            estatisticas.acumular(registro)
+        elif tipo == RESUMO:
+            resumo = registro
+
+    if resumo is None:
+        resumo = {'registro': RESUMO, 'concluido': False, 'estatisticas': estatisticas.para_dicionario()}
+    return cabecalho or {}, resumo
+
+
+def _formatar(valor):
+    if isinstance(valor, bool):
+        return '✅' if valor else '❌'
+    if isinstance(valor, list):
+        return '[' + ', '.join(_formatar(v) for v in valor) + ']'
+    if isinstance(valor, dict):
+        return ', '.join(f"{chave}={_formatar(v)}" for chave, v in valor.items())
+    return str(valor)
+
+
+def renderizar_texto(caminho, destino=None, detalhar_pontos=True):
+    """
+    Relatório legível a partir do fluxo JSONL
+    destino: caminho do .txt, um arquivo aberto ou None (saída padrão)
+    Lê o arquivo duas vezes (estatísticas, depois pontos) sem carregá-lo inteiro
+    """
+    cabecalho, resumo = resumir_relatorio(caminho)
+    metadata = cabecalho.get('metadata', {})
+
+    fechar = False
+    if destino is None:
+        saida = sys.stdout
+    elif isinstance(destino, str):
+        saida, fechar = open(destino, 'w', encoding='utf-8'), True
+    else:
+        saida = destino
+
+    try:
+        titulo = metadata.get('titulo') or f"RELATÓRIO {str(cabecalho.get('tipo', '')).upper()}"
+        saida.write(f"=== {titulo} ===\n\n")
+        if cabecalho.get('data_geracao'):
+            saida.write(f"🕒 Gerado em: {cabecalho['data_geracao']}\n\n")
+
+        for secao, simbolo, chave in (('OBJETIVO', '🎯', 'objetivo'), ('ESTRATÉGIA', '✅', 'estrategia')):
+            if metadata.get(chave):
+                saida.write(f"{simbolo} {secao}:\n")
+                for linha in metadata[chave]:
+                    saida.write(f"   • {linha}\n")
+                saida.write("\n")
+
+        situacao = '' if resumo.get('concluido') else ' (EM ANDAMENTO)'
+        for etapa, estatisticas in resumo.get('estatisticas', {}).items():
+            nome_etapa = '' if etapa == '-' else f" - {etapa}"
+            saida.write(f"📊 ESTATÍSTICAS GERAIS{nome_etapa}{situacao}:\n")
+            for chave, valor in estatisticas.items():
+                saida.write(f"   • {chave.replace('_', ' ').capitalize()}: {_formatar(codificar_valor(valor) if isinstance(valor, Decimal) else valor)}\n")
+            saida.write("\n")
+
+        if detalhar_pontos:
+            saida.write("🎯 RESULTADOS POR PONTO:\n")
+            for registro in ler_registros(caminho, (PONTO,)):
+                etapa = f" [{registro['etapa']}]" if registro.get('etapa') else ''
+                saida.write(f"\n   PONTO {registro.get('numero')}{etapa}:\n")
+                if not registro.get('processado', True):
+                    saida.write("     • Não processado\n")
+                    continue
+                for chave, valor in registro.items():
+                    if chave in ('registro', 'etapa', 'numero', 'processado'):
+                        continue
+                    saida.write(f"     • {chave}: {_formatar(valor)}\n")
+
+        conclusao = resumo.get('conclusao')
+        if conclusao:
+            saida.write("\n🎉 CONCLUSÃO:\n")
+            for linha in conclusao:
+                saida.write(f"   {linha}\n")
+    finally:
+        if fechar:
+            saida.close()
+
+    return destino
@@ -0,0 +1,488 @@
+# -*- coding: utf-8 -*-
+"""
+Robustez das Soluções Otimizadas
+Depois da otimização, confere se os valores sagrados do certificado continuam
+iguais, no arredondamento do certificado, quando as entradas gravadas (pulsos C,
+tempo F e leitura do medidor O) sofrem o arredondamento da própria planilha:
+double de 15 algarismos significativos do Excel ou, com "precisão como exibido"
+(DEF.NÚM.DEC), as casas decimais do formato da célula.
+
+Milhares de perturbações de ±0,5 ULP são avaliadas em um único lote vetorizado
+(mesmas fórmulas de incerteza_monte_carlo.calcular_saidas) e o resultado é a
+probabilidade de cada valor sagrado (I57, U57 e AD57) manter o arredondamento
+do certificado. O desvio padrão só é avaliado quando a planilha original tem o
+valor calculado (pelo menos duas leituras com erro não nulo); sem ele o relatório
+indica que não foi avaliado.
+
+Pontos com a vazão média frágil são refinados de novo com o alvo deslocado para
+dentro da faixa de arredondamento, sem sair da tolerância da verificação. Cada
+ponto tem uma semente própria, derivada da semente da execução e da linha do
+ponto: a solução anterior e a candidata são avaliadas com as mesmas perturbações
+e a candidata só fica se o ganho de probabilidade passar do erro padrão do Monte
+Carlo, sem piorar os resíduos dos valores sagrados
+"""
+
+from dataclasses import dataclass, field
+from decimal import Decimal, ROUND_HALF_UP, getcontext
+import argparse
+import json
+import math
+import os
+import re
+import sys
+
+import numpy as np
+
+from incerteza_monte_carlo import calcular_saidas, GRANDEZAS_CONSTANTES
+from instrumentacao import cronometrar
+from orcamento_otimizacao import residuos_valores_sagrados
+from registro_log import configurar_log, obter_logger
+
+# Configurar precisão alta
+getcontext().prec = 28
+
+log = obter_logger(__name__)
+
+# Colunas das entradas gravadas pelos otimizadores: (grandeza, coluna)
+ENTRADAS_GRAVADAS = (('pulsos_padrao', 3), ('tempo_coleta', 6), ('leitura_medidor', 15))
+
+# Colunas dos valores sagrados avaliados na linha de agregados
+COLUNAS_SAGRADAS = {'vazao_media': 9, 'tendencia': 21, 'desvio_padrao': 30}
+
+# Casas do certificado quando o formato da célula não as define (formato "Geral")
+CASAS_CERTIFICADO = {'vazao_media': 3, 'tendencia': 4, 'desvio_padrao': 4}
+
+# Algarismos significativos guardados pelo Excel
+ALGARISMOS_EXCEL = 15
+
+AMOSTRAS_PADRAO = 4096
+PROBABILIDADE_MINIMA = 0.99
+TENTATIVAS_REOTIMIZACAO = 2
+
+# Semente das execuções sem semente explícita (resultados reprodutíveis)
+SEMENTE_PADRAO = 0
+
+# Erros padrão do Monte Carlo que o ganho de probabilidade de uma tentativa precisa superar
+ERROS_PADRAO_ACEITACAO = 2
+
+# Fração da faixa de arredondamento mantida livre em cada borda na última tentativa
+# (as anteriores usam uma fração proporcional; sempre abaixo de 0.5, o centro da faixa)
+MARGEM_FAIXA = Decimal('0.25')
+
+# Valores sagrados que a reotimização dos tempos (coluna F) move: a tendência e o desvio
+# padrão vêm do erro % de cada leitura (medidor contra padrão no mesmo volume), que não
+# depende do tempo
+GRANDEZAS_REOTIMIZAVEIS = ('vazao_media',)
+
+MODOS = ('excel', 'exibicao')
+
+
+def casas_formato(formato):
+    """
+    Casas decimais de um formato numérico ('0.0000' → 4, '0' → 0), ou None ("Geral")
+    """
+    if not formato or formato.lower() == 'general':
+        return None
+    secao = formato.split(';')[0]
+    decimais = re.search(r'[0#]\.([0#]+)', secao)
+    if decimais:
+        return len(decimais.group(1))
+    return 0 if re.search(r'[0#]', secao) else None
+
+
+def meio_ulp(valor, casas_exibidas=None):
+    """
+    Meia unidade na última posição representável do valor gravado (Decimal lido da célula)
+    Inteiros gravados (sem casas decimais, como os pulsos) são exatos; com casas
+    exibidas (precisão como exibido) vale a casa do formato
+    """
+    if valor == 0 or valor.as_tuple().exponent >= 0:
+        return 0.0
+    if casas_exibidas is not None:
+        return 0.5 * 10.0 ** -casas_exibidas
+    expoente = math.floor(math.log10(abs(float(valor))))
+    return 0.5 * 10.0 ** (expoente - ALGARISMOS_EXCEL + 1)
+
+
+def faixa_arredondamento(valor, casas):
+    """
+    (valor arredondado, limite inferior, limite superior) em módulo, arredondamento
+    do Excel (metade para longe do zero)
+    """
+    quantum = Decimal(1).scaleb(-casas)
+    arredondado = Decimal(valor).quantize(quantum, rounding=ROUND_HALF_UP)
+    meio = quantum / 2
+    return arredondado, max(abs(arredondado) - meio, Decimal('0')), abs(arredondado) + meio
+
+
+def mantem_arredondamento(amostras, valor, casas):
+    """
+    Máscara das amostras cujo arredondamento a 'casas' é igual ao do valor sagrado
+    """
+    arredondado, inferior, superior = faixa_arredondamento(valor, casas)
+    modulo = np.abs(amostras)
+    dentro = (modulo >= float(inferior)) & (modulo < float(superior))
+    if arredondado > 0:
+        dentro &= amostras > 0
+    elif arredondado < 0:
+        dentro &= amostras < 0
+    return dentro
+
+
+def alvo_robusto(valor, casas, margem=MARGEM_FAIXA, tolerancia=None):
+    """
+    Valor sagrado trazido para dentro da sua faixa de arredondamento, a 'margem'
+    da largura da faixa de cada borda (inalterado se já estiver no interior)
+    Com tolerancia (a da verificação), o deslocamento fica limitado à metade dela:
+    a outra metade fica para o resíduo do refinamento
+    """
+    if not 0 <= margem < Decimal('0.5'):
+        raise ValueError(f"margem fora de [0, 0.5): {margem}")
+    valor = Decimal(valor)
+    arredondado, _, _ = faixa_arredondamento(valor, casas)
+    quantum = Decimal(1).scaleb(-casas)
+    folga = quantum / 2 - quantum * margem
+    alvo = min(max(valor, arredondado - folga), arredondado + folga)
+    if tolerancia is not None:
+        alvo = min(max(alvo, valor - tolerancia / 2), valor + tolerancia / 2)
+    return alvo
+
+
+@dataclass
+class ResultadoRobustez:
+    """
+    Probabilidade de cada valor sagrado manter o arredondamento do certificado
+    (valores sagrados sem valor na planilha ficam em nao_avaliados)
+    """
+    numero: int
+    amostras: int
+    modo: str
+    probabilidades: dict
+    casas: dict
+    nominais: dict
+    nao_avaliados: list = field(default_factory=list)
+    tentativas: int = 0
+    historico: list = field(default_factory=list)
+
+    @property
+    def probabilidade_minima(self):
+        return min(self.probabilidades.values(), default=1.0)
+
+    @property
+    def probabilidade_reotimizavel(self):
+        return min((self.probabilidades[nome] for nome in GRANDEZAS_REOTIMIZAVEIS if nome in self.probabilidades),
+                   default=1.0)
+
+    def fragil(self, limiar=PROBABILIDADE_MINIMA):
+        return self.probabilidade_minima < limiar
+
+    def reotimizavel(self, limiar=PROBABILIDADE_MINIMA):
+        """
+        A fragilidade está em um valor que a reotimização dos tempos consegue mover
+        """
+        return self.probabilidade_reotimizavel < limiar
+
+    def para_dicionario(self):
+        return {
+            'numero': self.numero,
+            'amostras': self.amostras,
+            'modo': self.modo,
+            'probabilidades': self.probabilidades,
+            'casas': self.casas,
+            'nominais': self.nominais,
+            'nao_avaliados': self.nao_avaliados,
+            'robusto': not self.fragil(),
+            'tentativas_reotimizacao': self.tentativas,
+            'historico': self.historico,
+        }
+
+
+def erro_padrao(probabilidade, amostras):
+    """
+    Erro padrão de uma probabilidade estimada com 'amostras' sorteios
+    """
+    return math.sqrt(probabilidade * (1.0 - probabilidade) / amostras)
+
+
+def ganho_significativo(anterior, candidato, erros_padrao=ERROS_PADRAO_ACEITACAO):
+    """
+    A probabilidade da vazão média do candidato supera a anterior por mais de
+    'erros_padrao' erros padrão da diferença entre as duas estimativas
+    """
+    ganho = candidato.probabilidade_reotimizavel - anterior.probabilidade_reotimizavel
+    incerteza = math.hypot(erro_padrao(anterior.probabilidade_reotimizavel, anterior.amostras),
+                           erro_padrao(candidato.probabilidade_reotimizavel, candidato.amostras))
+    return ganho > 0 and ganho > erros_padrao * incerteza
+
+
+def semente_ponto(ponto, semente=SEMENTE_PADRAO):
+    """
+    Semente do ponto, derivada da semente da execução e da linha inicial do ponto
+    """
+    return np.random.SeedSequence(semente, spawn_key=(ponto['linha_inicial'],))
+
+
+def casas_ponto(ponto, coleta_sheet=None):
+    """
+    Casas do certificado de cada valor sagrado (formato da linha de agregados) e
+    casas exibidas de cada entrada, por leitura (None = formato "Geral")
+    """
+    casas = dict(CASAS_CERTIFICADO)
+    exibidas = {grandeza: [None] * len(ponto['leituras']) for grandeza, _ in ENTRADAS_GRAVADAS}
+    if coleta_sheet is None:
+        return casas, exibidas
+
+    linha_agregados = ponto['linha_inicial'] + len(ponto['leituras'])
+    for nome, coluna in COLUNAS_SAGRADAS.items():
+        formato = casas_formato(coleta_sheet.cell(row=linha_agregados, column=coluna).number_format)
+        if formato is not None:
+            casas[nome] = formato
+    for grandeza, coluna in ENTRADAS_GRAVADAS:
+        exibidas[grandeza] = [casas_formato(coleta_sheet.cell(row=ponto['linha_inicial'] + i, column=coluna).number_format)
+                              for i in range(len(ponto['leituras']))]
+    return casas, exibidas
+
+
+def avaliar_ponto(ponto, constantes, valores_sagrados, coleta_sheet=None, modo='excel',
+                  amostras=AMOSTRAS_PADRAO, rng=None):
+    """
+    Avalia em um lote as perturbações de ±0,5 ULP das entradas gravadas do ponto
+    modo 'excel': 15 algarismos significativos; 'exibicao': casas do formato da célula
+    Valores sagrados ausentes (None) não são avaliados
+    """
+    if modo not in MODOS:
+        raise ValueError(f"modo desconhecido: {modo} (use {', '.join(MODOS)})")
+    rng = rng or np.random.default_rng()
+    casas, exibidas = casas_ponto(ponto, coleta_sheet)
+
+    faltando = [c for c in GRANDEZAS_CONSTANTES if constantes.get(c) is None]
+    if faltando:
+        raise ValueError(f"constantes ausentes: {', '.join(faltando)}")
+    estimativas_constantes = {c: float(constantes[c]) for c in GRANDEZAS_CONSTANTES}
+
+    entradas = {}
+    for grandeza, _ in ENTRADAS_GRAVADAS:
+        valores = [l[grandeza] for l in ponto['leituras']]
+        escalas = np.array([
+            meio_ulp(v, exibidas[grandeza][i] if modo == 'exibicao' else None)
+            for i, v in enumerate(valores)
+        ])
+        amostra = rng.uniform(-1.0, 1.0, (amostras, len(valores)))
+        amostra *= escalas
+        amostra += np.array([float(v) for v in valores])
+        entradas[grandeza] = amostra
+
+    with cronometrar('robustez'):
+        nominais = calcular_saidas(*(np.array([[float(l[g]) for l in ponto['leituras']]]) for g, _ in ENTRADAS_GRAVADAS),
+                                   estimativas_constantes)
+        saidas = calcular_saidas(entradas['pulsos_padrao'], entradas['tempo_coleta'], entradas['leitura_medidor'],
+                                 estimativas_constantes)
+
+    probabilidades = {
+        nome: float(np.count_nonzero(mantem_arredondamento(valores, valores_sagrados[nome], casas[nome]))) / amostras
+        for nome, valores in zip(COLUNAS_SAGRADAS, saidas) if valores_sagrados.get(nome) is not None
+    }
+    return ResultadoRobustez(
+        numero=ponto['numero'],
+        amostras=amostras,
+        modo=modo,
+        probabilidades=probabilidades,
+        casas=casas,
+        nominais={nome: float(valor[0]) for nome, valor in zip(COLUNAS_SAGRADAS, nominais)},
+        nao_avaliados=[nome for nome in COLUNAS_SAGRADAS if valores_sagrados.get(nome) is None],
+    )
+
+
+def avaliar_certificado(constantes, pontos_original, pontos_final, coleta_sheet=None, modo='excel',
+                        amostras=AMOSTRAS_PADRAO, semente=SEMENTE_PADRAO):
+    """
+    Avalia todos os pontos do certificado (um gerador por ponto, derivado da semente)
+    """
+    finais_por_linha = {p['linha_inicial']: p for p in pontos_final}
+    resultados = []
+    for ponto in pontos_original:
+        ponto_final = finais_por_linha.get(ponto['linha_inicial'])
+        if ponto_final is None:
+            resultados.append(None)
+            continue
+        rng = np.random.default_rng(semente_ponto(ponto_final, semente))
+        resultados.append(avaliar_ponto(ponto_final, constantes, ponto['valores_originais'], coleta_sheet,
+                                        modo, amostras, rng))
+    return resultados
+
+
+def reotimizar_ponto(ponto, constantes, valores_sagrados, casas, tolerancia, tolerancia_objetivo=Decimal('0.00001'),
+                     margem=MARGEM_FAIXA, estrategia=None, prazo=None, alvo=None):
+    """
+    Refina os tempos de novo com a vazão alvo dentro da faixa de arredondamento,
+    a no máximo metade da tolerância da verificação do valor sagrado
+    Retorna o resultado de processar_ponto_ultra_preciso (ou None)
+    """
+    from refinador_ultra_preciso import processar_ponto_ultra_preciso
+
+    if alvo is None:
+        alvo = alvo_robusto(valores_sagrados['vazao_media'], casas['vazao_media'], margem, tolerancia)
+    ponto_alvo = dict(ponto)
+    ponto_alvo['tempos_refinados'] = [l['tempo_coleta'] for l in ponto['leituras']]
+    ponto_alvo['valores_originais'] = dict(valores_sagrados)
+    ponto_alvo['valores_originais']['vazao_media'] = alvo
+    return processar_ponto_ultra_preciso(ponto_alvo, constantes, tolerancia_objetivo, estrategia, prazo)
+
+
+def piora_residuos(anteriores, novos, tolerancia):
+    """
+    Algum resíduo dos valores sagrados passou da tolerância da verificação e do valor anterior
+    """
+    return any(novo > max(anteriores.get(chave, novo), tolerancia) for chave, novo in novos.items())
+
+
+def reforcar_ponto(ponto, constantes, valores_sagrados, tolerancia, coleta_sheet=None, gravar_tempos=None,
+                   tentativas=TENTATIVAS_REOTIMIZACAO, limiar=PROBABILIDADE_MINIMA, estrategia=None, criar_prazo=None,
+                   semente=SEMENTE_PADRAO):
+    """
+    Avalia o ponto e, se a vazão média for frágil, refina os tempos de novo com o alvo deslocado
+    Todas as avaliações do ponto usam as mesmas perturbações (semente_ponto); uma tentativa
+    só é aceita se a probabilidade da vazão média subir mais que o erro padrão do Monte
+    Carlo, sem reduzir a mínima nem piorar os resíduos dos valores sagrados; senão os
+    tempos aceitos são restaurados
+    gravar_tempos(refinado): grava na planilha os tempos de uma tentativa aceita
+    criar_prazo(): Prazo de cada tentativa (None = sem limite)
+    Retorna o ResultadoRobustez dos tempos que ficaram no ponto
+    """
+    sementes = semente_ponto(ponto, semente)
+
+    def avaliar():
+        return avaliar_ponto(ponto, constantes, valores_sagrados, coleta_sheet, rng=np.random.default_rng(sementes))
+
+    robustez = avaliar()
+    # Sem valor sagrado calculado (planilha gravada sem cache do Excel) não há alvo
+    if not valores_sagrados['vazao_media'] or not robustez.fragil(limiar):
+        return robustez
+    if not robustez.reotimizavel(limiar):
+        log.warning("   ⚠️  Ponto %s frágil em %s: os tempos de coleta não movem esse valor, mantendo a solução",
+                    ponto['numero'], ', '.join(nome for nome, p in robustez.probabilidades.items() if p < limiar))
+        return robustez
+
+    tempos_aceitos = [l['tempo_coleta'] for l in ponto['leituras']]
+    residuos_aceitos = residuos_valores_sagrados(ponto['leituras'], constantes, tempos_aceitos, valores_sagrados)
+    historico = []
+    alvos = set()
+    for tentativa in range(1, tentativas + 1):
+        # A margem cresce a cada tentativa até MARGEM_FAIXA na última
+        alvo = alvo_robusto(valores_sagrados['vazao_media'], robustez.casas['vazao_media'],
+                            MARGEM_FAIXA * tentativa / tentativas, tolerancia)
+        if alvo in alvos:
+            log.info("   ⚠️  Ponto %s: alvo %s já tentado, sem nova reotimização", ponto['numero'], alvo)
+            break
+        alvos.add(alvo)
+
+        log.warning("   ⚠️  Ponto %s frágil (%.2f%%): reotimizando (%s/%s)...", ponto['numero'],
+                    robustez.probabilidade_reotimizavel * 100, tentativa, tentativas)
+        refinado = reotimizar_ponto(ponto, constantes, valores_sagrados, robustez.casas, tolerancia,
+                                    estrategia=estrategia, prazo=criar_prazo() if criar_prazo else None, alvo=alvo)
+        historico.append(robustez.probabilidades)
+        if refinado is None:
+            break
+
+        tempos = list(refinado['exatos']['tempos_ultra_refinados'])
+        for leitura, tempo in zip(ponto['leituras'], tempos):
+            leitura['tempo_coleta'] = tempo
+        candidato = avaliar()
+        residuos = residuos_valores_sagrados(ponto['leituras'], constantes, tempos, valores_sagrados)
+
+        if (ganho_significativo(robustez, candidato)
+                and candidato.probabilidade_minima >= robustez.probabilidade_minima
+                and not piora_residuos(residuos_aceitos, residuos, tolerancia)):
+            robustez, tempos_aceitos, residuos_aceitos = candidato, tempos, residuos
+            if gravar_tempos is not None:
+                gravar_tempos(refinado)
+        else:
+            log.warning("   ↩️  Ponto %s: tentativa %s não melhorou a robustez sem piorar os resíduos,"
+                        " restaurando os tempos anteriores", ponto['numero'], tentativa)
+            for leitura, tempo in zip(ponto['leituras'], tempos_aceitos):
+                leitura['tempo_coleta'] = tempo
+
+        if not robustez.reotimizavel(limiar):
+            break
+
+    robustez.tentativas, robustez.historico = len(historico), historico
+    return robustez
+
+
+def registrar_resultados(resultados, limiar=PROBABILIDADE_MINIMA):
+    """
+    Probabilidades por ponto no log
+    """
+    log.info("\n📊 ROBUSTEZ DAS SOLUÇÕES (limiar %.2f%%)", limiar * 100)
+    for r in resultados:
+        if r is None:
+            continue
+        simbolo = '⚠️ ' if r.fragil(limiar) else '✅'
+        detalhes = ' | '.join(f"{nome} ({r.casas[nome]} casas): {p:.2%}" for nome, p in r.probabilidades.items())
+        if r.nao_avaliados:
+            detalhes += f" | não avaliado (sem valor na planilha): {', '.join(r.nao_avaliados)}"
+        reotimizado = f" (reotimizado {r.tentativas}x)" if r.tentativas else ''
+        log.info("   %s Ponto %s: %s%s", simbolo, r.numero, detalhes, reotimizado)
+
+
+def executar_robustez(arquivo_original, arquivo_final=None, amostras=AMOSTRAS_PADRAO, modo='excel',
+                      limiar=PROBABILIDADE_MINIMA, semente=SEMENTE_PADRAO, arquivo_json=None):
+    """
+    Avalia um certificado gravado (sem reotimizar) - código de saída 0 se todos os pontos forem robustos
+    """
+    if arquivo_final is None:
+        arquivo_final = arquivo_original.replace('.xlsx', '_CERTIFICADO_FINAL.xlsx')
+    for arquivo in (arquivo_original, arquivo_final):
+        if not os.path.exists(arquivo):
+            log.error("❌ Arquivo não encontrado: %s", arquivo)
+            return 2
+
+    from openpyxl import load_workbook
+    from otimizador_tempos_inteligente import extrair_dados_planilha_original
+
+    constantes, pontos_original = extrair_dados_planilha_original(arquivo_original)
+    _, pontos_final = extrair_dados_planilha_original(arquivo_final)
+    if pontos_original is None or pontos_final is None:
+        return 1
+
+    try:
+        coleta_sheet = load_workbook(arquivo_final)['Coleta de Dados']
+        resultados = avaliar_certificado(constantes, pontos_original, pontos_final, coleta_sheet, modo, amostras, semente)
+    except (ValueError, KeyError, OSError) as e:
+        log.error("❌ %s", e)
+        return 1
+
+    registrar_resultados(resultados, limiar)
+    avaliados = [r for r in resultados if r is not None]
+    frageis = sum(1 for r in avaliados if r.fragil(limiar))
+    log.info("\n📊 Pontos robustos: %s/%s", len(avaliados) - frageis, len(resultados), extra={'resumo': True})
+
+    if arquivo_json:
+        with open(arquivo_json, 'w', encoding='utf-8') as f:
+            json.dump({'original': arquivo_original, 'final': arquivo_final, 'limiar': limiar,
+                       'pontos': [r.para_dicionario() if r else None for r in resultados]},
+                      f, indent=2, ensure_ascii=False)
+        log.info("✅ Resultados salvos em: %s", arquivo_json, extra={'resumo': True})
+    return 0 if avaliados and frageis == 0 and len(avaliados) == len(resultados) else 1
+
+
+def main(argv=None):
+    """
+    Função principal - ROBUSTEZ DAS SOLUÇÕES
+    """
+    parser = argparse.ArgumentParser(description="Probabilidade de os valores sagrados resistirem ao arredondamento da planilha")
+    parser.add_argument('original', help="planilha original")
+    parser.add_argument('final', nargs='?', default=None, help="certificado (padrão: <original>_CERTIFICADO_FINAL.xlsx)")
+    parser.add_argument('-n', '--amostras', type=int, default=AMOSTRAS_PADRAO, help=f"perturbações por ponto (padrão: {AMOSTRAS_PADRAO})")
+    parser.add_argument('--modo', choices=MODOS, default='excel', help="excel: 15 algarismos; exibicao: casas do formato")
+    parser.add_argument('--limiar', type=float, default=PROBABILIDADE_MINIMA, help="probabilidade mínima (padrão: 0.99)")
+    parser.add_argument('--semente', type=int, default=SEMENTE_PADRAO, help=f"semente do gerador (padrão: {SEMENTE_PADRAO})")
+    parser.add_argument('--json', default=None, help="grava os resultados neste arquivo")
+    args = parser.parse_args(argv)
+
+    configurar_log()
+    return executar_robustez(args.original, args.final, args.amostras, args.modo, args.limiar, args.semente, args.json)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
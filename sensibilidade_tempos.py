@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+"""
+Sensibilidade da Vazão Média aos Tempos de Coleta
+d(I57)/dF_i de cada leitura, por diferença finita no próprio motor de cálculo
+do refinador (mesmos arredondamentos). Com ela os refinadores:
+    1. refinam primeiro a leitura de maior efeito por segundo;
+    2. calculam quantos passos da grade de tempos levam à vazão desejada e
+       avaliam só os candidatos em volta desse ponto, em vez de varrer a grade.
+A vazão é monotônica no tempo de coleta, então o candidato mais próximo da
+vazão desejada na grade é o mesmo que a varredura completa encontraria; dentro
+da tolerância, uma busca binária recua até o primeiro candidato da varredura,
+que é onde ela pararia
+"""
+
+from bisect import bisect_left
+from decimal import Decimal, ROUND_HALF_EVEN, getcontext
+
+# Configurar precisão alta
+getcontext().prec = 28
+
+# Passo da diferença finita (s)
+PASSO_DERIVADA = Decimal('0.001')
+
+# Candidatos avaliados de cada lado do índice estimado
+VIZINHOS = 1
+
+
+def calcular_sensibilidades(calcular_vazao, leituras, constantes, tempos, passo=PASSO_DERIVADA, vazao_base=None):
+    """
+    d(vazão média)/d(tempo) de cada leitura, em L/h por segundo (negativa: mais tempo, menos vazão)
+    calcular_vazao(leituras, constantes, tempos) é o motor de cálculo do refinador
+    """
+    if vazao_base is None:
+        vazao_base = calcular_vazao(leituras, constantes, tempos)
+    sensibilidades = []
+    for i in range(len(tempos)):
+        tempos_teste = list(tempos)
+        tempos_teste[i] = tempos[i] + passo
+        sensibilidades.append((calcular_vazao(leituras, constantes, tempos_teste) - vazao_base) / passo)
+    return sensibilidades
+
+
+def ordem_por_sensibilidade(sensibilidades):
+    """
+    Índices das leituras da maior para a menor sensibilidade (em módulo)
+    """
+    return sorted(range(len(sensibilidades)), key=lambda i: -abs(sensibilidades[i]))
+
+
+def passos_necessarios(diferenca, sensibilidade, incremento):
+    """
+    Número de incrementos de tempo (com sinal) que leva a vazão à desejada
+    diferenca = vazão desejada - vazão atual
+    """
+    if sensibilidade == 0:
+        return 0
+    return int((diferenca / (sensibilidade * incremento)).to_integral_value(rounding=ROUND_HALF_EVEN))
+
+
+def indice_grade_uniforme(tempo_base, incremento, minimo, maximo):
+    """
+    indice_de(tempo) para a grade tempo_base + k·incremento, k em [minimo, maximo]
+    """
+    def indice_de(tempo):
+        k = passos_necessarios(tempo - tempo_base, Decimal('1'), incremento)
+        return min(max(k, minimo), maximo)
+    return indice_de
+
+
+def indice_lista_ordenada(valores):
+    """
+    indice_de(tempo) para uma lista ordenada de tempos: índice do valor mais próximo
+    """
+    def indice_de(tempo):
+        j = bisect_left(valores, tempo)
+        if j == 0:
+            return 0
+        if j == len(valores):
+            return len(valores) - 1
+        return j if valores[j] - tempo < tempo - valores[j - 1] else j - 1
+    return indice_de
+
+
+def candidatos_por_sensibilidade(avaliar, tempo_de, indice_de, limites, tempo_base, vazao_base, sensibilidade,
+                                 vazao_desejada, vizinhos=VIZINHOS, tolerancia=None, inicio=None):
+    """
+    Gera (tempo, vazão) dos candidatos da grade em volta do tempo estimado pela sensibilidade
+    avaliar(tempo) → vazão; tempo_de(índice) → tempo; indice_de(tempo) → índice válido
+    mais próximo; limites = (primeiro, último) índice da grade
+    O primeiro candidato é o estimado pela sensibilidade; a estimativa é corrigida
+    uma vez pela secante (curvatura da fórmula) e os vizinhos da correção completam a busca
+    Com tolerancia e inicio (índice onde a varredura completa começaria), o candidato
+    dentro da tolerância gerado é o primeiro que a varredura encontraria a partir de
+    inicio - o mesmo resultado da varredura, que para no primeiro acerto
+    """
+    if sensibilidade == 0:
+        return
+    avaliados = set()
+
+    def gerar(indice, tempo, vazao):
+        if tolerancia is None or inicio is None or abs(vazao - vazao_desejada) > tolerancia:
+            yield tempo, vazao
+            return
+        yield from primeiro_dentro_da_tolerancia(avaliar, tempo_de, inicio, indice, tempo, vazao,
+                                                 vazao_desejada, tolerancia)
+
+    indice = indice_de(tempo_base + (vazao_desejada - vazao_base) / sensibilidade)
+    tempo = tempo_de(indice)
+    vazao = avaliar(tempo)
+    avaliados.add(indice)
+    yield from gerar(indice, tempo, vazao)
+
+    inclinacao = (vazao - vazao_base) / (tempo - tempo_base) if tempo != tempo_base and vazao != vazao_base else sensibilidade
+    corrigido = indice_de(tempo + (vazao_desejada - vazao) / inclinacao)
+
+    for indice in sorted(range(corrigido - vizinhos, corrigido + vizinhos + 1), key=lambda j: abs(j - corrigido)):
+        if indice in avaliados or not limites[0] <= indice <= limites[1]:
+            continue
+        avaliados.add(indice)
+        tempo = tempo_de(indice)
+        yield from gerar(indice, tempo, avaliar(tempo))
+
+
+def primeiro_dentro_da_tolerancia(avaliar, tempo_de, inicio, indice, tempo, vazao, vazao_desejada, tolerancia):
+    """
+    Gera os candidatos da busca binária entre inicio e indice (dentro da tolerância)
+    pelo primeiro índice, na ordem da varredura a partir de inicio, dentro da tolerância;
+    os candidatos fora dela são gerados ao serem avaliados e o primeiro dentro, por último
+    A vazão é monotônica ao longo da grade, então os índices dentro da tolerância formam
+    um intervalo contínuo que contém indice
+    """
+    sentido = 1 if indice >= inicio else -1
+    # Posições contadas a partir de inicio: 'alto' está sempre dentro da tolerância
+    baixo, alto = 0, abs(indice - inicio)
+    while baixo < alto:
+        meio = (baixo + alto) // 2
+        tempo_meio = tempo_de(inicio + sentido * meio)
+        vazao_meio = avaliar(tempo_meio)
+        if abs(vazao_meio - vazao_desejada) <= tolerancia:
+            alto, tempo, vazao = meio, tempo_meio, vazao_meio
+        else:
+            baixo = meio + 1
+            yield tempo_meio, vazao_meio
+    yield tempo, vazao
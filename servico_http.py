@@ -0,0 +1,386 @@
+# -*- coding: utf-8 -*-
+"""
+Serviço HTTP Local do Pipeline de Certificados
+Servidor HTTP (biblioteca padrão) que recebe uma planilha e devolve o
+certificado final e o relatório JSON, sem o custo de iniciar o Python, o
+openpyxl e os motores de cálculo a cada certificado.
+
+    POST /certificados?tempo_alvo=240&tolerancia=0.00001[&orcamento=s][&formato=zip|json][&nome=arquivo.xlsx]
+         corpo: bytes da planilha .xlsx
+         resposta zip (padrão): <nome>_CERTIFICADO_FINAL.xlsx, resultado_pipeline.json, pontos.jsonl
+         resposta json: resultado com o certificado em base64
+         orcamento: segundos de busca por ponto em cada etapa (esgotado, fica a melhor solução)
+         tolerancia: só controla a aceitação - a verificação final dos valores sagrados e
+                     a etapa de robustez; os refinadores buscam com as próprias tolerâncias
+                     (TOLERANCIA_HIBRIDA, TOLERANCIA_ULTRA), as mesmas do lote e do cache de soluções
+    GET  /saude   processos, requisições em execução e na fila
+
+Os processos de trabalho são criados na partida (pré-fork) e já carregam os
+módulos, as restrições compiladas de cada estratégia de tempo alvo registrada
+(240 s, 360 s, ...), o layout compilado e o cache de soluções.
+No máximo 'processos' certificados são calculados ao mesmo tempo; até
+'limite_fila' requisições aguardam a vez e as demais recebem 503. Um certificado
+que excede o tempo limite recebe 504, mas segue ocupando a vaga até o processo terminar.
+Cada resposta traz o tempo de fila, de processamento e de cada etapa no
+cabeçalho Server-Timing
+"""
+
+from decimal import Decimal, InvalidOperation, getcontext
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+import argparse
+import base64
+import io
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import time
+import zipfile
+
+from estrategias_tempo import ESTRATEGIAS, obter_estrategia
+from orcamento_otimizacao import validar_orcamento
+from registro_log import configurar_log, obter_logger
+
+# Configurar precisão alta
+getcontext().prec = 28
+
+log = obter_logger(__name__)
+
+ENDERECO_PADRAO = '127.0.0.1'
+PORTA_PADRAO = 8765
+
+# Requisições aguardando um processo livre antes de recusar com 503
+LIMITE_FILA = 16
+
+# Tamanho máximo da planilha enviada
+TAMANHO_MAXIMO = 50 * 1024 * 1024
+
+# Tempo máximo de processamento de um certificado (s)
+TEMPO_LIMITE = 600
+
+# Tempos de coleta alvo suportados: as estratégias registradas em estrategias_tempo
+# (compiladas no aquecimento de cada processo de trabalho)
+TEMPOS_ALVO_SUPORTADOS = tuple(ESTRATEGIAS)
+
+TIPO_XLSX = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+# Cache de soluções do processo de trabalho (aberto uma vez, no aquecimento)
+_CACHE_PROCESSO = None
+
+
+def aquecer_processo():
+    """
+    Inicialização de cada processo de trabalho: importa os módulos pesados e
+    prepara as estruturas reaproveitadas por todos os certificados
+    """
+    global _CACHE_PROCESSO
+
+    configurar_log(os.environ.get('LOG_NIVEL', 'WARNING'), 'silencioso')
+
+    from processamento_lote import aquecer_motores
+    from cache_solucoes import CacheSolucoes
+
+    aquecer_motores()
+    _CACHE_PROCESSO = CacheSolucoes()
+
+
+def processar_planilha(conteudo, nome, tolerancia, tempo_alvo=None, orcamento_ponto=None):
+    """
+    Executa o pipeline em memória sobre a planilha recebida (no processo de trabalho)
+    Retorna {'certificado': bytes, 'resultado': dict, 'pontos': str, 'tempos': {etapa: s}}
+    """
+    from pipeline_certificado import PipelineCertificado
+    from relatorio_streaming import EscritorRelatorio
+
+    inicio = time.perf_counter()
+    with tempfile.TemporaryDirectory(prefix='certificado_') as pasta:
+        base = os.path.splitext(os.path.basename(nome))[0] or 'planilha'
+        arquivo_original = os.path.join(pasta, f"{base}.xlsx")
+        arquivo_certificado = os.path.join(pasta, f"{base}_CERTIFICADO_FINAL.xlsx")
+        arquivo_pontos = os.path.join(pasta, 'pontos.jsonl')
+        with open(arquivo_original, 'wb') as f:
+            f.write(conteudo)
+
+        with EscritorRelatorio(arquivo_pontos, 'pipeline', arquivo_original=nome) as relatorio:
+            resultado = PipelineCertificado(arquivo_original, relatorio=relatorio, cache=_CACHE_PROCESSO,
+                                            tolerancia=tolerancia, estrategia=tempo_alvo,
+                                            orcamento_ponto=orcamento_ponto).executar(arquivo_certificado)
+
+        dados = resultado.para_dicionario()
+        dados['arquivo_original'] = nome
+        dados['arquivo_certificado'] = os.path.basename(arquivo_certificado)
+        with open(arquivo_certificado, 'rb') as f:
+            certificado = f.read()
+        with open(arquivo_pontos, 'r', encoding='utf-8') as f:
+            pontos = f.read()
+
+    tempos = {etapa.nome: etapa.tempo for etapa in resultado.etapas}
+    tempos['pipeline'] = time.perf_counter() - inicio
+    return {
+        'certificado': certificado,
+        'nome_certificado': dados['arquivo_certificado'],
+        'resultado': json.loads(json.dumps(dados, ensure_ascii=False, default=str)),
+        'pontos': pontos,
+        'tempos': tempos,
+    }
+
+
+class ErroRequisicao(Exception):
+    """
+    Erro do cliente (parâmetro inválido, corpo ausente...) com o código HTTP
+    """
+
+    def __init__(self, codigo, mensagem):
+        super().__init__(mensagem)
+        self.codigo = codigo
+
+
+class ServicoCertificados:
+    """
+    Pool de processos pré-criados com fila limitada
+    """
+
+    def __init__(self, processos=None, limite_fila=LIMITE_FILA, tempo_limite=TEMPO_LIMITE):
+        self.processos = processos or os.cpu_count() or 1
+        self.limite_fila = limite_fila
+        self.tempo_limite = tempo_limite
+        self._vagas = threading.BoundedSemaphore(self.processos)
+        self._trava = threading.Lock()
+        self.em_execucao = 0
+        self.na_fila = 0
+        self.atendidas = 0
+
+        inicio = time.perf_counter()
+        self._pool = multiprocessing.Pool(self.processos, initializer=aquecer_processo)
+        # Garante que todos os processos terminaram o aquecimento antes de aceitar requisições
+        self._pool.map(time.sleep, [0] * self.processos, chunksize=1)
+        log.info("✅ %s processo(s) prontos em %.2f s", self.processos, time.perf_counter() - inicio,
+                 extra={'resumo': True})
+
+    def estado(self):
+        with self._trava:
+            return {'status': 'ok', 'processos': self.processos, 'em_execucao': self.em_execucao,
+                    'na_fila': self.na_fila, 'limite_fila': self.limite_fila, 'atendidas': self.atendidas}
+
+    def executar(self, conteudo, nome, tolerancia, tempo_alvo=None, orcamento_ponto=None):
+        """
+        Processa uma planilha respeitando o limite de concorrência
+        Retorna (resultado, tempo_fila)
+        A vaga só é devolvida quando o processo termina o certificado: depois de um 504
+        o cálculo continua no pool e segue ocupando a vaga, então a fila não cresce
+        além de limite_fila dentro do pool
+        """
+        with self._trava:
+            if self.na_fila >= self.limite_fila:
+                raise ErroRequisicao(503, "fila cheia, tente novamente")
+            self.na_fila += 1
+
+        inicio_fila = time.perf_counter()
+        self._vagas.acquire()
+        tempo_fila = time.perf_counter() - inicio_fila
+        with self._trava:
+            self.na_fila -= 1
+            self.em_execucao += 1
+
+        def liberar_vaga(_resultado=None):
+            # Chamado pelo pool ao fim do certificado (callback ou error_callback, nunca os dois)
+            with self._trava:
+                self.em_execucao -= 1
+            self._vagas.release()
+
+        try:
+            tarefa = self._pool.apply_async(processar_planilha,
+                                            (conteudo, nome, tolerancia, tempo_alvo, orcamento_ponto),
+                                            callback=liberar_vaga, error_callback=liberar_vaga)
+        except Exception:
+            liberar_vaga()
+            raise
+        try:
+            return tarefa.get(self.tempo_limite), tempo_fila
+        except multiprocessing.TimeoutError:
+            log.warning("⚠️  %s excedeu %s s; o processo segue com a vaga até terminar", nome, self.tempo_limite)
+            raise ErroRequisicao(504, f"processamento excedeu {self.tempo_limite} s")
+        finally:
+            with self._trava:
+                self.atendidas += 1
+
+    def encerrar(self):
+        self._pool.terminate()
+        self._pool.join()
+
+
+def _parametros(consulta):
+    """
+    (tempo_alvo, tolerancia, orcamento, formato, nome) validados da query string
+    """
+    parametros = {chave: valores[-1] for chave, valores in parse_qs(consulta).items()}
+
+    try:
+        tempo_alvo = obter_estrategia(parametros.get('tempo_alvo')).nome
+    except ValueError as e:
+        raise ErroRequisicao(400, str(e))
+    if tempo_alvo not in TEMPOS_ALVO_SUPORTADOS:
+        raise ErroRequisicao(422, f"tempo_alvo {tempo_alvo} s não suportado "
+                                  f"(suportados: {', '.join(TEMPOS_ALVO_SUPORTADOS)})")
+    try:
+        tolerancia = Decimal(parametros.get('tolerancia', '0.00001'))
+        if not tolerancia.is_finite() or tolerancia <= 0:
+            raise ValueError
+    except (InvalidOperation, ValueError):
+        raise ErroRequisicao(400, "tolerancia deve ser um número positivo e finito") from None
+    try:
+        orcamento = validar_orcamento(parametros.get('orcamento'))
+    except ValueError as e:
+        raise ErroRequisicao(400, str(e))
+
+    formato = parametros.get('formato', 'zip')
+    if formato not in ('zip', 'json'):
+        raise ErroRequisicao(400, "formato deve ser zip ou json")
+    return tempo_alvo, tolerancia, orcamento, formato, os.path.basename(parametros.get('nome', 'planilha.xlsx'))
+
+
+def _tamanho_corpo(valor):
+    """
+    Content-Length da requisição (0 se ausente); malformado ou negativo → 400
+    """
+    try:
+        tamanho = int(valor or 0)
+    except ValueError:
+        raise ErroRequisicao(400, f"Content-Length inválido: {valor}") from None
+    if tamanho < 0:
+        raise ErroRequisicao(400, f"Content-Length negativo: {valor}")
+    return tamanho
+
+
+def _compactar(resultado):
+    memoria = io.BytesIO()
+    with zipfile.ZipFile(memoria, 'w', zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr(resultado['nome_certificado'], resultado['certificado'])
+        zf.writestr('resultado_pipeline.json', json.dumps(resultado['resultado'], indent=2, ensure_ascii=False))
+        zf.writestr('pontos.jsonl', resultado['pontos'])
+    return memoria.getvalue()
+
+
+def _server_timing(tempo_fila, tempos, tempo_total):
+    """
+    Cabeçalho Server-Timing (durações em ms)
+    """
+    metricas = [f"fila;dur={tempo_fila * 1000:.1f}"]
+    metricas += [f"{etapa};dur={tempo * 1000:.1f}" for etapa, tempo in tempos.items()]
+    metricas.append(f"total;dur={tempo_total * 1000:.1f}")
+    return ', '.join(metricas)
+
+
+class ManipuladorCertificados(BaseHTTPRequestHandler):
+    """
+    Rotas do serviço (o ServicoCertificados fica em self.server.servico)
+    """
+    server_version = 'ServicoCertificados/1'
+
+    def log_message(self, formato, *args):
+        log.info("🌐 %s - %s", self.address_string(), formato % args)
+
+    def _responder(self, codigo, corpo, tipo, cabecalhos=None):
+        self.send_response(codigo)
+        self.send_header('Content-Type', tipo)
+        self.send_header('Content-Length', str(len(corpo)))
+        for chave, valor in (cabecalhos or {}).items():
+            self.send_header(chave, valor)
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def _responder_json(self, codigo, dados, cabecalhos=None):
+        corpo = json.dumps(dados, ensure_ascii=False).encode('utf-8')
+        self._responder(codigo, corpo, 'application/json; charset=utf-8', cabecalhos)
+
+    def do_GET(self):
+        if urlparse(self.path).path == '/saude':
+            self._responder_json(200, self.server.servico.estado())
+        else:
+            self._responder_json(404, {'erro': 'rota não encontrada'})
+
+    def do_POST(self):
+        inicio = time.perf_counter()
+        url = urlparse(self.path)
+        if url.path != '/certificados':
+            self._responder_json(404, {'erro': 'rota não encontrada'})
+            return
+
+        try:
+            tempo_alvo, tolerancia, orcamento, formato, nome = _parametros(url.query)
+            tamanho = _tamanho_corpo(self.headers.get('Content-Length'))
+            if tamanho == 0:
+                raise ErroRequisicao(411, "envie a planilha no corpo da requisição (Content-Length)")
+            if tamanho > TAMANHO_MAXIMO:
+                raise ErroRequisicao(413, f"planilha maior que {TAMANHO_MAXIMO // (1024 * 1024)} MB")
+            conteudo = self.rfile.read(tamanho)
+            if not conteudo.startswith(b'PK'):
+                raise ErroRequisicao(415, "o corpo deve ser uma planilha .xlsx")
+
+            resultado, tempo_fila = self.server.servico.executar(conteudo, nome, tolerancia, tempo_alvo, orcamento)
+        except ErroRequisicao as e:
+            cabecalhos = {'Retry-After': '5'} if e.codigo == 503 else None
+            self._responder_json(e.codigo, {'erro': str(e)}, cabecalhos)
+            return
+        except Exception as e:
+            log.error("❌ Erro ao processar %s: %s", self.path, e)
+            self._responder_json(500, {'erro': f"{type(e).__name__}: {e}"})
+            return
+
+        tempo_total = time.perf_counter() - inicio
+        cabecalhos = {
+            'Server-Timing': _server_timing(tempo_fila, resultado['tempos'], tempo_total),
+            'X-Certificado-Aprovado': 'true' if resultado['resultado']['aprovado'] else 'false',
+        }
+        if formato == 'json':
+            dados = dict(resultado['resultado'], pontos=resultado['pontos'],
+                         certificado_base64=base64.b64encode(resultado['certificado']).decode('ascii'))
+            self._responder_json(200, dados, cabecalhos)
+        else:
+            nome_zip = resultado['nome_certificado'].replace('.xlsx', '.zip')
+            cabecalhos['Content-Disposition'] = f'attachment; filename="{nome_zip}"'
+            self._responder(200, _compactar(resultado), 'application/zip', cabecalhos)
+
+
+def servir(endereco=ENDERECO_PADRAO, porta=PORTA_PADRAO, processos=None, limite_fila=LIMITE_FILA,
+           tempo_limite=TEMPO_LIMITE):
+    """
+    Cria o pool, abre o servidor e atende até Ctrl+C
+    """
+    servico = ServicoCertificados(processos, limite_fila, tempo_limite)
+    servidor = ThreadingHTTPServer((endereco, porta), ManipuladorCertificados)
+    servidor.daemon_threads = True
+    servidor.servico = servico
+    log.info("🌐 Serviço de certificados em http://%s:%s (POST /certificados, GET /saude)",
+             endereco, servidor.server_address[1], extra={'resumo': True})
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        log.info("\n⏹️  Encerrando o serviço...", extra={'resumo': True})
+    finally:
+        servidor.server_close()
+        servico.encerrar()
+    return 0
+
+
+def main(argv=None):
+    """
+    Função principal - SERVIÇO HTTP
+    """
+    parser = argparse.ArgumentParser(description="Serviço HTTP local do pipeline de certificados")
+    parser.add_argument('--endereco', default=ENDERECO_PADRAO, help=f"endereço de escuta (padrão: {ENDERECO_PADRAO})")
+    parser.add_argument('--porta', type=int, default=PORTA_PADRAO, help=f"porta (padrão: {PORTA_PADRAO})")
+    parser.add_argument('-p', '--processos', type=int, default=None, help="processos de trabalho (padrão: núcleos da CPU)")
+    parser.add_argument('--limite-fila', type=int, default=LIMITE_FILA, help=f"requisições em espera (padrão: {LIMITE_FILA})")
+    parser.add_argument('--tempo-limite', type=int, default=TEMPO_LIMITE, help=f"segundos por certificado (padrão: {TEMPO_LIMITE})")
+    args = parser.parse_args(argv)
+
+    configurar_log()
+    return servir(args.endereco, args.porta, args.processos, args.limite_fila, args.tempo_limite)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
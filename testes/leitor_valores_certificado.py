@@ -6,12 +6,18 @@ Lê diretamente os valores calculados pela planilha Excel
 """
 
 import os
-import time
-from decimal import Decimal
+import sys
 from openpyxl import load_workbook
 import json
 from datetime import datetime
 
+# Permite importar os módulos da raiz do projeto (localizador_rotulos, etc.)
+RAIZ_PROJETO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if RAIZ_PROJETO not in sys.path:
+    sys.path.insert(0, RAIZ_PROJETO)
+
+from localizador_rotulos import ler_valores_certificado, ABA_COLETA
+
 def ler_valores_certificado_planilha():
     """
     Lê os valores reais do certificado da planilha corrigida
@@ -37,104 +43,31 @@ def ler_valores_certificado_planilha():
         for sheet_name in wb.sheetnames:
             print(f"   • {sheet_name}")
         
-        # Procura pela planilha que contém os dados do certificado
-        sheet_certificado = None
-        for sheet_name in wb.sheetnames:
-            if "certificado" in sheet_name.lower() or "resultado" in sheet_name.lower():
-                sheet_certificado = wb[sheet_name]
-                print(f"\n✅ Planilha do certificado encontrada: {sheet_name}")
-                break
-        
-        if not sheet_certificado:
-            # Se não encontrar planilha específica, usa a primeira
-            sheet_certificado = wb.active
-            print(f"\n⚠️  Usando planilha ativa: {sheet_certificado.title}")
-        
-        print(f"   Dimensões: {sheet_certificado.dimensions}")
-        
-        # Busca pelos valores do certificado
-        valores_certificado = {}
+        # Os valores sagrados ficam na aba de coleta, à direita dos rótulos da
+        # linha de agregados de cada bloco (índice de rótulos por modelo de planilha)
+        if ABA_COLETA not in wb.sheetnames:
+            print(f"❌ Aba não encontrada: {ABA_COLETA}")
+            return None
+        print(f"\n✅ Aba do certificado: {ABA_COLETA}")
+        print(f"   Dimensões: {wb[ABA_COLETA].dimensions}")
         
         print(f"\n🔍 BUSCANDO VALORES DO CERTIFICADO:")
+        valores_certificado = ler_valores_certificado(wb)
         
-        # Para cada ponto de calibração (1 a 8)
-        for ponto_num in range(1, 9):
-            print(f"\n   📊 PONTO {ponto_num}:")
-            
-            # Determina as linhas base para cada ponto
-            # Ponto 1: linhas 54-56, Ponto 2: linhas 59-61, etc.
-            linha_base = 54 + (ponto_num - 1) * 5
-            
-            # Busca por valores em diferentes colunas e linhas
-            valores_encontrados = {}
-            
-            # Busca por vazão média (valores tipicamente > 1000 L/h)
-            vazao_encontrada = None
-            for col in range(1, 30):  # Busca em todas as colunas
-                for linha_offset in range(-10, 20):  # Busca em range maior
-                    try:
-                        cell = sheet_certificado.cell(row=linha_base + linha_offset, column=col)
-                        if cell.value and isinstance(cell.value, (int, float)) and cell.value > 1000 and cell.value < 1000000:
-                            # Verifica se é um valor de vazão (entre 1000 e 1000000 L/h)
-                            vazao_encontrada = {
-                                'valor': cell.value,
-                                'coordenada': cell.coordinate
-                            }
-                            print(f"     ✅ Vazão média: {cell.value} L/h em {cell.coordinate}")
-                            break
-                    except:
-                        continue
-                if vazao_encontrada:
-                    break
-            
-            # Busca por tendência (valores tipicamente pequenos, entre -10 e +10)
-            tendencia_encontrada = None
-            for col in range(1, 30):
-                for linha_offset in range(-10, 20):
-                    try:
-                        cell = sheet_certificado.cell(row=linha_base + linha_offset, column=col)
-                        if cell.value and isinstance(cell.value, (int, float)) and abs(cell.value) < 10 and cell.value != 0:
-                            # Verifica se é um valor de tendência
-                            tendencia_encontrada = {
-                                'valor': cell.value,
-                                'coordenada': cell.coordinate
-                            }
-                            print(f"     ✅ Tendência: {cell.value} % em {cell.coordinate}")
-                            break
-                    except:
-                        continue
-                if tendencia_encontrada:
-                    break
-            
-            # Busca por desvio padrão (valores tipicamente pequenos e positivos)
-            desvio_encontrado = None
-            for col in range(1, 30):
-                for linha_offset in range(-10, 20):
-                    try:
-                        cell = sheet_certificado.cell(row=linha_base + linha_offset, column=col)
-                        if cell.value and isinstance(cell.value, (int, float)) and cell.value > 0 and cell.value < 5:
-                            # Verifica se é um valor de desvio padrão
-                            desvio_encontrado = {
-                                'valor': cell.value,
-                                'coordenada': cell.coordinate
-                            }
-                            print(f"     ✅ Desvio padrão: {cell.value} % em {cell.coordinate}")
-                            break
-                    except:
-                        continue
-                if desvio_encontrado:
-                    break
-            
-            # Armazena os valores encontrados
-            valores_certificado[f"ponto_{ponto_num}"] = {
-                'numero_ponto': ponto_num,
-                'vazao_media': vazao_encontrada,
-                'tendencia': tendencia_encontrada,
-                'desvio_padrao': desvio_encontrado
-            }
+        for ponto_key, dados in valores_certificado.items():
+            print(f"\n   📊 PONTO {dados['numero_ponto']}:")
+            for nome, descricao, unidade in (('vazao_media', 'Vazão média', 'L/h'),
+                                             ('tendencia', 'Tendência', '%'),
+                                             ('desvio_padrao', 'Desvio padrão', '%')):
+                celula = dados[nome]
+                if celula and isinstance(celula['valor'], (int, float)):
+                    print(f"     ✅ {descricao}: {celula['valor']} {unidade} em {celula['coordenada']}")
+                else:
+                    # Célula localizada pelo rótulo, mas sem valor calculado em cache
+                    dados[nome] = None
             
             # Mostra resumo do ponto
-            valores_validos = sum(1 for v in [vazao_encontrada, tendencia_encontrada, desvio_encontrado] if v is not None)
+            valores_validos = sum(1 for nome in ('vazao_media', 'tendencia', 'desvio_padrao') if dados[nome] is not None)
             print(f"     📊 Resumo: {valores_validos}/3 valores encontrados")
         
         wb.close()
@@ -4,13 +4,10 @@ Otimizador de Tempos de Coleta
 Ajusta os tempos de coleta para ficarem próximos de 240s mantendo os valores finais idênticos
 """
 
-import pandas as pd
 from openpyxl import load_workbook, Workbook
 from decimal import Decimal, ROUND_HALF_UP
 import json
 import os
-import numpy as np
-from scipy.optimize import minimize
 
 def converter_para_decimal_padrao(valor):
     """
@@ -290,7 +287,9 @@ def otimizar_tempos_ponto(leituras, constantes, valores_originais):
     # Restrições: tempos devem estar entre 239.5999 e 240.499
     bounds = [(239.5999, 240.499) for _ in range(3)]
     
-    # Otimização
+    # Otimização (scipy só é carregado quando há o que otimizar)
+    from scipy.optimize import minimize
+
     resultado = minimize(
         funcao_objetivo,
         tempos_iniciais,
@@ -10,8 +10,16 @@ from decimal import Decimal, ROUND_HALF_UP, getcontext
 import json
 import os
 import itertools
+import sys
 import time
 
+# Permite importar os módulos da raiz do projeto (orcamento_otimizacao)
+RAIZ_PROJETO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if RAIZ_PROJETO not in sys.path:
+    sys.path.insert(0, RAIZ_PROJETO)
+
+from orcamento_otimizacao import Prazo, encerramento, limitar, orcamento_padrao
+
 # Configura precisão máxima
 getcontext().prec = 28
 
@@ -285,9 +293,11 @@ def gerar_combinacoes_tempos():
     
     return valores_base
 
-def otimizar_tempos_ponto_preciso(leituras, constantes, valores_originais):
+def otimizar_tempos_ponto_preciso(leituras, constantes, valores_originais, prazo=None):
     """
     Otimiza os tempos de coleta usando busca exaustiva com precisão máxima
+    prazo: Prazo opcional da busca; esgotado, devolve a melhor combinação encontrada até ali
+    O resultado informa o motivo do encerramento (convergencia, prazo ou busca_esgotada)
     """
     print(f"   🔍 Iniciando busca exaustiva para Ponto {leituras[0]['linha']}...")
     
@@ -299,49 +309,51 @@ def otimizar_tempos_ponto_preciso(leituras, constantes, valores_originais):
     melhor_diferenca = Decimal('inf')
     contador = 0
     
-    # Testa todas as combinações possíveis (3 leituras)
-    for tempo1 in valores_tempo:
-        for tempo2 in valores_tempo:
-            for tempo3 in valores_tempo:
-                contador += 1
-                
-                if contador % 100000 == 0:
-                    print(f"   ⏳ Testadas {contador} combinações...")
-                
-                tempos_teste = [tempo1, tempo2, tempo3]
-                
-                # Calcula resultados com estes tempos
-                resultados = calcular_formulas_com_tempo_ajustado(leituras, constantes, tempos_teste)
-                agregados = calcular_agregados_com_tempo_ajustado(resultados)
-                
-                # Calcula diferença total
-                diff_vazao = abs(agregados['vazao_media'] - valores_originais['vazao_media'])
-                diff_tendencia = abs(agregados['tendencia'] - valores_originais['tendencia'])
-                
-                # Se tem desvio padrão, inclui na comparação
-                diff_desvio = Decimal('0')
-                if agregados['desvio_padrao'] and valores_originais['desvio_padrao']:
-                    diff_desvio = abs(agregados['desvio_padrao'] - valores_originais['desvio_padrao'])
-                
-                diferenca_total = diff_vazao + diff_tendencia + diff_desvio
-                
-                # Se encontrou uma combinação melhor
-                if diferenca_total < melhor_diferenca:
-                    melhor_diferenca = diferenca_total
-                    melhor_combinacao = {
-                        'tempos': tempos_teste,
-                        'agregados': agregados,
-                        'diferenca_total': diferenca_total,
-                        'diff_vazao': diff_vazao,
-                        'diff_tendencia': diff_tendencia,
-                        'diff_desvio': diff_desvio
-                    }
-                    
-                    # Se a diferença é muito pequena, considera encontrado
-                    if diferenca_total < Decimal('0.0001'):
-                        print(f"   ✅ Encontrada combinação com diferença mínima: {float(diferenca_total):.8f}")
-                        return melhor_combinacao
+    # Testa todas as combinações possíveis (3 leituras) até o prazo, se houver
+    for tempos_teste in limitar(itertools.product(valores_tempo, repeat=3), prazo):
+        contador += 1
+        
+        if contador % 100000 == 0:
+            print(f"   ⏳ Testadas {contador} combinações...")
+        
+        tempos_teste = list(tempos_teste)
+        
+        # Calcula resultados com estes tempos
+        resultados = calcular_formulas_com_tempo_ajustado(leituras, constantes, tempos_teste)
+        agregados = calcular_agregados_com_tempo_ajustado(resultados)
+        
+        # Calcula diferença total
+        diff_vazao = abs(agregados['vazao_media'] - valores_originais['vazao_media'])
+        diff_tendencia = abs(agregados['tendencia'] - valores_originais['tendencia'])
+        
+        # Se tem desvio padrão, inclui na comparação
+        diff_desvio = Decimal('0')
+        if agregados['desvio_padrao'] and valores_originais['desvio_padrao']:
+            diff_desvio = abs(agregados['desvio_padrao'] - valores_originais['desvio_padrao'])
+        
+        diferenca_total = diff_vazao + diff_tendencia + diff_desvio
+        
+        # Se encontrou uma combinação melhor
+        if diferenca_total < melhor_diferenca:
+            melhor_diferenca = diferenca_total
+            melhor_combinacao = {
+                'tempos': tempos_teste,
+                'agregados': agregados,
+                'diferenca_total': diferenca_total,
+                'diff_vazao': diff_vazao,
+                'diff_tendencia': diff_tendencia,
+                'diff_desvio': diff_desvio
+            }
+            
+            # Se a diferença é muito pequena, considera encontrado
+            if diferenca_total < Decimal('0.0001'):
+                print(f"   ✅ Encontrada combinação com diferença mínima: {float(diferenca_total):.8f}")
+                melhor_combinacao['encerramento'] = encerramento(True, prazo)
+                return melhor_combinacao
     
+    melhor_combinacao['encerramento'] = encerramento(False, prazo)
+    if prazo is not None and prazo.expirado:
+        print(f"   ⏱️  Prazo esgotado após {contador} combinações")
     print(f"   ✅ Melhor combinação encontrada com diferença: {float(melhor_diferenca):.8f}")
     return melhor_combinacao
 
@@ -409,7 +421,8 @@ def main():
     
     print(f"✅ Extraídos {len(pontos)} pontos da planilha original")
     
-    # Otimiza cada ponto
+    # Otimiza cada ponto (com o prazo de ORCAMENTO_PONTO segundos por ponto, se definido)
+    segundos_por_ponto = orcamento_padrao()
     pontos_otimizados = []
     tempo_inicio = time.time()
     
@@ -420,7 +433,8 @@ def main():
         melhor_combinacao = otimizar_tempos_ponto_preciso(
             ponto['leituras'], 
             constantes, 
-            ponto['valores_originais']
+            ponto['valores_originais'],
+            Prazo(segundos_por_ponto) if segundos_por_ponto else None
         )
         
         # Calcula resultados com tempos otimizados
@@ -441,6 +455,7 @@ def main():
         print(f"   Tendência Otimizada: {float(melhor_combinacao['agregados']['tendencia']):.6f}")
         print(f"   Diferença: {tendencia_diff:.8f}")
         print(f"   Tempos Otimizados: {[float(t) for t in melhor_combinacao['tempos']]}")
+        print(f"   Encerramento: {melhor_combinacao['encerramento']}")
         
         ponto_otimizado = {
             'numero': ponto['numero'],
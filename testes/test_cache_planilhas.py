@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""
+Testes do cache de snapshots de planilhas
+"""
+
+from decimal import Decimal
+import marshal
+import os
+import zlib
+
+import cache_planilhas
+from cache_planilhas import (caminho_snapshot, desserializar_snapshot, gravar_snapshot_cache,
+                             ler_snapshot_cache, limpar_cache_excedente, serializar_snapshot)
+
+
+def test_serializacao_preserva_decimal_em_tuplas():
+    snapshot = {
+        'constantes': {'ponto_mlp': Decimal('1.000000000000000001')},
+        'pontos': [{'tempos': (Decimal('240.00001'), Decimal('239.99999')),
+                    'faixa': (1, ('a', Decimal('0.5'))), 'vazio': ()}],
+    }
+    assert desserializar_snapshot(serializar_snapshot(snapshot)) == snapshot
+
+
+def test_tupla_com_cara_de_marcador_volta_como_tupla():
+    snapshot = {'par': (cache_planilhas.MARCADOR_DECIMAL, '1.5')}
+    assert desserializar_snapshot(serializar_snapshot(snapshot)) == snapshot
+
+
+def test_limpeza_remove_snapshots_de_outra_versao(tmp_path):
+    pasta = str(tmp_path)
+    versao = cache_planilhas.VERSAO_SNAPSHOT
+    antigos = [os.path.join(pasta, f"abc-v{versao - 1}.snap"), os.path.join(pasta, f"def-v{versao + 1}.snap")]
+    for caminho in antigos:
+        with open(caminho, 'wb') as f:
+            f.write(b'antigo')
+    outro = os.path.join(pasta, 'notas.txt')
+    with open(outro, 'w') as f:
+        f.write('fora do cache')
+
+    gravar_snapshot_cache('abc', {'valor': Decimal('1')}, pasta)
+
+    assert not any(os.path.exists(c) for c in antigos)
+    assert os.path.exists(outro)
+    assert ler_snapshot_cache('abc', pasta) == {'valor': Decimal('1')}
+
+
+def test_snapshot_gravado_antes_da_marcacao_de_tuplas_continua_legivel(tmp_path):
+    # Mesma versão, gravado pelo codificador que deixava as tuplas sem marcação
+    corpo = marshal.dumps({'valor': (cache_planilhas.MARCADOR_DECIMAL, '1.5'), 'faixa': (1, 2)}, 4)
+    with open(caminho_snapshot('abc', str(tmp_path)), 'wb') as f:
+        f.write(cache_planilhas.CABECALHO + bytes([cache_planilhas.VERSAO_SNAPSHOT]) + zlib.compress(corpo))
+
+    assert ler_snapshot_cache('abc', str(tmp_path)) == {'valor': Decimal('1.5'), 'faixa': (1, 2)}
+
+
+def test_versao_anterior_legivel_e_mantida_e_lida(tmp_path, monkeypatch):
+    pasta = str(tmp_path)
+    versao = cache_planilhas.VERSAO_SNAPSHOT
+    monkeypatch.setattr(cache_planilhas, 'VERSOES_LEGIVEIS', (versao, versao - 1))
+    anterior = caminho_snapshot('abc', pasta, versao - 1)
+    corpo = serializar_snapshot({'valor': Decimal('2')})
+    with open(anterior, 'wb') as f:
+        f.write(corpo[:4] + bytes([versao - 1]) + corpo[5:])
+
+    gravar_snapshot_cache('def', {'valor': Decimal('1')}, pasta)
+
+    assert os.path.exists(anterior)
+    assert ler_snapshot_cache('abc', pasta) == {'valor': Decimal('2')}
+
+
+def test_limpeza_respeita_limite_pelo_uso(tmp_path):
+    pasta = str(tmp_path)
+    for i, nome in enumerate(('velho', 'medio', 'novo')):
+        gravar_snapshot_cache(nome, {'dados': 'x' * 100}, pasta)
+        os.utime(caminho_snapshot(nome, pasta), (1000 + i, 1000 + i))
+    tamanho = os.path.getsize(caminho_snapshot('novo', pasta))
+
+    assert limpar_cache_excedente(pasta, limite_bytes=2 * tamanho) == 1
+    assert not os.path.exists(caminho_snapshot('velho', pasta))
+    assert os.path.exists(caminho_snapshot('medio', pasta))
+    assert os.path.exists(caminho_snapshot('novo', pasta))
@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+"""
+Testes do cache persistente de soluções por ponto
+"""
+
+from decimal import Decimal
+import itertools
+
+import pytest
+
+import cache_solucoes
+from cache_solucoes import CacheSolucoes
+
+TOLERANCIA = Decimal('0.00001')
+TEMPOS_INICIAIS = [Decimal('240.000'), Decimal('240.010'), Decimal('239.990')]
+
+
+def criar_ponto(numero=1, pulsos=Decimal('1000')):
+    return {
+        'numero': numero,
+        'linha_inicial': 50 + (numero - 1) * 9,
+        'leituras': [{'pulsos_padrao': pulsos + i, 'tempo_coleta': t, 'leitura_medidor': Decimal('12.5'),
+                      'temperatura': Decimal('21.3')} for i, t in enumerate(TEMPOS_INICIAIS)],
+        'valores_originais': {'vazao_media': Decimal('33.1'), 'tendencia': Decimal('0.2'),
+                              'desvio_padrao': Decimal('0.01')},
+    }
+
+
+def solucao(tempos, convergiu=True, residuo=Decimal('0')):
+    return {
+        'numero': 1,
+        'linha_inicial': 50,
+        'objetivo_atingido': convergiu,
+        'encerramento': 'convergencia' if convergiu else 'busca_esgotada',
+        'exatos': {'tempos': list(tempos), 'residuos': {'vazao_media': residuo}},
+    }
+
+
+class Resolvedor:
+    """
+    Registra as partidas recebidas e devolve as soluções programadas, em ordem
+    """
+
+    def __init__(self, *respostas):
+        self.partidas = []
+        self.respostas = list(respostas)
+
+    def __call__(self, tempos):
+        self.partidas.append(tempos)
+        return self.respostas.pop(0)(tempos)
+
+
+@pytest.fixture
+def relogio(monkeypatch):
+    # Instantes crescentes para a ordem LRU não depender da resolução do relógio
+    instantes = itertools.count(1)
+    monkeypatch.setattr(cache_solucoes.time, 'time', lambda: float(next(instantes)))
+
+
+@pytest.fixture
+def cache(tmp_path, relogio):
+    with CacheSolucoes(str(tmp_path / 'solucoes.sqlite3')) as cache:
+        yield cache
+
+
+def resolver(cache, ponto, resolvedor):
+    return cache.resolver('teste', ponto, {'k': Decimal('1')}, TEMPOS_INICIAIS, TOLERANCIA, resolvedor)
+
+
+def test_acerto_serve_a_solucao_sem_nova_busca(cache):
+    ponto = criar_ponto()
+    primeiro = Resolvedor(lambda tempos: solucao(tempos))
+    assert resolver(cache, ponto, primeiro)['cache'] == 'falta'
+    assert primeiro.partidas == [TEMPOS_INICIAIS]
+
+    segundo = Resolvedor()
+    resultado = resolver(cache, ponto, segundo)
+    assert resultado['cache'] == 'acerto'
+    assert resultado['exatos']['tempos'] == TEMPOS_INICIAIS
+    assert segundo.partidas == []
+    assert cache.estatisticas()['acertos'] == 1
+
+
+def test_partida_vizinha_aceita_quando_converge(cache):
+    tempos_vizinha = [Decimal('240.123'), Decimal('240.456'), Decimal('239.789')]
+    resolver(cache, criar_ponto(pulsos=Decimal('1000')), Resolvedor(lambda tempos: solucao(tempos_vizinha)))
+
+    resolvedor = Resolvedor(lambda tempos: solucao(tempos))
+    resultado = resolver(cache, criar_ponto(pulsos=Decimal('1001')), resolvedor)
+    assert resolvedor.partidas == [tempos_vizinha]
+    assert resultado['cache'] == 'partida_vizinha'
+    assert cache.estatisticas()['partidas_vizinhas'] == 1
+
+
+@pytest.mark.parametrize('resposta_vizinha', [
+    lambda tempos: solucao(tempos, convergiu=False, residuo=Decimal('0.01')),
+    lambda tempos: solucao(tempos, residuo=Decimal('0.01')),
+    lambda tempos: None,
+])
+def test_partida_vizinha_sem_convergencia_refaz_dos_tempos_iniciais(cache, resposta_vizinha):
+    tempos_vizinha = [Decimal('240.123'), Decimal('240.456'), Decimal('239.789')]
+    resolver(cache, criar_ponto(pulsos=Decimal('1000')), Resolvedor(lambda tempos: solucao(tempos_vizinha)))
+
+    resolvedor = Resolvedor(resposta_vizinha, lambda tempos: solucao(tempos, convergiu=False))
+    ponto = criar_ponto(pulsos=Decimal('1001'))
+    resultado = resolver(cache, ponto, resolvedor)
+    assert resolvedor.partidas == [tempos_vizinha, TEMPOS_INICIAIS]
+    assert resultado['cache'] == 'falta'
+    assert resultado['exatos']['tempos'] == TEMPOS_INICIAIS
+    assert cache.estatisticas()['vizinhas_rejeitadas'] == 1
+
+    # A solução gravada é a da partida a frio
+    assert resolver(cache, ponto, Resolvedor())['exatos']['tempos'] == TEMPOS_INICIAIS
+
+
+def test_solucao_interrompida_pelo_prazo_nao_e_gravada(cache):
+    interrompida = dict(solucao(TEMPOS_INICIAIS, convergiu=False), encerramento='prazo')
+    resolver(cache, criar_ponto(), Resolvedor(lambda tempos: interrompida))
+    assert len(cache) == 0
+
+
+def test_lru_remove_as_solucoes_usadas_ha_mais_tempo(tmp_path, relogio):
+    with CacheSolucoes(str(tmp_path / 'solucoes.sqlite3'), limite_entradas=2) as cache:
+        pontos = [criar_ponto(numero, pulsos=Decimal(1000 * numero)) for numero in (1, 2, 3)]
+        resolver(cache, pontos[0], Resolvedor(lambda tempos: solucao(tempos)))
+        resolver(cache, pontos[1], Resolvedor(lambda tempos: solucao(tempos)))
+        # Usar o ponto 1 o torna o mais recente: o ponto 2 é o removido
+        assert resolver(cache, pontos[0], Resolvedor())['cache'] == 'acerto'
+        resolver(cache, pontos[2], Resolvedor(lambda tempos: solucao(tempos)))
+
+        assert len(cache) == 2
+        assert resolver(cache, pontos[0], Resolvedor())['cache'] == 'acerto'
+        assert resolver(cache, pontos[2], Resolvedor())['cache'] == 'acerto'
+        assert resolver(cache, pontos[1], Resolvedor(lambda tempos: solucao(tempos)))['cache'] == 'falta'
+
+
+def test_nova_versao_do_motor_invalida_as_solucoes(tmp_path, relogio):
+    caminho = str(tmp_path / 'solucoes.sqlite3')
+    ponto = criar_ponto()
+    with CacheSolucoes(caminho, versao_motor=cache_solucoes.VERSAO_MOTOR) as cache:
+        resolver(cache, ponto, Resolvedor(lambda tempos: solucao(tempos)))
+        assert len(cache) == 1
+
+    with CacheSolucoes(caminho, versao_motor=cache_solucoes.VERSAO_MOTOR + 1) as cache:
+        assert len(cache) == 0
+        resolvedor = Resolvedor(lambda tempos: solucao(tempos))
+        assert resolver(cache, ponto, resolvedor)['cache'] == 'falta'
+        assert resolvedor.partidas == [TEMPOS_INICIAIS]
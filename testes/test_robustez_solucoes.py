@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+"""
+Testes da reotimização de pontos frágeis na etapa de robustez
+"""
+
+from decimal import Decimal
+
+from openpyxl import Workbook
+import pytest
+
+import robustez_solucoes
+from otimizador_tempos_inteligente import calcular_agregados_com_tempo_ajustado, calcular_formulas_com_tempo_ajustado
+from robustez_solucoes import ResultadoRobustez, alvo_robusto, avaliar_ponto, reforcar_ponto
+
+TOLERANCIA = Decimal('0.00001')
+TEMPOS = [Decimal('240.00012'), Decimal('239.99991'), Decimal('240.00003')]
+
+CONSTANTES = {
+    'ponto_mlp': Decimal('200'), 'pulso_equipamento_mlp': Decimal('1'),
+    'constante_correcao_temp': Decimal('0'), 'constante_correcao_inclinacao': Decimal('0'),
+    'correcao_tempo_bu23': Decimal('0'), 'correcao_tempo_bw23': Decimal('0'),
+    'correcao_temp_bu26': Decimal('0'), 'correcao_temp_bw26': Decimal('0'),
+    'modo_calibracao': 'Automática com início dinâmico',
+}
+
+
+def criar_ponto():
+    leituras = [{'linha': 54 + i, 'pulsos_padrao': pulsos, 'tempo_coleta': tempo,
+                 'leitura_medidor': Decimal('2260.5'), 'temperatura': Decimal('25.5')}
+                for i, (pulsos, tempo) in enumerate(zip((Decimal('11285'), Decimal('11335'), Decimal('11365')), TEMPOS))]
+    return {'numero': 1, 'linha_inicial': 54, 'leituras': leituras}
+
+
+def valores_sagrados(ponto):
+    # Os sagrados são os agregados dos tempos de partida: resíduos zero
+    return calcular_agregados_com_tempo_ajustado(calcular_formulas_com_tempo_ajustado(ponto['leituras'], CONSTANTES, TEMPOS))
+
+
+def robustez(vazao_media, tendencia=1.0):
+    return ResultadoRobustez(numero=1, amostras=100, modo='excel',
+                             probabilidades={'vazao_media': vazao_media, 'tendencia': tendencia},
+                             casas={'vazao_media': 3, 'tendencia': 4}, nominais={})
+
+
+class Programado:
+    """
+    Devolve as respostas programadas, em ordem, registrando as chamadas
+    """
+
+    def __init__(self, *respostas):
+        self.respostas = list(respostas)
+        self.chamadas = []
+
+    def __call__(self, *args, **kwargs):
+        self.chamadas.append((args, kwargs))
+        return self.respostas.pop(0)
+
+
+def refinado(tempos):
+    return {'numero': 1, 'linha_inicial': 54, 'tempos_ultra_refinados': [float(t) for t in tempos],
+            'exatos': {'tempos_ultra_refinados': list(tempos)}}
+
+
+@pytest.fixture
+def programar(monkeypatch):
+    def programar(avaliacoes, reotimizacoes):
+        avaliar, reotimizar = Programado(*avaliacoes), Programado(*reotimizacoes)
+        monkeypatch.setattr(robustez_solucoes, 'avaliar_ponto', avaliar)
+        monkeypatch.setattr(robustez_solucoes, 'reotimizar_ponto', reotimizar)
+        return avaliar, reotimizar
+    return programar
+
+
+def test_tentativa_que_piora_os_residuos_e_desfeita(programar):
+    ponto = criar_ponto()
+    # Mais robusta, mas a vazão média se afasta do valor sagrado muito além da tolerância
+    piores = [t + Decimal('0.05') for t in TEMPOS]
+    _, reotimizar = programar([robustez(0.5), robustez(1.0)], [refinado(piores)])
+    gravados = []
+
+    resultado = reforcar_ponto(ponto, CONSTANTES, valores_sagrados(ponto), TOLERANCIA, gravar_tempos=gravados.append)
+
+    assert [l['tempo_coleta'] for l in ponto['leituras']] == TEMPOS
+    assert gravados == []
+    assert resultado.probabilidades['vazao_media'] == 0.5
+    # O alvo da segunda tentativa é o mesmo (limitado pela tolerância): não é refeita
+    assert len(reotimizar.chamadas) == 1
+
+
+def test_tentativa_sem_ganho_de_probabilidade_e_desfeita(programar):
+    ponto = criar_ponto()
+    vizinhos = [TEMPOS[0] + Decimal('0.0000001')] + TEMPOS[1:]
+    programar([robustez(0.5), robustez(0.5)], [refinado(vizinhos)])
+    gravados = []
+
+    resultado = reforcar_ponto(ponto, CONSTANTES, valores_sagrados(ponto), TOLERANCIA, gravar_tempos=gravados.append)
+
+    assert [l['tempo_coleta'] for l in ponto['leituras']] == TEMPOS
+    assert gravados == []
+    assert resultado.tentativas == 1
+
+
+def test_tentativa_mais_robusta_dentro_da_tolerancia_e_aceita(programar):
+    ponto = criar_ponto()
+    vizinhos = [TEMPOS[0] + Decimal('0.0000001')] + TEMPOS[1:]
+    _, reotimizar = programar([robustez(0.5), robustez(1.0)], [refinado(vizinhos)])
+    gravados = []
+
+    resultado = reforcar_ponto(ponto, CONSTANTES, valores_sagrados(ponto), TOLERANCIA, gravar_tempos=gravados.append)
+
+    assert [l['tempo_coleta'] for l in ponto['leituras']] == vizinhos
+    assert gravados == [refinado(vizinhos)]
+    assert not resultado.fragil()
+    assert len(reotimizar.chamadas) == 1
+
+
+def test_ganho_dentro_do_erro_padrao_e_desfeito(programar):
+    ponto = criar_ponto()
+    vizinhos = [TEMPOS[0] + Decimal('0.0000001')] + TEMPOS[1:]
+    # Com 100 amostras o erro padrão da diferença é ~0.07: 0.50 → 0.52 é ruído
+    programar([robustez(0.5), robustez(0.52)], [refinado(vizinhos)])
+    gravados = []
+
+    reforcar_ponto(ponto, CONSTANTES, valores_sagrados(ponto), TOLERANCIA, gravar_tempos=gravados.append)
+
+    assert [l['tempo_coleta'] for l in ponto['leituras']] == TEMPOS
+    assert gravados == []
+
+
+def test_reforco_com_amostragem_real_e_reprodutivel():
+    # Vazão média com 11 casas: o arredondamento das entradas a cruza
+    coleta_sheet = Workbook().active
+    coleta_sheet.cell(row=57, column=9).number_format = '0.00000000000'
+    resultados = []
+    for _ in range(2):
+        ponto = criar_ponto()
+        resultado = reforcar_ponto(ponto, CONSTANTES, valores_sagrados(ponto), TOLERANCIA, coleta_sheet)
+        resultados.append(([l['tempo_coleta'] for l in ponto['leituras']], resultado))
+
+    (tempos, primeiro), (tempos_repetidos, segundo) = resultados
+    assert 0 < primeiro.probabilidades['vazao_media'] < 1 and primeiro.tentativas > 0
+    assert tempos == tempos_repetidos
+    assert primeiro.probabilidades == segundo.probabilidades
+    assert primeiro.historico == segundo.historico
+
+
+def test_desvio_padrao_sem_valor_na_planilha_nao_e_avaliado():
+    ponto = criar_ponto()
+    sagrados = valores_sagrados(ponto)
+    avaliado = avaliar_ponto(ponto, CONSTANTES, sagrados)
+    sagrados['desvio_padrao'] = None
+
+    resultado = avaliar_ponto(ponto, CONSTANTES, sagrados)
+
+    assert avaliado.probabilidades['desvio_padrao'] == 1.0 and avaliado.nao_avaliados == []
+    assert 'desvio_padrao' not in resultado.probabilidades
+    assert resultado.nao_avaliados == ['desvio_padrao']
+
+
+def test_tendencia_fragil_nao_e_reotimizada(programar):
+    ponto = criar_ponto()
+    _, reotimizar = programar([robustez(1.0, tendencia=0.0)], [])
+
+    resultado = reforcar_ponto(ponto, CONSTANTES, valores_sagrados(ponto), TOLERANCIA)
+
+    assert reotimizar.chamadas == []
+    assert resultado.fragil() and resultado.tentativas == 0
+    assert [l['tempo_coleta'] for l in ponto['leituras']] == TEMPOS
+
+
+def test_alvo_ja_tentado_nao_e_reotimizado_de_novo(programar):
+    ponto = criar_ponto()
+    sagrados = valores_sagrados(ponto)
+    # Valor sagrado no interior da faixa: nenhuma margem o desloca, o alvo é sempre o mesmo
+    sagrados['vazao_media'] = sagrados['vazao_media'].quantize(Decimal('0.001'))
+    _, reotimizar = programar([robustez(0.5), robustez(0.5)], [refinado(TEMPOS)])
+
+    reforcar_ponto(ponto, CONSTANTES, sagrados, TOLERANCIA)
+
+    assert len(reotimizar.chamadas) == 1
+
+
+@pytest.mark.parametrize('valor', [Decimal('239.9575'), Decimal('239.95749999'), Decimal('239.9575001')])
+def test_alvo_deslocado_fica_dentro_da_tolerancia(valor):
+    for margem in (Decimal('0'), Decimal('0.125'), Decimal('0.25'), Decimal('0.49')):
+        assert abs(alvo_robusto(valor, 3, margem, TOLERANCIA) - valor) <= TOLERANCIA / 2
+
+
+def test_margem_no_centro_da_faixa_e_rejeitada():
+    with pytest.raises(ValueError):
+        alvo_robusto(Decimal('239.9575'), 3, Decimal('0.5'))
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""
+Testes diferenciais da busca por sensibilidade contra a varredura completa
+A varredura de referência é a dos refinadores antes da busca por sensibilidade:
+percorre a grade em ordem, para no primeiro candidato dentro da tolerância e,
+sem acerto, fica com o de menor diferença. Com a ordem 1-2-3 forçada, os
+refinadores atuais devem chegar aos mesmos tempos
+"""
+
+from decimal import Decimal
+import random
+
+import pytest
+
+from aplicador_tempos_gerados import buscar_refinamento_tempos_sequencial, calcular_vazao_com_tempos
+from estrategias_tempo import compilar_estrategia
+from refinador_ultra_preciso import buscar_refinamento_ultra_preciso
+
+# Constantes e pulsos das planilhas de fixture do repositório
+CONSTANTES = {
+    'ponto_mlp': Decimal('200'), 'pulso_equipamento_mlp': Decimal('1'),
+    'constante_correcao_temp': Decimal('0'), 'constante_correcao_inclinacao': Decimal('0'),
+    'correcao_tempo_bu23': Decimal('0'), 'correcao_tempo_bw23': Decimal('0'),
+    'correcao_temp_bu26': Decimal('0'), 'correcao_temp_bw26': Decimal('0'),
+}
+PULSOS = [(Decimal('11285'), Decimal('11335'), Decimal('11365')),
+          (Decimal('11307'), Decimal('11273'), Decimal('11291'))]
+
+SEMENTES = range(12)
+
+
+def criar_leituras(pulsos):
+    return [{'pulsos_padrao': p, 'temperatura': Decimal('25.5')} for p in pulsos]
+
+
+def tempos_aleatorios(rng, raio, escala=Decimal('1000')):
+    return [Decimal('240') + Decimal(rng.randint(-raio, raio)) / escala for _ in range(3)]
+
+
+def varrer(leituras, tempos_atual, tempo_idx, valores, vazao_desejada, tolerancia, melhor):
+    """
+    Varredura completa de um tempo: (tempo, vazão, acertou) do primeiro acerto ou da melhor aproximação
+    """
+    melhor_tempo, melhor_vazao = melhor
+    melhor_diferenca = abs(melhor_vazao - vazao_desejada)
+    for valor in valores:
+        tempos_teste = list(tempos_atual)
+        tempos_teste[tempo_idx] = valor
+        vazao = calcular_vazao_com_tempos(leituras, CONSTANTES, tempos_teste)
+        diferenca = abs(vazao - vazao_desejada)
+        if diferenca <= tolerancia:
+            return valor, vazao, True
+        if diferenca < melhor_diferenca:
+            melhor_tempo, melhor_vazao, melhor_diferenca = valor, vazao, diferenca
+    return melhor_tempo, melhor_vazao, False
+
+
+def varredura_hibrida(leituras, vazao_desejada, tempos, direcao, tolerancia):
+    principais, fallback, _ = compilar_estrategia().grades(direcao)
+    diferenca_inicial = abs(calcular_vazao_com_tempos(leituras, CONSTANTES, tempos) - vazao_desejada)
+    tempos_atual = list(tempos)
+    for tempo_idx in range(3):
+        melhor = (tempos_atual[tempo_idx], calcular_vazao_com_tempos(leituras, CONSTANTES, tempos_atual))
+        fases = [principais] + ([fallback] if diferenca_inicial > tolerancia * 2 else [])
+        for valores in fases:
+            *melhor, acertou = varrer(leituras, tempos_atual, tempo_idx, valores, vazao_desejada, tolerancia, melhor)
+            if acertou:
+                tempos_atual[tempo_idx] = melhor[0]
+                return tempos_atual
+        tempos_atual[tempo_idx] = melhor[0]
+    return tempos_atual
+
+
+def varredura_ultra(leituras, vazao_desejada, tempos, tolerancia):
+    restricoes = compilar_estrategia()
+    incremento = restricoes.incremento_ultra
+    tempos_atual = list(tempos)
+    for tempo_idx in range(3):
+        tempo = tempos_atual[tempo_idx]
+        vazao = calcular_vazao_com_tempos(leituras, CONSTANTES, tempos_atual)
+        if vazao < vazao_desejada:
+            passos = range(1, restricoes.passos_ultra[0] + 1)
+            valores = [v for v in (tempo - incremento * k for k in passos) if v >= restricoes.piso_ultra]
+        else:
+            passos = range(1, restricoes.passos_ultra[1] + 1)
+            valores = [v for v in (tempo + incremento * k for k in passos) if v <= restricoes.teto_ultra]
+        tempo, _, acertou = varrer(leituras, tempos_atual, tempo_idx, valores, vazao_desejada, tolerancia,
+                                   (tempo, vazao))
+        tempos_atual[tempo_idx] = tempo
+        if acertou:
+            break
+    return tempos_atual
+
+
+@pytest.mark.parametrize('pulsos', PULSOS)
+@pytest.mark.parametrize('semente', SEMENTES)
+@pytest.mark.parametrize('tolerancia', [Decimal('0.07'), Decimal('0.005')])
+def test_hibrido_com_ordem_fixa_reproduz_a_varredura(pulsos, semente, tolerancia):
+    rng = random.Random(semente)
+    leituras = criar_leituras(pulsos)
+    vazao_desejada = calcular_vazao_com_tempos(leituras, CONSTANTES, tempos_aleatorios(rng, 200))
+    tempos = tempos_aleatorios(rng, 150)
+    vazao = calcular_vazao_com_tempos(leituras, CONSTANTES, tempos)
+    direcao = 'INCREMENTAR' if vazao < vazao_desejada else 'DECREMENTAR'
+
+    resultado = buscar_refinamento_tempos_sequencial(leituras, CONSTANTES, vazao_desejada, tempos, direcao,
+                                                     tolerancia, ordem=[0, 1, 2])
+    assert resultado['tempos'] == varredura_hibrida(leituras, vazao_desejada, tempos, direcao, tolerancia)
+
+
+@pytest.mark.parametrize('pulsos', PULSOS)
+@pytest.mark.parametrize('semente', SEMENTES)
+def test_ultra_com_ordem_fixa_reproduz_a_varredura(pulsos, semente):
+    rng = random.Random(semente)
+    leituras = criar_leituras(pulsos)
+    vazao_desejada = calcular_vazao_com_tempos(leituras, CONSTANTES, tempos_aleatorios(rng, 200))
+    tempos = tempos_aleatorios(rng, 15000, Decimal('100000'))
+    tolerancia = Decimal('0.00001')
+
+    resultado = buscar_refinamento_ultra_preciso(leituras, CONSTANTES, vazao_desejada, tempos, tolerancia,
+                                                 ordem=[0, 1, 2])
+    assert resultado['tempos'] == varredura_ultra(leituras, vazao_desejada, tempos, tolerancia)